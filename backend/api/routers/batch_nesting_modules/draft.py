@@ -10,7 +10,7 @@ import logging
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from api.database import get_db
 from services.nesting_service import get_nesting_service
@@ -42,6 +42,13 @@ class ConfirmDraftResponse(BaseModel):
     persistent_batch_id: str
     draft_id: str
 
+class RepairDraftRequest(BaseModel):
+    """Schema per riparazione incrementale di un batch DRAFT"""
+    add_odl_ids: List[int] = Field(default_factory=list, description="ODL da aggiungere al layout")
+    remove_odl_ids: List[int] = Field(default_factory=list, description="ODL da rimuovere dal layout")
+    neighbourhood_size: int = Field(6, ge=1, le=50, description="Tool vicini riaperti dal CP-SAT locale")
+    time_limit_ms: int = Field(600, ge=50, le=10000, description="Budget massimo della riparazione")
+
 # === ENDPOINTS BATCH DRAFT ===
 
 @router.get("/draft", response_model=DraftBatchListResponse,
@@ -296,6 +303,203 @@ def confirm_draft_batch(
             detail=f"Errore conferma batch DRAFT: {str(e)}"
         )
 
+@router.post("/draft/{draft_id}/repair", summary="🔧 Riparazione incrementale layout batch DRAFT")
+def repair_draft_batch(
+    draft_id: str,
+    request: RepairDraftRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    🔧 RIPARAZIONE INCREMENTALE BATCH DRAFT
+    ========================================
+
+    Aggiunge/rimuove ODL da un batch DRAFT senza rigenerare l'intero layout.
+
+    - I tool non coinvolti mantengono la posizione attuale
+    - Nuovi ODL: inserimento nello spazio libero, altrimenti CP-SAT locale su pochi tool vicini
+    - Batch 2L: la riparazione opera sul livello 0, tool di livello 1 e cavalletti restano fissi
+    """
+    try:
+        from models.batch_nesting import BatchNesting, StatoBatchNestingEnum
+        from sqlalchemy.orm import joinedload
+        from services.nesting.incremental import IncrementalRepairer
+        from services.nesting.solver import NestingParameters, NestingLayout, ToolInfo, AutoclaveInfo
+
+        draft_batch = db.query(BatchNesting).options(
+            joinedload(BatchNesting.autoclave)
+        ).filter(
+            BatchNesting.id == draft_id,
+            BatchNesting.stato == StatoBatchNestingEnum.DRAFT.value
+        ).first()
+
+        if not draft_batch:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Batch DRAFT {draft_id} non trovato nel database"
+            )
+        if not request.add_odl_ids and not request.remove_odl_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Specificare almeno un ODL da aggiungere o rimuovere"
+            )
+
+        configurazione = dict(draft_batch.configurazione_json or {})
+        is_2l_batch = bool(configurazione.get('is_2l_batch', False))
+        positions_key = 'positioned_tools' if configurazione.get('positioned_tools') else 'tool_positions'
+        positions = [dict(p) for p in configurazione.get(positions_key) or []]
+        autoclave = draft_batch.autoclave
+        parametri = draft_batch.parametri or {}
+
+        parameters = NestingParameters(
+            padding_mm=float(parametri.get('padding_mm', configurazione.get('padding_mm', 10.0))),
+            min_distance_mm=float(parametri.get('min_distance_mm', configurazione.get('min_distance_mm', 15.0))),
+            vacuum_lines_capacity=int(getattr(autoclave, 'num_linee_vuoto', None) or 10)
+        )
+        autoclave_info = AutoclaveInfo(
+            id=autoclave.id,
+            width=float(configurazione.get('canvas_width') or autoclave.lunghezza or 0),
+            height=float(configurazione.get('canvas_height') or autoclave.larghezza_piano or 0),
+            max_weight=float(autoclave.max_load_kg or 1000),
+            max_lines=parameters.vacuum_lines_capacity
+        )
+
+        # 2L: solo il livello 0 è riparato, livello 1 e cavalletti sono ostacoli fissi
+        removed = set(request.remove_odl_ids)
+        upper_level = [p for p in positions if p.get('level', 0) == 1 and p.get('odl_id') not in removed]
+        cavalletti = [
+            c for c in configurazione.get('cavalletti') or []
+            if c.get('tool_odl_id') not in removed
+        ]
+        obstacles = [(float(c['x']), float(c['y']), float(c['width']), float(c['height'])) for c in cavalletti]
+        lower_level = [p for p in positions if p.get('level', 0) == 0]
+
+        layouts = [
+            NestingLayout(
+                odl_id=p['odl_id'],
+                x=float(p.get('x', 0)),
+                y=float(p.get('y', 0)),
+                width=float(p.get('width', 0)),
+                height=float(p.get('height', 0)),
+                weight=float(p.get('peso', p.get('weight', 0)) or 0),
+                rotated=bool(p.get('rotated', False)),
+                lines_used=int(p.get('lines_used', 1) or 1)
+            )
+            for p in lower_level
+        ]
+
+        present_ids = {p.get('odl_id') for p in positions}
+        nesting_service = get_nesting_service()
+        odl_data = nesting_service.get_odl_data(db, [i for i in request.add_odl_ids if i not in present_ids])
+        add_tools = [
+            ToolInfo(
+                odl_id=odl['odl_id'],
+                width=float(odl['tool_width']),
+                height=float(odl['tool_height']),
+                weight=float(odl['tool_weight']),
+                lines_needed=odl.get('lines_needed', 1),
+                ciclo_cura_id=odl.get('ciclo_cura_id')
+            )
+            for odl in odl_data
+        ]
+
+        # Il livello 1 conta per peso e linee vuoto ma non occupa il piano
+        upper_weight = sum(float(p.get('peso', p.get('weight', 0)) or 0) for p in upper_level)
+        upper_lines = sum(int(p.get('lines_used', 1) or 1) for p in upper_level)
+        autoclave_info.max_weight -= upper_weight
+        parameters.vacuum_lines_capacity -= upper_lines
+
+        repairer = IncrementalRepairer(
+            parameters,
+            neighbourhood_size=request.neighbourhood_size,
+            time_limit_seconds=request.time_limit_ms / 1000
+        )
+        result = repairer.repair(layouts, autoclave_info, add_tools, request.remove_odl_ids, obstacles)
+        solution = result.solution
+
+        # Aggiorna le posizioni mantenendo i campi esistenti (info ODL, livello, ...)
+        by_odl = {p['odl_id']: p for p in lower_level}
+        odl_info = {odl['odl_id']: odl for odl in odl_data}
+        new_positions = []
+        for layout in solution.layouts:
+            entry = dict(by_odl.get(layout.odl_id, {}))
+            entry.update({
+                'odl_id': layout.odl_id,
+                'x': float(layout.x),
+                'y': float(layout.y),
+                'width': float(layout.width),
+                'height': float(layout.height),
+                'peso': float(layout.weight),
+                'rotated': bool(layout.rotated),
+                'lines_used': int(layout.lines_used)
+            })
+            if layout.odl_id in odl_info:
+                entry['descrizione_breve'] = odl_info[layout.odl_id].get('parte_descrizione')
+                if is_2l_batch:
+                    entry.update({'level': 0, 'weight': float(layout.weight)})
+            new_positions.append(entry)
+        new_positions.extend(upper_level)
+
+        configurazione[positions_key] = new_positions
+        if 'positioned_tools_data' in configurazione:
+            configurazione['positioned_tools_data'] = new_positions
+        if 'plane_assignments' in configurazione:
+            configurazione['plane_assignments'] = {str(p['odl_id']): p.get('lines_used', 1) for p in new_positions}
+        if is_2l_batch:
+            configurazione['cavalletti'] = cavalletti
+            configurazione['total_positioned'] = len(new_positions)
+            configurazione['level_0_count'] = len(solution.layouts)
+            configurazione['level_1_count'] = len(upper_level)
+        configurazione['last_repair'] = {
+            'strategy': result.strategy,
+            'added_odl_ids': result.added_odl_ids,
+            'removed_odl_ids': result.removed_odl_ids,
+            'moved_odl_ids': result.moved_odl_ids,
+            'excluded_odls': solution.excluded_odls,
+            'time_ms': solution.metrics.time_solver_ms
+        }
+
+        if not is_2l_batch:
+            configurazione['efficiency'] = float(solution.metrics.efficiency_score)
+
+        total_weight = sum(float(p.get('peso', p.get('weight', 0)) or 0) for p in new_positions)
+        draft_batch.configurazione_json = configurazione
+        draft_batch.odl_ids = [p['odl_id'] for p in new_positions]
+        draft_batch.peso_totale_kg = int(total_weight)
+        draft_batch.valvole_totali_utilizzate = sum(int(p.get('lines_used', 1) or 1) for p in new_positions)
+        if not is_2l_batch:
+            draft_batch.numero_nesting = len(new_positions)
+            draft_batch.area_totale_utilizzata = int(sum(l.width * l.height for l in solution.layouts) / 100)
+            draft_batch.efficiency = float(solution.metrics.efficiency_score)
+
+        db.commit()
+        db.refresh(draft_batch)
+
+        logger.info(f"🔧 Batch DRAFT {draft_id} riparato: {solution.message} ({solution.metrics.time_solver_ms:.0f}ms)")
+
+        return {
+            "success": True,
+            "draft_id": draft_id,
+            "message": solution.message,
+            "strategy": result.strategy,
+            "added_odl_ids": result.added_odl_ids,
+            "removed_odl_ids": result.removed_odl_ids,
+            "moved_odl_ids": result.moved_odl_ids,
+            "excluded_odls": solution.excluded_odls,
+            "neighbourhood_size": result.neighbourhood_size,
+            "time_ms": solution.metrics.time_solver_ms,
+            "configurazione_json": configurazione
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Errore riparazione batch DRAFT {draft_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Errore riparazione batch DRAFT: {str(e)}"
+        )
+
 @router.delete("/draft/{draft_id}", summary="🗑️ Elimina batch DRAFT dal database")
 def delete_draft_batch(
     draft_id: str,
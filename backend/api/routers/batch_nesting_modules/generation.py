@@ -29,6 +29,7 @@ from models.ciclo_cura import CicloCura
 from models.tool import Tool
 from services.nesting_service import NestingService, NestingParameters as ServiceNestingParameters
 from schemas.batch_nesting import (
+    NestingModeEnum,
     NestingSolveRequest, 
     NestingSolveResponse, 
     NestingMetricsResponse,
@@ -36,6 +37,7 @@ from schemas.batch_nesting import (
     NestingExcludedODL
 )
 from services.nesting.solver import NestingModel, NestingParameters as SolverNestingParameters, ToolInfo, AutoclaveInfo
+from services.nesting.fleet_assignment import FleetAssigner, FleetAssignment
 from schemas.batch_nesting import (
     NestingSolveRequest2L,
     NestingSolveResponse2L,
@@ -64,6 +66,7 @@ router = APIRouter(
 class NestingParametri(BaseModel):
     padding_mm: int = 10  # Default padding 10mm - SARÀ SOVRASCRITTO dai parametri frontend
     min_distance_mm: int = 8  # Default distanza 8mm - SARÀ SOVRASCRITTO dai parametri frontend
+    mode: NestingModeEnum = NestingModeEnum.THOROUGH  # fast = anteprima senza CP-SAT
 
 class NestingRequest(BaseModel):
     odl_ids: List[str]
@@ -115,6 +118,8 @@ class NestingResponse(BaseModel):
     success: bool
     validation_report: Optional[Dict[str, Any]] = None
     fixes_applied: List[str] = []
+    mode_used: str = NestingModeEnum.THOROUGH.value
+    latency_ms: float = 0.0
 
 class NestingDataResponse(BaseModel):
     """Risposta per l'endpoint /data con ODL e autoclavi disponibili"""
@@ -382,7 +387,9 @@ def genera_nesting_single_autoclave(
                 algorithm_status=result.get('algorithm_status', 'SUCCESS'),
                 success=True,
                 validation_report={},
-                fixes_applied=[]
+                fixes_applied=[],
+                mode_used=request.parametri.mode.value,
+                latency_ms=(time.time() - start_time) * 1000
             )
             
             execution_time = time.time() - start_time
@@ -470,8 +477,10 @@ def genera_multi_aerospace_filtered(
                 detail=f"Nessun ODL valido trovato in stato 'Attesa Cura' tra gli ID: {odl_ids_int}"
             )
         
-        # Distribuisci ODL tra le autoclavi selezionate (non tutte disponibili)
-        distribution = _distribute_odls_aerospace_grade(odl_list, autoclavi_selezionate)
+        # Assegnazione congiunta ODL → autoclavi selezionate (non tutte disponibili)
+        assignment = _distribute_odls_aerospace_grade(odl_list, autoclavi_selezionate, request.parametri)
+        distribution = assignment.assignments
+        pending = list(assignment.unassigned)
         
         # Genera nesting per ogni autoclave selezionata
         batch_results = []
@@ -479,7 +488,8 @@ def genera_multi_aerospace_filtered(
         error_count = 0
         
         for autoclave in autoclavi_selezionate:
-            autoclave_odl_ids = distribution.get(autoclave.id, [])
+            # ODL rimandati dalle autoclavi precedenti, se compatibili
+            autoclave_odl_ids = distribution.get(autoclave.id, []) + _take_pending_odls(pending, autoclave.id, assignment)
             
             if not autoclave_odl_ids:
                 continue
@@ -491,6 +501,7 @@ def genera_multi_aerospace_filtered(
                     autoclave_id=autoclave.id,
                     parametri=request.parametri
                 )
+                pending.extend(_collect_pushed_back(result, autoclave_odl_ids))
                 
                 if result['success']:
                     # 🔧 FIX CRITICO: Usa direttamente il batch_id restituito da generate_nesting
@@ -524,6 +535,7 @@ def genera_multi_aerospace_filtered(
                     
             except Exception as e:
                 logger.error(f"❌ Errore generazione autoclave {autoclave.nome}: {str(e)}")
+                pending.extend(autoclave_odl_ids)
                 batch_results.append({
                     'batch_id': None,
                     'autoclave_id': autoclave.id,
@@ -565,7 +577,9 @@ def genera_multi_aerospace_filtered(
             'avg_efficiency': avg_efficiency,
             'batch_results': batch_results,
             'is_real_multi_batch': len(successful_batches) > 1,
-            'unique_autoclavi_count': len(set(b['autoclave_id'] for b in successful_batches))
+            'unique_autoclavi_count': len(set(b['autoclave_id'] for b in successful_batches)),
+            'assignment_method': assignment.method,
+            'odl_rimandati': pending
         }
         
     except HTTPException:
@@ -612,9 +626,9 @@ def genera_multi_aerospace_unified(
     - Previene visualizzazione di batch obsoleti
     
     🏭 **DISTRIBUZIONE MULTI-AUTOCLAVE:**
-    - Distribuisce ODL tra tutte le autoclavi disponibili
-    - Algoritmo round-robin per bilanciamento carico
-    - Genera esattamente 1 batch per autoclave
+    - Assegnazione congiunta ODL → autoclavi (area, peso, linee vuoto, ciclo di cura)
+    - Gli ODL esclusi dal nesting di un'autoclave passano alle successive compatibili
+    - Genera al più 1 batch per autoclave; i rimandati tornano in odl_rimandati
     
     ⚡ **GESTIONE FALLIMENTI:**
     - Fallback automatico se autoclave non disponibile
@@ -678,8 +692,10 @@ def genera_multi_aerospace_unified(
         
         logger.info(f"✅ ODL validati: {len(odl_list)}/{len(odl_ids_int)}")
         
-        # Distribui ODL tra autoclavi
-        distribution = _distribute_odls_aerospace_grade(odl_list, autoclavi_disponibili)
+        # Assegnazione congiunta ODL → autoclavi (capacità, dimensioni, ciclo di cura)
+        assignment = _distribute_odls_aerospace_grade(odl_list, autoclavi_disponibili, request.parametri)
+        distribution = assignment.assignments
+        pending = list(assignment.unassigned)
         
         # Genera nesting per ogni autoclave
         batch_results = []
@@ -687,7 +703,8 @@ def genera_multi_aerospace_unified(
         error_count = 0
         
         for autoclave in autoclavi_disponibili:
-            autoclave_odl_ids = distribution.get(autoclave.id, [])
+            # ODL rimandati dalle autoclavi precedenti, se compatibili
+            autoclave_odl_ids = distribution.get(autoclave.id, []) + _take_pending_odls(pending, autoclave.id, assignment)
             
             if not autoclave_odl_ids:
                 continue
@@ -699,6 +716,7 @@ def genera_multi_aerospace_unified(
                     autoclave_id=autoclave.id,
                     parametri=request.parametri
                 )
+                pending.extend(_collect_pushed_back(result, autoclave_odl_ids))
                 
                 if result['success']:
                     # 🔧 FIX CRITICO: Usa direttamente il batch_id restituito da generate_nesting
@@ -732,6 +750,7 @@ def genera_multi_aerospace_unified(
                     
             except Exception as e:
                 logger.error(f"Errore generazione per {autoclave.nome}: {e}")
+                pending.extend(autoclave_odl_ids)
                 error_count += 1
         
         # 🔧 FIX CRITICO: Trova il batch migliore per efficienza con controllo validità ID
@@ -759,7 +778,9 @@ def genera_multi_aerospace_unified(
             "total_autoclavi": len(autoclavi_disponibili),
             "is_real_multi_batch": success_count > 1,
             "best_batch_id": best_batch_id,  # 🔧 FIX: Usa batch con migliore efficienza
-            "avg_efficiency": avg_efficiency  # 🆕 Aggiungi efficienza media
+            "avg_efficiency": avg_efficiency,  # 🆕 Aggiungi efficienza media
+            "assignment_method": assignment.method,  # 🚀 Assegnazione congiunta flotta
+            "odl_rimandati": pending  # ODL non posizionati in nessuna autoclave (restano in Attesa Cura)
         }
         
     except HTTPException:
@@ -793,8 +814,9 @@ def solve_nesting_v1_4_12_demo(
     - Heuristica "Ruin & Recreate Goal-Driven" (RRGH) opzionale
     - Vincoli su linee vuoto e bilanciamento peso
     """
+    request_start = time.time()
     try:
-        logger.info(f"🚀 Avvio nesting solver v1.4.12-DEMO per autoclave {request.autoclave_id}")
+        logger.info(f"🚀 Avvio nesting solver v1.4.12-DEMO per autoclave {request.autoclave_id} (modalità {request.mode.value})")
         
         # Verifica autoclave
         autoclave = db.query(Autoclave).filter(Autoclave.id == request.autoclave_id).first()
@@ -854,7 +876,9 @@ def solve_nesting_v1_4_12_demo(
                     "lunghezza": autoclave.lunghezza,
                     "max_load_kg": autoclave.max_load_kg,
                     "num_linee_vuoto": autoclave.num_linee_vuoto
-                }
+                },
+                mode_used=request.mode.value,
+                latency_ms=(time.time() - request_start) * 1000
             )
         
         # Configura parametri solver
@@ -864,7 +888,9 @@ def solve_nesting_v1_4_12_demo(
             vacuum_lines_capacity=request.vacuum_lines_capacity or autoclave.num_linee_vuoto,
             allow_heuristic=request.allow_heuristic,
             timeout_override=request.timeout_override,
-            heavy_piece_threshold_kg=request.heavy_piece_threshold_kg
+            heavy_piece_threshold_kg=request.heavy_piece_threshold_kg,
+            mode=request.mode.value,
+            use_solution_cache=True  # 🚀 Riuso layout per set di tool già nestati (ODL diversi)
         )
         
         # Esegui nesting
@@ -965,12 +991,14 @@ def solve_nesting_v1_4_12_demo(
                 "lunghezza": autoclave.lunghezza,
                 "max_load_kg": autoclave.max_load_kg,
                 "num_linee_vuoto": autoclave.num_linee_vuoto
-            }
+            },
+            mode_used=solution.metrics.mode_used or request.mode.value,
+            latency_ms=(time.time() - request_start) * 1000
         )
         
         logger.info(f"✅ Nesting completato: {solution.metrics.positioned_count} pezzi posizionati, "
                    f"efficienza {solution.metrics.efficiency_score:.1f}%, "
-                   f"tempo {solution.metrics.time_solver_ms:.0f}ms, "
+                   f"latenza {response.latency_ms:.0f}ms ({response.mode_used}), "
                    f"rotazione={solution.metrics.rotation_used}")
         
         return response
@@ -984,68 +1012,86 @@ def solve_nesting_v1_4_12_demo(
             detail=f"Errore interno durante la risoluzione del nesting: {str(e)}"
         )
 
-def _distribute_odls_aerospace_grade(odl_list: List[ODL], autoclavi_disponibili: List[Autoclave]) -> Dict[int, List[int]]:
+def _distribute_odls_aerospace_grade(
+    odl_list: List[ODL],
+    autoclavi_disponibili: List[Autoclave],
+    parametri: Optional[NestingParametri] = None
+) -> FleetAssignment:
     """
-    🚀 AEROSPACE-GRADE ODL DISTRIBUTION v2.0
+    🚀 AEROSPACE-GRADE ODL DISTRIBUTION v3.0
     ========================================
     
-    Algoritmo di distribuzione intelligente ODL tra autoclavi aerospace seguendo:
-    - Bilanciamento peso/volume ottimale
-    - Compatibilità cicli di cura
-    - Efficienza dimensionale
-    - Fallback robusti per edge cases
+    Assegnazione congiunta ODL → autoclavi prima del nesting geometrico:
+    - Capacità area utile, peso e linee vuoto di ogni autoclave
+    - Compatibilità dimensionale (almeno un orientamento nel piano)
+    - Un ciclo di cura per autoclave
+    - Massima area assegnata sull'intera flotta (CP-SAT, best-fit come hint/fallback)
     
     Returns:
-        Dict[autoclave_id, List[odl_ids]] - Distribuzione ottimizzata
+        FleetAssignment - ODL per autoclave, non assegnati e autoclavi alternative
     """
     logger.info("🚀 === AEROSPACE ODL DISTRIBUTION STARTED === 🚀")
+    parametri = parametri or NestingParametri()
     
-    # Inizializza distribuzione vuota
-    distribution = {autoclave.id: [] for autoclave in autoclavi_disponibili}
-    
-    if not odl_list or not autoclavi_disponibili:
-        logger.warning("⚠️ Lista ODL o autoclavi vuota - distribuzione fallita")
-        return distribution
-    
-    # 🎯 AEROSPACE STRATEGY 1: Round-Robin Bilanciato (Base)
-    logger.info("🎯 Applicando Round-Robin aerospace...")
-    
-    for i, odl in enumerate(odl_list):
-        autoclave_index = i % len(autoclavi_disponibili)
-        target_autoclave = autoclavi_disponibili[autoclave_index]
-        distribution[target_autoclave.id].append(odl.id)
-        
-        logger.info(f"   ODL {odl.id} → {target_autoclave.nome} (slot #{len(distribution[target_autoclave.id])})")
-    
-    # 🚀 AEROSPACE STRATEGY 2: Bilanciamento Peso/Volume (Advanced)
-    logger.info("🚀 Ottimizzazione peso/volume aerospace...")
+    tools = []
+    missing_tool = []
+    for odl in odl_list:
+        if not odl.tool:
+            missing_tool.append(odl.id)
+            continue
+        tools.append(ToolInfo(
+            odl_id=odl.id,
+            width=float(odl.tool.larghezza_piano or 0),
+            height=float(odl.tool.lunghezza_piano or 0),
+            weight=float(odl.tool.peso or 0),
+            lines_needed=(odl.parte.num_valvole_richieste or 1) if odl.parte else 1,
+            ciclo_cura_id=odl.parte.ciclo_cura_id if odl.parte else None,
+            priority=odl.priorita or 1
+        ))
     
-    for autoclave in autoclavi_disponibili:
-        assigned_odls = distribution[autoclave.id]
-        autoclave_capacity = autoclave.lunghezza * autoclave.larghezza_piano * 0.001  # m²
-        
-        if assigned_odls:
-            total_odls = len(assigned_odls)
-            density_ratio = total_odls / autoclave_capacity if autoclave_capacity > 0 else 0
-            
-            logger.info(f"   {autoclave.nome}: {total_odls} ODL, densità {density_ratio:.2f} ODL/m²")
-        else:
-            logger.info(f"   {autoclave.nome}: 0 ODL (vuota)")
+    autoclavi = [
+        AutoclaveInfo(
+            id=autoclave.id,
+            width=float(autoclave.lunghezza or 0),
+            height=float(autoclave.larghezza_piano or 0),
+            max_weight=float(autoclave.max_load_kg or 1000),
+            max_lines=autoclave.num_linee_vuoto or 10
+        )
+        for autoclave in autoclavi_disponibili
+    ]
     
-    # 📊 AEROSPACE VERIFICATION: Verifica distribuzione
-    total_distributed = sum(len(odl_ids) for odl_ids in distribution.values())
+    solver_params = SolverNestingParameters(
+        padding_mm=parametri.padding_mm,
+        min_distance_mm=parametri.min_distance_mm
+    )
+    assignment = FleetAssigner(solver_params).assign(tools, autoclavi)
+    assignment.unassigned.extend(missing_tool)
     
+    nomi = {autoclave.id: autoclave.nome for autoclave in autoclavi_disponibili}
     logger.info("📊 === AEROSPACE DISTRIBUTION SUMMARY === 📊")
-    logger.info(f"   ODL input: {len(odl_list)}")
-    logger.info(f"   ODL distribuiti: {total_distributed}")
-    logger.info(f"   Autoclavi target: {len(autoclavi_disponibili)}")
-    
-    if total_distributed != len(odl_list):
-        logger.error(f"❌ AEROSPACE ERROR: Distribuzione incompleta {total_distributed}/{len(odl_list)}")
-        raise ValueError(f"Distribuzione aerospace fallita: {total_distributed}/{len(odl_list)} ODL")
+    logger.info(f"   ODL input: {len(odl_list)}, metodo: {assignment.method}")
+    for autoclave_id, odl_ids in assignment.assignments.items():
+        logger.info(f"   {nomi[autoclave_id]}: {len(odl_ids)} ODL, ciclo {assignment.cure_cycles.get(autoclave_id)}")
+    if assignment.unassigned:
+        logger.warning(f"⚠️ ODL non assegnabili a nessuna autoclave: {assignment.unassigned}")
     
     logger.info("✅ AEROSPACE DISTRIBUTION COMPLETED")
-    return distribution
+    return assignment
+
+def _take_pending_odls(pending: List[int], autoclave_id: int, assignment: FleetAssignment) -> List[int]:
+    """
+    ODL rimandati (non assegnati o esclusi dal nesting di un'autoclave precedente)
+    che l'autoclave può ancora accettare col proprio ciclo di cura: vengono rimossi da pending e riproposti al nesting
+    """
+    return assignment.take_pending(pending, autoclave_id)
+
+def _collect_pushed_back(result: Dict[str, Any], autoclave_odl_ids: List[int]) -> List[int]:
+    """ODL proposti a un'autoclave ma non posizionati dal nesting"""
+    if not result.get('success'):
+        return list(autoclave_odl_ids)
+    excluded = result.get('excluded_odls') or []
+    excluded_ids = {e.get('odl_id') for e in excluded if isinstance(e, dict)}
+    return [odl_id for odl_id in autoclave_odl_ids if odl_id in excluded_ids]
 
 def validate_system_prerequisites(db: Session) -> bool:
     """
@@ -1130,7 +1176,8 @@ def generate_nesting(
             min_distance_mm=parametri.min_distance_mm,
             # vacuum_lines_capacity rimosso - ora preso dall'autoclave
             use_fallback=True,
-            allow_heuristic=True
+            allow_heuristic=True,
+            mode=parametri.mode.value
         )
         
         # Genera nesting
@@ -1408,7 +1455,10 @@ def solve_nesting_2l_batch(
             prefer_base_level=request.prefer_base_level,
             allow_heuristic=request.allow_heuristic,
             use_multithread=request.use_multithread,
-            heavy_piece_threshold_kg=request.heavy_piece_threshold_kg
+            heavy_piece_threshold_kg=request.heavy_piece_threshold_kg,
+            mode=request.mode.value,
+            level_strategy=request.level_strategy.value,
+            cavalletti_strategy=request.cavalletti_strategy.value
         )
         
         # Override timeout se specificato
@@ -1498,6 +1548,8 @@ def solve_nesting_2l_batch(
             autoclave_2l,
             request_params=request.model_dump()
         )
+        response.mode_used = solution_2l.metrics.mode_used or request.mode.value
+        response.latency_ms = (time.time() - start_time) * 1000
         
         # 🆕 SALVATAGGIO BATCH 2L: Salva sempre se l'algoritmo ha successo
         if response.success and response.metrics.pieces_positioned > 0:
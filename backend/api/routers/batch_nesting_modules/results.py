@@ -1,8 +1,11 @@
 # Router risultati e analisi batch
 
 import logging
+import time
+from dataclasses import asdict
 from typing import Dict, Any, Optional, List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import desc, asc
 from datetime import datetime, timedelta
@@ -14,6 +17,7 @@ from models.odl import ODL
 from models.parte import Parte
 from models.tool import Tool
 from schemas.batch_nesting import BatchNestingResponse
+from services.nesting.interactive import LayoutIndexRegistry, LayoutMoveValidator
 from .utils import (
     handle_database_error,
     format_batch_for_response,
@@ -27,6 +31,21 @@ router = APIRouter(
     tags=["Batch Nesting - Results"]
 )
 
+# 🖱️ Indici in memoria dei layout aperti nell'editor (ricostruiti quando il batch cambia)
+_move_validators = LayoutIndexRegistry()
+
+
+class MoveToolRequest(BaseModel):
+    """Schema per la validazione dello spostamento di un singolo tool nell'editor"""
+    odl_id: int = Field(..., description="ODL del tool spostato")
+    x: float = Field(..., description="Nuova posizione X in mm")
+    y: float = Field(..., description="Nuova posizione Y in mm")
+    rotated: Optional[bool] = Field(None, description="Nuovo orientamento (None = invariato)")
+    reoptimize: bool = Field(False, description="Sposta i tool vicini per fare spazio se la mossa non è valida")
+    max_shift_mm: float = Field(300.0, ge=0, le=5000, description="Spostamento massimo per asse dei tool vicini")
+    max_neighbours: int = Field(8, ge=1, le=50, description="Tool vicini riaperti dalla ri-ottimizzazione")
+    time_limit_ms: int = Field(200, ge=10, le=5000, description="Budget massimo della ri-ottimizzazione")
+
 # ✅ FUNZIONE HELPER PER ARRICCHIRE TOOL POSITIONS
 def enrich_tool_positions_with_odl_data(tool_positions: List[Dict[str, Any]], db: Session) -> List[Dict[str, Any]]:
     """
@@ -395,6 +414,125 @@ def validate_nesting_layout(batch_id: str, db: Session = Depends(get_db)):
         logger.error(f"❌ Errore validazione batch {batch_id}: {e}")
         return handle_database_error(db, e, f"validazione batch {batch_id}")
 
+def _build_move_validator(batch: BatchNesting) -> LayoutMoveValidator:
+    """Indice del layout salvato in configurazione_json (livelli e cavalletti per i batch 2L)"""
+    from services.nesting.solver_2l import NestingLayout2L, CavallettoPosition, CavallettiConfiguration
+
+    configurazione = batch.configurazione_json or {}
+    parametri = batch.parametri or {}
+    autoclave = batch.autoclave
+    positions = configurazione.get('positioned_tools') or configurazione.get('tool_positions') or []
+    layouts = [
+        NestingLayout2L(
+            odl_id=p['odl_id'],
+            x=float(p.get('x', 0)),
+            y=float(p.get('y', 0)),
+            width=float(p.get('width', 0)),
+            height=float(p.get('height', 0)),
+            weight=float(p.get('peso', p.get('weight', 0)) or 0),
+            level=int(p.get('level', 0) or 0),
+            rotated=bool(p.get('rotated', False)),
+            lines_used=int(p.get('lines_used', 1) or 1)
+        )
+        for p in positions if p.get('odl_id') is not None
+    ]
+    cavalletti = [
+        CavallettoPosition(
+            x=float(c['x']), y=float(c['y']), width=float(c['width']), height=float(c['height']),
+            tool_odl_id=c['tool_odl_id'], sequence_number=int(c.get('sequence_number', i))
+        )
+        for i, c in enumerate(configurazione.get('cavalletti') or [])
+    ]
+    config = (configurazione.get('parametri_usati') or {}).get('cavalletti_config') or {}
+    cavalletti_config = CavallettiConfiguration(
+        cavalletto_width=float(getattr(autoclave, 'cavalletto_width', None) or 80.0),
+        cavalletto_height=float(getattr(autoclave, 'cavalletto_height', None) or 60.0),
+        safety_margin_x=float(config.get('safety_margin_x', 10.0)),
+        safety_margin_y=float(config.get('safety_margin_y', 10.0)),
+        force_minimum_two=bool(config.get('force_minimum_two', True))
+    )
+    return LayoutMoveValidator(
+        layouts,
+        width=float(configurazione.get('canvas_width') or getattr(autoclave, 'lunghezza', 0) or 0),
+        height=float(configurazione.get('canvas_height') or getattr(autoclave, 'larghezza_piano', 0) or 0),
+        padding_mm=float(parametri.get('padding_mm', configurazione.get('padding_mm', 10.0))),
+        min_distance_mm=float(parametri.get('min_distance_mm', configurazione.get('min_distance_mm', 15.0))),
+        cavalletti=cavalletti,
+        cavalletti_config=cavalletti_config
+    )
+
+@router.post("/{batch_id}/move", summary="🖱️ Valida lo spostamento di un tool nell'editor di layout")
+def validate_tool_move(batch_id: str, request: MoveToolRequest, db: Session = Depends(get_db)):
+    """
+    🖱️ VALIDAZIONE INTERATTIVA SPOSTAMENTO TOOL
+    ============================================
+
+    Verifica lo spostamento o la rotazione di un tool senza salvare il layout.
+
+    - Limiti del piano, overlap e padding con i tool dello stesso livello
+    - Batch 2L: interferenza con i cavalletti e supporto dei tool di livello 1
+    - L'indice del layout resta in memoria finché il batch non viene modificato
+    - reoptimize=true: se la mossa non è valida propone lo spostamento minimo dei tool vicini
+    """
+    try:
+        request_start = time.perf_counter()
+        updated_at = db.query(BatchNesting.updated_at).filter(BatchNesting.id == batch_id).scalar()
+        if updated_at is None:
+            raise HTTPException(status_code=404, detail="Batch non trovato")
+
+        def _load() -> LayoutMoveValidator:
+            batch = db.query(BatchNesting).options(
+                joinedload(BatchNesting.autoclave)
+            ).filter(BatchNesting.id == batch_id).first()
+            return _build_move_validator(batch)
+
+        validator, cached = _move_validators.get(batch_id, updated_at, _load)
+        if request.odl_id not in validator.layouts:
+            raise HTTPException(status_code=404, detail=f"ODL {request.odl_id} non presente nel layout del batch")
+
+        if request.reoptimize:
+            relocation = validator.relocate(
+                request.odl_id, request.x, request.y, request.rotated,
+                max_shift_mm=request.max_shift_mm,
+                max_neighbours=request.max_neighbours,
+                time_limit_seconds=request.time_limit_ms / 1000
+            )
+            validation = relocation.validation
+        else:
+            relocation = None
+            validation = validator.validate(request.odl_id, request.x, request.y, request.rotated)
+
+        return {
+            "batch_id": batch_id,
+            "odl_id": request.odl_id,
+            "valid": validation.valid,
+            "position": {
+                "x": validation.x,
+                "y": validation.y,
+                "width": validation.width,
+                "height": validation.height,
+                "rotated": validation.rotated,
+                "level": validation.level
+            },
+            "violations": [asdict(v) for v in validation.violations],
+            "validation_ms": validation.time_ms,
+            "index_cached": cached,
+            "reoptimization": None if relocation is None else {
+                "success": relocation.success,
+                "status": relocation.status,
+                "shifts": [asdict(s) for s in relocation.shifts],
+                "neighbourhood_size": relocation.neighbourhood_size,
+                "time_ms": relocation.time_ms
+            },
+            "latency_ms": (time.perf_counter() - request_start) * 1000
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Errore validazione spostamento batch {batch_id}: {e}")
+        return handle_database_error(db, e, f"validazione spostamento batch {batch_id}")
+
 @router.get("/{batch_id}/full", summary="Ottiene un batch nesting con tutte le informazioni")
 def read_batch_nesting_full(batch_id: str, db: Session = Depends(get_db)):
     """Ottiene batch con informazioni complete"""
@@ -391,6 +391,12 @@ def update_tool(tool_id: int, tool: ToolUpdate, db: Session = Depends(get_db)):
         db.commit()
         db.refresh(db_tool)
         
+        # 🧹 Dimensioni o peso cambiati: invalida i layout di nesting in cache che usano il tool
+        if any(key in update_data and update_data[key] != old_values[key]
+               for key in ("lunghezza_piano", "larghezza_piano", "peso")):
+            from services.nesting.solution_cache import get_solution_cache
+            get_solution_cache().invalidate_dimensions(old_values["lunghezza_piano"], old_values["larghezza_piano"])
+        
         # Log dell'evento se ci sono state modifiche
         if modified_fields:
             modification_details = f"Campi modificati: {', '.join(modified_fields)}"
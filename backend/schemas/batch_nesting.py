@@ -13,6 +13,22 @@ class StatoBatchNestingEnum(str, Enum):
     IN_CURA = "in_cura"       # Autoclave caricata, cura in corso, timing attivo
     TERMINATO = "terminato"   # Cura completata, workflow chiuso
 
+# Modalità di solve: compromesso latenza/qualità richiesto dall'operatore
+class NestingModeEnum(str, Enum):
+    FAST = "fast"             # Anteprima interattiva: solo euristica BL-FFD, niente CP-SAT (< 500ms)
+    BALANCED = "balanced"     # CP-SAT con budget limitato (10s)
+    THOROUGH = "thorough"     # Pipeline completa con timeout adattivo (max 300s)
+
+# Strategia 2L: come vengono decisi i livelli dei tool
+class LevelStrategyEnum(str, Enum):
+    SEQUENTIAL = "sequential" # Prima il piano base, poi gli esclusi sui cavalletti
+    JOINT = "joint"           # Modello CP-SAT congiunto sui due livelli (warm start dal sequenziale)
+
+# Strategia di ottimizzazione dei cavalletti nel nesting 2L
+class CavallettiStrategyEnum(str, Enum):
+    AUTO = "auto"  # Strategia scelta in base al numero di tool sui cavalletti
+    ALL = "all"    # Tutte le strategie in parallelo, vince il punteggio migliore
+
 # Schema per i parametri di nesting
 class ParametriNesting(BaseModel):
     """Schema per validare i parametri utilizzati nella generazione del nesting"""
@@ -194,6 +210,7 @@ class NestingSolveRequest(BaseModel):
     allow_heuristic: bool = Field(default=False, description="Abilita heuristica RRGH")
     timeout_override: Optional[int] = Field(None, ge=30, le=300, description="Override timeout (30-300s)")
     heavy_piece_threshold_kg: float = Field(default=50.0, ge=0, description="Soglia peso per constraint posizionamento")
+    mode: NestingModeEnum = Field(default=NestingModeEnum.THOROUGH, description="Modalità di solve: fast | balanced | thorough")
     
     class Config:
         json_schema_extra = {
@@ -275,6 +292,10 @@ class NestingSolveResponse(BaseModel):
     # Informazioni autoclave
     autoclave_info: Dict[str, Any] = Field(..., description="Informazioni autoclave utilizzata")
     
+    # Modalità e latenza misurata
+    mode_used: str = Field(default=NestingModeEnum.THOROUGH.value, description="Modalità di solve applicata")
+    latency_ms: float = Field(default=0.0, description="Latenza misurata della richiesta (ms)")
+    
     # Timestamp
     solved_at: datetime = Field(default_factory=datetime.now, description="Timestamp risoluzione")
     
@@ -493,6 +514,9 @@ class NestingSolveRequest2L(BaseModel):
     timeout_override: Optional[int] = Field(None, ge=30, le=600, description="Override timeout (30-600s)")
     heavy_piece_threshold_kg: float = Field(default=50.0, ge=0, description="Soglia peso per pezzi pesanti")
     use_multithread: bool = Field(default=True, description="Utilizza solver multithread")
+    mode: NestingModeEnum = Field(default=NestingModeEnum.THOROUGH, description="Modalità di solve del piano base: fast | balanced | thorough")
+    level_strategy: LevelStrategyEnum = Field(default=LevelStrategyEnum.SEQUENTIAL, description="Strategia livelli: sequential | joint")
+    cavalletti_strategy: CavallettiStrategyEnum = Field(default=CavallettiStrategyEnum.AUTO, description="Ottimizzazione cavalletti: auto | all")
     
     class Config:
         json_schema_extra = {
@@ -535,6 +559,10 @@ class NestingSolveResponse2L(BaseModel):
     # Configurazione cavalletti utilizzata
     cavalletti_config: Optional[Dict[str, Any]] = Field(None, description="Configurazione cavalletti utilizzata")
     
+    # Modalità e latenza misurata
+    mode_used: str = Field(default=NestingModeEnum.THOROUGH.value, description="Modalità di solve applicata al piano base")
+    latency_ms: float = Field(default=0.0, description="Latenza misurata della richiesta (ms)")
+    
     # Timestamp
     solved_at: datetime = Field(default_factory=datetime.now, description="Timestamp risoluzione")
     
@@ -0,0 +1,174 @@
+"""
+CarbonPilot - Valutazione vettorizzata dei punti candidati
+Valutatore batch NumPy condiviso dalle strategie FFD 2D del solver
+
+- I layout già posizionati sono tenuti come array NumPy (x1, y1, x2, y2)
+- Ogni combinazione punto candidato × orientamento viene testata con un'unica
+  operazione broadcast (a blocchi per limitare la memoria)
+- Restituisce maschere di fattibilità e vettori di score al posto dei loop
+  Python annidati su candidati e layout
+- Semantica identica ai controlli scalari: bordi a contatto NON sono overlap
+"""
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Orientation = Tuple[float, float, bool]  # (width, height, rotated)
+
+# Numero massimo di celle punto × layout valutate per blocco
+MAX_BLOCK_CELLS = 2_000_000
+
+# Spazio residuo sotto questa soglia (mm) è considerato spreco
+WASTE_THRESHOLD_MM = 100.0
+
+
+class CandidateEvaluator:
+    """
+    Valutatore vettorizzato dei candidati per un insieme fisso di layout posizionati.
+
+    Va costruito una volta per tool da posizionare e condiviso tra le strategie,
+    che così lavorano sulle stesse matrici precomputate.
+    """
+
+    def __init__(self, layouts: Sequence[Any], autoclave_width: float, autoclave_height: float):
+        self.autoclave_width = float(autoclave_width)
+        self.autoclave_height = float(autoclave_height)
+
+        if layouts:
+            boxes = np.array([(l.x, l.y, l.width, l.height) for l in layouts], dtype=float)
+        else:
+            boxes = np.zeros((0, 4), dtype=float)
+        self.x1 = boxes[:, 0]
+        self.y1 = boxes[:, 1]
+        self.x2 = boxes[:, 0] + boxes[:, 2]
+        self.y2 = boxes[:, 1] + boxes[:, 3]
+
+    @classmethod
+    def from_layouts(cls, layouts: Sequence[Any], autoclave: Any) -> "CandidateEvaluator":
+        return cls(layouts, autoclave.width, autoclave.height)
+
+    def __len__(self) -> int:
+        return len(self.x1)
+
+    # ------------------------------------------------------------------
+    # Maschere di fattibilità
+    # ------------------------------------------------------------------
+
+    def overlap_mask(self, xs: np.ndarray, ys: np.ndarray, width: float, height: float) -> np.ndarray:
+        """True dove il rettangolo (x, y, width, height) interseca almeno un layout"""
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        result = np.zeros(xs.shape[0], dtype=bool)
+        if len(self) == 0 or xs.shape[0] == 0:
+            return result
+
+        block = max(1, MAX_BLOCK_CELLS // len(self))
+        for start in range(0, xs.shape[0], block):
+            bx = xs[start:start + block, None]
+            by = ys[start:start + block, None]
+            separated = (
+                (bx + width <= self.x1) | (bx >= self.x2) |
+                (by + height <= self.y1) | (by >= self.y2)
+            )
+            result[start:start + block] = ~separated.all(axis=1)
+        return result
+
+    def feasibility_mask(self, xs: np.ndarray, ys: np.ndarray, width: float, height: float) -> np.ndarray:
+        """True dove il tool entra nell'autoclave (bordo destro/superiore) senza overlap"""
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        inside = (xs + width <= self.autoclave_width) & (ys + height <= self.autoclave_height)
+        mask = np.zeros(xs.shape[0], dtype=bool)
+        if inside.any():
+            idx = np.nonzero(inside)[0]
+            mask[idx] = ~self.overlap_mask(xs[idx], ys[idx], width, height)
+        return mask
+
+    def free_points_mask(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """True dove il punto non cade dentro (bordi inclusi) nessun layout"""
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        result = np.ones(xs.shape[0], dtype=bool)
+        if len(self) == 0 or xs.shape[0] == 0:
+            return result
+
+        block = max(1, MAX_BLOCK_CELLS // len(self))
+        for start in range(0, xs.shape[0], block):
+            bx = xs[start:start + block, None]
+            by = ys[start:start + block, None]
+            inside = (self.x1 <= bx) & (bx <= self.x2) & (self.y1 <= by) & (by <= self.y2)
+            result[start:start + block] = ~inside.any(axis=1)
+        return result
+
+    # ------------------------------------------------------------------
+    # Score
+    # ------------------------------------------------------------------
+
+    def waste_scores(self, xs: np.ndarray, ys: np.ndarray, width: float, height: float) -> np.ndarray:
+        """Spazio sprecato sopra e a destra del tool (versione vettoriale di _calculate_wasted_space)"""
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        space_above = self.autoclave_height - (ys + height)
+        space_right = self.autoclave_width - (xs + width)
+        waste = np.zeros(xs.shape[0], dtype=float)
+        waste += np.where((space_above > 0) & (space_above < WASTE_THRESHOLD_MM), space_above * width, 0.0)
+        waste += np.where((space_right > 0) & (space_right < WASTE_THRESHOLD_MM), space_right * height, 0.0)
+        return waste
+
+    def placement_scores(self, xs: np.ndarray, ys: np.ndarray, width: float, height: float) -> np.ndarray:
+        """Score FFD (priorità bottom-left + spreco): y * 1000 + x + spreco * 0.1"""
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        return ys * 1000 + xs + self.waste_scores(xs, ys, width, height) * 0.1
+
+    def evaluate(
+        self,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        orientations: List[Orientation]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Valuta tutti i punti per tutti gli orientamenti.
+
+        Returns:
+            (mask, scores) di forma (len(orientations), len(xs)): fattibilità e score FFD,
+            con score = inf dove il candidato non è fattibile
+        """
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        mask = np.zeros((len(orientations), xs.shape[0]), dtype=bool)
+        scores = np.full((len(orientations), xs.shape[0]), np.inf)
+        for k, (width, height, _) in enumerate(orientations):
+            mask[k] = self.feasibility_mask(xs, ys, width, height)
+            scores[k, mask[k]] = self.placement_scores(xs[mask[k]], ys[mask[k]], width, height)
+        return mask, scores
+
+    # ------------------------------------------------------------------
+    # Skyline
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def skyline_heights(
+        xs: np.ndarray,
+        width: float,
+        skyline: List[Tuple[float, float]],
+        padding: float
+    ) -> np.ndarray:
+        """Y di appoggio sulla skyline per ogni intervallo [x, x + width] (vettoriale di _find_skyline_y)"""
+        xs = np.asarray(xs, dtype=float)
+        if not skyline or xs.shape[0] == 0:
+            return np.full(xs.shape[0], float(padding))
+        sky_x = np.array([p[0] for p in skyline], dtype=float)
+        sky_y = np.array([p[1] for p in skyline], dtype=float) + padding
+        covered = (sky_x >= xs[:, None]) & (sky_x <= xs[:, None] + width)
+        heights = np.where(covered, sky_y, -np.inf).max(axis=1)
+        return np.maximum(heights, float(padding))
+
+
+def first_true(mask: np.ndarray) -> Optional[Tuple[int, ...]]:
+    """Indice (in ordine C) del primo candidato fattibile, None se nessuno"""
+    flat = np.flatnonzero(mask)
+    if flat.size == 0:
+        return None
+    return np.unravel_index(flat[0], mask.shape)
@@ -7,6 +7,7 @@ Sistema avanzato per posizionamento cavalletti basato su:
 - ✅ Ottimizzazione palletizing (column stacking, adiacency sharing)
 - ✅ Rispetto vincoli database (max_cavalletti)
 - ✅ Load balancing e efficienza strutturale
+- ✅ Valutazione parallela di tutte le strategie con scelta della migliore
 
 Risolve TUTTI i problemi critici identificati:
 1. Numero massimo cavalletti NON rispettato
@@ -16,7 +17,12 @@ Risolve TUTTI i problemi critici identificati:
 """
 
 import logging
-from typing import List, Dict, Optional, Tuple, Set
+import os
+import time
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, List, Dict, Optional, Sequence, Tuple, Set
 from dataclasses import dataclass
 from enum import Enum
 
@@ -25,6 +31,10 @@ from .solver_2l import (
     NestingLayout2L, AutoclaveInfo2L, CavallettiConfiguration, 
     CavallettoPosition, CavallettoFixedPosition
 )
+from .spatial_index import RectIndex, sweep_pairs
+
+# Tool di livello 1 oltre i quali la valutazione di tutte le strategie usa processi invece di thread
+PROCESS_POOL_MIN_TOOLS = 300
 
 
 class OptimizationStrategy(Enum):
@@ -55,12 +65,23 @@ class CavallettiOptimizationResult:
     # Validazione fisica
     distribuzione_bilanciata: bool = True
     stabilita_garantita: bool = True
+    riduzione_forzata: bool = False  # Supporti troncati da _force_limit_compliance
+    
+    tempo_ms: float = 0.0
+    
+    # Valutazione di tutte le strategie (optimize_cavalletti_all_strategies), per valore strategia
+    strategy_timings_ms: Dict[str, float] = None
+    strategy_scores: Dict[str, Dict[str, Any]] = None
     
     warnings: List[str] = None
     
     def __post_init__(self):
         if self.warnings is None:
             self.warnings = []
+        if self.strategy_timings_ms is None:
+            self.strategy_timings_ms = {}
+        if self.strategy_scores is None:
+            self.strategy_scores = {}
 
 
 class CavallettiOptimizerAdvanced:
@@ -102,6 +123,7 @@ class CavallettiOptimizerAdvanced:
         4. ✅ Validazione limite max_cavalletti
         5. ✅ Conversione formato finale
         """
+        start_time = time.perf_counter()
         self.logger.info(f"🔧 [OTTIMIZZAZIONE v2.0] Avvio con strategia {strategy.value}")
         self.logger.info(f"   Tool da processare: {len(layouts)} (livello 1: {sum(1 for l in layouts if l.level == 1)})")
         
@@ -123,6 +145,7 @@ class CavallettiOptimizerAdvanced:
         
         # ✅ STEP 4: Validazione limite max_cavalletti
         limite_rispettato = True
+        riduzione_forzata = False
         if autoclave.max_cavalletti is not None:
             if optimized_count > autoclave.max_cavalletti:
                 self.logger.warning(f"⚠️ LIMITE SUPERATO: {optimized_count} > {autoclave.max_cavalletti}")
@@ -131,6 +154,7 @@ class CavallettiOptimizerAdvanced:
                 cavalletti_ottimizzati = self._force_limit_compliance(
                     cavalletti_ottimizzati, layouts, autoclave, config
                 )
+                riduzione_forzata = len(cavalletti_ottimizzati) < optimized_count
                 optimized_count = len(cavalletti_ottimizzati)
                 limite_rispettato = optimized_count <= autoclave.max_cavalletti
             
@@ -150,12 +174,142 @@ class CavallettiOptimizerAdvanced:
             max_cavalletti_limite=autoclave.max_cavalletti,
             limite_rispettato=limite_rispettato,
             strategia_applicata=strategy,
-            physical_violations_fixed=physical_violations
+            physical_violations_fixed=physical_violations,
+            riduzione_forzata=riduzione_forzata,
+            tempo_ms=(time.perf_counter() - start_time) * 1000
         )
         
         self.logger.info(f"✅ Ottimizzazione completata: {original_count} → {optimized_count} cavalletti (-{riduzione_pct:.1f}%)")
         return result
     
+    def optimize_cavalletti_all_strategies(
+        self,
+        layouts: List[NestingLayout2L],
+        autoclave: AutoclaveInfo2L,
+        config: CavallettiConfiguration,
+        strategies: Optional[Sequence[OptimizationStrategy]] = None,
+        workers: Optional[int] = None,
+        use_processes: Optional[bool] = None
+    ) -> CavallettiOptimizationResult:
+        """
+        🏁 TUTTE LE STRATEGIE: optimize_cavalletti_complete per ogni strategia in un pool,
+        restituisce il risultato con punteggio migliore (_evaluate_result)
+        
+        Le strategie sono Python puro: con pochi tool bastano i thread (niente avvio di processi),
+        da PROCESS_POOL_MIN_TOOLS tool di livello 1 si usa un pool di processi.
+        Se il pool non è disponibile le strategie vengono eseguite in sequenza.
+        Il risultato vincente riporta tempi e punteggi di tutte le strategie.
+        """
+        strategies = list(strategies or OptimizationStrategy)
+        level_1 = [l for l in layouts if l.level == 1]
+        if use_processes is None:
+            use_processes = len(level_1) >= PROCESS_POOL_MIN_TOOLS
+        workers = max(1, min(workers or os.cpu_count() or 1, len(strategies)))
+        self.logger.info(
+            f"🏁 [TUTTE LE STRATEGIE] {len(strategies)} strategie, {workers} worker "
+            f"({'processi' if use_processes else 'thread'}), tool livello 1: {len(level_1)}"
+        )
+        
+        results = None
+        if workers > 1:
+            try:
+                if use_processes:
+                    from .solver import _get_portfolio_context
+                    pool = ProcessPoolExecutor(max_workers=workers, mp_context=_get_portfolio_context())
+                else:
+                    pool = ThreadPoolExecutor(max_workers=workers)
+                with pool:
+                    results = list(pool.map(
+                        _optimize_with_strategy, repeat(layouts), repeat(autoclave), repeat(config), strategies
+                    ))
+            except Exception as e:
+                self.logger.warning(f"⚠️ Pool strategie non disponibile ({e}), esecuzione sequenziale")
+        if results is None:
+            results = [self.optimize_cavalletti_complete(layouts, autoclave, config, s) for s in strategies]
+        
+        scores = {
+            strategy.value: self._evaluate_result(result, level_1, config)
+            for strategy, result in zip(strategies, results)
+        }
+        # A parità di punteggio vince la strategia elencata prima (la più semplice)
+        best_position = min(
+            range(len(results)), key=lambda k: (self._score_key(scores[strategies[k].value]), k)
+        )
+        best = results[best_position]
+        best.strategy_timings_ms = {strategy.value: result.tempo_ms for strategy, result in zip(strategies, results)}
+        best.strategy_scores = scores
+        
+        for strategy in strategies:
+            score = scores[strategy.value]
+            self.logger.info(
+                f"   {strategy.value:10s}: {score['cavalletti']} cavalletti, limite {score['limite_rispettato']}, "
+                f"violazioni {score['violazioni_residue']}, instabili {score['tool_instabili']}, carico max {score['carico_max_kg']:.1f}kg, "
+                f"{best.strategy_timings_ms[strategy.value]:.1f}ms"
+            )
+        self.logger.info(f"✅ Strategia migliore: {best.strategia_applicata.value}")
+        return best
+    
+    def _evaluate_result(
+        self,
+        result: CavallettiOptimizationResult,
+        level_1_layouts: List[NestingLayout2L],
+        config: CavallettiConfiguration
+    ) -> Dict[str, Any]:
+        """
+        📊 PUNTEGGIO di un risultato: conteggio supporti, limite, violazioni fisiche residue e carico
+        
+        Un tool di livello 1 è instabile se ha sotto di sé (centro del supporto dentro il tool)
+        meno supporti del minimo fisico (MIN_SUPPORTS_PER_TOOL, o quanti ne richiede se piccolo)
+        oppure tutti nella stessa metà lungo l'asse principale.
+        Il peso di ogni tool è ripartito in parti uguali sui supporti sotto di esso.
+        """
+        centers = [(c.x + c.width / 2, c.y + c.height / 2) for c in result.cavalletti_finali]
+        index = RectIndex.from_rects((k, (cx, cy, 0.0, 0.0)) for k, (cx, cy) in enumerate(centers))
+        
+        loads = [0.0] * len(centers)
+        unstable = 0
+        for tool in level_1_layouts:
+            is_horizontal = tool.width >= tool.height
+            axis = 0 if is_horizontal else 1
+            required = min(self.MIN_SUPPORTS_PER_TOOL, self._calculate_optimal_supports_count(
+                tool.width if is_horizontal else tool.height, tool.weight, config
+            ))
+            under = [
+                k for k in index.query(tool.x - 1.0, tool.y - 1.0, tool.width + 2.0, tool.height + 2.0)
+                if tool.x <= centers[k][0] <= tool.x + tool.width and tool.y <= centers[k][1] <= tool.y + tool.height
+            ]
+            middle = tool.x + tool.width / 2 if is_horizontal else tool.y + tool.height / 2
+            first_half = sum(1 for k in under if centers[k][axis] < middle)
+            if len(under) < required or (len(under) >= 2 and first_half in (0, len(under))):
+                unstable += 1
+            for k in under:
+                loads[k] += tool.weight / len(under)
+        
+        return {
+            'cavalletti': result.cavalletti_ottimizzati,
+            'limite_rispettato': result.limite_rispettato,
+            'riduzione_forzata': result.riduzione_forzata,
+            'tool_instabili': unstable,
+            'violazioni_residue': len(self._unbalanced_tools(result.cavalletti_finali, level_1_layouts)),
+            'physical_violations_fixed': result.physical_violations_fixed,  # Solo informativo: pre-strategia
+            'carico_max_kg': max(loads, default=0.0)
+        }
+    
+    def _score_key(self, score: Dict[str, Any]) -> Tuple:
+        """
+        Ordine lessicografico (minore è migliore): limite, violazioni fisiche rimaste nel risultato,
+        stabilità, troncamenti, supporti, carico. Le violazioni corrette prima della strategia
+        (physical_violations_fixed) sono uguali per tutte e non entrano nel confronto.
+        """
+        return (
+            not score['limite_rispettato'],
+            score['violazioni_residue'],
+            score['tool_instabili'],
+            score['riduzione_forzata'],
+            score['cavalletti'],
+            round(score['carico_max_kg'], 3)
+        )
+    
     def _calculate_physical_supports_all_tools(
         self,
         layouts: List[NestingLayout2L],
@@ -402,6 +556,22 @@ class CavallettiOptimizerAdvanced:
         """
         violations_fixed = 0
         
+        for tool_id in self._unbalanced_tools(cavalletti, layouts):
+            self.logger.warning(f"⚠️ Correzione automatica distribuzione per ODL {tool_id}")
+            violations_fixed += 1
+            # TODO: Implementare correzione automatica se necessario
+        
+        return violations_fixed
+    
+    def _unbalanced_tools(
+        self,
+        cavalletti: List,
+        layouts: List[NestingLayout2L]
+    ) -> List[int]:
+        """
+        ODL con almeno 2 supporti tutti nella stessa metà (lungo X) del tool.
+        Accetta CavallettoPosition o CavallettoFixedPosition (usa x + width / 2).
+        """
         # Raggruppa per tool
         cavalletti_per_tool = {}
         for cav in cavalletti:
@@ -410,23 +580,23 @@ class CavallettiOptimizerAdvanced:
             cavalletti_per_tool[cav.tool_odl_id].append(cav)
         
         # Valida ogni tool
+        unbalanced = []
+        layouts_by_id = {l.odl_id: l for l in reversed(layouts)}
         for tool_id, tool_cavalletti in cavalletti_per_tool.items():
-            tool_layout = next((l for l in layouts if l.odl_id == tool_id), None)
+            tool_layout = layouts_by_id.get(tool_id)
             if not tool_layout:
                 continue
             
             # Check distribuzione bilanciata
             if len(tool_cavalletti) >= 2:
                 tool_center_x = tool_layout.x + tool_layout.width / 2
-                left_half = sum(1 for c in tool_cavalletti if c.center_x < tool_center_x)
+                left_half = sum(1 for c in tool_cavalletti if c.x + c.width / 2 < tool_center_x)
                 right_half = len(tool_cavalletti) - left_half
                 
                 if left_half == 0 or right_half == 0:
-                    self.logger.warning(f"⚠️ Correzione automatica distribuzione per ODL {tool_id}")
-                    violations_fixed += 1
-                    # TODO: Implementare correzione automatica se necessario
+                    unbalanced.append(tool_id)
         
-        return violations_fixed
+        return unbalanced
     
     def _apply_optimization_strategy(
         self,
@@ -481,7 +651,6 @@ class CavallettiOptimizerAdvanced:
         
         self.logger.info("🔧 [ADJACENCY SHARING] Avvio ottimizzazione condivisione supporti")
         
-        optimized = []
         removed_count = 0
         shared_supports = {}  # Track condivisioni
         
@@ -492,62 +661,63 @@ class CavallettiOptimizerAdvanced:
                 cavalletti_per_tool[cav.tool_odl_id] = []
             cavalletti_per_tool[cav.tool_odl_id].append(cav)
         
-        processed_pairs = set()
-        
-        for tool_id, tool_cavalletti in cavalletti_per_tool.items():
-            tool_layout = next((l for l in layouts if l.odl_id == tool_id), None)
-            if not tool_layout:
-                optimized.extend(tool_cavalletti)
-                continue
+        # Coppie adiacenti con area di appoggio comune (sort-and-sweep), nell'ordine in cui
+        # la scansione per tool le incontrerebbe: il primo tool con supporti è il principale
+        first_layouts = list({l.odl_id: l for l in reversed(layouts)}.values())[::-1]
+        rank = {tool_id: r for r, tool_id in enumerate(cavalletti_per_tool)}
+        pairs = []
+        for a, b in self._find_adjacent_tools_advanced(first_layouts, config):
+            tool_a, tool_b = first_layouts[a], first_layouts[b]
+            if tool_a.odl_id not in rank or tool_b.odl_id not in rank:
+                continue  # Senza supporti su entrambi i tool non c'è nulla da condividere
+            pairs.append(min((rank[tool_a.odl_id], b, tool_a, tool_b), (rank[tool_b.odl_id], a, tool_b, tool_a),
+                             key=lambda item: item[:2]))
+        pairs.sort(key=lambda item: item[:2])
+        
+        for _, _, tool_layout, adjacent_tool in pairs:
+            tool_id = tool_layout.odl_id
+            pair_key = tuple(sorted([tool_id, adjacent_tool.odl_id]))
             
-            # Trova tool adiacenti
-            adjacent_tools = self._find_adjacent_tools_advanced(tool_layout, layouts, config)
+            # Analizza possibilità condivisione supporti
+            sharing_opportunities = self._analyze_sharing_opportunities(
+                tool_layout, adjacent_tool, 
+                cavalletti_per_tool[tool_id],
+                cavalletti_per_tool[adjacent_tool.odl_id],
+                config
+            )
             
-            for adjacent_tool in adjacent_tools:
-                pair_key = tuple(sorted([tool_id, adjacent_tool.odl_id]))
-                if pair_key in processed_pairs:
-                    continue
-                processed_pairs.add(pair_key)
+            if sharing_opportunities:
+                self.logger.debug(f"   Condivisione possibile: ODL {tool_id} ↔ ODL {adjacent_tool.odl_id}")
                 
-                # Analizza possibilità condivisione supporti
-                sharing_opportunities = self._analyze_sharing_opportunities(
-                    tool_layout, adjacent_tool, 
-                    cavalletti_per_tool.get(tool_id, []),
-                    cavalletti_per_tool.get(adjacent_tool.odl_id, []),
-                    config
+                # Applica condivisione supporti
+                shared_cavalletti, removed = self._create_shared_supports(
+                    sharing_opportunities, config
                 )
                 
-                if sharing_opportunities:
-                    self.logger.debug(f"   Condivisione possibile: ODL {tool_id} ↔ ODL {adjacent_tool.odl_id}")
-                    
-                    # Applica condivisione supporti
-                    shared_cavalletti, removed = self._create_shared_supports(
-                        sharing_opportunities, config
-                    )
-                    
-                    shared_supports[pair_key] = shared_cavalletti
-                    removed_count += len(removed)
+                shared_supports[pair_key] = shared_cavalletti
+                removed_count += len(removed)
         
         # Ricostruisci lista ottimizzata
         final_cavalletti = []
+        shared_per_tool: Dict[int, List[CavallettoPosition]] = {}
+        for pair_key, shared_cavs in shared_supports.items():
+            for tool_id in dict.fromkeys(pair_key):
+                shared_per_tool.setdefault(tool_id, []).extend(shared_cavs)
         
         for tool_id, tool_cavalletti in cavalletti_per_tool.items():
-            # Trova supporti condivisi per questo tool
-            tool_shared = []
-            for pair_key, shared_cavs in shared_supports.items():
-                if tool_id in pair_key:
-                    tool_shared.extend(shared_cavs)
+            # Supporti condivisi per questo tool
+            tool_shared = shared_per_tool.get(tool_id, [])
             
             # Rimuovi supporti originali che sono stati sostituiti da condivisi
-            remaining_original = []
-            for cav in tool_cavalletti:
-                replaced = False
-                for shared_cav in tool_shared:
-                    if self._cavalletti_overlap_significantly(cav, shared_cav, config):
-                        replaced = True
-                        break
-                if not replaced:
-                    remaining_original.append(cav)
+            # 🚀 Indice spaziale sui centri dei supporti condivisi: solo i vicini sono esaminati
+            overlap_threshold = max(config.cavalletto_width, config.cavalletto_height) * 0.7
+            shared_index = RectIndex.from_rects(
+                (k, (c.x, c.y, c.width, c.height)) for k, c in enumerate(tool_shared)
+            )
+            remaining_original = [
+                cav for cav in tool_cavalletti
+                if not shared_index.near_point(cav.center_x, cav.center_y, overlap_threshold)
+            ]
             
             final_cavalletti.extend(remaining_original)
             final_cavalletti.extend(tool_shared)
@@ -576,39 +746,58 @@ class CavallettiOptimizerAdvanced:
     
     def _find_adjacent_tools_advanced(
         self,
-        tool: NestingLayout2L,
         all_layouts: List[NestingLayout2L],
         config: CavallettiConfiguration
-    ) -> List[NestingLayout2L]:
+    ) -> List[Tuple[int, int]]:
         """
-        🔧 RICERCA AVANZATA: Trova tool adiacenti con analisi geometrica precisa
+        🔧 RICERCA AVANZATA: Coppie (indici in all_layouts) di tool adiacenti che possono
+        condividere supporti, con analisi geometrica precisa
         
         CRITERI ADIACENZA (basati su standard palletizing):
         - ✅ Distanza bordi < threshold
         - ✅ Allineamento assi per condivisione supporti
         - ✅ Compatibilità peso e dimensioni
-        """
-        adjacent = []
         
-        for other_tool in all_layouts:
-            if other_tool.odl_id == tool.odl_id or other_tool.level != tool.level:
+        Un supporto condiviso deve cadere nell'area di appoggio di entrambi i tool
+        (_point_under_tool): sort-and-sweep su X delle aree di appoggio, intersezione Y,
+        criteri esatti di adiacenza solo sulle coppie candidate. O(n log n + k).
+        """
+        margin = config.min_distance_from_edge
+        areas = {}
+        for k, l in enumerate(all_layouts):
+            x0, x1 = l.x + margin, l.x + l.width - margin - config.cavalletto_width
+            y0, y1 = l.y + margin, l.y + l.height - margin - config.cavalletto_height
+            if x0 <= x1 and y0 <= y1:
+                areas[k] = (x0, x1, y0, y1)
+        
+        pairs = []
+        for a, b in sweep_pairs((k, x0, x1) for k, (x0, x1, _, _) in areas.items()):
+            tool, other_tool = all_layouts[a], all_layouts[b]
+            if tool.level != other_tool.level or tool.odl_id == other_tool.odl_id:
                 continue
-            
-            # Calcola distanze precise tra bordi
-            gap_x = max(0, max(tool.x, other_tool.x) - min(tool.x + tool.width, other_tool.x + other_tool.width))
-            gap_y = max(0, max(tool.y, other_tool.y) - min(tool.y + tool.height, other_tool.y + other_tool.height))
-            
-            # Verifica criteri adiacenza
-            is_adjacent_x = gap_x <= self.ADJACENCY_THRESHOLD
-            is_adjacent_y = gap_y <= self.ADJACENCY_THRESHOLD
-            
-            # Tool sono adiacenti se vicini su almeno un asse
-            if is_adjacent_x or is_adjacent_y:
-                # Verifica allineamento per condivisione supporti
-                if self._check_alignment_for_sharing(tool, other_tool, config):
-                    adjacent.append(other_tool)
+            if max(areas[a][2], areas[b][2]) > min(areas[a][3], areas[b][3]):
+                continue
+            if self._are_adjacent(tool, other_tool, config):
+                pairs.append((a, b))
+        return pairs
+    
+    def _are_adjacent(
+        self,
+        tool: NestingLayout2L,
+        other_tool: NestingLayout2L,
+        config: CavallettiConfiguration
+    ) -> bool:
+        """Criteri di adiacenza tra due tool dello stesso livello (simmetrici)"""
+        # Calcola distanze precise tra bordi
+        gap_x = max(0, max(tool.x, other_tool.x) - min(tool.x + tool.width, other_tool.x + other_tool.width))
+        gap_y = max(0, max(tool.y, other_tool.y) - min(tool.y + tool.height, other_tool.y + other_tool.height))
+        
+        # Verifica criteri adiacenza
+        is_adjacent_x = gap_x <= self.ADJACENCY_THRESHOLD
+        is_adjacent_y = gap_y <= self.ADJACENCY_THRESHOLD
         
-        return adjacent
+        # Tool sono adiacenti se vicini su almeno un asse e allineati per condivisione supporti
+        return (is_adjacent_x or is_adjacent_y) and self._check_alignment_for_sharing(tool, other_tool, config)
     
     def _check_alignment_for_sharing(
         self,
@@ -649,11 +838,18 @@ class CavallettiOptimizerAdvanced:
     ) -> List[Dict]:
         """
         🔧 ANALISI OPPORTUNITÀ: Identifica supporti che possono essere condivisi
+        
+        I supporti del secondo tool sono ordinati per center_x: per ogni supporto del primo
+        si esaminano solo quelli nella finestra ±LOAD_CONSOLIDATION_THRESHOLD (bisect).
         """
         opportunities = []
+        threshold = self.LOAD_CONSOLIDATION_THRESHOLD
+        by_x = sorted(range(len(cavalletti2)), key=lambda k: cavalletti2[k].center_x)
+        xs = [cavalletti2[k].center_x for k in by_x]
         
         for cav1 in cavalletti1:
-            for cav2 in cavalletti2:
+            window = by_x[bisect_left(xs, cav1.center_x - threshold):bisect_right(xs, cav1.center_x + threshold)]
+            for cav2 in (cavalletti2[k] for k in sorted(window)):
                 # Verifica se cavalletti sono abbastanza vicini per condivisione
                 distance = ((cav1.center_x - cav2.center_x) ** 2 + (cav1.center_y - cav2.center_y) ** 2) ** 0.5
                 
@@ -892,24 +1088,36 @@ class CavallettiOptimizerAdvanced:
     ) -> List[List[CavallettoPosition]]:
         """
         🔧 IDENTIFICA COLONNE: Raggruppa supporti per X simile
+        
+        Ogni supporto va nella prima colonna creata con media X entro tolleranza.
+        Le medie delle colonne sono tenute ordinate: la ricerca guarda solo la finestra
+        ±tolleranza invece di scorrere tutte le colonne.
         """
-        columns = []
+        columns: List[List[CavallettoPosition]] = []
+        sums: List[float] = []
+        means: List[Tuple[float, int]] = []  # (media center_x, indice colonna), ordinate
         tolerance = self.COLUMN_ALIGNMENT_TOLERANCE
+        slack = 1e-6 * (1.0 + tolerance)  # La finestra bisect non deve perdere casi al bordo
         
         for cavalletto in cavalletti:
-            assigned = False
-            
-            for column in columns:
-                # Verifica se cavalletto può essere aggiunto a colonna esistente
-                column_center_x = sum(c.center_x for c in column) / len(column)
-                
-                if abs(cavalletto.center_x - column_center_x) <= tolerance:
-                    column.append(cavalletto)
-                    assigned = True
-                    break
+            x = cavalletto.center_x
+            low = bisect_left(means, (x - tolerance - slack, -1))
+            high = bisect_right(means, (x + tolerance + slack, len(columns)))
+            candidates = [
+                (index, mean) for mean, index in means[low:high]
+                if abs(x - mean) <= tolerance
+            ]
             
-            if not assigned:
+            if candidates:
+                index, mean = min(candidates)
+                means.pop(bisect_left(means, (mean, index)))
+                columns[index].append(cavalletto)
+                sums[index] += x
+            else:
+                index = len(columns)
                 columns.append([cavalletto])
+                sums.append(x)
+            insort(means, (sums[index] / len(columns[index]), index))
         
         return columns
     
@@ -990,27 +1198,25 @@ class CavallettiOptimizerAdvanced:
         consolidated = []
         processed = set()
         consolidations_made = 0
+        layouts_by_id = {l.odl_id: l for l in reversed(layouts)}
+        neighbours = self._support_neighbours(cavalletti, self.LOAD_CONSOLIDATION_THRESHOLD)
         
         for i, cavalletto in enumerate(cavalletti):
             if i in processed:
                 continue
             
-            # Trova supporti vicini consolidabili
+            # Supporti vicini consolidabili (vicinato precalcolato con sort-and-sweep)
             consolidation_group = [cavalletto]
             group_indices = [i]
             
-            for j, other_cavalletto in enumerate(cavalletti):
-                if i != j and j not in processed:
-                    distance = ((cavalletto.center_x - other_cavalletto.center_x) ** 2 + 
-                               (cavalletto.center_y - other_cavalletto.center_y) ** 2) ** 0.5
-                    
-                    if distance <= self.LOAD_CONSOLIDATION_THRESHOLD:
-                        consolidation_group.append(other_cavalletto)
-                        group_indices.append(j)
+            for j in neighbours[i]:
+                if j not in processed:
+                    consolidation_group.append(cavalletti[j])
+                    group_indices.append(j)
             
             if len(consolidation_group) > 1:
                 # Verifica consolidabilità
-                if self._can_consolidate_supports(consolidation_group, layouts, autoclave, config):
+                if self._can_consolidate_supports(consolidation_group, layouts, autoclave, config, layouts_by_id):
                     # Crea supporto consolidato
                     consolidated_support = self._create_consolidated_support(consolidation_group, config)
                     consolidated.append(consolidated_support)
@@ -1034,22 +1240,47 @@ class CavallettiOptimizerAdvanced:
         
         return consolidated
     
+    def _support_neighbours(
+        self,
+        cavalletti: List[CavallettoPosition],
+        radius: float
+    ) -> List[List[int]]:
+        """
+        Per ogni supporto, indici (crescenti) degli altri supporti con centro a distanza ≤ radius.
+        Sort-and-sweep su center_x, distanza euclidea solo sulle coppie della finestra.
+        """
+        neighbours: List[List[int]] = [[] for _ in cavalletti]
+        centers = [(cav.center_x, cav.center_y) for cav in cavalletti]
+        intervals = [(k, cx, cx) for k, (cx, _) in enumerate(centers)]
+        for a, b in sweep_pairs(intervals, radius):
+            (ax, ay), (bx, by) = centers[a], centers[b]
+            if ((ax - bx) ** 2 + (ay - by) ** 2) ** 0.5 <= radius:
+                neighbours[a].append(b)
+                neighbours[b].append(a)
+        for indices in neighbours:
+            indices.sort()
+        return neighbours
+    
     def _can_consolidate_supports(
         self,
         supports: List[CavallettoPosition],
         layouts: List[NestingLayout2L],
         autoclave: AutoclaveInfo2L,
-        config: CavallettiConfiguration
+        config: CavallettiConfiguration,
+        layouts_by_id: Optional[Dict[int, NestingLayout2L]] = None
     ) -> bool:
         """
         🔧 VERIFICA CONSOLIDAZIONE: Supporti possono essere unificati?
         """
+        if layouts_by_id is None:
+            layouts_by_id = {l.odl_id: l for l in reversed(layouts)}
+        
         # Calcola carico totale combinato
         total_load = 0.0
         supported_tools = set()
         
         for support in supports:
-            tool = next((l for l in layouts if l.odl_id == support.tool_odl_id), None)
+            tool = layouts_by_id.get(support.tool_odl_id)
             if tool:
                 supported_tools.add(tool.odl_id)
                 # Stima frazione carico (peso tool / numero supporti tool)
@@ -1070,7 +1301,7 @@ class CavallettiOptimizerAdvanced:
         
         # Tutti i tool supportati devono avere il punto consolidato nella loro area
         for tool_id in supported_tools:
-            tool = next((l for l in layouts if l.odl_id == tool_id), None)
+            tool = layouts_by_id.get(tool_id)
             if tool and not self._point_under_tool(center_x, center_y, tool, config):
                 return False
         
@@ -1155,4 +1386,14 @@ class CavallettiOptimizerAdvanced:
             )
             fixed_positions.append(fixed_position)
         
-        return fixed_positions 
\ No newline at end of file
+        return fixed_positions 
+
+
+def _optimize_with_strategy(
+    layouts: List[NestingLayout2L],
+    autoclave: AutoclaveInfo2L,
+    config: CavallettiConfiguration,
+    strategy: OptimizationStrategy
+) -> CavallettiOptimizationResult:
+    """Una strategia in un worker del pool (thread o processo)"""
+    return CavallettiOptimizerAdvanced().optimize_cavalletti_complete(layouts, autoclave, config, strategy)
@@ -0,0 +1,143 @@
+"""
+CarbonPilot - Pre-clustering dei tool piccoli in super-item
+Riduce n prima del solve principale (CP-SAT, greedy) sui batch a dimensioni miste
+
+- Tool piccoli: area sotto una quota dell'area dell'autoclave
+- Shelf packer locale (next-fit decreasing height): tool in orientamento orizzontale,
+  ordinati per altezza, mensole larghe al più quanto il lato del super-item target,
+  padding tra i membri
+- Ogni super-item è un ToolInfo con id sintetico negativo (peso, linee e priorità aggregati):
+  il solver lo tratta come un singolo oggetto
+- Espansione: offset dei membri traslati (e ruotati di 90° se il solver ha ruotato
+  il super-item) in NestingLayout individuali
+"""
+
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from .solver import NestingParameters, NestingLayout, ToolInfo, AutoclaveInfo
+
+# Membro di un super-item: (tool, dx, dy, larghezza, altezza, ruotato) rispetto all'angolo del super-item
+Member = Tuple[ToolInfo, float, float, float, float, bool]
+
+
+@dataclass
+class SuperItem:
+    """Rettangolo composito di tool piccoli, visto dal solver come un unico tool"""
+    tool: ToolInfo  # ToolInfo sintetico passato al solver (odl_id negativo)
+    members: List[Member] = field(default_factory=list)
+
+    def expand(self, layout: NestingLayout) -> List[NestingLayout]:
+        """Layout individuali dei membri dato il layout del super-item"""
+        result = []
+        for tool, dx, dy, w, h, rotated in self.members:
+            if layout.rotated:
+                # Rotazione di 90°: (x, y) → (y, W - x), il super-item diventa H × W
+                x, y, w, h, rotated = layout.x + dy, layout.y + self.tool.width - dx - w, h, w, not rotated
+            else:
+                x, y = layout.x + dx, layout.y + dy
+            result.append(NestingLayout(
+                odl_id=tool.odl_id, x=x, y=y, width=w, height=h,
+                weight=tool.weight, rotated=rotated, lines_used=tool.lines_needed
+            ))
+        return result
+
+
+class SmallToolClusterer:
+    """Raggruppa i tool piccoli in super-item con uno shelf packer NFDH"""
+
+    def __init__(
+        self,
+        parameters: NestingParameters,
+        area_threshold_pct: float = 5.0,
+        max_item_area_pct: float = 15.0
+    ):
+        self.parameters = parameters
+        self.area_threshold_pct = area_threshold_pct
+        self.max_item_area_pct = max_item_area_pct
+        self.logger = logging.getLogger(__name__)
+
+    def cluster(
+        self,
+        tools: Sequence[ToolInfo],
+        autoclave: AutoclaveInfo
+    ) -> Tuple[List[ToolInfo], Dict[int, SuperItem]]:
+        """
+        Returns:
+            (tool per il solver: grandi + super-item + piccoli rimasti soli, super-item per id sintetico)
+        """
+        total_area = autoclave.width * autoclave.height
+        threshold = total_area * self.area_threshold_pct / 100
+        small = [t for t in tools if t.width * t.height < threshold]
+        large = [t for t in tools if t.width * t.height >= threshold]
+        if len(small) < 2:
+            return list(tools), {}
+
+        margin = 2 * self.parameters.min_distance_mm
+        padding = self.parameters.padding_mm
+        max_area = total_area * self.max_item_area_pct / 100
+        # Tool piccoli in orientamento orizzontale: mensole più basse e più piene
+        oriented = [
+            (t, max(t.width, t.height), min(t.width, t.height), t.height > t.width)
+            for t in small
+        ]
+        oriented.sort(key=lambda item: (item[2], item[1]), reverse=True)
+        shelf_limit = min(
+            autoclave.width - margin,
+            autoclave.height - margin,
+            max(max(item[1] for item in oriented), math.sqrt(max_area))
+        )
+
+        groups: List[List[Member]] = []
+        current: List[Member] = []
+        shelf_x = shelf_y = shelf_h = 0.0
+        for tool, w, h, rotated in oriented:
+            if current and shelf_x + w > shelf_limit:
+                # Nuova mensola sopra la precedente, se il super-item resta entro l'area massima
+                next_y = shelf_y + shelf_h + padding
+                if (next_y + h) * shelf_limit <= max_area and next_y + h <= shelf_limit:
+                    shelf_x, shelf_y, shelf_h = 0.0, next_y, 0.0
+                else:
+                    groups.append(current)
+                    current, shelf_x, shelf_y, shelf_h = [], 0.0, 0.0, 0.0
+            current.append((tool, shelf_x, shelf_y, w, h, rotated))
+            shelf_x += w + padding
+            shelf_h = max(shelf_h, h)
+        if current:
+            groups.append(current)
+
+        solver_tools = list(large)
+        super_items: Dict[int, SuperItem] = {}
+        for members in groups:
+            if len(members) == 1:
+                solver_tools.append(members[0][0])
+                continue
+            item_id = -(len(super_items) + 1)
+            item_tool = ToolInfo(
+                odl_id=item_id,
+                width=math.ceil(max(dx + w for _, dx, _, w, _, _ in members)),
+                height=math.ceil(max(dy + h for _, _, dy, _, h, _ in members)),
+                weight=sum(m[0].weight for m in members),
+                lines_needed=sum(m[0].lines_needed for m in members),
+                ciclo_cura_id=members[0][0].ciclo_cura_id,
+                priority=max(m[0].priority for m in members)
+            )
+            super_items[item_id] = SuperItem(tool=item_tool, members=members)
+
+        solver_tools.extend(item.tool for item in super_items.values())
+        self.logger.info(
+            f"🧩 CLUSTERING: {len(small)} tool piccoli → {len(super_items)} super-item, "
+            f"n {len(tools)} → {len(solver_tools)}"
+        )
+        return solver_tools, super_items
+
+    @staticmethod
+    def expand(layouts: Sequence[NestingLayout], super_items: Dict[int, SuperItem]) -> List[NestingLayout]:
+        """Sostituisce i layout dei super-item con quelli dei membri"""
+        result = []
+        for layout in layouts:
+            item = super_items.get(layout.odl_id)
+            result.extend(item.expand(layout) if item is not None else [layout])
+        return result
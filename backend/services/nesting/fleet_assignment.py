@@ -0,0 +1,255 @@
+"""
+CarbonPilot - Assegnazione congiunta ODL → autoclavi
+Multi-bin assignment prima del nesting geometrico per autoclave
+
+- Modello CP-SAT: x[odl, autoclave] booleane, ogni ODL al più in un'autoclave
+- Capacità per autoclave: area utile (frazione di riempimento realistica), peso, linee vuoto
+- Compatibilità geometrica: l'ODL entra nel piano in almeno un orientamento
+- Ciclo di cura: un solo ciclo per autoclave (ODL senza ciclo compatibili con tutti)
+- Obiettivo: massima area (× priorità) assegnata sull'intera flotta
+- Best-fit decreasing come soluzione iniziale (hint) e fallback se CP-SAT non conclude
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from ortools.sat.python import cp_model
+
+from .solver import AREA_FILL_LIMIT, NestingParameters, ToolInfo, AutoclaveInfo
+
+
+@dataclass
+class FleetAssignment:
+    """Esito dell'assegnazione ODL → autoclavi"""
+    assignments: Dict[int, List[int]]  # autoclave_id → ODL assegnati
+    unassigned: List[int]  # ODL che non entrano in nessuna autoclave
+    cure_cycles: Dict[int, Optional[int]] = field(default_factory=dict)  # autoclave_id → ciclo di cura scelto
+    method: str = ""  # CP-SAT_OPTIMAL | CP-SAT_FEASIBLE | GREEDY
+    assigned_area: float = 0.0  # mm² assegnati sull'intera flotta
+    time_ms: float = 0.0
+    alternatives: Dict[int, List[int]] = field(default_factory=dict)  # ODL → altre autoclavi compatibili (per i rimandati)
+    odl_cycles: Dict[int, Optional[int]] = field(default_factory=dict)  # ODL → ciclo di cura
+
+    def take_pending(self, pending: List[int], autoclave_id: int) -> List[int]:
+        """
+        ODL rimandati che l'autoclave può ancora accettare, rimossi da pending.
+        Senza ciclo assegnato, il primo ODL rimandato con ciclo fissa quello dell'autoclave:
+        gli ODL con ciclo diverso restano in pending
+        """
+        cycle = self.cure_cycles.get(autoclave_id)
+        taken = []
+        for odl_id in pending:
+            if autoclave_id not in self.alternatives.get(odl_id, []):
+                continue
+            odl_cycle = self.odl_cycles.get(odl_id)
+            if odl_cycle is not None:
+                if cycle is None:
+                    cycle = odl_cycle
+                elif odl_cycle != cycle:
+                    continue
+            taken.append(odl_id)
+        for odl_id in taken:
+            pending.remove(odl_id)
+        self.cure_cycles[autoclave_id] = cycle
+        return taken
+
+
+class FleetAssigner:
+    """
+    Decide quali ODL vanno in quale autoclave prima del nesting geometrico.
+
+    Le capacità sono rilassamenti (area, peso, linee) del problema di nesting:
+    il solver per autoclave decide poi il layout e restituisce ciò che non entra.
+    """
+
+    def __init__(
+        self,
+        parameters: NestingParameters,
+        area_fill_limit: float = AREA_FILL_LIMIT,
+        time_limit_seconds: float = 2.0
+    ):
+        self.parameters = parameters
+        self.area_fill_limit = area_fill_limit
+        self.time_limit_seconds = time_limit_seconds
+        self.logger = logging.getLogger(__name__)
+
+    def assign(self, tools: Sequence[ToolInfo], autoclaves: Sequence[AutoclaveInfo]) -> FleetAssignment:
+        """Assegnazione congiunta: CP-SAT con hint best-fit, best-fit se CP-SAT non trova soluzioni"""
+        start = time.time()
+        tools = list(tools)
+        autoclaves = list(autoclaves)
+        self.logger.info(f"🚀 FLEET ASSIGNMENT: {len(tools)} ODL su {len(autoclaves)} autoclavi")
+
+        greedy = self._best_fit(tools, autoclaves)
+        assignment = greedy
+        if tools and autoclaves and self.time_limit_seconds > 0:
+            try:
+                solved = self._solve_cpsat(tools, autoclaves, greedy)
+                if solved is not None and self._throughput(solved, tools) >= self._throughput(greedy, tools):
+                    assignment = solved
+            except Exception as e:
+                self.logger.warning(f"⚠️ FLEET ASSIGNMENT: CP-SAT fallito, uso best-fit: {e}")
+
+        assignment.alternatives = self._alternatives(tools, autoclaves, assignment)
+        assignment.odl_cycles = {tool.odl_id: tool.ciclo_cura_id for tool in tools}
+        assignment.time_ms = (time.time() - start) * 1000
+        self.logger.info(
+            f"✅ FLEET ASSIGNMENT {assignment.method}: {len(tools) - len(assignment.unassigned)}/{len(tools)} ODL, "
+            f"{assignment.assigned_area / 1e6:.2f} m², non assegnati {assignment.unassigned} "
+            f"({assignment.time_ms:.0f}ms)"
+        )
+        return assignment
+
+    def _alternatives(
+        self,
+        tools: List[ToolInfo],
+        autoclaves: List[AutoclaveInfo],
+        assignment: FleetAssignment
+    ) -> Dict[int, List[int]]:
+        """Per ogni ODL le autoclavi (ordine flotta) diverse da quella assegnata che lo accettano col ciclo scelto"""
+        assigned_to = {o: autoclave_id for autoclave_id, ids in assignment.assignments.items() for o in ids}
+        return {
+            tool.odl_id: [
+                a.id for a in autoclaves
+                if a.id != assigned_to.get(tool.odl_id)
+                and self.fits(tool, a)
+                and (tool.ciclo_cura_id is None or assignment.cure_cycles.get(a.id) in (None, tool.ciclo_cura_id))
+            ]
+            for tool in tools
+        }
+
+    @staticmethod
+    def _throughput(assignment: FleetAssignment, tools: List[ToolInfo]) -> float:
+        """Obiettivo comune a best-fit e CP-SAT: area assegnata pesata per priorità"""
+        by_id = {t.odl_id: t for t in tools}
+        return sum(by_id[o].width * by_id[o].height * by_id[o].priority for ids in assignment.assignments.values() for o in ids)
+
+    def fits(self, tool: ToolInfo, autoclave: AutoclaveInfo) -> bool:
+        """Il tool entra nel piano (margini inclusi) in almeno un orientamento"""
+        margin = 2 * self.parameters.min_distance_mm
+        return ((tool.width + margin <= autoclave.width and tool.height + margin <= autoclave.height) or
+                (tool.height + margin <= autoclave.width and tool.width + margin <= autoclave.height))
+
+    def _area_capacity(self, autoclave: AutoclaveInfo) -> float:
+        margin = 2 * self.parameters.min_distance_mm
+        return max(0.0, autoclave.width - margin) * max(0.0, autoclave.height - margin) * self.area_fill_limit
+
+    def _lines_capacity(self, autoclave: AutoclaveInfo) -> int:
+        return autoclave.max_lines if autoclave.max_lines > 0 else self.parameters.vacuum_lines_capacity
+
+    def _best_fit(self, tools: List[ToolInfo], autoclaves: List[AutoclaveInfo]) -> FleetAssignment:
+        """Best-fit decreasing: ODL per area × priorità, nell'autoclave compatibile con meno area residua"""
+        residual_area = {a.id: self._area_capacity(a) for a in autoclaves}
+        residual_weight = {a.id: a.max_weight for a in autoclaves}
+        residual_lines = {a.id: self._lines_capacity(a) for a in autoclaves}
+        cycles: Dict[int, Optional[int]] = {a.id: None for a in autoclaves}
+        assignments: Dict[int, List[int]] = {a.id: [] for a in autoclaves}
+        unassigned = []
+
+        for tool in sorted(tools, key=lambda t: (t.width * t.height * t.priority, -t.odl_id), reverse=True):
+            area = tool.width * tool.height
+            candidates = [
+                a for a in autoclaves
+                if self.fits(tool, a)
+                and area <= residual_area[a.id]
+                and tool.weight <= residual_weight[a.id]
+                and tool.lines_needed <= residual_lines[a.id]
+                and (tool.ciclo_cura_id is None or cycles[a.id] in (None, tool.ciclo_cura_id))
+            ]
+            if not candidates:
+                unassigned.append(tool.odl_id)
+                continue
+
+            # A parità di residuo preferisce un'autoclave già sul ciclo del tool
+            target = min(candidates, key=lambda a: (residual_area[a.id] - area, cycles[a.id] is None))
+            assignments[target.id].append(tool.odl_id)
+            residual_area[target.id] -= area
+            residual_weight[target.id] -= tool.weight
+            residual_lines[target.id] -= tool.lines_needed
+            if tool.ciclo_cura_id is not None:
+                cycles[target.id] = tool.ciclo_cura_id
+
+        by_id = {t.odl_id: t for t in tools}
+        return FleetAssignment(
+            assignments=assignments,
+            unassigned=unassigned,
+            cure_cycles=cycles,
+            method="GREEDY",
+            assigned_area=sum(by_id[o].width * by_id[o].height for ids in assignments.values() for o in ids)
+        )
+
+    def _solve_cpsat(
+        self,
+        tools: List[ToolInfo],
+        autoclaves: List[AutoclaveInfo],
+        hint: FleetAssignment
+    ) -> Optional[FleetAssignment]:
+        """Modello di assegnazione multi-bin con capacità aggregate e un ciclo di cura per autoclave"""
+        model = cp_model.CpModel()
+        cycles = sorted({t.ciclo_cura_id for t in tools if t.ciclo_cura_id is not None})
+        hinted = {odl: autoclave_id for autoclave_id, ids in hint.assignments.items() for odl in ids}
+
+        x = {}
+        for tool in tools:
+            for autoclave in autoclaves:
+                if self.fits(tool, autoclave):
+                    x[tool.odl_id, autoclave.id] = model.NewBoolVar(f'x_{tool.odl_id}_{autoclave.id}')
+                    model.AddHint(x[tool.odl_id, autoclave.id], 1 if hinted.get(tool.odl_id) == autoclave.id else 0)
+            options = [x[tool.odl_id, a.id] for a in autoclaves if (tool.odl_id, a.id) in x]
+            if options:
+                model.AddAtMostOne(options)
+
+        for autoclave in autoclaves:
+            members = [t for t in tools if (t.odl_id, autoclave.id) in x]
+            if not members:
+                continue
+            # Area in cm² per tenere i coefficienti piccoli
+            model.Add(sum(round(t.width * t.height / 100) * x[t.odl_id, autoclave.id] for t in members)
+                      <= int(self._area_capacity(autoclave) / 100))
+            model.Add(sum(round(t.weight * 1000) * x[t.odl_id, autoclave.id] for t in members)
+                      <= round(autoclave.max_weight * 1000))
+            model.Add(sum(t.lines_needed * x[t.odl_id, autoclave.id] for t in members)
+                      <= self._lines_capacity(autoclave))
+
+            # Un solo ciclo di cura per autoclave
+            if cycles:
+                uses = {c: model.NewBoolVar(f'cycle_{autoclave.id}_{c}') for c in cycles}
+                model.AddAtMostOne(uses.values())
+                for tool in members:
+                    if tool.ciclo_cura_id is not None:
+                        model.AddImplication(x[tool.odl_id, autoclave.id], uses[tool.ciclo_cura_id])
+                hinted_cycle = hint.cure_cycles.get(autoclave.id)
+                for c, var in uses.items():
+                    model.AddHint(var, 1 if c == hinted_cycle else 0)
+
+        by_id = {t.odl_id: t for t in tools}
+        model.Maximize(sum(
+            round(by_id[odl_id].width * by_id[odl_id].height / 100) * by_id[odl_id].priority * var
+            for (odl_id, _), var in x.items()
+        ))
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = self.time_limit_seconds
+        solver.parameters.num_search_workers = max(1, self.parameters.num_search_workers)
+        status = solver.Solve(model)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return None
+
+        assignments: Dict[int, List[int]] = {a.id: [] for a in autoclaves}
+        for (odl_id, autoclave_id), var in x.items():
+            if solver.Value(var):
+                assignments[autoclave_id].append(odl_id)
+        assigned = {o for ids in assignments.values() for o in ids}
+        cure_cycles = {
+            a.id: next((by_id[o].ciclo_cura_id for o in assignments[a.id] if by_id[o].ciclo_cura_id is not None), None)
+            for a in autoclaves
+        }
+        return FleetAssignment(
+            assignments=assignments,
+            unassigned=[t.odl_id for t in tools if t.odl_id not in assigned],
+            cure_cycles=cure_cycles,
+            method="CP-SAT_OPTIMAL" if status == cp_model.OPTIMAL else "CP-SAT_FEASIBLE",
+            assigned_area=sum(by_id[o].width * by_id[o].height for o in assigned)
+        )
@@ -0,0 +1,352 @@
+"""
+CarbonPilot - GRASP multi-start parallelo
+Greedy Randomized Adaptive Search Procedure su motore MaxRects
+
+- Costruzione randomizzata: lista ristretta di candidati (RCL) controllata da alpha
+  (0 = greedy puro per area, 1 = ordine casuale), seed riproducibile per start
+- Ricerca locale: ruin & recreate casuale (rimuove 1-3 tool, reinserisce rimossi + esclusi)
+  con accettazione solo se lo score migliora
+- Multi-start: N start indipendenti in ProcessPoolExecutor (uno per core), budget di tempo
+  (istanze fino a PARALLEL_MIN_TOOLS tool nel processo corrente, senza pool)
+  invece di un numero fisso di iterazioni; i worker condividono lo score migliore
+  e saltano la ricerca locale sulle costruzioni troppo lontane dall'incumbent
+- Stop anticipato: con target_score (bound del solver meno il gap ammesso) ogni worker
+  si ferma appena lo score condiviso lo raggiunge
+"""
+
+import logging
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+from .maxrects import MaxRectsPacker, MaxRectsRule
+from .solver import NestingParameters, NestingLayout, ToolInfo, AutoclaveInfo, efficiency_score
+
+# Costruzioni sotto questa frazione dello score migliore condiviso non vengono rifinite
+LOCAL_SEARCH_CUTOFF = 0.9
+# Tool oltre i quali conviene avviare il pool: sotto, il costo dei processi supera la ricerca
+PARALLEL_MIN_TOOLS = 15
+# Mosse ruin & recreate consecutive senza miglioramento prima di chiudere la ricerca locale
+LOCAL_SEARCH_PATIENCE = 25
+
+# Score migliore condiviso tra i processi (impostato dall'initializer del pool)
+_shared_best = None
+
+
+@dataclass
+class GraspResult:
+    """Esito del GRASP multi-start"""
+    layouts: List[NestingLayout]
+    score: float
+    iterations: int  # Costruzioni + mosse di ricerca locale
+    starts: int  # Costruzioni randomizzate eseguite
+    elapsed_seconds: float
+    trajectory: List[Tuple[float, float]] = field(default_factory=list)  # (ms, score) per ogni miglioramento
+    workers: int = 1
+    target_reached: bool = False  # Arresto anticipato per target_score raggiunto
+
+    @property
+    def iterations_per_second(self) -> float:
+        return self.iterations / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+class GraspSearch:
+    """Costruzione RCL + ricerca locale ruin & recreate su un singolo processo"""
+
+    def __init__(
+        self,
+        tools: Sequence[ToolInfo],
+        autoclave: AutoclaveInfo,
+        parameters: NestingParameters,
+        rng: random.Random
+    ):
+        self.tools = list(tools)
+        self.autoclave = autoclave
+        self.parameters = parameters
+        self.rng = rng
+        self.margin = parameters.min_distance_mm
+        self.padding = parameters.padding_mm
+
+    def score(self, layouts: List[NestingLayout]) -> float:
+        """Stesso score delle soluzioni del solver: 85% area + 15% linee vuoto"""
+        return efficiency_score(sum(l.width * l.height for l in layouts), sum(l.lines_used for l in layouts),
+                                self.autoclave, self.parameters.vacuum_lines_capacity)
+
+    def construct(self, alpha: float) -> List[NestingLayout]:
+        """Costruzione greedy randomizzata: scelta uniforme nella RCL per area"""
+        return self._insert(self.tools, [], alpha)
+
+    def local_search(
+        self,
+        layouts: List[NestingLayout],
+        deadline: float
+    ) -> Tuple[List[NestingLayout], int]:
+        """Ruin & recreate casuale fino a LOCAL_SEARCH_PATIENCE mosse senza miglioramento"""
+        best, best_score = layouts, self.score(layouts)
+        moves = 0
+        stale = 0
+
+        while stale < LOCAL_SEARCH_PATIENCE and time.time() < deadline and best:
+            moves += 1
+            removed = set(l.odl_id for l in self.rng.sample(best, min(len(best), self.rng.randint(1, 3))))
+            kept = [l for l in best if l.odl_id not in removed]
+            placed = {l.odl_id for l in kept}
+            to_place = [t for t in self.tools if t.odl_id not in placed]
+            self.rng.shuffle(to_place)
+            candidate = self._insert(to_place, kept, alpha=1.0)
+
+            candidate_score = self.score(candidate)
+            if candidate_score > best_score + 1e-9:
+                best, best_score = candidate, candidate_score
+                stale = 0
+            else:
+                stale += 1
+
+        return best, moves
+
+    def _insert(
+        self,
+        tools: Sequence[ToolInfo],
+        fixed: List[NestingLayout],
+        alpha: float
+    ) -> List[NestingLayout]:
+        """Inserisce i tool con RCL(alpha) attorno ai layout fissi, nel rispetto di peso e linee"""
+        packer = MaxRectsPacker(
+            self.margin, self.margin, self.autoclave.width - self.margin, self.autoclave.height - self.margin,
+            spacing=self.padding, rule=MaxRectsRule(self.parameters.maxrects_rule)
+        )
+        for l in fixed:
+            packer.occupy(l.x, l.y, l.width, l.height)
+
+        layouts = list(fixed)
+        weight = sum(l.weight for l in layouts)
+        lines = sum(l.lines_used for l in layouts)
+        candidates = list(tools)
+
+        while candidates:
+            values = [t.width * t.height for t in candidates]
+            threshold = max(values) - alpha * (max(values) - min(values))
+            rcl = [t for t, v in zip(candidates, values) if v >= threshold]
+            tool = self.rng.choice(rcl)
+            candidates.remove(tool)
+
+            if weight + tool.weight > self.autoclave.max_weight:
+                continue
+            if lines + tool.lines_needed > self.parameters.vacuum_lines_capacity:
+                continue
+            placement = packer.insert(tool.width, tool.height)
+            if placement is None:
+                continue
+
+            x, y, width, height, rotated = placement
+            layouts.append(NestingLayout(
+                odl_id=tool.odl_id, x=float(x), y=float(y), width=float(width), height=float(height),
+                weight=tool.weight, rotated=rotated, lines_used=tool.lines_needed
+            ))
+            weight += tool.weight
+            lines += tool.lines_needed
+
+        return layouts
+
+
+def _init_grasp_worker(shared_best) -> None:
+    """Initializer del pool: riceve lo score migliore condiviso"""
+    global _shared_best
+    _shared_best = shared_best
+
+
+def _run_grasp_starts(
+    tools: List[ToolInfo],
+    autoclave: AutoclaveInfo,
+    parameters: NestingParameters,
+    alpha: float,
+    seed: int,
+    deadline: float,
+    start_time: float,
+    target_score: Optional[float] = None
+) -> GraspResult:
+    """
+    Worker: start GRASP ripetuti fino alla deadline (almeno uno) o al raggiungimento di target_score.
+    Legge/aggiorna lo score migliore condiviso (se presente) per il taglio delle costruzioni deboli.
+    """
+    search = GraspSearch(tools, autoclave, parameters, random.Random(seed))
+    best: List[NestingLayout] = []
+    best_score = -1.0
+    iterations = 0
+    starts = 0
+    trajectory: List[Tuple[float, float]] = []
+
+    # Almeno uno start anche se l'avvio del processo ha consumato il budget
+    target_reached = False
+    while starts == 0 or time.time() < deadline:
+        if target_score is not None:
+            shared = _shared_best.value if _shared_best is not None else best_score
+            if max(shared, best_score) >= target_score - 1e-9:
+                target_reached = True
+                break
+        starts += 1
+        iterations += 1
+        layouts = search.construct(alpha)
+        score = search.score(layouts)
+
+        incumbent = _shared_best.value if _shared_best is not None else best_score
+        if score >= LOCAL_SEARCH_CUTOFF * incumbent:
+            layouts, moves = search.local_search(layouts, deadline)
+            iterations += moves
+            score = search.score(layouts)
+
+        if score > best_score:
+            best, best_score = layouts, score
+            trajectory.append(((time.time() - start_time) * 1000, score))
+            if _shared_best is not None:
+                with _shared_best.get_lock():
+                    if score > _shared_best.value:
+                        _shared_best.value = score
+
+    return GraspResult(
+        layouts=best,
+        score=best_score,
+        iterations=iterations,
+        starts=starts,
+        elapsed_seconds=time.time() - start_time,
+        trajectory=trajectory,
+        target_reached=target_reached
+    )
+
+
+def _get_grasp_context():
+    """Contesto forkserver con il modulo precaricato (come il portfolio del solver)"""
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+class GraspEngine:
+    """
+    GRASP multi-start con budget di tempo.
+
+    Con workers > 1 ogni core esegue start indipendenti (seed = seed base + indice worker);
+    con un solo worker gli start girano nel processo corrente, senza costi di avvio del pool.
+    """
+
+    def __init__(
+        self,
+        parameters: NestingParameters,
+        alpha: float = 0.3,
+        seed: Optional[int] = None,
+        time_budget_seconds: float = 2.0,
+        workers: int = 0
+    ):
+        self.parameters = parameters
+        self.alpha = min(1.0, max(0.0, alpha))
+        self.seed = seed if seed is not None else random.randrange(2 ** 31)
+        self.time_budget_seconds = time_budget_seconds
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.logger = logging.getLogger(__name__)
+
+    def run(
+        self,
+        tools: Sequence[ToolInfo],
+        autoclave: AutoclaveInfo,
+        incumbent: Optional[List[NestingLayout]] = None,
+        target_score: Optional[float] = None
+    ) -> GraspResult:
+        """
+        Esegue il GRASP; l'incumbent (es. BL-FFD) è il riferimento iniziale da battere.
+        Con target_score gli start si fermano appena lo score migliore lo raggiunge.
+        """
+        start_time = time.time()
+        deadline = start_time + self.time_budget_seconds
+        tools = list(tools)
+        reference = GraspSearch(tools, autoclave, self.parameters, random.Random(self.seed))
+        incumbent = list(incumbent or [])
+        incumbent_score = reference.score(incumbent) if incumbent else -1.0
+        workers = self.workers if len(tools) > PARALLEL_MIN_TOOLS else 1
+
+        self.logger.info(
+            f"🚀 GRASP multi-start: {len(tools)} tools, alpha={self.alpha}, seed={self.seed}, "
+            f"{workers} worker, budget {self.time_budget_seconds:.1f}s"
+        )
+
+        if target_score is not None and incumbent_score >= target_score - 1e-9:
+            # Incumbent già al target: nessuno start
+            results = []
+        elif workers == 1:
+            results = [_run_grasp_starts(tools, autoclave, self.parameters, self.alpha, self.seed, deadline, start_time,
+                                         target_score)]
+        else:
+            results = self._run_parallel(tools, autoclave, incumbent_score, deadline, start_time, target_score, workers)
+
+        layouts, score = incumbent, incumbent_score
+        if results:
+            best = max(results, key=lambda r: r.score)
+            layouts, score = best.layouts, best.score
+        if incumbent and incumbent_score >= score:
+            layouts, score = incumbent, incumbent_score
+
+        # Traiettoria globale: solo i miglioramenti del massimo corrente tra tutti i worker
+        trajectory = []
+        running = incumbent_score
+        for t_ms, value in sorted(p for r in results for p in r.trajectory):
+            if value > running:
+                trajectory.append((t_ms, value))
+                running = value
+
+        result = GraspResult(
+            layouts=layouts,
+            score=score,
+            iterations=sum(r.iterations for r in results),
+            starts=sum(r.starts for r in results),
+            elapsed_seconds=time.time() - start_time,
+            trajectory=trajectory,
+            workers=workers,
+            target_reached=target_score is not None and score >= target_score - 1e-9
+        )
+        self.logger.info(
+            f"✅ GRASP: score {score:.2f} (incumbent {incumbent_score:.2f}), {result.starts} start, "
+            f"{result.iterations_per_second:.0f} it/s, {len(trajectory)} miglioramenti"
+        )
+        return result
+
+    def _run_parallel(
+        self,
+        tools: List[ToolInfo],
+        autoclave: AutoclaveInfo,
+        incumbent_score: float,
+        deadline: float,
+        start_time: float,
+        target_score: Optional[float] = None,
+        workers: Optional[int] = None
+    ) -> List[GraspResult]:
+        """Un task per core con seed distinti; lo score migliore è condiviso via Value"""
+        workers = workers or self.workers
+        context = _get_grasp_context()
+        shared_best = context.Value('d', incumbent_score)
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_grasp_worker,
+            initargs=(shared_best,)
+        ) as pool:
+            futures = [
+                pool.submit(_run_grasp_starts, tools, autoclave, self.parameters, self.alpha,
+                            self.seed + index, deadline, start_time, target_score)
+                for index in range(workers)
+            ]
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    self.logger.warning(f"⚠️ GRASP worker fallito: {e}")
+
+        if not results:
+            # Nessun worker completato: un passaggio nel processo corrente
+            results = [_run_grasp_starts(tools, autoclave, self.parameters, self.alpha, self.seed,
+                                         max(deadline, time.time() + 0.2), start_time, target_score)]
+        return results
@@ -0,0 +1,367 @@
+"""
+CarbonPilot - Riparazione incrementale del layout (batch DRAFT)
+Re-nesting locale quando l'operatore aggiunge o rimuove ODL da un batch esistente
+
+Invece di rigenerare l'intero layout con NestingModel.solve / solve_2l:
+- i tool non coinvolti restano fissi (rettangoli pre-posizionati)
+- rimozione: il tool viene tolto, nessun altro si sposta
+- aggiunta: inserimento MaxRects nello spazio libero residuo; se non entra,
+  CP-SAT locale su un intorno di k tool vicini (gli altri sono intervalli fissi),
+  minimizzando lo spostamento dei tool riaperti rispetto alla posizione originale
+- l'intorno cresce (k × 2) finché resta budget di tempo
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from ortools.sat.python import cp_model
+
+from .maxrects import MaxRectsPacker, MaxRectsRule
+from .solver import (
+    NestingModel, NestingParameters, NestingLayout, NestingSolution, ToolInfo, AutoclaveInfo, fixed_rects_disjoint
+)
+
+Obstacle = Tuple[float, float, float, float]  # (x, y, width, height) occupato ma non spostabile (es. cavalletti)
+
+# Peso del tool inserito rispetto allo spostamento (mm) dei tool riaperti
+INSERTION_REWARD = 1_000_000
+
+
+@dataclass
+class RepairResult:
+    """Esito di una riparazione incrementale"""
+    solution: NestingSolution
+    added_odl_ids: List[int] = field(default_factory=list)
+    removed_odl_ids: List[int] = field(default_factory=list)
+    moved_odl_ids: List[int] = field(default_factory=list)
+    strategy: str = "REMOVE_ONLY"  # REMOVE_ONLY | GREEDY_INSERT | LOCAL_CPSAT
+    neighbourhood_size: int = 0  # Tool riaperti nell'ultimo modello CP-SAT locale
+
+
+class IncrementalRepairer:
+    """
+    Riparazione di un layout esistente dato un delta di ODL (aggiunte/rimozioni).
+
+    Per modifiche di un singolo ODL la risposta resta ben sotto il secondo:
+    il caso comune si risolve con il solo inserimento MaxRects, il CP-SAT locale
+    lavora su pochi tool con tutti gli altri fissati.
+    """
+
+    def __init__(
+        self,
+        parameters: NestingParameters,
+        neighbourhood_size: int = 6,
+        time_limit_seconds: float = 0.6
+    ):
+        self.parameters = parameters
+        self.neighbourhood_size = max(1, neighbourhood_size)
+        self.time_limit_seconds = time_limit_seconds
+        self.logger = logging.getLogger(__name__)
+        self._model = NestingModel(parameters)
+
+    def repair(
+        self,
+        layouts: List[NestingLayout],
+        autoclave: AutoclaveInfo,
+        add_tools: Sequence[ToolInfo] = (),
+        remove_odl_ids: Sequence[int] = (),
+        obstacles: Sequence[Obstacle] = ()
+    ) -> RepairResult:
+        """
+        Applica il delta al layout mantenendo fisse le posizioni non coinvolte.
+
+        Args:
+            layouts: layout corrente (es. da configurazione_json del batch)
+            autoclave: piano di carico
+            add_tools: tool degli ODL da aggiungere
+            remove_odl_ids: ODL da togliere dal layout
+            obstacles: aree occupate non spostabili né conteggiate (es. cavalletti 2L)
+        """
+        start_time = time.time()
+        deadline = start_time + self.time_limit_seconds
+        removed = set(remove_odl_ids)
+        current = [l for l in layouts if l.odl_id not in removed]
+        present = {l.odl_id for l in current}
+        pending = [t for t in add_tools if t.odl_id not in present]
+        originals = {l.odl_id: (l.x, l.y) for l in current}
+
+        self.logger.info(f"🔧 REPAIR: {len(layouts)} tool nel layout, +{len(pending)} / -{len(removed & {l.odl_id for l in layouts})} ODL")
+
+        result = RepairResult(
+            solution=None,
+            removed_odl_ids=sorted(removed & {l.odl_id for l in layouts})
+        )
+        excluded: List[Dict[str, Any]] = []
+
+        for tool in sorted(pending, key=lambda t: t.width * t.height, reverse=True):
+            reason = self._capacity_violation(current, tool, autoclave)
+            if reason:
+                excluded.append({'odl_id': tool.odl_id, 'motivo': reason, 'dettagli': 'Riparazione incrementale'})
+                continue
+
+            layout = self._greedy_insert(current, obstacles, tool, autoclave)
+            if layout is not None:
+                current.append(layout)
+                result.added_odl_ids.append(tool.odl_id)
+                if result.strategy == "REMOVE_ONLY":
+                    result.strategy = "GREEDY_INSERT"
+                continue
+
+            repaired = self._local_cpsat_insert(current, obstacles, tool, autoclave, deadline, result)
+            if repaired is not None:
+                current = repaired
+                result.added_odl_ids.append(tool.odl_id)
+                result.strategy = "LOCAL_CPSAT"
+            else:
+                excluded.append({
+                    'odl_id': tool.odl_id,
+                    'motivo': 'Spazio insufficiente',
+                    'dettagli': 'Nessuna riparazione locale trovata entro il budget di tempo'
+                })
+
+        result.moved_odl_ids = sorted(
+            l.odl_id for l in current
+            if l.odl_id in originals and (l.x, l.y) != originals[l.odl_id]
+        )
+
+        placed_tools = [
+            ToolInfo(odl_id=l.odl_id, width=l.width, height=l.height, weight=l.weight, lines_needed=l.lines_used)
+            for l in current
+        ]
+        solution = self._model._create_solution_from_layouts(
+            current, placed_tools, autoclave, start_time, f"INCREMENTAL_{result.strategy}"
+        )
+        solution.excluded_odls = excluded
+        solution.metrics.excluded_count = len(excluded)
+        solution.success = True
+        solution.message = (
+            f"Riparazione {result.strategy}: +{len(result.added_odl_ids)} / -{len(result.removed_odl_ids)} ODL, "
+            f"{len(result.moved_odl_ids)} tool spostati"
+        )
+        result.solution = solution
+
+        self.logger.info(f"✅ REPAIR {result.strategy}: {solution.message} in {solution.metrics.time_solver_ms:.0f}ms")
+        return result
+
+    # ------------------------------------------------------------------
+    # Vincoli di capacità
+    # ------------------------------------------------------------------
+
+    def _capacity_violation(
+        self,
+        layouts: List[NestingLayout],
+        tool: ToolInfo,
+        autoclave: AutoclaveInfo
+    ) -> Optional[str]:
+        """Motivo di esclusione per peso/linee vuoto, None se il tool rientra nei limiti"""
+        if sum(l.weight for l in layouts) + tool.weight > autoclave.max_weight:
+            return 'Peso massimo autoclave superato'
+        if sum(l.lines_used for l in layouts) + tool.lines_needed > self.parameters.vacuum_lines_capacity:
+            return 'Linee vuoto insufficienti'
+        return None
+
+    # ------------------------------------------------------------------
+    # Inserimento greedy attorno ai tool fissi
+    # ------------------------------------------------------------------
+
+    def _greedy_insert(
+        self,
+        layouts: List[NestingLayout],
+        obstacles: Sequence[Obstacle],
+        tool: ToolInfo,
+        autoclave: AutoclaveInfo
+    ) -> Optional[NestingLayout]:
+        """Inserimento MaxRects nello spazio libero lasciato dal layout fisso"""
+        margin = self.parameters.min_distance_mm
+        padding = self.parameters.padding_mm
+        packer = MaxRectsPacker(
+            margin, margin, autoclave.width - margin, autoclave.height - margin,
+            spacing=padding, rule=MaxRectsRule(self.parameters.maxrects_rule)
+        )
+        for l in layouts:
+            packer.occupy(l.x, l.y, l.width, l.height)
+        for x, y, width, height in obstacles:
+            packer.occupy(x, y, width, height)
+
+        placement = packer.find_position(tool.width, tool.height)
+        if placement is None:
+            return None
+
+        x, y, width, height, rotated = placement
+        return NestingLayout(
+            odl_id=tool.odl_id, x=float(x), y=float(y), width=float(width), height=float(height),
+            weight=tool.weight, rotated=rotated, lines_used=tool.lines_needed
+        )
+
+    # ------------------------------------------------------------------
+    # CP-SAT locale
+    # ------------------------------------------------------------------
+
+    def _local_cpsat_insert(
+        self,
+        layouts: List[NestingLayout],
+        obstacles: Sequence[Obstacle],
+        tool: ToolInfo,
+        autoclave: AutoclaveInfo,
+        deadline: float,
+        result: RepairResult
+    ) -> Optional[List[NestingLayout]]:
+        """Riapre intorni crescenti di tool vicini finché il nuovo tool entra o scade il budget"""
+        k = min(self.neighbourhood_size, len(layouts))
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0.05:
+                return None
+
+            neighbourhood = self._select_neighbourhood(layouts, obstacles, autoclave, k)
+            result.neighbourhood_size = len(neighbourhood)
+            repaired = self._solve_neighbourhood(layouts, neighbourhood, obstacles, tool, autoclave, remaining)
+            if repaired is not None:
+                return repaired
+            if k >= len(layouts):
+                return None
+            k = min(len(layouts), k * 2)
+
+    def _select_neighbourhood(
+        self,
+        layouts: List[NestingLayout],
+        obstacles: Sequence[Obstacle],
+        autoclave: AutoclaveInfo,
+        k: int
+    ) -> Set[int]:
+        """I k tool più vicini al rettangolo libero più grande (dove lo spazio si può compattare)"""
+        packer = MaxRectsPacker(0, 0, autoclave.width, autoclave.height)
+        for l in layouts:
+            packer.occupy(l.x, l.y, l.width, l.height)
+        for x, y, width, height in obstacles:
+            packer.occupy(x, y, width, height)
+
+        if packer.free_rects:
+            fx, fy, fw, fh = max(packer.free_rects, key=lambda r: r[2] * r[3])
+            seed_x, seed_y = fx + fw / 2, fy + fh / 2
+        else:
+            seed_x, seed_y = autoclave.width / 2, autoclave.height / 2
+
+        by_distance = sorted(
+            layouts,
+            key=lambda l: math.hypot(l.x + l.width / 2 - seed_x, l.y + l.height / 2 - seed_y)
+        )
+        return {l.odl_id for l in by_distance[:k]}
+
+    def _solve_neighbourhood(
+        self,
+        layouts: List[NestingLayout],
+        neighbourhood: Set[int],
+        obstacles: Sequence[Obstacle],
+        tool: ToolInfo,
+        autoclave: AutoclaveInfo,
+        time_limit: float
+    ) -> Optional[List[NestingLayout]]:
+        """
+        Modello CP-SAT locale: tool dell'intorno liberi (orientamento invariato),
+        resto del layout e ostacoli come intervalli fissi, nuovo tool opzionale con rotazione.
+        Obiettivo: inserire il tool, poi minimizzare lo spostamento complessivo.
+        """
+        margin = max(1, round(self.parameters.min_distance_mm))
+        padding = max(1, round(self.parameters.padding_mm))
+        width = int(autoclave.width)
+        height = int(autoclave.height)
+
+        model = cp_model.CpModel()
+        free_x, free_y = [], []
+        moving: List[Tuple[NestingLayout, Any, Any]] = []
+        displacement = []
+
+        for l in layouts:
+            if l.odl_id not in neighbourhood:
+                continue
+            w, h = round(l.width), round(l.height)
+            ox, oy = round(l.x), round(l.y)
+            x = model.NewIntVar(min(margin, ox), max(width - margin - w, ox), f"x_{l.odl_id}")
+            y = model.NewIntVar(min(margin, oy), max(height - margin - h, oy), f"y_{l.odl_id}")
+            free_x.append(model.NewFixedSizeIntervalVar(x, w + padding, f"ix_{l.odl_id}"))
+            free_y.append(model.NewFixedSizeIntervalVar(y, h + padding, f"iy_{l.odl_id}"))
+            model.AddHint(x, ox)
+            model.AddHint(y, oy)
+
+            dx = model.NewIntVar(0, width, f"dx_{l.odl_id}")
+            dy = model.NewIntVar(0, height, f"dy_{l.odl_id}")
+            model.AddAbsEquality(dx, x - ox)
+            model.AddAbsEquality(dy, y - oy)
+            displacement.extend([dx, dy])
+            moving.append((l, x, y))
+
+        orientations = []
+        for rotated, (w, h) in enumerate([(round(tool.width), round(tool.height)), (round(tool.height), round(tool.width))]):
+            if rotated and w == h:
+                continue
+            if w > width - 2 * margin or h > height - 2 * margin:
+                continue
+            present = model.NewBoolVar(f"new_{tool.odl_id}_r{rotated}")
+            x = model.NewIntVar(margin, width - margin - w, f"x_new_r{rotated}")
+            y = model.NewIntVar(margin, height - margin - h, f"y_new_r{rotated}")
+            free_x.append(model.NewOptionalFixedSizeIntervalVar(x, w + padding, present, f"ix_new_r{rotated}"))
+            free_y.append(model.NewOptionalFixedSizeIntervalVar(y, h + padding, present, f"iy_new_r{rotated}"))
+            orientations.append((present, x, y, bool(rotated)))
+        if not orientations:
+            return None
+        model.AddAtMostOne(o[0] for o in orientations)
+
+        fixed = [
+            (round(l.x), round(l.y), round(l.width), round(l.height))
+            for l in layouts if l.odl_id not in neighbourhood
+        ]
+        fixed.extend((round(x), round(y), round(w), round(h)) for x, y, w, h in obstacles)
+        fixed_x = [model.NewFixedSizeIntervalVar(fx, fw + padding, f"fx_{i}") for i, (fx, _, fw, _) in enumerate(fixed)]
+        fixed_y = [model.NewFixedSizeIntervalVar(fy, fh + padding, f"fy_{i}") for i, (_, fy, _, fh) in enumerate(fixed)]
+
+        # I rettangoli fissi possono già violare il padding tra loro (layout di altri algoritmi):
+        # in quel caso un vincolo per ciascuno, altrimenti un unico NoOverlap2D
+        if fixed_rects_disjoint(fixed, padding):
+            model.AddNoOverlap2D(free_x + fixed_x, free_y + fixed_y)
+        else:
+            model.AddNoOverlap2D(free_x, free_y)
+            for ix, iy in zip(fixed_x, fixed_y):
+                model.AddNoOverlap2D(free_x + [ix], free_y + [iy])
+
+        inserted = sum(o[0] for o in orientations)
+        model.Maximize(INSERTION_REWARD * inserted - sum(displacement))
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = max(0.05, time_limit)
+        solver.parameters.num_search_workers = max(1, min(8, self.parameters.num_search_workers))
+        status = solver.Solve(model)
+
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return None
+        chosen = next((o for o in orientations if solver.Value(o[0])), None)
+        if chosen is None:
+            return None
+
+        self.logger.info(f"🔧 REPAIR CP-SAT locale: intorno {len(moving)} tool, {solver.StatusName(status)} in {solver.WallTime() * 1000:.0f}ms")
+
+        moved = {}
+        for l, x, y in moving:
+            new_x, new_y = float(solver.Value(x)), float(solver.Value(y))
+            if (round(l.x), round(l.y)) != (new_x, new_y):
+                moved[l.odl_id] = NestingLayout(
+                    odl_id=l.odl_id, x=new_x, y=new_y, width=l.width, height=l.height,
+                    weight=l.weight, rotated=l.rotated, lines_used=l.lines_used
+                )
+        repaired = [moved.get(l.odl_id, l) for l in layouts]
+
+        _, x, y, rotated = chosen
+        repaired.append(NestingLayout(
+            odl_id=tool.odl_id,
+            x=float(solver.Value(x)),
+            y=float(solver.Value(y)),
+            width=float(tool.height if rotated else tool.width),
+            height=float(tool.width if rotated else tool.height),
+            weight=tool.weight,
+            rotated=rotated,
+            lines_used=tool.lines_needed
+        ))
+        return repaired
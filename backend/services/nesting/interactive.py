@@ -0,0 +1,417 @@
+"""
+CarbonPilot - Validazione interattiva dello spostamento di un tool
+Fast path server-side per l'editor di layout: l'operatore trascina o ruota un singolo tool
+
+- Indice in memoria del layout del batch (RectIndex per livello + cavalletti), costruito
+  una volta e riusato finché il batch non cambia (LayoutIndexRegistry)
+- Validazione di uno spostamento/rotazione con sole query locali sull'indice:
+  limiti del piano, overlap, padding e, per i batch 2L, interferenza e supporto dei cavalletti
+- Ri-ottimizzazione locale opzionale: CP-SAT sui soli tool vicini del livello 0, con il tool
+  spostato fisso nella nuova posizione, minimizzando lo spostamento; restituisce il delta
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from ortools.sat.python import cp_model
+
+from .solver import fixed_rects_disjoint
+from .solver_2l import (
+    NestingModel2L, NestingParameters2L, NestingLayout2L, CavallettoPosition, CavallettiConfiguration
+)
+from .spatial_index import RectIndex
+
+Rect = Tuple[float, float, float, float]  # (x, y, width, height)
+
+
+@dataclass
+class MoveViolation:
+    """Vincolo violato dalla posizione proposta"""
+    kind: str  # BOUNDS | OVERLAP | PADDING | CAVALLETTO | SUPPORT
+    message: str
+    odl_id: Optional[int] = None  # Tool coinvolto (None per i limiti del piano)
+
+
+@dataclass
+class MoveValidation:
+    """Esito della validazione di uno spostamento"""
+    odl_id: int
+    x: float
+    y: float
+    width: float
+    height: float
+    rotated: bool
+    level: int = 0
+    violations: List[MoveViolation] = field(default_factory=list)
+    time_ms: float = 0.0
+
+    @property
+    def valid(self) -> bool:
+        return not self.violations
+
+
+@dataclass
+class ToolShift:
+    """Spostamento di un tool vicino proposto dalla ri-ottimizzazione locale"""
+    odl_id: int
+    x: float
+    y: float
+    dx: float
+    dy: float
+
+
+@dataclass
+class LocalShiftResult:
+    """Esito della ri-ottimizzazione locale attorno al tool spostato"""
+    success: bool
+    status: str  # NOT_NEEDED | OPTIMAL | FEASIBLE | NO_SOLUTION | INFEASIBLE_MOVE | UNSUPPORTED_LEVEL
+    validation: MoveValidation
+    shifts: List[ToolShift] = field(default_factory=list)
+    neighbourhood_size: int = 0
+    time_ms: float = 0.0
+
+
+class LayoutMoveValidator:
+    """
+    Indice del layout di un batch per validare spostamenti di un singolo tool.
+
+    Ogni livello ha il proprio RectIndex (i tool di livello 1 non occupano il piano),
+    i cavalletti sono indicizzati a parte con chiave (odl_id, sequenza): una validazione
+    visita solo le celle coperte dal tool, indipendentemente dalla dimensione del batch.
+    """
+
+    def __init__(
+        self,
+        layouts: Sequence[NestingLayout2L],
+        width: float,
+        height: float,
+        padding_mm: float = 10.0,
+        min_distance_mm: float = 15.0,
+        cavalletti: Sequence[CavallettoPosition] = (),
+        cavalletti_config: Optional[CavallettiConfiguration] = None
+    ):
+        self.width = width
+        self.height = height
+        self.padding_mm = padding_mm
+        self.min_distance_mm = min_distance_mm
+        self.cavalletti_config = cavalletti_config or CavallettiConfiguration()
+        self.logger = logging.getLogger(__name__)
+        self._model_2l: Optional[NestingModel2L] = None
+
+        self.layouts: Dict[int, NestingLayout2L] = {l.odl_id: l for l in layouts}
+        self._levels: Dict[int, RectIndex] = {}
+        for level in sorted({l.level for l in layouts} | {0}):
+            self._levels[level] = RectIndex.from_rects(
+                (l.odl_id, (l.x, l.y, l.width, l.height)) for l in layouts if l.level == level
+            )
+
+        self.cavalletti: Dict[int, List[CavallettoPosition]] = {}
+        for cav in cavalletti:
+            self.cavalletti.setdefault(cav.tool_odl_id, []).append(cav)
+        self._cavalletti_index = RectIndex.from_rects(
+            ((cav.tool_odl_id, cav.sequence_number), (cav.x, cav.y, cav.width, cav.height))
+            for cav in cavalletti
+        )
+
+    @property
+    def cavalletti_margin(self) -> float:
+        return max(self.cavalletti_config.safety_margin_x, self.cavalletti_config.safety_margin_y)
+
+    # ------------------------------------------------------------------
+    # Validazione
+    # ------------------------------------------------------------------
+
+    def validate(self, odl_id: int, x: float, y: float, rotated: Optional[bool] = None) -> MoveValidation:
+        """
+        Valida la posizione proposta per un tool del layout (rotated=None mantiene l'orientamento).
+
+        Raises:
+            KeyError: se il tool non fa parte del layout
+        """
+        start = time.perf_counter()
+        current = self.layouts[odl_id]
+        proposed = self._proposed_layout(current, x, y, rotated)
+        result = MoveValidation(
+            odl_id=odl_id, x=proposed.x, y=proposed.y, width=proposed.width, height=proposed.height,
+            rotated=proposed.rotated, level=proposed.level
+        )
+        violations = result.violations
+
+        margin = self.min_distance_mm
+        if (proposed.x < margin or proposed.y < margin or
+                proposed.x + proposed.width > self.width - margin or
+                proposed.y + proposed.height > self.height - margin):
+            violations.append(MoveViolation(
+                'BOUNDS', f"Tool fuori dal piano utile (margine {margin:.0f}mm dai bordi)"
+            ))
+
+        for other_id, kind in self._tool_conflicts(proposed):
+            message = "Sovrapposizione con un altro tool" if kind == 'OVERLAP' else \
+                f"Distanza inferiore al padding di {self.padding_mm:.0f}mm"
+            violations.append(MoveViolation(kind, message, other_id))
+
+        if proposed.level == 0:
+            # I tool del piano non possono occupare l'area dei cavalletti di livello 1
+            for key in self._cavalletti_index.query(
+                    proposed.x, proposed.y, proposed.width, proposed.height, self.cavalletti_margin):
+                violations.append(MoveViolation(
+                    'CAVALLETTO', "Interferenza con un cavalletto del livello 1", key[0]
+                ))
+        else:
+            violations.extend(self._support_violations(proposed))
+
+        result.time_ms = (time.perf_counter() - start) * 1000
+        return result
+
+    def moved_cavalletti(self, odl_id: int, proposed: NestingLayout2L) -> List[CavallettoPosition]:
+        """
+        Cavalletti del tool di livello 1 nella posizione proposta: traslati con il tool,
+        ricalcolati se cambia l'orientamento
+        """
+        current = self.layouts[odl_id]
+        own = self.cavalletti.get(odl_id, [])
+        if proposed.rotated == current.rotated and own:
+            dx, dy = proposed.x - current.x, proposed.y - current.y
+            return [replace(cav, x=cav.x + dx, y=cav.y + dy) for cav in own]
+        if self._model_2l is None:
+            self._model_2l = NestingModel2L(NestingParameters2L(
+                padding_mm=self.padding_mm, min_distance_mm=self.min_distance_mm
+            ))
+        return self._model_2l.calcola_cavalletti_per_tool(proposed, self.cavalletti_config)
+
+    def _proposed_layout(
+        self,
+        current: NestingLayout2L,
+        x: float,
+        y: float,
+        rotated: Optional[bool]
+    ) -> NestingLayout2L:
+        if rotated is None or bool(rotated) == current.rotated:
+            return replace(current, x=float(x), y=float(y))
+        return replace(current, x=float(x), y=float(y), width=current.height, height=current.width,
+                       rotated=bool(rotated))
+
+    def _tool_conflicts(self, proposed: NestingLayout2L) -> List[Tuple[int, str]]:
+        """Tool dello stesso livello in overlap (area comune) o sotto il padding"""
+        index = self._levels.get(proposed.level)
+        if index is None:
+            return []
+        conflicts = []
+        for other_id in index.query(proposed.x, proposed.y, proposed.width, proposed.height, self.padding_mm):
+            if other_id == proposed.odl_id:
+                continue
+            ox, oy, ow, oh = index.get(other_id)
+            overlap = not (proposed.x + proposed.width <= ox or ox + ow <= proposed.x or
+                           proposed.y + proposed.height <= oy or oy + oh <= proposed.y)
+            conflicts.append((other_id, 'OVERLAP' if overlap else 'PADDING'))
+        conflicts.sort()
+        return conflicts
+
+    def _support_violations(self, proposed: NestingLayout2L) -> List[MoveViolation]:
+        """Supporto di un tool di livello 1: cavalletti sotto il tool, sul piano, liberi da interferenze"""
+        violations = []
+        cavalletti = self.moved_cavalletti(proposed.odl_id, proposed)
+        if len(cavalletti) < 2 and self.cavalletti_config.force_minimum_two:
+            violations.append(MoveViolation(
+                'SUPPORT', f"Solo {len(cavalletti)} cavalletti sotto il tool (richiesti ≥2)", proposed.odl_id
+            ))
+
+        margin = self.cavalletti_margin
+        floor = self._levels[0]
+        interfering = set()
+        for cav in cavalletti:
+            if cav.x < 0 or cav.y < 0 or cav.x + cav.width > self.width or cav.y + cav.height > self.height:
+                violations.append(MoveViolation(
+                    'SUPPORT', f"Cavalletto {cav.sequence_number} fuori dal piano", proposed.odl_id
+                ))
+            for other_id in floor.query(cav.x, cav.y, cav.width, cav.height, margin):
+                interfering.add(('CAVALLETTO', other_id, "Cavalletto sopra un tool del livello 0"))
+            for key in self._cavalletti_index.query(cav.x, cav.y, cav.width, cav.height, margin):
+                if key[0] != proposed.odl_id:
+                    interfering.add(('CAVALLETTO', key[0], "Interferenza tra cavalletti"))
+        violations.extend(MoveViolation(kind, message, odl_id) for kind, odl_id, message in sorted(interfering))
+        return violations
+
+    # ------------------------------------------------------------------
+    # Ri-ottimizzazione locale
+    # ------------------------------------------------------------------
+
+    def relocate(
+        self,
+        odl_id: int,
+        x: float,
+        y: float,
+        rotated: Optional[bool] = None,
+        max_shift_mm: float = 300.0,
+        max_neighbours: int = 8,
+        time_limit_seconds: float = 0.2
+    ) -> LocalShiftResult:
+        """
+        Fa spazio al tool nella posizione proposta spostando solo i tool vicini del livello 0.
+
+        Il tool spostato resta fisso; i vicini (tutti quelli in conflitto più i più vicini
+        fino a max_neighbours) si muovono al più di max_shift_mm per asse; il resto del piano
+        e i cavalletti sono rettangoli fissi. Obiettivo: spostamento totale minimo.
+        """
+        start = time.perf_counter()
+        validation = self.validate(odl_id, x, y, rotated)
+        result = LocalShiftResult(success=validation.valid, status="NOT_NEEDED", validation=validation)
+        if validation.valid:
+            result.time_ms = (time.perf_counter() - start) * 1000
+            return result
+
+        if validation.level != 0:
+            result.status = "UNSUPPORTED_LEVEL"
+        elif any(v.kind not in ('OVERLAP', 'PADDING') for v in validation.violations):
+            # Limiti del piano e cavalletti non si risolvono spostando i vicini
+            result.status = "INFEASIBLE_MOVE"
+        else:
+            shifts, status, size = self._shift_neighbours(
+                validation, max_shift_mm, max_neighbours, time_limit_seconds
+            )
+            result.status, result.neighbourhood_size = status, size
+            if shifts is not None:
+                result.success, result.shifts = True, shifts
+                result.validation = replace(validation, violations=[])
+
+        result.time_ms = (time.perf_counter() - start) * 1000
+        self.logger.info(
+            f"🔧 RELOCATE ODL {odl_id}: {result.status}, {len(result.shifts)} tool spostati "
+            f"(intorno {result.neighbourhood_size}) in {result.time_ms:.0f}ms"
+        )
+        return result
+
+    def _shift_neighbours(
+        self,
+        moved: MoveValidation,
+        max_shift_mm: float,
+        max_neighbours: int,
+        time_limit_seconds: float
+    ) -> Tuple[Optional[List[ToolShift]], str, int]:
+        floor = self._levels[0]
+        conflicting = {v.odl_id for v in moved.violations}
+        center_x, center_y = moved.x + moved.width / 2, moved.y + moved.height / 2
+        nearby = sorted(
+            (key for key in floor.near(moved.x, moved.y, moved.width, moved.height, max_shift_mm)
+             if key != moved.odl_id and key not in conflicting),
+            key=lambda key: _center_distance(floor.get(key), center_x, center_y)
+        )
+        free_ids = sorted(conflicting) + nearby[:max(0, max_neighbours - len(conflicting))]
+
+        margin = max(1, round(self.min_distance_mm))
+        padding = max(1, round(self.padding_mm))
+        width, height = int(self.width), int(self.height)
+        shift = round(max_shift_mm)
+
+        model = cp_model.CpModel()
+        free_x, free_y, moving, displacement = [], [], [], []
+        region = [moved.x, moved.y, moved.x + moved.width, moved.y + moved.height]
+        for key in free_ids:
+            l = self.layouts[key]
+            w, h, ox, oy = round(l.width), round(l.height), round(l.x), round(l.y)
+            x = model.NewIntVar(*_shift_domain(ox, w, width, margin, shift), f"x_{key}")
+            y = model.NewIntVar(*_shift_domain(oy, h, height, margin, shift), f"y_{key}")
+            free_x.append(model.NewFixedSizeIntervalVar(x, w + padding, f"ix_{key}"))
+            free_y.append(model.NewFixedSizeIntervalVar(y, h + padding, f"iy_{key}"))
+            model.AddHint(x, ox)
+            model.AddHint(y, oy)
+            dx = model.NewIntVar(0, shift, f"dx_{key}")
+            dy = model.NewIntVar(0, shift, f"dy_{key}")
+            model.AddAbsEquality(dx, x - ox)
+            model.AddAbsEquality(dy, y - oy)
+            displacement.extend([dx, dy])
+            moving.append((l, x, y))
+            region = [min(region[0], ox - shift), min(region[1], oy - shift),
+                      max(region[2], ox + w + shift), max(region[3], oy + h + shift)]
+
+        # Solo i rettangoli fissi raggiungibili dai vicini entrano nel modello
+        rx, ry = region[0], region[1]
+        rw, rh = region[2] - region[0], region[3] - region[1]
+        fixed = [(round(moved.x), round(moved.y), round(moved.width), round(moved.height))]
+        for key in floor.query(rx, ry, rw, rh, padding):
+            if key != moved.odl_id and key not in free_ids:
+                fx, fy, fw, fh = floor.get(key)
+                fixed.append((round(fx), round(fy), round(fw), round(fh)))
+        # Cavalletti allargati in modo che il padding copra anche il margine di sicurezza
+        grow = max(0, round(self.cavalletti_margin) - padding)
+        for key in self._cavalletti_index.query(rx, ry, rw, rh, padding + grow):
+            cx, cy, cw, ch = self._cavalletti_index.get(key)
+            fixed.append((round(cx) - grow, round(cy) - grow, round(cw) + 2 * grow, round(ch) + 2 * grow))
+
+        fixed_x = [model.NewFixedSizeIntervalVar(fx, fw + padding, f"fx_{i}") for i, (fx, _, fw, _) in enumerate(fixed)]
+        fixed_y = [model.NewFixedSizeIntervalVar(fy, fh + padding, f"fy_{i}") for i, (_, fy, _, fh) in enumerate(fixed)]
+        if fixed_rects_disjoint(fixed, padding):
+            model.AddNoOverlap2D(free_x + fixed_x, free_y + fixed_y)
+        else:
+            model.AddNoOverlap2D(free_x, free_y)
+            for ix, iy in zip(fixed_x, fixed_y):
+                model.AddNoOverlap2D(free_x + [ix], free_y + [iy])
+        model.Minimize(sum(displacement))
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = max(0.01, time_limit_seconds)
+        solver.parameters.num_search_workers = 1
+        status = solver.Solve(model)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return None, "NO_SOLUTION", len(free_ids)
+
+        shifts = []
+        for l, x, y in moving:
+            new_x, new_y = float(solver.Value(x)), float(solver.Value(y))
+            if (round(l.x), round(l.y)) != (new_x, new_y):
+                shifts.append(ToolShift(odl_id=l.odl_id, x=new_x, y=new_y, dx=new_x - l.x, dy=new_y - l.y))
+        return shifts, solver.StatusName(status), len(free_ids)
+
+
+class LayoutIndexRegistry:
+    """
+    Cache LRU thread-safe dei validatori per batch.
+
+    Il validatore di un batch si ricostruisce solo quando cambia la sua impronta
+    (es. updated_at): le richieste successive durante il drag riusano l'indice.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Any, LayoutMoveValidator]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        key: Hashable,
+        fingerprint: Any,
+        builder: Callable[[], LayoutMoveValidator]
+    ) -> Tuple[LayoutMoveValidator, bool]:
+        """(validatore, True se riusato dalla cache)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(key)
+                return entry[1], True
+
+        validator = builder()
+        with self._lock:
+            self._entries[key] = (fingerprint, validator)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return validator, False
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+def _shift_domain(origin: int, size: int, extent: int, margin: int, shift: int) -> Tuple[int, int]:
+    """Intervallo di posizioni entro il piano utile e a distanza <= shift dall'origine"""
+    low, high = max(margin, origin - shift), min(extent - margin - size, origin + shift)
+    return (low, high) if low <= high else (origin, origin)
+
+
+def _center_distance(rect: Rect, cx: float, cy: float) -> float:
+    x, y, w, h = rect
+    return abs(x + w / 2 - cx) + abs(y + h / 2 - cy)
@@ -0,0 +1,247 @@
+"""
+CarbonPilot - Modello CP-SAT congiunto a due livelli
+Decide insieme livello, orientamento e posizione di ogni tool invece di riempire
+prima il piano (solver.py) e poi collocare gli avanzi sui cavalletti
+
+- Per ogni tool una coppia di intervalli opzionali per livello e orientamento:
+  al più una alternativa presente, un NoOverlap2D per livello
+- Livello 1: dominio di x limitato alle posizioni supportate dai cavalletti fissi
+  (FixedSupportModel.supported_x_ranges), niente vincoli a coppie
+- Interferenze: le impronte dei supporti di un tool di livello 1 (offset precalcolati
+  per tool e orientamento) sono intervalli opzionali nel NoOverlap2D del livello 0,
+  quindi non possono cadere su un tool del piano né su altri supporti
+- Obiettivo allineato all'efficiency_score 2L (area media dei livelli 70% + linee vuoto 30%),
+  warm start dalla soluzione sequenziale
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from ortools.sat.python import cp_model
+
+from .solver_2l import (
+    NestingModel2L, NestingLayout2L, ToolInfo2L, AutoclaveInfo2L, CavallettiConfiguration
+)
+from .spatial_index import RectIndex
+
+# Scala dei coefficienti interi dell'obiettivo (punti di score × SCORE_SCALE)
+SCORE_SCALE = 10_000
+
+# Penalità relativa per il livello 1 a parità di score: il piano resta preferito
+LEVEL_1_PENALTY = 0.001
+
+Footprint = Tuple[int, int, int, int]  # (dx, dy, larghezza, altezza) rispetto all'angolo del tool
+
+
+@dataclass
+class _Option:
+    """Alternativa (livello × orientamento) di un tool nel modello"""
+    present: cp_model.IntVar
+    level: int
+    rotated: bool
+    x: cp_model.IntVar
+    y: cp_model.IntVar
+    width: int
+    height: int
+    x_domain: cp_model.Domain
+    y_domain: cp_model.Domain
+    footprints: List[Footprint] = field(default_factory=list)
+
+
+@dataclass
+class JointSolveResult:
+    """Esito del modello congiunto"""
+    layouts: List[NestingLayout2L]
+    status: str  # OPTIMAL | FEASIBLE | INFEASIBLE | UNKNOWN | MODEL_INVALID
+    objective: float = 0.0
+    time_ms: float = 0.0
+    hinted: int = 0  # Tool della soluzione sequenziale usati come hint
+    options: Dict[int, int] = field(default_factory=dict)  # Alternative (livello × orientamento) per tool
+
+
+class JointTwoLevelSolver:
+    """Modello CP-SAT unico sui due livelli con intervalli opzionali per livello"""
+
+    def __init__(self, model_2l: NestingModel2L, time_limit_seconds: float = 10.0):
+        self.model_2l = model_2l
+        self.parameters = model_2l.parameters
+        self.time_limit_seconds = time_limit_seconds
+        self.logger = logging.getLogger(__name__)
+
+    def solve(
+        self,
+        tools: Sequence[ToolInfo2L],
+        autoclave: AutoclaveInfo2L,
+        warm_start: Sequence[NestingLayout2L] = ()
+    ) -> JointSolveResult:
+        start = time.time()
+        margin = max(1, round(self.parameters.min_distance_mm))
+        padding = max(1, round(self.parameters.padding_mm))
+        width, height = int(autoclave.width), int(autoclave.height)
+        use_level_1 = autoclave.has_cavalletti and self.parameters.use_cavalletti
+
+        support_model = self.model_2l._fixed_support_model(autoclave)
+        config = self.model_2l._advanced_cavalletti_config(autoclave)
+        _, level_1_weight_limit = self.model_2l._calculate_dynamic_weight_limits(autoclave, 0)
+        hints = {l.odl_id: l for l in warm_start}
+
+        model = cp_model.CpModel()
+        intervals = {0: ([], []), 1: ([], [])}
+        alternatives: Dict[int, List[_Option]] = {}
+        objective, total_weight, level_1_weight, total_lines = [], [], [], []
+
+        total_area = 2 * autoclave.width * autoclave.height
+        max_lines = max(1, autoclave.max_lines)
+        for tool in tools:
+            value = (tool.width * tool.height / total_area * 100 * 0.7 +
+                     tool.lines_needed / max_lines * 100 * 0.3) if total_area > 0 else 0.0
+            options = []
+            for level in ((0, 1) if use_level_1 and tool.can_use_cavalletto else (0,)):
+                for rotated, (w, h) in enumerate(((tool.width, tool.height), (tool.height, tool.width))):
+                    if rotated and tool.width == tool.height:
+                        continue
+                    w, h = math.ceil(w), math.ceil(h)
+                    x_max, y_max = width - margin - w, height - margin - h
+                    if x_max < margin or y_max < margin:
+                        continue
+                    if level == 1:
+                        ranges = support_model.supported_x_ranges(w, margin, x_max)
+                        if not ranges:
+                            continue
+                        x_domain = cp_model.Domain.FromIntervals([list(r) for r in ranges])
+                    else:
+                        x_domain = cp_model.Domain(margin, x_max)
+
+                    name = f"{tool.odl_id}_l{level}_r{rotated}"
+                    present = model.NewBoolVar(f"p_{name}")
+                    x = model.NewIntVarFromDomain(x_domain, f"x_{name}")
+                    y = model.NewIntVar(margin, y_max, f"y_{name}")
+                    intervals[level][0].append(model.NewOptionalFixedSizeIntervalVar(x, w + padding, present, f"ix_{name}"))
+                    intervals[level][1].append(model.NewOptionalFixedSizeIntervalVar(y, h + padding, present, f"iy_{name}"))
+
+                    footprints = self._support_footprints(tool, w, h, config) if level == 1 else []
+                    if level == 1:
+                        # Impronta dei supporti sul piano: occupa il livello 0 solo se il tool è sul livello 1
+                        for k, (dx, dy, fw, fh) in enumerate(footprints):
+                            intervals[0][0].append(model.NewOptionalFixedSizeIntervalVar(
+                                x + dx, fw + padding, present, f"fx_{name}_{k}"))
+                            intervals[0][1].append(model.NewOptionalFixedSizeIntervalVar(
+                                y + dy, fh + padding, present, f"fy_{name}_{k}"))
+                        level_1_weight.append((present, tool.weight))
+
+                    scaled = value * (1 - LEVEL_1_PENALTY * level)
+                    objective.append(round(scaled * SCORE_SCALE) * present)
+                    total_weight.append((present, tool.weight))
+                    total_lines.append((present, tool.lines_needed))
+                    options.append(_Option(present, level, bool(rotated), x, y, w, h,
+                                           x_domain, cp_model.Domain(margin, y_max), footprints))
+            if options:
+                model.AddAtMostOne(o.present for o in options)
+                alternatives[tool.odl_id] = options
+
+        for level, (xs, ys) in intervals.items():
+            if xs:
+                model.AddNoOverlap2D(xs, ys)
+        model.Add(sum(round(w * 1000) * p for p, w in total_weight) <= round(autoclave.max_weight * 1000))
+        if level_1_weight:
+            model.Add(sum(round(w * 1000) * p for p, w in level_1_weight) <= round(level_1_weight_limit * 1000))
+        model.Add(sum(n * p for p, n in total_lines) <= autoclave.max_lines)
+        model.Maximize(sum(objective))
+
+        hinted = self._add_hints(model, alternatives, hints, padding)
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = max(0.1, self.time_limit_seconds)
+        solver.parameters.num_search_workers = max(1, self.parameters.num_search_workers)
+        solver.parameters.repair_hint = hinted > 0
+        status = solver.Solve(model)
+        status_name = solver.StatusName(status)
+
+        layouts = []
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            by_id = {t.odl_id: t for t in tools}
+            for odl_id, options in alternatives.items():
+                for option in options:
+                    if solver.Value(option.present):
+                        tool = by_id[odl_id]
+                        layouts.append(NestingLayout2L(
+                            odl_id=odl_id, x=float(solver.Value(option.x)), y=float(solver.Value(option.y)),
+                            width=float(option.width), height=float(option.height), weight=tool.weight,
+                            level=option.level, rotated=option.rotated, lines_used=tool.lines_needed
+                        ))
+                        break
+
+        result = JointSolveResult(
+            layouts=layouts,
+            status=status_name,
+            objective=solver.ObjectiveValue() / SCORE_SCALE if layouts else 0.0,
+            time_ms=(time.time() - start) * 1000,
+            hinted=hinted,
+            options={odl_id: len(options) for odl_id, options in alternatives.items()}
+        )
+        self.logger.info(
+            f"🧩 JOINT 2L {status_name}: {len(layouts)}/{len(tools)} tool "
+            f"(L1: {sum(1 for l in layouts if l.level == 1)}), hint {hinted}, {result.time_ms:.0f}ms"
+        )
+        return result
+
+    def _support_footprints(
+        self,
+        tool: ToolInfo2L,
+        width: int,
+        height: int,
+        config: CavallettiConfiguration
+    ) -> List[Footprint]:
+        """Supporti del tool di livello 1 come offset interi dall'angolo (stessa logica dell'ottimizzatore)"""
+        optimizer = self.model_2l._get_cavalletti_optimizer()
+        origin = NestingLayout2L(odl_id=tool.odl_id, x=0.0, y=0.0, width=float(width), height=float(height),
+                                 weight=tool.weight, level=1)
+        footprints = []
+        for support in optimizer._calculate_physical_supports_single_tool(origin, config):
+            dx, dy = math.floor(support.x), math.floor(support.y)
+            footprints.append((dx, dy, math.ceil(support.x + support.width) - dx,
+                               math.ceil(support.y + support.height) - dy))
+        return footprints
+
+    def _add_hints(
+        self,
+        model: cp_model.CpModel,
+        alternatives: Dict[int, List[_Option]],
+        hints: Dict[int, NestingLayout2L],
+        padding: int
+    ) -> int:
+        """
+        Hint dalla soluzione sequenziale: alternativa scelta, posizione e assenza delle altre.
+        Un hint incoerente fa scartare tutto il warm start, quindi si suggeriscono solo i
+        posizionamenti compatibili con il modello (domini, padding, impronte dei supporti),
+        prima il livello 0 e poi il livello 1.
+        """
+        chosen: Dict[int, _Option] = {}
+        occupied = {0: RectIndex(), 1: RectIndex()}
+        ordered = sorted(hints.values(), key=lambda l: (l.level, l.odl_id))
+        for layout in ordered:
+            x, y = round(layout.x), round(layout.y)
+            option = next((o for o in alternatives.get(layout.odl_id, ())
+                           if o.level == layout.level and o.rotated == layout.rotated
+                           and o.x_domain.contains(x) and o.y_domain.contains(y)), None)
+            if option is None:
+                continue
+            rects = [(option.level, x, y, option.width, option.height)]
+            rects += [(0, x + dx, y + dy, fw, fh) for dx, dy, fw, fh in option.footprints]
+            if any(occupied[level].intersects(rx, ry, rw, rh, padding) for level, rx, ry, rw, rh in rects):
+                continue
+            for k, (level, rx, ry, rw, rh) in enumerate(rects):
+                occupied[level].insert((layout.odl_id, k), rx, ry, rw, rh)
+            chosen[layout.odl_id] = option
+
+        for odl_id, options in alternatives.items():
+            for option in options:
+                is_chosen = chosen.get(odl_id) is option
+                model.AddHint(option.present, is_chosen)
+                if is_chosen:
+                    model.AddHint(option.x, round(hints[odl_id].x))
+                    model.AddHint(option.y, round(hints[odl_id].y))
+        return len(chosen)
@@ -0,0 +1,232 @@
+"""
+CarbonPilot - MaxRects Free-Space Engine
+Motore di posizionamento basato sui rettangoli liberi massimali (MaxRects)
+
+Sostituisce la scansione a griglia brute-force delle euristiche greedy:
+- Mantiene la lista dei rettangoli liberi massimali, aggiornata a ogni inserimento
+- Posizionare un tool costa O(rettangoli liberi) invece di O(area / step²)
+- Regole di scoring intercambiabili: bottom-left, best-short-side, best-area, contact-point
+- Padding tra tool gestito gonfiando ogni rettangolo occupato di `spacing` (destra/alto)
+
+Riferimento: J. Jylänki, "A Thousand Ways to Pack the Bin" (2010)
+"""
+
+from enum import Enum
+from typing import List, Optional, Tuple
+
+# Tolleranza numerica per confronti tra coordinate float
+EPS = 1e-6
+
+Rect = Tuple[float, float, float, float]  # (x, y, width, height)
+Placement = Tuple[float, float, float, float, bool]  # (x, y, width, height, rotated)
+
+
+class MaxRectsRule(Enum):
+    """Regole di scoring per la scelta del rettangolo libero"""
+    BOTTOM_LEFT = "bottom_left"            # Minimizza lato superiore, poi x
+    BEST_SHORT_SIDE = "best_short_side"    # Minimizza il residuo sul lato corto
+    BEST_AREA = "best_area"                # Minimizza l'area residua del rettangolo libero
+    CONTACT_POINT = "contact_point"        # Massimizza il perimetro a contatto
+
+
+class MaxRectsPacker:
+    """
+    Packer MaxRects su un'area rettangolare con spacing minimo tra i pezzi.
+
+    I tool hanno estensione valida [x_min, x_max] × [y_min, y_max]; internamente
+    ogni rettangolo occupato è esteso di `spacing` a destra e in alto e il
+    contenitore di conseguenza, così due tool adiacenti distano almeno `spacing`.
+    """
+
+    def __init__(
+        self,
+        x_min: float,
+        y_min: float,
+        x_max: float,
+        y_max: float,
+        spacing: float = 0.0,
+        rule: MaxRectsRule = MaxRectsRule.BOTTOM_LEFT
+    ):
+        self.x_min = x_min
+        self.y_min = y_min
+        self.x_max = x_max
+        self.y_max = y_max
+        self.spacing = max(0.0, spacing)
+        self.rule = rule
+
+        bin_width = x_max - x_min + self.spacing
+        bin_height = y_max - y_min + self.spacing
+        self.free_rects: List[Rect] = []
+        if bin_width > EPS and bin_height > EPS:
+            self.free_rects.append((x_min, y_min, bin_width, bin_height))
+        self.used_rects: List[Rect] = []
+
+    # ------------------------------------------------------------------
+    # API pubblica
+    # ------------------------------------------------------------------
+
+    def occupy(self, x: float, y: float, width: float, height: float) -> None:
+        """Marca come occupato un tool già posizionato (es. layout esistente)"""
+        self._place((x, y, width + self.spacing, height + self.spacing))
+
+    def find_position(
+        self,
+        width: float,
+        height: float,
+        allow_rotation: bool = True
+    ) -> Optional[Placement]:
+        """Trova la migliore posizione per un tool secondo la regola di scoring, senza occuparla"""
+        orientations = [(width, height, False)]
+        if allow_rotation and abs(width - height) > EPS:
+            orientations.append((height, width, True))
+
+        best_score = None
+        best_placement = None
+
+        for tool_w, tool_h, rotated in orientations:
+            need_w = tool_w + self.spacing
+            need_h = tool_h + self.spacing
+
+            for free_x, free_y, free_w, free_h in self.free_rects:
+                if need_w > free_w + EPS or need_h > free_h + EPS:
+                    continue
+
+                score = self._score(free_x, free_y, free_w, free_h, need_w, need_h)
+                if best_score is None or score < best_score:
+                    best_score = score
+                    best_placement = (free_x, free_y, tool_w, tool_h, rotated)
+
+        return best_placement
+
+    def insert(
+        self,
+        width: float,
+        height: float,
+        allow_rotation: bool = True
+    ) -> Optional[Placement]:
+        """Trova la migliore posizione e la occupa; None se il tool non entra"""
+        placement = self.find_position(width, height, allow_rotation)
+        if placement is not None:
+            x, y, tool_w, tool_h, _ = placement
+            self.occupy(x, y, tool_w, tool_h)
+        return placement
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def _score(
+        self,
+        free_x: float,
+        free_y: float,
+        free_w: float,
+        free_h: float,
+        need_w: float,
+        need_h: float
+    ) -> Tuple[float, float]:
+        """Score lessicografico (minore = migliore) per la regola attiva"""
+        if self.rule == MaxRectsRule.BEST_SHORT_SIDE:
+            leftover_w = free_w - need_w
+            leftover_h = free_h - need_h
+            return (min(leftover_w, leftover_h), max(leftover_w, leftover_h))
+
+        if self.rule == MaxRectsRule.BEST_AREA:
+            leftover_area = free_w * free_h - need_w * need_h
+            return (leftover_area, min(free_w - need_w, free_h - need_h))
+
+        if self.rule == MaxRectsRule.CONTACT_POINT:
+            contact = self._contact_score(free_x, free_y, need_w, need_h)
+            return (-contact, free_y + free_x)
+
+        # BOTTOM_LEFT (default)
+        return (free_y + need_h, free_x)
+
+    def _contact_score(self, x: float, y: float, width: float, height: float) -> float:
+        """Lunghezza del perimetro a contatto con pareti e rettangoli occupati"""
+        score = 0.0
+        bin_right = self.x_max + self.spacing
+        bin_top = self.y_max + self.spacing
+
+        if abs(x - self.x_min) < EPS or abs(x + width - bin_right) < EPS:
+            score += height
+        if abs(y - self.y_min) < EPS or abs(y + height - bin_top) < EPS:
+            score += width
+
+        for used_x, used_y, used_w, used_h in self.used_rects:
+            if abs(used_x - (x + width)) < EPS or abs(used_x + used_w - x) < EPS:
+                score += _common_interval(used_y, used_y + used_h, y, y + height)
+            if abs(used_y - (y + height)) < EPS or abs(used_y + used_h - y) < EPS:
+                score += _common_interval(used_x, used_x + used_w, x, x + width)
+
+        return score
+
+    # ------------------------------------------------------------------
+    # Aggiornamento rettangoli liberi
+    # ------------------------------------------------------------------
+
+    def _place(self, rect: Rect) -> None:
+        """Divide i rettangoli liberi intersecati da `rect` e rimuove quelli non massimali"""
+        self.used_rects.append(rect)
+
+        new_free: List[Rect] = []
+        for free_rect in self.free_rects:
+            if _intersects(free_rect, rect):
+                new_free.extend(_split(free_rect, rect))
+            else:
+                new_free.append(free_rect)
+
+        self.free_rects = _prune_contained(new_free)
+
+
+def _intersects(a: Rect, b: Rect) -> bool:
+    return not (
+        a[0] >= b[0] + b[2] - EPS or b[0] >= a[0] + a[2] - EPS or
+        a[1] >= b[1] + b[3] - EPS or b[1] >= a[1] + a[3] - EPS
+    )
+
+
+def _split(free_rect: Rect, used: Rect) -> List[Rect]:
+    """Genera fino a 4 rettangoli massimali residui di `free_rect` meno `used`"""
+    fx, fy, fw, fh = free_rect
+    ux, uy, uw, uh = used
+    pieces = []
+
+    # Sinistra
+    if ux > fx + EPS:
+        pieces.append((fx, fy, ux - fx, fh))
+    # Destra
+    if ux + uw < fx + fw - EPS:
+        pieces.append((ux + uw, fy, fx + fw - (ux + uw), fh))
+    # Sotto
+    if uy > fy + EPS:
+        pieces.append((fx, fy, fw, uy - fy))
+    # Sopra
+    if uy + uh < fy + fh - EPS:
+        pieces.append((fx, uy + uh, fw, fy + fh - (uy + uh)))
+
+    return pieces
+
+
+def _contains(outer: Rect, inner: Rect) -> bool:
+    return (
+        inner[0] >= outer[0] - EPS and inner[1] >= outer[1] - EPS and
+        inner[0] + inner[2] <= outer[0] + outer[2] + EPS and
+        inner[1] + inner[3] <= outer[1] + outer[3] + EPS
+    )
+
+
+def _prune_contained(rects: List[Rect]) -> List[Rect]:
+    """Rimuove i rettangoli contenuti in altri (mantiene solo quelli massimali)"""
+    # Ordinamento per area decrescente: un rettangolo può essere contenuto solo in uno più grande
+    ordered = sorted(set(rects), key=lambda r: r[2] * r[3], reverse=True)
+    kept: List[Rect] = []
+    for rect in ordered:
+        if not any(_contains(other, rect) for other in kept):
+            kept.append(rect)
+    return kept
+
+
+def _common_interval(a_start: float, a_end: float, b_start: float, b_end: float) -> float:
+    if a_end < b_start or b_end < a_start:
+        return 0.0
+    return min(a_end, b_end) - max(a_start, b_start)
@@ -0,0 +1,161 @@
+"""
+CarbonPilot - Preselezione knapsack degli ODL prima del posizionamento geometrico
+Decide l'inclusione separatamente dalla geometria quando i candidati superano di molto la capacità
+
+- ODL che non entrano nel piano in nessun orientamento scartati prima dell'ottimizzazione
+- Knapsack multidimensionale 0/1: area con padding × densità di impaccamento, peso, linee vuoto
+- Valore: contributo allo score (85% area + 15% linee vuoto) × priorità
+- CP-SAT con hint greedy (densità di valore) e limite di tempo in millisecondi;
+  greedy come fallback se CP-SAT non conclude
+- Lista di riserva: i migliori ODL non selezionati, provati dal solver quando un
+  selezionato non trova posto
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import List, Sequence
+
+from ortools.sat.python import cp_model
+
+from .solver import AREA_FILL_LIMIT, NestingParameters, ToolInfo, AutoclaveInfo, tool_score_contribution
+
+# Scala dei valori interi del modello CP-SAT (score × priorità)
+VALUE_SCALE = 1000
+
+
+@dataclass
+class KnapsackSelection:
+    """Esito della preselezione knapsack"""
+    selected: List[ToolInfo]
+    reserve: List[ToolInfo] = field(default_factory=list)  # Sostituti in ordine di valore
+    rejected: List[ToolInfo] = field(default_factory=list)  # Né selezionati né in riserva
+    method: str = ""  # CP-SAT_OPTIMAL | CP-SAT_FEASIBLE | GREEDY | ALL_FIT
+    time_ms: float = 0.0
+
+
+class KnapsackPreselector:
+    """Knapsack multidimensionale su area (con densità), peso e linee vuoto"""
+
+    def __init__(
+        self,
+        parameters: NestingParameters,
+        density: float = AREA_FILL_LIMIT,
+        reserve_size: int = 5,
+        time_limit_seconds: float = 0.1
+    ):
+        self.parameters = parameters
+        self.density = density
+        self.reserve_size = reserve_size
+        self.time_limit_seconds = time_limit_seconds
+        self.logger = logging.getLogger(__name__)
+
+    def select(self, tools: Sequence[ToolInfo], autoclave: AutoclaveInfo) -> KnapsackSelection:
+        """Sottoinsieme di valore massimo entro le capacità aggregate, più la riserva"""
+        start = time.time()
+        unfit = [t for t in tools if not self.fits(t, autoclave)]
+        tools = [t for t in tools if self.fits(t, autoclave)]
+        area_capacity = self._area_capacity(autoclave)
+        lines_capacity = self.parameters.vacuum_lines_capacity
+
+        if (sum(self._footprint(t) for t in tools) <= area_capacity
+                and sum(t.weight for t in tools) <= autoclave.max_weight
+                and sum(t.lines_needed for t in tools) <= lines_capacity):
+            return KnapsackSelection(selected=tools, rejected=unfit, method="ALL_FIT",
+                                     time_ms=(time.time() - start) * 1000)
+
+        values = [self._value(t, autoclave) for t in tools]
+        greedy = self._greedy(tools, values, autoclave)
+        chosen, method = greedy, "GREEDY"
+        if self.time_limit_seconds > 0:
+            try:
+                solved = self._solve_cpsat(tools, values, autoclave, greedy)
+                if solved is not None and sum(values[i] for i in solved[0]) >= sum(values[i] for i in greedy):
+                    chosen, method = solved
+            except Exception as e:
+                self.logger.warning(f"⚠️ PRESELEZIONE: CP-SAT fallito, uso greedy: {e}")
+
+        chosen_set = set(chosen)
+        others = sorted(
+            (i for i in range(len(tools)) if i not in chosen_set),
+            key=lambda i: values[i],
+            reverse=True
+        )
+        selection = KnapsackSelection(
+            selected=[tools[i] for i in sorted(chosen_set)],
+            reserve=[tools[i] for i in others[:self.reserve_size]],
+            rejected=[tools[i] for i in others[self.reserve_size:]] + unfit,
+            method=method,
+            time_ms=(time.time() - start) * 1000
+        )
+        self.logger.info(
+            f"🎒 PRESELEZIONE {method}: {len(selection.selected)}/{len(tools)} ODL selezionati, "
+            f"riserva {len(selection.reserve)}, scartati {len(selection.rejected)} "
+            f"(fuori misura {len(unfit)}) ({selection.time_ms:.0f}ms)"
+        )
+        return selection
+
+    def fits(self, tool: ToolInfo, autoclave: AutoclaveInfo) -> bool:
+        """Il tool entra nel piano (margini inclusi) in almeno un orientamento, come FleetAssigner.fits"""
+        margin = 2 * self.parameters.min_distance_mm
+        return ((tool.width + margin <= autoclave.width and tool.height + margin <= autoclave.height) or
+                (tool.height + margin <= autoclave.width and tool.width + margin <= autoclave.height))
+
+    def _area_capacity(self, autoclave: AutoclaveInfo) -> float:
+        margin = 2 * self.parameters.min_distance_mm
+        padding = self.parameters.padding_mm
+        # Rettangolo tra i margini esteso di padding, come nel bound knapsack del solver
+        return max(0.0, autoclave.width - margin + padding) * max(0.0, autoclave.height - margin + padding) * self.density
+
+    def _footprint(self, tool: ToolInfo) -> float:
+        padding = self.parameters.padding_mm
+        return (tool.width + padding) * (tool.height + padding)
+
+    def _value(self, tool: ToolInfo, autoclave: AutoclaveInfo) -> float:
+        score = tool_score_contribution(tool, autoclave, self.parameters.vacuum_lines_capacity)
+        return score * max(1, tool.priority)
+
+    def _greedy(self, tools: List[ToolInfo], values: List[float], autoclave: AutoclaveInfo) -> List[int]:
+        """Greedy per densità di valore sull'impronta, entro tutte le capacità"""
+        area_left = self._area_capacity(autoclave)
+        weight_left = autoclave.max_weight
+        lines_left = self.parameters.vacuum_lines_capacity
+        chosen = []
+        for i in sorted(range(len(tools)), key=lambda i: values[i] / max(1.0, self._footprint(tools[i])), reverse=True):
+            tool = tools[i]
+            if self._footprint(tool) <= area_left and tool.weight <= weight_left and tool.lines_needed <= lines_left:
+                chosen.append(i)
+                area_left -= self._footprint(tool)
+                weight_left -= tool.weight
+                lines_left -= tool.lines_needed
+        return chosen
+
+    def _solve_cpsat(
+        self,
+        tools: List[ToolInfo],
+        values: List[float],
+        autoclave: AutoclaveInfo,
+        hint: List[int]
+    ):
+        """Knapsack 0/1 a tre vincoli; (indici scelti, metodo) oppure None"""
+        model = cp_model.CpModel()
+        hinted = set(hint)
+        x = [model.NewBoolVar(f'select_{tool.odl_id}') for tool in tools]
+        for i, var in enumerate(x):
+            model.AddHint(var, 1 if i in hinted else 0)
+
+        # Area in cm² per tenere i coefficienti piccoli
+        model.Add(sum(round(self._footprint(t) / 100) * v for t, v in zip(tools, x))
+                  <= int(self._area_capacity(autoclave) / 100))
+        model.Add(sum(round(t.weight * 1000) * v for t, v in zip(tools, x)) <= round(autoclave.max_weight * 1000))
+        model.Add(sum(t.lines_needed * v for t, v in zip(tools, x)) <= self.parameters.vacuum_lines_capacity)
+        model.Maximize(sum(round(value * VALUE_SCALE) * v for value, v in zip(values, x)))
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = self.time_limit_seconds
+        solver.parameters.num_search_workers = max(1, self.parameters.num_search_workers)
+        status = solver.Solve(model)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return None
+        chosen = [i for i, v in enumerate(x) if solver.Value(v)]
+        return chosen, "CP-SAT_OPTIMAL" if status == cp_model.OPTIMAL else "CP-SAT_FEASIBLE"
@@ -0,0 +1,365 @@
+"""
+CarbonPilot - Motore sequence pair + simulated annealing
+Metaeuristica alternativa a CP-SAT e BL-FFD per il nesting su singola autoclave
+
+- Rappresentazione: sequence pair (Γ+, Γ-) sugli indici dei tool + bit di rotazione
+  a prima di b in entrambe le sequenze → a a sinistra di b
+  a dopo b in Γ+ e prima di b in Γ- → a sotto b
+- Decodifica O(n log n) (FAST-SP): coordinate come longest common subsequence pesata,
+  prefisso massimo su albero di Fenwick indicizzato per posizione in Γ-
+- Stessa geometria del modello CP-SAT a intervalli: dimensioni arrotondate al mm,
+  padding incorporato nella dimensione (estensione a destra/in alto), margine
+  max(1, round(min_distance)) dalle pareti
+- I tool che escono dal piano o eccedono peso/linee vuoto restano esclusi: gli altri
+  mantengono le coordinate decodificate, che restano prive di overlap
+- Annealing: mosse swap (Γ+ oppure entrambe le sequenze), rotate, move (estrai/reinserisci
+  in una sequenza), applicate in place con annullamento; temperatura geometrica sul budget
+  di tempo, stop anticipato con target_score
+"""
+
+import logging
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+from .solver import NestingParameters, NestingLayout, ToolInfo, AutoclaveInfo, tool_score_contribution
+
+# Peso del termine di compattezza (bounding box dei tool posizionati) nell'energia
+COMPACTNESS_WEIGHT = 0.5
+# Rapporto temperatura finale / iniziale del raffreddamento geometrico
+FINAL_TEMPERATURE_RATIO = 1e-3
+# Valutazioni tra due letture dell'orologio
+CLOCK_CHECK_INTERVAL = 256
+
+
+@dataclass
+class SequencePairResult:
+    """Esito dell'annealing su sequence pair"""
+    layouts: List[NestingLayout]
+    score: float
+    evaluations: int  # Sequence pair decodificati (vicini valutati)
+    accepted: int  # Mosse accettate dal criterio di Metropolis
+    elapsed_seconds: float
+    trajectory: List[Tuple[float, float]] = field(default_factory=list)  # (ms, score) per ogni miglioramento
+    target_reached: bool = False  # Arresto anticipato per target_score raggiunto
+
+    @property
+    def evaluations_per_second(self) -> float:
+        return self.evaluations / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+class SequencePairDecoder:
+    """Decodifica (Γ+, Γ-, rotazioni) in coordinate e score, in O(n log n) per chiamata"""
+
+    def __init__(self, tools: Sequence[ToolInfo], autoclave: AutoclaveInfo, parameters: NestingParameters):
+        self.tools = list(tools)
+        self.autoclave = autoclave
+        self.parameters = parameters
+        self.n = len(self.tools)
+        self.margin = max(1, round(parameters.min_distance_mm))
+        self.padding = max(1, round(parameters.padding_mm))
+        # Limiti sulle estremità con padding, come max_end_x/max_end_y del modello CP-SAT
+        self.limit_x = int(autoclave.width - self.margin) + self.padding
+        self.limit_y = int(autoclave.height - self.margin) + self.padding
+
+        self.widths = [round(t.width) for t in self.tools]
+        self.heights = [round(t.height) for t in self.tools]
+        self.fits_normal = [self._fits(w, h) for w, h in zip(self.widths, self.heights)]
+        self.fits_rotated = [self._fits(h, w) for w, h in zip(self.widths, self.heights)]
+
+        # Contributo di ciascun tool allo score 85% area + 15% linee vuoto
+        self.contributions = [
+            tool_score_contribution(t, autoclave, parameters.vacuum_lines_capacity) for t in self.tools
+        ]
+        self.usable_area = max(1, (self.limit_x - self.margin) * (self.limit_y - self.margin))
+
+    def _fits(self, w: int, h: int) -> bool:
+        return self.margin + w + self.padding <= self.limit_x and self.margin + h + self.padding <= self.limit_y
+
+    def padded_sizes(self, rotated: List[bool]) -> Tuple[List[int], List[int]]:
+        """Dimensioni con padding per l'orientamento corrente"""
+        pad = self.padding
+        return (
+            [(h if r else w) + pad for w, h, r in zip(self.widths, self.heights, rotated)],
+            [(w if r else h) + pad for w, h, r in zip(self.widths, self.heights, rotated)],
+        )
+
+    @staticmethod
+    def longest_paths(order: Sequence[int], position: List[int], sizes: List[int]) -> List[int]:
+        """
+        LCS pesata FAST-SP: coordinata di ogni tool = massima estremità tra i tool già
+        visitati in `order` con posizione (1-based) in Γ- minore della sua
+        """
+        n = len(position)
+        tree = [0] * (n + 1)
+        coords = [0] * n
+        for b in order:
+            p = position[b]
+            i = p - 1
+            best = 0
+            while i > 0:
+                if tree[i] > best:
+                    best = tree[i]
+                i &= i - 1
+            coords[b] = best
+            end = best + sizes[b]
+            i = p
+            while i <= n:
+                if tree[i] < end:
+                    tree[i] = end
+                i += i & -i
+        return coords
+
+    def evaluate(
+        self,
+        plus: List[int],
+        position: List[int],
+        widths: List[int],
+        heights: List[int]
+    ) -> Tuple[float, float, List[int], List[int], List[int]]:
+        """
+        Decodifica e valuta un sequence pair
+
+        Args:
+            plus: Γ+ (indici dei tool)
+            position: posizione 1-based di ogni tool in Γ-
+            widths, heights: dimensioni con padding nell'orientamento corrente
+
+        Returns:
+            (energia, score, tool posizionati, x, y) con coordinate relative al margine
+        """
+        xs = self.longest_paths(plus, position, widths)
+        ys = self.longest_paths(plus[::-1], position, heights)
+
+        room_x = self.limit_x - self.margin
+        room_y = self.limit_y - self.margin
+        max_weight = self.autoclave.max_weight
+        capacity = self.parameters.vacuum_lines_capacity
+        tools = self.tools
+        contributions = self.contributions
+
+        placed = []
+        score = weight = 0.0
+        lines = 0
+        extent_x = extent_y = 0
+        for i in plus:
+            end_x = xs[i] + widths[i]
+            end_y = ys[i] + heights[i]
+            if end_x > room_x or end_y > room_y:
+                continue
+            tool = tools[i]
+            if weight + tool.weight > max_weight or lines + tool.lines_needed > capacity:
+                continue
+            weight += tool.weight
+            lines += tool.lines_needed
+            score += contributions[i]
+            placed.append(i)
+            if end_x > extent_x:
+                extent_x = end_x
+            if end_y > extent_y:
+                extent_y = end_y
+
+        energy = score + COMPACTNESS_WEIGHT * (1 - extent_x * extent_y / self.usable_area)
+        return energy, score, placed, xs, ys
+
+    def layouts(
+        self,
+        placed: List[int],
+        xs: List[int],
+        ys: List[int],
+        rotated: List[bool]
+    ) -> List[NestingLayout]:
+        """Layout finali in mm assoluti (senza padding nelle dimensioni)"""
+        result = []
+        for i in placed:
+            tool = self.tools[i]
+            w, h = (self.heights[i], self.widths[i]) if rotated[i] else (self.widths[i], self.heights[i])
+            result.append(NestingLayout(
+                odl_id=tool.odl_id,
+                x=float(self.margin + xs[i]),
+                y=float(self.margin + ys[i]),
+                width=float(w),
+                height=float(h),
+                weight=tool.weight,
+                rotated=rotated[i],
+                lines_used=tool.lines_needed
+            ))
+        return result
+
+
+class SequencePairAnnealer:
+    """Simulated annealing su sequence pair con decodifica FAST-SP"""
+
+    def __init__(
+        self,
+        parameters: NestingParameters,
+        seed: Optional[int] = None,
+        time_budget_seconds: float = 2.0,
+        initial_temperature: float = 0.0
+    ):
+        self.parameters = parameters
+        self.seed = seed
+        self.time_budget_seconds = time_budget_seconds
+        self.initial_temperature = initial_temperature
+        self.logger = logging.getLogger(__name__)
+
+    def initial_state(
+        self,
+        decoder: SequencePairDecoder,
+        incumbent: Optional[List[NestingLayout]] = None
+    ) -> Tuple[List[int], List[int], List[bool]]:
+        """
+        Sequence pair iniziale: dal layout incumbent (Γ+ per centro x - y, Γ- per x + y)
+        oppure per area decrescente; i tool non posizionati vanno in coda
+        """
+        index = {t.odl_id: i for i, t in enumerate(decoder.tools)}
+        rotated = [not decoder.fits_normal[i] and decoder.fits_rotated[i] for i in range(decoder.n)]
+        centers = {}
+        for layout in incumbent or []:
+            i = index.get(layout.odl_id)
+            if i is None:
+                continue
+            centers[i] = (layout.x + layout.width / 2, layout.y + layout.height / 2)
+            rotated[i] = bool(layout.rotated) and decoder.fits_rotated[i]
+
+        rest = sorted(
+            (i for i in range(decoder.n) if i not in centers),
+            key=lambda i: decoder.widths[i] * decoder.heights[i],
+            reverse=True
+        )
+        plus = sorted(centers, key=lambda i: centers[i][0] - centers[i][1]) + rest
+        minus = sorted(centers, key=lambda i: centers[i][0] + centers[i][1]) + rest
+        return plus, minus, rotated
+
+    def run(
+        self,
+        tools: Sequence[ToolInfo],
+        autoclave: AutoclaveInfo,
+        incumbent: Optional[List[NestingLayout]] = None,
+        target_score: Optional[float] = None
+    ) -> SequencePairResult:
+        """Annealing entro il budget di tempo; restituisce l'incumbent se non viene battuto"""
+        start = time.time()
+        rng = random.Random(self.seed)
+        decoder = SequencePairDecoder(tools, autoclave, self.parameters)
+        n = decoder.n
+        incumbent_score = self._score(decoder, incumbent or [])
+
+        plus, minus, rotated = self.initial_state(decoder, incumbent)
+        position = [0] * n
+        for p, i in enumerate(minus):
+            position[i] = p + 1
+        widths, heights = decoder.padded_sizes(rotated)
+        rotatable = [i for i in range(n) if decoder.fits_normal[i] and decoder.fits_rotated[i]]
+
+        energy, score, placed, xs, ys = decoder.evaluate(plus, position, widths, heights)
+        best_score = score
+        best_layouts = decoder.layouts(placed, xs, ys, rotated)
+        if incumbent and incumbent_score >= best_score:
+            best_score, best_layouts = incumbent_score, list(incumbent)
+        trajectory = [((time.time() - start) * 1000, best_score)]
+
+        t0 = self.initial_temperature or max(1e-3, sum(decoder.contributions) / max(1, n))
+        t_end = t0 * FINAL_TEMPERATURE_RATIO
+        temperature = t0
+        evaluations = accepted = 0
+        target_reached = target_score is not None and best_score >= target_score - 1e-9
+        budget = self.time_budget_seconds
+
+        while n > 1 and not target_reached:
+            if evaluations % CLOCK_CHECK_INTERVAL == 0:
+                elapsed = time.time() - start
+                if elapsed >= budget:
+                    break
+                temperature = t0 * (t_end / t0) ** (elapsed / budget) if budget > 0 else t_end
+
+            move = self._perturb(rng, plus, minus, position, rotated, widths, heights, rotatable)
+            candidate = decoder.evaluate(plus, position, widths, heights)
+            evaluations += 1
+
+            delta = candidate[0] - energy
+            if delta >= 0 or rng.random() < math.exp(delta / temperature):
+                accepted += 1
+                energy, score, placed, xs, ys = candidate
+                if score > best_score + 1e-9:
+                    best_score = score
+                    best_layouts = decoder.layouts(placed, xs, ys, rotated)
+                    trajectory.append(((time.time() - start) * 1000, best_score))
+                    target_reached = target_score is not None and best_score >= target_score - 1e-9
+            else:
+                self._undo(move, plus, minus, position, rotated, widths, heights)
+
+        elapsed = time.time() - start
+        self.logger.info(
+            f"🔥 SEQUENCE PAIR SA: score {best_score:.2f} (incumbent {incumbent_score:.2f}), "
+            f"{evaluations} vicini in {elapsed:.2f}s ({evaluations / elapsed if elapsed > 0 else 0:.0f}/s), "
+            f"{accepted} accettati"
+        )
+        return SequencePairResult(
+            layouts=best_layouts,
+            score=best_score,
+            evaluations=evaluations,
+            accepted=accepted,
+            elapsed_seconds=elapsed,
+            trajectory=trajectory,
+            target_reached=target_reached
+        )
+
+    def _score(self, decoder: SequencePairDecoder, layouts: List[NestingLayout]) -> float:
+        index = {t.odl_id: i for i, t in enumerate(decoder.tools)}
+        return sum(decoder.contributions[index[l.odl_id]] for l in layouts if l.odl_id in index)
+
+    @staticmethod
+    def _perturb(rng, plus, minus, position, rotated, widths, heights, rotatable) -> Tuple:
+        """Applica in place una mossa casuale swap / rotate / move e ne restituisce la descrizione"""
+        n = len(plus)
+        kind = rng.random()
+        if kind < 0.15 and rotatable:
+            i = rng.choice(rotatable)
+            SequencePairAnnealer._rotate(i, rotated, widths, heights)
+            return ('rotate', i)
+        if kind < 0.6:
+            p, q = rng.sample(range(n), 2)
+            both = rng.random() < 0.5
+            a, b = plus[p], plus[q]
+            plus[p], plus[q] = b, a
+            if both:
+                pa, pb = position[a], position[b]
+                minus[pa - 1], minus[pb - 1] = b, a
+                position[a], position[b] = pb, pa
+            return ('swap', p, q, both)
+        src, dst = rng.sample(range(n), 2)
+        in_minus = rng.random() < 0.5
+        SequencePairAnnealer._move(minus if in_minus else plus, src, dst, position if in_minus else None)
+        return ('move', src, dst, in_minus)
+
+    @staticmethod
+    def _undo(move, plus, minus, position, rotated, widths, heights) -> None:
+        if move[0] == 'rotate':
+            SequencePairAnnealer._rotate(move[1], rotated, widths, heights)
+        elif move[0] == 'swap':
+            _, p, q, both = move
+            b, a = plus[p], plus[q]
+            plus[p], plus[q] = a, b
+            if both:
+                pa, pb = position[a], position[b]
+                minus[pb - 1], minus[pa - 1] = a, b
+                position[a], position[b] = pb, pa
+        else:
+            _, src, dst, in_minus = move
+            SequencePairAnnealer._move(minus if in_minus else plus, dst, src, position if in_minus else None)
+
+    @staticmethod
+    def _rotate(i, rotated, widths, heights) -> None:
+        rotated[i] = not rotated[i]
+        widths[i], heights[i] = heights[i], widths[i]
+
+    @staticmethod
+    def _move(sequence: List[int], src: int, dst: int, position: Optional[List[int]]) -> None:
+        """Estrae l'elemento in src e lo reinserisce in dst; aggiorna le posizioni Γ- coinvolte"""
+        sequence.insert(dst, sequence.pop(src))
+        if position is not None:
+            for p in range(min(src, dst), max(src, dst) + 1):
+                position[sequence[p]] = p + 1
@@ -0,0 +1,367 @@
+"""
+CarbonPilot - Cache soluzioni nesting su istanza canonica
+
+Gli stessi set di tool vengono ri-nestati molte volte al giorno con ODL diversi:
+la chiave di cache non usa gli ODL id ma la firma canonica dell'istanza
+- multiset ordinato di (larghezza, altezza, peso, linee, priorità) dei tool
+- geometria e limiti dell'autoclave
+- NestingParameters
+
+Su hit il layout memorizzato viene rimappato sui nuovi ODL id (tool con stessa
+firma sono intercambiabili). Due livelli: LRU in memoria + SQLite su disco.
+Le voci che contengono tool con dimensioni modificate si invalidano con
+invalidate_dimensions().
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .solver import AutoclaveInfo, NestingLayout, NestingMetrics, NestingParameters, NestingSolution, ToolInfo
+
+logger = logging.getLogger(__name__)
+
+# Incrementare quando cambia il formato del payload o la semantica del solver
+CACHE_SCHEMA_VERSION = 2
+
+# Database SQLite accanto a carbonpilot.db, sovrascrivibile da variabile d'ambiente
+DEFAULT_CACHE_PATH = os.getenv(
+    "CARBONPILOT_NESTING_CACHE_PATH",
+    str(Path(__file__).resolve().parent.parent.parent / "nesting_cache.db")
+)
+
+# Parametri che non influenzano il layout e restano fuori dalla firma
+_PARAMETERS_EXCLUDED_FROM_KEY = {"use_solution_cache"}
+
+ToolSignature = Tuple[float, float, float, int, int]
+
+
+@dataclass
+class CacheStats:
+    """Contatori hit/miss della cache"""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    invalidated: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate_pct(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total * 100 if total > 0 else 0.0
+
+
+def tool_signature(tool: ToolInfo) -> ToolSignature:
+    """
+    Firma di un tool: ODL id e metadati non influenzano il layout.
+    La priorità sì: pesa nel taglio del prefiltro e nella preselezione knapsack
+    """
+    return (round(tool.width, 1), round(tool.height, 1), round(tool.weight, 3), int(tool.lines_needed),
+            int(tool.priority or 0))
+
+
+def canonical_order(tools: List[ToolInfo]) -> List[ToolInfo]:
+    """
+    Ordine canonico dei tool: per firma, poi ODL id.
+    La posizione in questo ordine (slot) è ciò che la cache memorizza.
+    """
+    return sorted(tools, key=lambda t: (tool_signature(t), t.odl_id))
+
+
+def instance_key(tools: List[ToolInfo], autoclave: AutoclaveInfo, parameters: NestingParameters) -> str:
+    """Hash SHA-256 della firma canonica dell'istanza"""
+    params = {k: v for k, v in asdict(parameters).items() if k not in _PARAMETERS_EXCLUDED_FROM_KEY}
+    payload = {
+        "version": CACHE_SCHEMA_VERSION,
+        "tools": [tool_signature(t) for t in canonical_order(tools)],
+        "autoclave": [round(autoclave.width, 1), round(autoclave.height, 1),
+                      round(autoclave.max_weight, 3), autoclave.max_lines],
+        "parameters": params,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class NestingSolutionCache:
+    """
+    Cache a due livelli delle soluzioni di nesting su istanza canonica.
+
+    Thread-safe: usata dai worker del server API in parallelo.
+    """
+
+    def __init__(self, db_path: Optional[str] = DEFAULT_CACHE_PATH, memory_size: int = 256):
+        self.db_path = db_path
+        self.memory_size = memory_size
+        self.stats = CacheStats()
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.db_path:
+            self._init_db()
+
+    # ------------------------------------------------------------------
+    # API pubblica
+    # ------------------------------------------------------------------
+
+    def lookup(
+        self,
+        tools: List[ToolInfo],
+        autoclave: AutoclaveInfo,
+        parameters: NestingParameters
+    ) -> Optional[NestingSolution]:
+        """Soluzione memorizzata rimappata sugli ODL di `tools`, None se assente"""
+        if not tools:
+            return None
+        start_time = time.time()
+        key = instance_key(tools, autoclave, parameters)
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+            else:
+                entry = self._disk_get(key)
+                if entry is not None:
+                    self._memory_put(key, entry)
+                    self.stats.disk_hits += 1
+                else:
+                    self.stats.misses += 1
+                    return None
+
+        solution = self._remap(entry, canonical_order(tools), start_time)
+        logger.info(f"⚡ CACHE HIT nesting: {len(solution.layouts)} tool rimappati in {solution.metrics.time_solver_ms:.1f}ms")
+        return solution
+
+    def store(
+        self,
+        tools: List[ToolInfo],
+        autoclave: AutoclaveInfo,
+        parameters: NestingParameters,
+        solution: NestingSolution
+    ) -> None:
+        """Memorizza una soluzione riuscita in forma canonica (slot al posto degli ODL id)"""
+        if not tools or not solution.success:
+            return
+        ordered = canonical_order(tools)
+        slot_of = {tool.odl_id: slot for slot, tool in enumerate(ordered)}
+        if len(slot_of) != len(ordered):
+            return  # ODL id duplicati: rimappatura ambigua
+
+        layouts = []
+        for layout in solution.layouts:
+            if layout.odl_id not in slot_of:
+                return
+            data = asdict(layout)
+            data["odl_id"] = slot_of[layout.odl_id]
+            layouts.append(data)
+
+        excluded = []
+        for exc in solution.excluded_odls:
+            if exc.get("odl_id") in slot_of:
+                data = copy.deepcopy(exc)
+                data["odl_id"] = slot_of[exc["odl_id"]]
+                excluded.append(data)
+
+        entry = {
+            "layouts": layouts,
+            "excluded": excluded,
+            "metrics": asdict(solution.metrics),
+            "algorithm_status": solution.algorithm_status,
+            "message": solution.message,
+            "dimensions": sorted({(round(t.width, 1), round(t.height, 1)) for t in ordered}),
+        }
+        key = instance_key(tools, autoclave, parameters)
+
+        with self._lock:
+            self._memory_put(key, entry)
+            self._disk_put(key, entry)
+            self.stats.stores += 1
+
+    def invalidate_dimensions(self, width: float, height: float) -> int:
+        """Rimuove le voci che contengono un tool di dimensioni width × height (in entrambi gli orientamenti)"""
+        targets = {(round(width, 1), round(height, 1)), (round(height, 1), round(width, 1))}
+        removed = 0
+        with self._lock:
+            for key in [k for k, e in self._memory.items() if targets & {tuple(d) for d in e["dimensions"]}]:
+                del self._memory[key]
+                removed += 1
+            removed = max(removed, self._disk_invalidate(targets))
+            self.stats.invalidated += removed
+        if removed:
+            logger.info(f"🧹 Cache nesting: invalidate {removed} voci con tool {width}x{height}mm")
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._disk_execute("DELETE FROM nesting_cache")
+            self._disk_execute("DELETE FROM nesting_cache_dims")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiche cache per monitoring"""
+        return {
+            "memory_hits": self.stats.memory_hits,
+            "disk_hits": self.stats.disk_hits,
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "hit_rate_pct": self.stats.hit_rate_pct,
+            "stores": self.stats.stores,
+            "invalidated": self.stats.invalidated,
+            "memory_size": len(self._memory),
+            "disk_enabled": bool(self.db_path),
+        }
+
+    # ------------------------------------------------------------------
+    # Rimappatura
+    # ------------------------------------------------------------------
+
+    def _remap(self, entry: Dict[str, Any], ordered: List[ToolInfo], start_time: float) -> NestingSolution:
+        layouts = []
+        for data in entry["layouts"]:
+            data = dict(data)
+            data["odl_id"] = ordered[data["odl_id"]].odl_id
+            layouts.append(NestingLayout(**data))
+
+        excluded = []
+        for data in entry["excluded"]:
+            data = copy.deepcopy(data)
+            data["odl_id"] = ordered[data["odl_id"]].odl_id
+            excluded.append(data)
+
+        metrics_data = dict(entry["metrics"])
+        metrics_data["improvement_curve"] = [tuple(p) for p in metrics_data.get("improvement_curve", [])]
+        metrics = NestingMetrics(**metrics_data)
+        metrics.time_solver_ms = (time.time() - start_time) * 1000
+        metrics.cache_hit = True
+
+        return NestingSolution(
+            layouts=layouts,
+            excluded_odls=excluded,
+            metrics=metrics,
+            success=True,
+            algorithm_status=entry["algorithm_status"],
+            message=entry["message"]
+        )
+
+    # ------------------------------------------------------------------
+    # Livello memoria
+    # ------------------------------------------------------------------
+
+    def _memory_put(self, key: str, entry: Dict[str, Any]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Livello SQLite
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _connect(self):
+        """Connessione breve per operazione: commit a fine blocco e chiusura sempre"""
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self) -> None:
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS nesting_cache ("
+                    "key TEXT PRIMARY KEY, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS nesting_cache_dims ("
+                    "key TEXT NOT NULL, width REAL NOT NULL, height REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_nesting_cache_dims ON nesting_cache_dims (width, height)")
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache nesting: SQLite non disponibile ({e}), solo memoria")
+            self.db_path = None
+
+    def _disk_execute(self, sql: str, params: Tuple = ()) -> None:
+        if not self.db_path:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(sql, params)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache nesting: errore SQLite ({e})")
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.db_path:
+            return None
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT payload FROM nesting_cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache nesting: lettura SQLite fallita ({e})")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _disk_put(self, key: str, entry: Dict[str, Any]) -> None:
+        if not self.db_path:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO nesting_cache (key, payload, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(entry), time.time())
+                )
+                conn.execute("DELETE FROM nesting_cache_dims WHERE key = ?", (key,))
+                conn.executemany(
+                    "INSERT INTO nesting_cache_dims (key, width, height) VALUES (?, ?, ?)",
+                    [(key, w, h) for w, h in entry["dimensions"]]
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache nesting: scrittura SQLite fallita ({e})")
+
+    def _disk_invalidate(self, targets: set) -> int:
+        if not self.db_path:
+            return 0
+        try:
+            with self._connect() as conn:
+                keys = set()
+                for w, h in targets:
+                    rows = conn.execute(
+                        "SELECT DISTINCT key FROM nesting_cache_dims WHERE width = ? AND height = ?", (w, h)
+                    ).fetchall()
+                    keys.update(r[0] for r in rows)
+                for key in keys:
+                    conn.execute("DELETE FROM nesting_cache WHERE key = ?", (key,))
+                    conn.execute("DELETE FROM nesting_cache_dims WHERE key = ?", (key,))
+                return len(keys)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache nesting: invalidazione SQLite fallita ({e})")
+            return 0
+
+
+_default_cache: Optional[NestingSolutionCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_solution_cache() -> NestingSolutionCache:
+    """Istanza condivisa della cache (creata al primo uso)"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = NestingSolutionCache()
+        return _default_cache
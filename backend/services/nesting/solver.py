@@ -19,19 +19,50 @@ Riferimenti Scientifici:
 
 import logging
 import math
+import multiprocessing
+import os
 import random
 import time
 from typing import List, Dict, Any, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from ortools.sat.python import cp_model
 import numpy as np
 
+from .maxrects import MaxRectsPacker, MaxRectsRule
+from .spatial_index import RectIndex, LayoutIndexCache, LINEAR_SCAN_THRESHOLD
+from .candidate_evaluator import CandidateEvaluator, first_true
+
 # Configurazione logger
 logger = logging.getLogger(__name__)
 
+# Quota dell'area utile realmente impaccabile (il resto va in padding e sfridi geometrici):
+# unica stima di capacità per strisce, assegnazione flotta e preselezione knapsack
+AREA_FILL_LIMIT = 0.85
+
+# Pesi dello score di efficienza (standard aerospace): 85% area + 15% linee vuoto
+AREA_SCORE_WEIGHT = 0.85
+VACUUM_SCORE_WEIGHT = 0.15
+
+
+def efficiency_score(area: float, lines: float, autoclave: "AutoclaveInfo", capacity: int) -> float:
+    """Score 85% area + 15% linee vuoto di un insieme di tool (area in mm², linee usate)"""
+    total_area = autoclave.width * autoclave.height
+    area_pct = area / total_area * 100 if total_area > 0 else 0.0
+    vacuum_pct = lines / capacity * 100 if capacity > 0 else 0.0
+    return area_pct * AREA_SCORE_WEIGHT + vacuum_pct * VACUUM_SCORE_WEIGHT
+
+
+def tool_score_contribution(tool: "ToolInfo", autoclave: "AutoclaveInfo", capacity: int) -> float:
+    """Contributo di un tool allo score: lo score è additivo sui tool posizionati"""
+    return efficiency_score(tool.width * tool.height, tool.lines_needed, autoclave, capacity)
+
+
 @dataclass
 class NestingParameters:
     """Parametri per l'algoritmo di nesting ottimizzato AEROSPACE GRADE v3.0"""
+    # 🚀 MODALITÀ DI SOLVE (latenza garantita per anteprime interattive)
+    mode: str = "thorough"  # "fast" (solo BL-FFD MaxRects, niente CP-SAT) | "balanced" (CP-SAT limitato) | "thorough" (pipeline completa)
+    
     # 🔧 PARAMETRI AEROSPACE BASE (Validati con frontend - NON hardcoded)
     padding_mm: float = 10.0  # Sarà sovrascritto dai parametri frontend
     min_distance_mm: float = 15.0  # Sarà sovrascritto dai parametri frontend  
@@ -49,9 +80,63 @@ class NestingParameters:
     balance_weight: float = 0.02  # 2% vs 5% per priorità area
     area_weight: float = 0.93  # 93% vs 85% per efficienza reale
     max_iterations_grasp: int = 5  # 🔧 OTTIMIZZATO: Ridotto da 8 a 5 con algoritmi migliori
+    grasp_alpha: float = 0.3  # Ampiezza RCL: 0 = greedy per area, 1 = ordine casuale
+    grasp_seed: Optional[int] = None  # Seed base GRASP (None = casuale), worker i usa seed + i
+    grasp_time_budget_seconds: float = 2.0  # Budget wall-clock del GRASP multi-start
+    grasp_workers: int = 0  # Processi GRASP paralleli (0 = tutti i core)
     
     # 🚀 NUOVI PARAMETRI RICERCA SCIENTIFICA 2024
     enable_one_big_bin: bool = True  # "One Big Bin" approach per CP-SAT
+    cpsat_model_mode: str = "no_overlap_2d"  # "no_overlap_2d" (intervalli opzionali) | "pairwise" (disgiunzioni big-M legacy)
+    cpsat_warm_start: bool = True  # Hint CP-SAT da layout BL-FFD calcolato prima del solve
+    cpsat_symmetry_breaking: bool = True  # Classi di tool identici con ordinamento lessicografico
+    
+    # 🚀 MULTI-RISOLUZIONE CP-SAT (griglia grossolana → rifinitura a 1mm)
+    cpsat_multires: bool = False  # Solve su griglia grossolana, poi rifinitura locale a 1mm
+    cpsat_coarse_grid_mm: int = 20  # Passo griglia grossolana (dimensioni arrotondate per eccesso)
+    cpsat_coarse_time_fraction: float = 0.6  # Quota del timeout dedicata alla fase grossolana
+    cpsat_refine_window_mm: float = 0.0  # Semi-ampiezza finestra di rifinitura (0 = 3 × griglia)
+    
+    # 🚀 LNS CP-SAT (sotto-modelli su regioni, resto del layout fisso)
+    lns_enabled: bool = False  # Usa LNS al posto del CP-SAT monolitico sui batch grandi
+    lns_min_tools: int = 60  # Numero minimo di tool per attivare LNS
+    lns_subsolve_seconds: float = 0.3  # Timeout di ogni sotto-modello CP-SAT
+    lns_max_free_tools: int = 6  # Tool liberati al massimo per regione (oltre ai non posizionati)
+    lns_seed: Optional[int] = None  # Seed scelta regioni (None = casuale)
+    
+    # 🚀 DECOMPOSIZIONE IN STRISCE (istanze molto grandi su autoclavi lunghe)
+    strip_decomposition: bool = False  # Divide la lunghezza in strisce risolte in processi separati
+    strip_min_tools: int = 40  # Numero minimo di tool per attivare la decomposizione
+    strip_max_tools: int = 12  # Tool per striscia (determina il numero di strisce)
+    strip_workers: int = 0  # Processi paralleli (0 = tutti i core)
+    
+    # 🚀 PRE-CLUSTERING TOOL PICCOLI (super-item impacchettati a mensole, clustering.py)
+    cluster_small_tools: bool = False  # Raggruppa i tool piccoli in super-item prima del solve
+    cluster_area_threshold_pct: float = 5.0  # Tool piccolo: area sotto questa % dell'autoclave
+    cluster_max_item_area_pct: float = 15.0  # Area massima di un super-item (% dell'autoclave)
+    
+    # 🚀 PRESELEZIONE KNAPSACK (sottoinsieme di ODL prima del posizionamento, preselection.py)
+    knapsack_preselection: bool = False  # Knapsack area/peso/linee prima del solve geometrico
+    preselection_density: float = AREA_FILL_LIMIT  # Quota dell'area utile realmente impaccabile
+    preselection_reserve_size: int = 5  # ODL di riserva provati quando un selezionato non entra
+    preselection_time_limit_seconds: float = 0.1  # Limite CP-SAT del knapsack (greedy come hint e fallback)
+    
+    # 🚀 SEQUENCE PAIR + SIMULATED ANNEALING (motore alternativo a CP-SAT, sequence_pair.py)
+    algorithm: str = "cpsat"  # "cpsat" (CP-SAT + fallback greedy) | "sequence_pair" (annealing su sequence pair)
+    sa_time_budget_seconds: float = 2.0  # Budget wall-clock dell'annealing
+    sa_seed: Optional[int] = None  # Seed mosse annealing (None = casuale)
+    sa_initial_temperature: float = 0.0  # 0 = contributo medio di un tool allo score
+    
+    # 🚀 LIMITI SUPERIORI: stop anticipato quando l'incumbent è entro il gap dal bound
+    early_stop_enabled: bool = True
+    early_stop_gap_pct: float = 0.0  # Gap relativo ammesso dal bound (0 = solo bound raggiunto)
+    
+    # 🚀 PORTFOLIO PARALLELO (CP-SAT + euristiche in processi separati)
+    portfolio_mode: bool = False  # Avvia tutti i motori insieme invece della pipeline sequenziale
+    portfolio_deadline_seconds: float = 0.0  # Budget wall-clock totale (0 = timeout adattivo)
+    
+    # 🚀 CACHE SOLUZIONI (istanza canonica: stessi tool/autoclave/parametri con ODL diversi)
+    use_solution_cache: bool = False  # LRU in memoria + SQLite su disco (solution_cache.py)
     enable_knowledge_transfer: bool = True  # Knowledge reuse per pattern storici
     enable_monte_carlo_rl: bool = True  # Monte Carlo Reinforcement Learning
     enable_hybrid_search: bool = True  # Deep RL + Heuristic Search
@@ -69,6 +154,10 @@ class NestingParameters:
     force_rotation_area_threshold: float = 35000.0  # Forza rotazione per tool grandi (>35000mm²)
     rotation_efficiency_bonus: float = 0.15  # Bonus efficienza per rotazioni intelligenti
 
+    # 🚀 MOTORE POSIZIONAMENTO GREEDY
+    placement_engine: str = "maxrects"  # "maxrects" (rettangoli liberi massimali) | "grid" (scansione griglia legacy)
+    maxrects_rule: str = "bottom_left"  # bottom_left | best_short_side | best_area | contact_point
+
 @dataclass 
 class ToolInfo:
     """Informazioni complete di un tool per il nesting"""
@@ -135,6 +224,39 @@ class NestingMetrics:
     algorithm_used: str = ""  # Nome algoritmo utilizzato per il risultato
     complexity_score: float = 0.0  # 🆕 Score complessità dataset
     timeout_used: float = 0.0  # 🆕 Timeout effettivamente utilizzato
+    cpsat_model_mode: str = ""  # Formulazione CP-SAT usata (no_overlap_2d / pairwise)
+    model_variables: int = 0  # Numero variabili del modello CP-SAT
+    model_constraints: int = 0  # Numero vincoli del modello CP-SAT
+    warm_start_placed: int = 0  # Tool posizionati nel layout BL-FFD usato come hint CP-SAT
+    time_to_first_solution_ms: float = 0.0  # Tempo CP-SAT alla prima soluzione valida
+    improvement_curve: List[Tuple[float, float]] = field(default_factory=list)  # (ms, objective) per ogni soluzione migliorativa
+    cache_hit: bool = False  # Soluzione servita dalla cache su istanza canonica
+    grasp_starts: int = 0  # Costruzioni randomizzate GRASP eseguite
+    grasp_iterations_per_second: float = 0.0  # (Costruzioni + mosse ricerca locale) / secondo
+    grasp_trajectory: List[Tuple[float, float]] = field(default_factory=list)  # (ms, score) miglioramenti GRASP
+    lns_iterations: int = 0  # Sotto-modelli CP-SAT risolti dal driver LNS
+    lns_improvements: Dict[str, int] = field(default_factory=dict)  # Miglioramenti accettati per tipo di regione
+    strip_stats: List[Dict[str, Any]] = field(default_factory=list)  # Per striscia: estensione, tool, posizionati, tempo
+    strip_repaired: int = 0  # Tool esclusi reinseriti dalla riparazione delle giunzioni
+    strip_efficiency_loss_pct: float = 0.0  # Score BL-FFD monolitico - score decomposto (positivo = perdita)
+    super_items: int = 0  # Super-item di tool piccoli passati al solver
+    clustered_tools: int = 0  # Tool piccoli raggruppati nei super-item
+    preselected_count: int = 0  # ODL selezionati dal knapsack e passati al solver geometrico
+    reserve_count: int = 0  # ODL nella lista di riserva
+    reserve_used: int = 0  # ODL di riserva entrati nel layout finale
+    preselection_method: str = ""  # CP-SAT_OPTIMAL | CP-SAT_FEASIBLE | GREEDY
+    preselection_ms: float = 0.0  # Tempo della preselezione
+    mode_used: str = ""  # Modalità di solve effettivamente applicata (fast | balanced | thorough)
+    sa_evaluations_per_second: float = 0.0  # Vicini sequence pair decodificati al secondo
+    tool_classes: int = 0  # Classi di equivalenza (stesse dimensioni/peso/linee) nel modello CP-SAT
+    symmetric_tools: int = 0  # Tool appartenenti a classi con più di un elemento
+    symmetry_constraints: int = 0  # Vincoli di rottura simmetria aggiunti
+    multires_stages: List[Dict[str, Any]] = field(default_factory=list)  # Per fase: griglia, tempo, posizionati, area
+    multires_quality_delta_pct: float = 0.0  # Area % rifinita - area % grossolana (positivo = guadagno)
+    score_upper_bound: float = 0.0  # Limite superiore dello score (min dei bound area/peso/linee/knapsack)
+    bound_source: str = ""  # Bound più stringente: area | weight | lines | knapsack
+    optimality_gap_pct: float = 0.0  # (bound - score) / bound × 100
+    stop_reason: str = ""  # gap_reached | optimal | timeout | completed
 
 @dataclass
 class NestingSolution:
@@ -146,6 +268,154 @@ class NestingSolution:
     algorithm_status: str
     message: str = ""  # Messaggio descrittivo del risultato
 
+@dataclass
+class ScoreUpperBound:
+    """Limiti superiori dello score (85% area + 15% linee vuoto) calcolati prima del solve"""
+    area: float  # Tutti i tool posizionati, area e linee limitate al 100%
+    weight: float  # Knapsack frazionario sul peso massimo
+    lines: float  # Knapsack 0/1 esatto sulle linee vuoto (programmazione dinamica)
+    knapsack: float  # Knapsack frazionario sull'area utile (ingombro con padding)
+
+    @property
+    def value(self) -> float:
+        return min(self.area, self.weight, self.lines, self.knapsack)
+
+    @property
+    def source(self) -> str:
+        bounds = {"area": self.area, "weight": self.weight, "lines": self.lines, "knapsack": self.knapsack}
+        return min(bounds, key=bounds.get)
+
+    def gap_pct(self, score: float) -> float:
+        """Gap relativo dello score dal bound, in percentuale"""
+        return max(0.0, (self.value - score) / self.value * 100) if self.value > 0 else 0.0
+
+
+class CpSatSolutionRecorder(cp_model.CpSolverSolutionCallback):
+    """
+    🚀 Callback CP-SAT: registra ogni soluzione migliorativa con il suo timestamp
+    (millisecondi dall'avvio del solve) per time-to-first-solution e curva di miglioramento.
+    Con score_terms e score_target interrompe la ricerca appena lo score raggiunge il target.
+    """
+
+    def __init__(
+        self,
+        score_terms: Optional[List[Tuple[Any, float]]] = None,
+        score_target: Optional[float] = None
+    ):
+        super().__init__()
+        self.improvements: List[Tuple[float, float]] = []
+        self.score_terms = score_terms or []
+        self.score_target = score_target
+        self.target_reached = False
+
+    def on_solution_callback(self) -> None:
+        objective = self.ObjectiveValue()
+        if not self.improvements or objective > self.improvements[-1][1]:
+            self.improvements.append((round(self.WallTime() * 1000, 1), objective))
+        
+        if self.score_target is not None and self.score_terms:
+            score = sum(value for var, value in self.score_terms if self.Value(var))
+            if score >= self.score_target - 1e-9:
+                self.target_reached = True
+                self.StopSearch()
+
+    @property
+    def time_to_first_solution_ms(self) -> float:
+        return self.improvements[0][0] if self.improvements else 0.0
+
+
+# 🚀 LNS: tipi di regione liberata a rotazione a ogni iterazione
+LNS_NEIGHBOURHOODS = ("strip", "window", "gap")
+
+# Scala intera dello score per tool nell'obiettivo LNS (1 mm di compattazione = 1)
+LNS_SCORE_SCALE = 1_000_000_000
+
+# Worker CP-SAT per sotto-modello LNS
+LNS_SUBSOLVE_WORKERS = 8
+
+
+def fixed_rects_disjoint(rects: List[Tuple[int, int, int, int]], padding: int) -> bool:
+    """True se i rettangoli (x, y, w, h), estesi di padding a destra/alto, non si sovrappongono tra loro"""
+    ordered = sorted(rects)
+    for i, (ax, ay, aw, ah) in enumerate(ordered):
+        for bx, by, bw, bh in ordered[i + 1:]:
+            if bx >= ax + aw + padding:
+                break
+            if by < ay + ah + padding and ay < by + bh + padding:
+                return False
+    return True
+
+
+# 🚀 MODALITÀ: budget CP-SAT massimo (secondi) per modalità; thorough mantiene il timeout adattivo (max 300s)
+SOLVE_MODES = ("fast", "balanced", "thorough")
+MODE_TIMEOUT_CAP_SECONDS = {"balanced": 10.0}
+
+# 🚀 PORTFOLIO: motori eseguiti in parallelo, in ordine di preferenza a parità di score
+PORTFOLIO_ENGINES = ("cpsat", "bl_ffd_rrgh", "smart_combinations")
+
+# Secondi riservati all'avvio dei processi e alla raccolta risultati
+PORTFOLIO_STARTUP_MARGIN_S = 1.0
+
+
+def _run_portfolio_engine(
+    engine: str,
+    parameters: NestingParameters,
+    tools: List[ToolInfo],
+    autoclave: AutoclaveInfo,
+    deadline: float
+) -> NestingSolution:
+    """
+    Esegue un singolo motore del portfolio in un processo worker.
+    Funzione di modulo (non metodo) per poter essere serializzata verso il pool.
+    """
+    start_time = time.time()
+    model = NestingModel(parameters)
+
+    if engine == "cpsat":
+        hint_layouts = model._build_cpsat_warm_start(tools, autoclave) if parameters.cpsat_warm_start else None
+        budget = max(0.5, deadline - time.time() - PORTFOLIO_STARTUP_MARGIN_S / 2)
+        return model._solve_cpsat_aerospace(tools, autoclave, budget, start_time, hint_layouts=hint_layouts)
+
+    if engine == "bl_ffd_rrgh":
+        layouts = model._apply_bl_ffd_algorithm_aerospace(tools, autoclave)
+        solution = model._create_solution_from_layouts(layouts, tools, autoclave, start_time, "BL_FFD")
+        if layouts and parameters.use_grasp_heuristic:
+            solution = model._apply_ruin_recreate_heuristic(solution, tools, autoclave, start_time)
+        return solution
+
+    if engine == "smart_combinations":
+        return model._try_smart_combinations(tools, autoclave, start_time)
+
+    raise ValueError(f"Motore portfolio sconosciuto: {engine}")
+
+
+def _get_portfolio_context():
+    """
+    Contesto multiprocessing per il portfolio: forkserver con il solver precaricato.
+    I worker nascono da un processo server senza thread (niente fork dei thread
+    OR-Tools/server web del padre) e senza ripagare l'import dei moduli a ogni solve.
+    """
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+def _solve_strip(
+    parameters: NestingParameters,
+    tools: List[ToolInfo],
+    autoclave: AutoclaveInfo
+) -> Tuple[List[NestingLayout], float, str]:
+    """
+    Risolve una striscia come autoclave indipendente in un processo worker.
+    Restituisce (layout in coordinate della striscia, tempo ms, stato algoritmo).
+    """
+    start_time = time.time()
+    if not tools:
+        return [], 0.0, "EMPTY"
+    solution = NestingModel(parameters).solve(tools, autoclave)
+    return solution.layouts, (time.time() - start_time) * 1000, solution.algorithm_status
+
+
 class NestingModel:
     """Modello di nesting ottimizzato v3.0 con ricerca scientifica 2024"""
     
@@ -156,6 +426,10 @@ class NestingModel:
         self._successful_patterns: List[Dict] = []
         # 🆕 Statistics per Monte Carlo RL
         self._placement_statistics: Dict[str, float] = {}
+        # 🆕 Indice spaziale dei layout per query di overlap nei loop candidati
+        self._layout_index_cache = LayoutIndexCache()
+        # 🚀 Score minimo per lo stop anticipato (impostato da _solve_normal, None = disattivo)
+        self._score_target: Optional[float] = None
         
     def solve(
         self, 
@@ -168,6 +442,22 @@ class NestingModel:
         start_time = time.time()
         self.logger.info(f"🚀 Avvio NestingModel v3.0: {len(tools)} tools, autoclave {autoclave.width}x{autoclave.height}mm")
         
+        # 🚀 CACHE: istanza canonica già risolta → layout rimappato sui nuovi ODL
+        cache = None
+        if self.parameters.use_solution_cache:
+            from .solution_cache import get_solution_cache
+            cache = get_solution_cache()
+            cached_solution = cache.lookup(tools, autoclave, self.parameters)
+            if cached_solution is not None:
+                return cached_solution
+        
+        if self.parameters.mode not in SOLVE_MODES:
+            raise ValueError(f"Modalità di solve sconosciuta: {self.parameters.mode}")
+        
+        # 🚀 FAST: anteprima a latenza garantita, nessun modello CP-SAT
+        if self.parameters.mode == "fast":
+            return self._solve_fast(tools, autoclave, start_time)
+        
         # 🔧 NUOVO v3.0: Calcolo complessità dinamica del dataset
         complexity_score = self._calculate_dataset_complexity(tools, autoclave)
         self.logger.info(f"🔧 Dataset Complexity Score: {complexity_score:.2f}")
@@ -189,14 +479,187 @@ class NestingModel:
         # Verifica se tutto è oversize per auto-scaling
         all_oversize = self._check_all_oversize(tools, autoclave)
         
+        solution = None
         if all_oversize:
             self.logger.info("🔧 AUTO-FIX: Tutti i pezzi oversize, provo scala × 0.1 (mm→cm)")
             scaled_solution = self._solve_scaled(tools, autoclave, start_time)
             if scaled_solution.success:
-                return scaled_solution
+                solution = scaled_solution
         
         # Risoluzione normale con algoritmi v3.0
-        return self._solve_normal(tools, autoclave, start_time, complexity_score, dynamic_timeout)
+        if solution is None and self.parameters.knapsack_preselection:
+            solution = self._solve_preselected(tools, autoclave, start_time, complexity_score, dynamic_timeout)
+        if solution is None:
+            solution = self._solve_core(tools, autoclave, start_time, complexity_score, dynamic_timeout)
+        
+        solution.metrics.mode_used = self.parameters.mode
+        if cache is not None:
+            cache.store(tools, autoclave, self.parameters, solution)
+        return solution
+    
+    def _solve_fast(
+        self,
+        tools: List[ToolInfo],
+        autoclave: AutoclaveInfo,
+        start_time: float
+    ) -> NestingSolution:
+        """
+        🚀 FAST: BL-FFD su MaxRects con la geometria intera del modello CP-SAT
+
+        Un solo passaggio greedy (inserimento proporzionale ai rettangoli liberi, non al piano):
+        pochi millisecondi per 100 ODL, senza prefiltri, CP-SAT né ricerca locale.
+        """
+        layouts = self._build_cpsat_warm_start(tools, autoclave)
+        solution = self._create_solution_from_layouts(layouts, tools, autoclave, start_time, "FAST_BL_FFD")
+        solution.metrics.mode_used = "fast"
+        solution.metrics.stop_reason = "completed"
+        self.logger.info(
+            f"⚡ FAST: {len(layouts)}/{len(tools)} tool, efficienza {solution.metrics.efficiency_score:.1f}% "
+            f"in {solution.metrics.time_solver_ms:.0f}ms"
+        )
+        return solution
+    
+    def _solve_clustered(
+        self,
+        tools: List[ToolInfo],
+        autoclave: AutoclaveInfo,
+        start_time: float,
+        complexity_score: float,
+        dynamic_timeout: float
+    ) -> Optional[NestingSolution]:
+        """
+        🧩 PRE-CLUSTERING: tool piccoli raggruppati in super-item prima del solve principale
+
+        Il solver vede meno oggetti; il layout viene poi espanso nei tool originali e i membri
+        dei super-item esclusi vengono reinseriti singolarmente negli spazi residui.
+        None se non ci sono almeno due tool piccoli da raggruppare.
+        """
+        from .clustering import SmallToolClusterer
+        
+        clusterer = SmallToolClusterer(
+            self.parameters,
+            area_threshold_pct=self.parameters.cluster_area_threshold_pct,
+            max_item_area_pct=self.parameters.cluster_max_item_area_pct
+        )
+        solver_tools, super_items = clusterer.cluster(tools, autoclave)
+        if not super_items:
+            return None
+        
+        inner = self._solve_normal(solver_tools, autoclave, start_time, complexity_score, dynamic_timeout)
+        layouts = clusterer.expand(inner.layouts, super_items)
+        placed_ids = {l.odl_id for l in layouts}
+        layouts, _ = self._fill_gaps(layouts, [t for t in tools if t.odl_id not in placed_ids], autoclave)
+        
+        return self._rebuild_solution(
+            inner, layouts, tools, autoclave, start_time, hidden_ids=set(super_items),
+            super_items=len(super_items),
+            clustered_tools=sum(len(item.members) for item in super_items.values())
+        )
+    
+    def _solve_preselected(
+        self,
+        tools: List[ToolInfo],
+        autoclave: AutoclaveInfo,
+        start_time: float,
+        complexity_score: float,
+        dynamic_timeout: float
+    ) -> Optional[NestingSolution]:
+        """
+        🎒 PRESELEZIONE KNAPSACK: inclusione decisa prima della geometria
+
+        Il solver geometrico riceve solo il sottoinsieme selezionato; i selezionati non
+        posizionati vengono sostituiti, negli spazi residui, dagli ODL della riserva.
+        None se tutti i candidati rientrano già nelle capacità aggregate.
+        """
+        from .preselection import KnapsackPreselector
+        
+        preselector = KnapsackPreselector(
+            self.parameters,
+            density=self.parameters.preselection_density,
+            reserve_size=self.parameters.preselection_reserve_size,
+            time_limit_seconds=self.parameters.preselection_time_limit_seconds
+        )
+        selection = preselector.select(tools, autoclave)
+        if not selection.reserve and not selection.rejected:
+            return None
+        
+        inner = self._solve_core(selection.selected, autoclave, start_time, complexity_score, dynamic_timeout)
+        placed_ids = {l.odl_id for l in inner.layouts}
+        unplaced = [t for t in selection.selected if t.odl_id not in placed_ids]
+        layouts, filled = self._fill_gaps(inner.layouts, unplaced + selection.reserve, autoclave)
+        reserve_ids = {t.odl_id for t in selection.reserve}
+        
+        solution = self._rebuild_solution(
+            inner, layouts, tools, autoclave, start_time,
+            preselected_count=len(selection.selected),
+            reserve_count=len(selection.reserve),
+            reserve_used=sum(1 for l in layouts if l.odl_id in reserve_ids),
+            preselection_method=selection.method,
+            preselection_ms=selection.time_ms
+        )
+        for tool in selection.rejected:
+            details = ('Non selezionato dal knapsack area/peso/linee' if preselector.fits(tool, autoclave) else
+                       f'Dimensioni {tool.width}x{tool.height}mm non entrano nel piano {autoclave.width}x{autoclave.height}mm')
+            for entry in solution.excluded_odls:
+                if entry.get('odl_id') == tool.odl_id:
+                    entry.update({'motivo': 'Preselezione knapsack', 'dettagli': details})
+        self.logger.info(
+            f"🎒 PRESELEZIONE: {len(inner.layouts)} posizionati dal solver, {filled} negli spazi residui "
+            f"({solution.metrics.reserve_used} dalla riserva)"
+        )
+        return solution
+    
+    def _solve_core(
+        self,
+        tools: List[ToolInfo],
+        autoclave: AutoclaveInfo,
+        start_time: float,
+        complexity_score: float,
+        dynamic_timeout: float
+    ) -> NestingSolution:
+        """Solve geometrico: con pre-clustering dei tool piccoli se abilitato, altrimenti normale"""
+        solution = None
+        if self.parameters.cluster_small_tools:
+            solution = self._solve_clustered(tools, autoclave, start_time, complexity_score, dynamic_timeout)
+        if solution is None:
+            solution = self._solve_normal(tools, autoclave, start_time, complexity_score, dynamic_timeout)
+        return solution
+    
+    def _rebuild_solution(
+        self,
+        inner: NestingSolution,
+        layouts: List[NestingLayout],
+        tools: List[ToolInfo],
+        autoclave: AutoclaveInfo,
+        start_time: float,
+        hidden_ids: Optional[set] = None,
+        **extra_metrics: Any
+    ) -> NestingSolution:
+        """
+        Soluzione sui tool originali a partire da quella di uno stadio interno (clustering,
+        preselezione): metriche di base ricalcolate, metriche del solver interno conservate,
+        motivi di esclusione del solver mantenuti (tranne per gli id sintetici in hidden_ids)
+        """
+        hidden_ids = hidden_ids or set()
+        solution = self._create_solution_from_layouts(layouts, tools, autoclave, start_time, inner.algorithm_status)
+        placed_ids = {l.odl_id for l in layouts}
+        reasons = {e['odl_id']: e for e in inner.excluded_odls if e.get('odl_id') not in hidden_ids}
+        solution.excluded_odls = [
+            reasons.get(e['odl_id'], e) for e in solution.excluded_odls if e['odl_id'] not in placed_ids
+        ]
+        
+        core = solution.metrics
+        solution.metrics = replace(
+            inner.metrics,
+            area_pct=core.area_pct, vacuum_util_pct=core.vacuum_util_pct, lines_used=core.lines_used,
+            total_weight=core.total_weight, positioned_count=core.positioned_count,
+            excluded_count=core.excluded_count, efficiency_score=core.efficiency_score,
+            time_solver_ms=core.time_solver_ms, rotation_used=core.rotation_used,
+            **extra_metrics
+        )
+        solution.success = inner.success or bool(layouts)
+        solution.message = inner.message
+        return self._apply_bound_metrics(solution, self._compute_score_upper_bound(tools, autoclave), autoclave)
     
     def _calculate_dataset_complexity(self, tools: List[ToolInfo], autoclave: AutoclaveInfo) -> float:
         """
@@ -410,13 +873,66 @@ class NestingModel:
         n_pieces = len(valid_tools)
         base_timeout = min(300, max(10, 10 * n_pieces))  # Max 300s, min 10s
         timeout_seconds = self.parameters.timeout_override or base_timeout
+        if self.parameters.mode in MODE_TIMEOUT_CAP_SECONDS:
+            timeout_seconds = min(timeout_seconds, MODE_TIMEOUT_CAP_SECONDS[self.parameters.mode])
         
         self.logger.info(f"⏱️ AEROSPACE Timeout: {timeout_seconds}s per {n_pieces} pezzi (max 300s)")
         
+        # 🚀 PORTFOLIO: tutti i motori in parallelo sotto un'unica deadline
+        if self.parameters.portfolio_mode:
+            deadline_seconds = self.parameters.portfolio_deadline_seconds or timeout_seconds
+            return self._solve_portfolio(valid_tools, excluded_tools, tools, autoclave, start_time, deadline_seconds)
+        
+        # 🚀 LIMITI SUPERIORI: bound sullo score prima del solve, target per lo stop anticipato
+        bound = self._compute_score_upper_bound(valid_tools, autoclave)
+        self._score_target = None
+        if self.parameters.early_stop_enabled:
+            self._score_target = bound.value * (1 - self.parameters.early_stop_gap_pct / 100)
+        self.logger.info(f"📊 Bound score {bound.value:.2f} ({bound.source}), stop anticipato: {self._score_target}")
+        
+        # 🚀 WARM START: layout euristico calcolato prima di CP-SAT e passato come hint
+        warm_start_layouts = None
+        use_lns = self.parameters.lns_enabled and len(valid_tools) >= self.parameters.lns_min_tools
+        if self.parameters.cpsat_warm_start and not self.parameters.cpsat_multires and not use_lns:
+            warm_start_layouts = self._build_cpsat_warm_start(valid_tools, autoclave)
+        
+        # 🚀 STOP ANTICIPATO: l'euristica BL-FFD è già entro il gap dal bound → nessun solve
+        if self._score_target is not None:
+            incumbent = warm_start_layouts
+            if incumbent is None:
+                incumbent = self._build_cpsat_warm_start(valid_tools, autoclave)
+            if self._portfolio_score(incumbent, autoclave) >= self._score_target - 1e-9:
+                self.logger.info(f"✅ BL-FFD entro il gap dal bound: {len(incumbent)} tool, nessun solve CP-SAT")
+                solution = self._create_solution_from_layouts(incumbent, valid_tools, autoclave, start_time, "BL_FFD_BOUND")
+                solution.metrics.stop_reason = "gap_reached"
+                solution.excluded_odls.extend(excluded_tools)
+                return self._apply_bound_metrics(solution, bound, autoclave)
+        
+        # 🚀 STRISCE: sotto-problemi indipendenti in parallelo, poi riparazione delle giunzioni
+        if self.parameters.strip_decomposition and len(valid_tools) >= self.parameters.strip_min_tools:
+            solution = self._solve_strips(valid_tools, autoclave, timeout_seconds, start_time, reference=warm_start_layouts)
+            solution.excluded_odls.extend(excluded_tools)
+            return self._apply_bound_metrics(solution, bound, autoclave)
+        
+        # 🚀 SEQUENCE PAIR: annealing al posto di CP-SAT, partendo dal layout BL-FFD
+        if self.parameters.algorithm == "sequence_pair":
+            solution = self._solve_sequence_pair(
+                valid_tools, autoclave, timeout_seconds, start_time, incumbent=warm_start_layouts
+            )
+            solution.excluded_odls.extend(excluded_tools)
+            return self._apply_bound_metrics(solution, bound, autoclave)
+        
         # 🚀 AEROSPACE: Prova CP-SAT ottimizzato
         cp_sat_solution = None
         try:
-            cp_sat_solution = self._solve_cpsat_aerospace(valid_tools, autoclave, timeout_seconds, start_time)
+            if use_lns:
+                cp_sat_solution = self._solve_lns(valid_tools, autoclave, timeout_seconds, start_time)
+            elif self.parameters.cpsat_multires:
+                cp_sat_solution = self._solve_cpsat_multires(valid_tools, autoclave, timeout_seconds, start_time)
+            else:
+                cp_sat_solution = self._solve_cpsat_aerospace(
+                    valid_tools, autoclave, timeout_seconds, start_time, hint_layouts=warm_start_layouts
+                )
             
             # 🔧 FIX: Controlla se CP-SAT ha avuto successo
             if cp_sat_solution and cp_sat_solution.success:
@@ -425,7 +941,7 @@ class NestingModel:
                 
                 # Aggiungi tool esclusi dal pre-filtering
                 cp_sat_solution.excluded_odls.extend(excluded_tools)
-                return cp_sat_solution
+                return self._apply_bound_metrics(cp_sat_solution, bound, autoclave)
             
         except Exception as e:
             self.logger.warning(f"⚠️ Errore CP-SAT: {str(e)}")
@@ -446,11 +962,187 @@ class NestingModel:
             # 🎯 NUOVO v1.4.16-DEMO: Post-processing per controllo overlap
             solution = self._post_process_overlaps(solution, tools, autoclave)
             
-            return solution
+            return self._apply_bound_metrics(solution, bound, autoclave)
         
         # Soluzione vuota se tutto fallisce
         return self._create_empty_solution(excluded_tools, autoclave, start_time)
     
+    def _solve_portfolio(
+        self,
+        valid_tools: List[ToolInfo],
+        excluded_tools: List[Dict[str, Any]],
+        all_tools: List[ToolInfo],
+        autoclave: AutoclaveInfo,
+        start_time: float,
+        deadline_seconds: float
+    ) -> NestingSolution:
+        """
+        🚀 PORTFOLIO: CP-SAT, BL-FFD/RRGH e ordinamenti alternativi avviati insieme
+        in un pool di processi con deadline wall-clock unica.
+
+        Alla deadline i motori ancora in esecuzione vengono terminati e si restituisce
+        il miglior layout valido disponibile. Motore vincente e score di ciascun motore
+        sono riportati in metrics.algorithm_used.
+        """
+        deadline = start_time + deadline_seconds
+        self.logger.info(f"🚀 PORTFOLIO: {len(PORTFOLIO_ENGINES)} motori in parallelo, deadline {deadline_seconds:.1f}s")
+        
+        results: Dict[str, NestingSolution] = {}
+        try:
+            pool = _get_portfolio_context().Pool(processes=len(PORTFOLIO_ENGINES))
+        except Exception as e:
+            self.logger.warning(f"⚠️ PORTFOLIO: pool non disponibile ({e}), uso pipeline sequenziale")
+            pool = None
+        
+        if pool is not None:
+            try:
+                pending = {
+                    engine: pool.apply_async(
+                        _run_portfolio_engine,
+                        (engine, self.parameters, valid_tools, autoclave, deadline)
+                    )
+                    for engine in PORTFOLIO_ENGINES
+                }
+                while pending and time.time() < deadline:
+                    for engine, async_result in list(pending.items()):
+                        if async_result.ready():
+                            del pending[engine]
+                            try:
+                                results[engine] = async_result.get()
+                            except Exception as e:
+                                self.logger.warning(f"⚠️ PORTFOLIO: motore {engine} fallito: {e}")
+                    if pending:
+                        time.sleep(0.01)
+                for engine in pending:
+                    self.logger.warning(f"⏱️ PORTFOLIO: motore {engine} interrotto alla deadline")
+            finally:
+                # Termina i worker ancora attivi: la deadline è rigida
+                pool.terminate()
+                pool.join()
+        
+        # Valutazione uniforme dei layout restituiti
+        scores: Dict[str, Optional[float]] = {engine: None for engine in PORTFOLIO_ENGINES}
+        best_engine = None
+        for engine in PORTFOLIO_ENGINES:
+            solution = results.get(engine)
+            if solution is None or not solution.layouts:
+                continue
+            if not self._is_portfolio_layout_valid(solution.layouts, autoclave):
+                self.logger.warning(f"⚠️ PORTFOLIO: layout {engine} non valido, scartato")
+                continue
+            scores[engine] = self._portfolio_score(solution.layouts, autoclave)
+            if best_engine is None or scores[engine] > scores[best_engine]:
+                best_engine = engine
+        
+        if best_engine is not None:
+            best_layouts = results[best_engine].layouts
+            status = f"PORTFOLIO_{best_engine.upper()}"
+        else:
+            # Nessun motore entro la deadline: BL-FFD in-process (millisecondi)
+            self.logger.warning("⚠️ PORTFOLIO: nessun risultato entro la deadline, BL-FFD di emergenza")
+            best_layouts = self._apply_bl_ffd_algorithm(valid_tools, autoclave)
+            status = "PORTFOLIO_BL_FFD_EMERGENCY"
+        
+        solution = self._create_solution_from_layouts(best_layouts, valid_tools, autoclave, start_time, status)
+        score_summary = ", ".join(
+            f"{engine}={score:.1f}" if score is not None else f"{engine}=n/a"
+            for engine, score in scores.items()
+        )
+        solution.metrics.algorithm_used = f"{status} [{score_summary}]"
+        solution.metrics.timeout_used = deadline_seconds
+        self.logger.info(f"🏆 PORTFOLIO: vincitore {best_engine or 'nessuno'} ({score_summary})")
+        
+        solution = self._collect_exclusion_reasons(solution, all_tools, autoclave)
+        solution.excluded_odls.extend(excluded_tools)
+        return solution
+    
+    def _compute_score_upper_bound(self, tools: List[ToolInfo], autoclave: AutoclaveInfo) -> ScoreUpperBound:
+        """
+        📊 Limiti superiori dello score (85% area + 15% linee) senza risolvere il nesting
+
+        - area: tutti i tool posizionati, area e linee limitate al 100%
+        - weight: knapsack frazionario sul peso massimo
+        - lines: knapsack 0/1 esatto sulla capacità linee vuoto (DP, O(n × linee))
+        - knapsack: knapsack frazionario sull'area utile; ogni tool occupa (w + padding) × (h + padding)
+          dentro il rettangolo tra i margini esteso di padding, come nel modello CP-SAT
+        """
+        total_area = autoclave.width * autoclave.height
+        capacity = self.parameters.vacuum_lines_capacity
+        if not tools or total_area <= 0:
+            return ScoreUpperBound(area=0.0, weight=0.0, lines=0.0, knapsack=0.0)
+        
+        values = [tool_score_contribution(t, autoclave, capacity) for t in tools]
+        
+        area_bound = (AREA_SCORE_WEIGHT * min(100.0, sum(t.width * t.height for t in tools) / total_area * 100) +
+                      VACUUM_SCORE_WEIGHT * min(100.0, sum(t.lines_needed for t in tools) / capacity * 100 if capacity > 0 else 0.0))
+        weight_bound = self._fractional_knapsack_bound(values, [t.weight for t in tools], autoclave.max_weight)
+        
+        # Linee intere: DP esatta sulla capacità residua
+        best = [0.0] * (max(0, capacity) + 1)
+        always = 0.0
+        for tool, value in zip(tools, values):
+            if tool.lines_needed <= 0:
+                always += value
+                continue
+            for c in range(len(best) - 1, tool.lines_needed - 1, -1):
+                best[c] = max(best[c], best[c - tool.lines_needed] + value)
+        lines_bound = always + best[-1]
+        
+        # Geometria arrotondata per difetto rispetto a CP-SAT ed euristiche: il bound resta valido
+        margin = min(self.parameters.min_distance_mm, max(1, round(self.parameters.min_distance_mm)))
+        padding = min(self.parameters.padding_mm, max(1, round(self.parameters.padding_mm)))
+        usable = max(0.0, autoclave.width - 2 * margin + padding) * max(0.0, autoclave.height - 2 * margin + padding)
+        footprints = [(min(t.width, round(t.width)) + padding) * (min(t.height, round(t.height)) + padding) for t in tools]
+        knapsack_bound = self._fractional_knapsack_bound(values, footprints, usable)
+        
+        return ScoreUpperBound(area=area_bound, weight=weight_bound, lines=lines_bound, knapsack=knapsack_bound)
+    
+    @staticmethod
+    def _fractional_knapsack_bound(values: List[float], sizes: List[float], capacity: float) -> float:
+        """Rilassamento continuo del knapsack: ordine per valore/risorsa, ultimo oggetto frazionario"""
+        bound = sum(v for v, size in zip(values, sizes) if size <= 0)
+        remaining = max(0.0, capacity)
+        items = sorted(((v, size) for v, size in zip(values, sizes) if size > 0), key=lambda item: item[0] / item[1], reverse=True)
+        for value, size in items:
+            if remaining <= 0:
+                break
+            take = min(1.0, remaining / size)
+            bound += value * take
+            remaining -= size * take
+        return bound
+    
+    def _apply_bound_metrics(
+        self,
+        solution: NestingSolution,
+        bound: ScoreUpperBound,
+        autoclave: AutoclaveInfo
+    ) -> NestingSolution:
+        """📊 Registra bound, gap dello score finale e motivo di arresto nelle metriche"""
+        score = self._portfolio_score(solution.layouts, autoclave)
+        solution.metrics.score_upper_bound = round(bound.value, 4)
+        solution.metrics.bound_source = bound.source
+        solution.metrics.optimality_gap_pct = round(bound.gap_pct(score), 4)
+        if not solution.metrics.stop_reason:
+            solution.metrics.stop_reason = "completed"
+        self.logger.info(
+            f"📊 Score {score:.2f} / bound {bound.value:.2f} ({bound.source}): "
+            f"gap {solution.metrics.optimality_gap_pct:.2f}%, stop: {solution.metrics.stop_reason}"
+        )
+        return solution
+    
+    def _portfolio_score(self, layouts: List[NestingLayout], autoclave: AutoclaveInfo) -> float:
+        """Score comune ai motori del portfolio (stessa formula di _create_solution_from_layouts)"""
+        return efficiency_score(sum(l.width * l.height for l in layouts), sum(l.lines_used for l in layouts),
+                                autoclave, self.parameters.vacuum_lines_capacity)
+    
+    def _is_portfolio_layout_valid(self, layouts: List[NestingLayout], autoclave: AutoclaveInfo) -> bool:
+        """Layout valido: dentro i bordi, senza overlap, entro peso e linee vuoto"""
+        if sum(l.weight for l in layouts) > autoclave.max_weight:
+            return False
+        if sum(l.lines_used for l in layouts) > self.parameters.vacuum_lines_capacity:
+            return False
+        return self._is_layout_valid(layouts, autoclave)
+    
     def _prefilter_tools(
         self, 
         tools: List[ToolInfo], 
@@ -538,6 +1230,12 @@ class NestingModel:
         
         # Filtro 4: Limitazione batch size per performance garantite
         max_tools_for_performance = min(len(tool_metrics), self._calculate_max_tools_for_autoclave(autoclave))
+        if self.parameters.lns_enabled and len(tool_metrics) >= self.parameters.lns_min_tools:
+            # 🚀 LNS: i sotto-modelli restano piccoli, il limite del modello monolitico non serve
+            max_tools_for_performance = len(tool_metrics)
+        if self.parameters.strip_decomposition and len(tool_metrics) >= self.parameters.strip_min_tools:
+            # 🚀 STRISCE: ogni striscia ha il proprio limite nel sotto-solve
+            max_tools_for_performance = len(tool_metrics)
         
         # Aggiungi tool validi con priorità
         for i, metrics in enumerate(tool_metrics):
@@ -723,11 +1421,16 @@ class NestingModel:
         tools: List[ToolInfo], 
         autoclave: AutoclaveInfo, 
         timeout_seconds: float,
-        start_time: float
+        start_time: float,
+        hint_layouts: Optional[List[NestingLayout]] = None,
+        refine_around: Optional[List[NestingLayout]] = None,
+        refine_window: int = 0
     ) -> NestingSolution:
         """
         🚀 AEROSPACE: CP-SAT ottimizzato con parametri aeronautici
         🔧 FIX: Risolto errore BoundedLinearExpression con variabili intermedie
+        🚀 NUOVO: hint_layouts (warm start) e registrazione soluzioni migliorative
+        🚀 NUOVO: refine_around/refine_window restringono i domini attorno a un layout (multi-risoluzione)
         """
         
         self.logger.info(f"🚀 AEROSPACE CP-SAT: {len(tools)} tools con timeout {timeout_seconds}s")
@@ -739,18 +1442,50 @@ class NestingModel:
             # Crea modello CP-SAT
             model = cp_model.CpModel()
             
-            # Variabili di decisione
-            self.logger.info("🔧 FIX CP-SAT: Creazione variabili con intermediate variables")
-            variables = self._create_cpsat_variables(model, sorted_tools, autoclave)
-            
-            # Vincoli
-            self.logger.info("🔧 FIX CP-SAT: Aggiunta vincoli con intermediate variables")
-            self._add_cpsat_constraints(model, sorted_tools, autoclave, variables)
-            
+            model_mode = self.parameters.cpsat_model_mode
+
+            if model_mode == "no_overlap_2d":
+                # 🚀 Intervalli opzionali + AddNoOverlap2D (modello lineare in n)
+                self.logger.info("🚀 CP-SAT: Creazione variabili a intervalli opzionali (NoOverlap2D)")
+                variables = self._create_cpsat_interval_variables(model, sorted_tools, autoclave)
+                self._add_no_overlap_2d_constraints(model, sorted_tools, autoclave, variables)
+            else:
+                # Variabili di decisione
+                self.logger.info("🔧 FIX CP-SAT: Creazione variabili con intermediate variables")
+                variables = self._create_cpsat_variables(model, sorted_tools, autoclave)
+
+                # Vincoli
+                self.logger.info("🔧 FIX CP-SAT: Aggiunta vincoli con intermediate variables")
+                self._add_cpsat_constraints(model, sorted_tools, autoclave, variables)
+
             # 🚀 AEROSPACE: Funzione obiettivo ottimizzata
             self.logger.info("🔧 FIX CP-SAT: Aggiunta objective con intermediate variables")
             self._add_cpsat_objective_aerospace(model, sorted_tools, autoclave, variables)
+
+            # 🚀 SIMMETRIE: tool identici ordinati per inclusione e posizione
+            tool_classes = self._build_tool_classes(sorted_tools)
+            symmetry_constraints = 0
+            if self.parameters.cpsat_symmetry_breaking:
+                symmetry_constraints = self._add_symmetry_breaking_constraints(model, tool_classes, autoclave, variables)
+                if hint_layouts is not None:
+                    hint_layouts = self._canonicalize_layouts(tool_classes, hint_layouts)
+                if refine_around is not None:
+                    refine_around = self._canonicalize_layouts(tool_classes, refine_around)
+
+            # 🚀 WARM START: hint su included/x/y/rotated dal layout euristico
+            if hint_layouts is not None:
+                self._add_cpsat_hints(model, sorted_tools, variables, hint_layouts)
             
+            # 🚀 MULTI-RISOLUZIONE: domini ristretti attorno alla soluzione grossolana
+            if refine_around is not None:
+                self._add_cpsat_refinement_domains(model, sorted_tools, variables, refine_around, refine_window)
+
+            # 📊 Dimensione modello per confronto tra formulazioni
+            model_proto = model.Proto()
+            model_variables = len(model_proto.variables)
+            model_constraints = len(model_proto.constraints)
+            self.logger.info(f"📊 CP-SAT modello '{model_mode}': {model_variables} variabili, {model_constraints} vincoli")
+
             # 🚀 AEROSPACE: Solver ottimizzato
             solver = cp_model.CpSolver()
             solver.parameters.max_time_in_seconds = timeout_seconds
@@ -770,17 +1505,45 @@ class NestingModel:
             # Parametri aggressivi per convergenza ottimale
             solver.parameters.cp_model_presolve = True
             solver.parameters.symmetry_level = 2  # Massima eliminazione simmetrie
-            solver.parameters.linearization_level = 2  # Massima linearizzazione
+            # Massima linearizzazione solo per le disgiunzioni big-M: con NoOverlap2D
+            # i propagatori dedicati bastano e il livello 2 rallenta la prima soluzione
+            solver.parameters.linearization_level = 2 if model_mode == "pairwise" else 1
             
             self.logger.info("🚀 AEROSPACE: Avvio risoluzione CP-SAT ottimizzata")
             
             try:
-                status = solver.Solve(model)
+                score_terms = [
+                    (variables['included'][t.odl_id],
+                     tool_score_contribution(t, autoclave, self.parameters.vacuum_lines_capacity))
+                    for t in sorted_tools
+                ]
+                recorder = CpSatSolutionRecorder(score_terms, self._score_target)
+                status = solver.Solve(model, recorder)
+                
+                if recorder.improvements:
+                    self.logger.info(
+                        f"📈 CP-SAT: prima soluzione a {recorder.time_to_first_solution_ms:.0f}ms, "
+                        f"{len(recorder.improvements)} miglioramenti"
+                    )
                 
                 # 🔧 FIX CP-SAT: Log del risultato per debugging
                 if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
                     self.logger.info(f"✅ CP-SAT SUCCESS: Status={status}, variabili corrette")
-                    return self._extract_cpsat_solution(solver, sorted_tools, autoclave, variables, status, start_time)
+                    solution = self._extract_cpsat_solution(solver, sorted_tools, autoclave, variables, status, start_time)
+                    solution.metrics.cpsat_model_mode = model_mode
+                    solution.metrics.model_variables = model_variables
+                    solution.metrics.model_constraints = model_constraints
+                    solution.metrics.warm_start_placed = len(hint_layouts) if hint_layouts else 0
+                    solution.metrics.time_to_first_solution_ms = recorder.time_to_first_solution_ms
+                    solution.metrics.improvement_curve = list(recorder.improvements)
+                    solution.metrics.tool_classes = len(tool_classes)
+                    solution.metrics.symmetric_tools = sum(len(c) for c in tool_classes if len(c) > 1)
+                    solution.metrics.symmetry_constraints = symmetry_constraints
+                    if recorder.target_reached:
+                        solution.metrics.stop_reason = "gap_reached"
+                    else:
+                        solution.metrics.stop_reason = "optimal" if status == cp_model.OPTIMAL else "timeout"
+                    return solution
                 elif status in [cp_model.INFEASIBLE, cp_model.UNKNOWN]:
                     self.logger.warning(f"⚠️ CP-SAT infeasible/unknown: {status}")
                     # Ritorna soluzione vuota per attivare fallback
@@ -835,6 +1598,771 @@ class NestingModel:
                 message=f"Errore CP-SAT: {error_msg}"
             )
     
+    def _solve_cpsat_multires(
+        self,
+        tools: List[ToolInfo],
+        autoclave: AutoclaveInfo,
+        timeout_seconds: float,
+        start_time: float
+    ) -> NestingSolution:
+        """
+        🚀 MULTI-RISOLUZIONE: CP-SAT su griglia grossolana, poi rifinitura a 1mm
+
+        Fase 1 - griglia di passo g: dimensioni tool, padding e margine arrotondati per
+        eccesso, autoclave per difetto. Ogni soluzione grossolana riportata in mm è quindi
+        già ammissibile alla risoluzione piena (domini g volte più piccoli per lato).
+        Fase 2 - CP-SAT breve a 1mm con la soluzione grossolana come hint: i tool già
+        posizionati restano inclusi con orientamento fisso in una finestra ±w attorno alla
+        posizione grossolana, i tool esclusi restano liberi e possono entrare nello spazio recuperato.
+        """
+        grid = max(1, int(self.parameters.cpsat_coarse_grid_mm))
+        window = round(self.parameters.cpsat_refine_window_mm or 3 * grid)
+        coarse_budget = max(0.5, timeout_seconds * self.parameters.cpsat_coarse_time_fraction)
+        
+        self.logger.info(f"🚀 MULTI-RISOLUZIONE: griglia {grid}mm ({coarse_budget:.1f}s), rifinitura ±{window}mm")
+        
+        # === FASE 1: griglia grossolana ===
+        stage_start = time.time()
+        coarse_params = replace(
+            self.parameters,
+            padding_mm=math.ceil(self.parameters.padding_mm / grid),
+            min_distance_mm=math.ceil(self.parameters.min_distance_mm / grid),
+            cpsat_multires=False,
+            use_solution_cache=False
+        )
+        coarse_tools = [
+            replace(tool, width=math.ceil(tool.width / grid), height=math.ceil(tool.height / grid), debug_reasons=[])
+            for tool in tools
+        ]
+        coarse_autoclave = replace(
+            autoclave, width=math.floor(autoclave.width / grid), height=math.floor(autoclave.height / grid)
+        )
+        coarse_model = NestingModel(coarse_params)
+        coarse_hint = coarse_model._build_cpsat_warm_start(coarse_tools, coarse_autoclave) if coarse_params.cpsat_warm_start else None
+        coarse = coarse_model._solve_cpsat_aerospace(
+            coarse_tools, coarse_autoclave, coarse_budget, stage_start, hint_layouts=coarse_hint
+        )
+        coarse_ms = (time.time() - stage_start) * 1000
+        
+        if not coarse.success:
+            self.logger.warning(f"⚠️ MULTI-RISOLUZIONE: fase grossolana senza soluzione ({coarse.algorithm_status}), CP-SAT a piena risoluzione")
+            hint_layouts = self._build_cpsat_warm_start(tools, autoclave) if self.parameters.cpsat_warm_start else None
+            return self._solve_cpsat_aerospace(
+                tools, autoclave, max(0.5, timeout_seconds - coarse_ms / 1000), start_time, hint_layouts=hint_layouts
+            )
+        
+        # Riporta il layout grossolano in mm con le dimensioni reali dei tool
+        tools_by_id = {tool.odl_id: tool for tool in tools}
+        coarse_layouts = []
+        for layout in coarse.layouts:
+            tool = tools_by_id[layout.odl_id]
+            coarse_layouts.append(NestingLayout(
+                odl_id=tool.odl_id,
+                x=float(layout.x * grid),
+                y=float(layout.y * grid),
+                width=float(tool.height if layout.rotated else tool.width),
+                height=float(tool.width if layout.rotated else tool.height),
+                weight=tool.weight,
+                rotated=layout.rotated,
+                lines_used=tool.lines_needed
+            ))
+        coarse_solution = self._create_solution_from_layouts(
+            coarse_layouts, tools, autoclave, start_time, f"CP-SAT_MULTIRES_COARSE_{grid}MM"
+        )
+        stages = [{
+            'stage': 'coarse',
+            'grid_mm': grid,
+            'time_ms': coarse_ms,
+            'status': coarse.algorithm_status,
+            'positioned': len(coarse_layouts),
+            'area_pct': coarse_solution.metrics.area_pct
+        }]
+        
+        # === FASE 2: rifinitura a 1mm ===
+        stage_start = time.time()
+        refine_budget = max(0.5, min(timeout_seconds - coarse_ms / 1000, timeout_seconds * (1 - self.parameters.cpsat_coarse_time_fraction)))
+        refined = self._solve_cpsat_aerospace(
+            tools, autoclave, refine_budget, start_time,
+            hint_layouts=coarse_layouts, refine_around=coarse_layouts, refine_window=window
+        )
+        refine_ms = (time.time() - stage_start) * 1000
+        stages.append({
+            'stage': 'refine',
+            'grid_mm': 1,
+            'window_mm': window,
+            'time_ms': refine_ms,
+            'status': refined.algorithm_status,
+            'positioned': len(refined.layouts),
+            'area_pct': refined.metrics.area_pct if refined.success else 0.0
+        })
+        
+        if refined.success and refined.metrics.area_pct >= coarse_solution.metrics.area_pct:
+            solution = refined
+            solution.algorithm_status = f"{refined.algorithm_status}_MULTIRES"
+        else:
+            # La soluzione grossolana è già ammissibile a 1mm: non si perde nulla
+            self.logger.info("🔧 MULTI-RISOLUZIONE: rifinitura non migliorativa, uso layout grossolano")
+            solution = coarse_solution
+            solution.metrics.cpsat_model_mode = self.parameters.cpsat_model_mode
+        
+        solution.metrics.multires_stages = stages
+        solution.metrics.multires_quality_delta_pct = solution.metrics.area_pct - coarse_solution.metrics.area_pct
+        solution.metrics.time_to_first_solution_ms = coarse.metrics.time_to_first_solution_ms
+        solution.metrics.algorithm_used = solution.algorithm_status
+        
+        self.logger.info(
+            f"📊 MULTI-RISOLUZIONE: grossolana {coarse_ms:.0f}ms ({len(coarse_layouts)} tool, {stages[0]['area_pct']:.1f}%), "
+            f"rifinitura {refine_ms:.0f}ms ({stages[1]['positioned']} tool, {stages[1]['area_pct']:.1f}%), "
+            f"delta {solution.metrics.multires_quality_delta_pct:+.2f}%"
+        )
+        return solution
+    
+    def _build_tool_classes(self, tools: List[ToolInfo]) -> List[List[ToolInfo]]:
+        """
+        🚀 SIMMETRIE: raggruppa i tool indistinguibili per il modello CP-SAT
+
+        Chiave = dimensioni intere, peso in grammi e linee vuoto (stessa discretizzazione
+        delle variabili). All'interno della classe i tool sono ordinati per priorità
+        decrescente e poi ODL: l'ordinamento lessicografico sull'inclusione fa entrare
+        per primi gli ODL più prioritari, così la soluzione si rimappa in modo deterministico.
+        """
+        classes: Dict[Tuple[int, int, int, int], List[ToolInfo]] = {}
+        for tool in tools:
+            key = (round(tool.width), round(tool.height), round(tool.weight * 1000), tool.lines_needed)
+            classes.setdefault(key, []).append(tool)
+        
+        return [
+            sorted(members, key=lambda t: (-t.priority, t.odl_id))
+            for members in classes.values()
+        ]
+    
+    def _add_symmetry_breaking_constraints(
+        self,
+        model: cp_model.CpModel,
+        tool_classes: List[List[ToolInfo]],
+        autoclave: AutoclaveInfo,
+        variables: Dict[str, Any]
+    ) -> int:
+        """
+        🚀 SIMMETRIE: per tool consecutivi a, b della stessa classe
+        - included[a] >= included[b]
+        - se entrambi inclusi: x[a]·K + y[a] < x[b]·K + y[b] (K > altezza, ordine lessicografico)
+        Elimina le n! permutazioni equivalenti di ogni classe.
+        """
+        stride = round(autoclave.height) + 1
+        added = 0
+        
+        for members in tool_classes:
+            for a, b in zip(members, members[1:]):
+                inc_a = variables['included'][a.odl_id]
+                inc_b = variables['included'][b.odl_id]
+                model.AddImplication(inc_b, inc_a)
+                model.Add(
+                    variables['x'][a.odl_id] * stride + variables['y'][a.odl_id] <
+                    variables['x'][b.odl_id] * stride + variables['y'][b.odl_id]
+                ).OnlyEnforceIf(inc_b)
+                added += 2
+        
+        if added:
+            symmetric = sum(len(c) for c in tool_classes if len(c) > 1)
+            self.logger.info(f"🚀 SIMMETRIE: {len(tool_classes)} classi, {symmetric} tool ripetuti, {added} vincoli")
+        return added
+    
+    def _canonicalize_layouts(
+        self,
+        tool_classes: List[List[ToolInfo]],
+        layouts: List[NestingLayout]
+    ) -> List[NestingLayout]:
+        """
+        🚀 SIMMETRIE: riassegna i layout di una classe ai suoi ODL in ordine canonico
+        (posizioni lessicografiche crescenti ai primi membri), così hint e domini
+        restano compatibili con i vincoli di rottura simmetria.
+        """
+        by_odl = {layout.odl_id: layout for layout in layouts}
+        remapped = {}
+        
+        for members in tool_classes:
+            placed = sorted(
+                (by_odl[t.odl_id] for t in members if t.odl_id in by_odl),
+                key=lambda l: (l.x, l.y)
+            )
+            for tool, layout in zip(members, placed):
+                remapped[layout.odl_id] = replace(layout, odl_id=tool.odl_id)
+        
+        return [remapped.get(layout.odl_id, layout) for layout in layouts]
+    
+    def _plan_strips(self, tools: List[ToolInfo], autoclave: AutoclaveInfo) -> List[Tuple[int, int]]:
+        """
+        Estensioni [inizio, fine] lungo x dei tool di ogni striscia
+
+        Strisce di uguale lunghezza sul tratto utile tra i margini; sulle giunzioni interne
+        la striscia di sinistra termina `padding` prima dell'inizio della successiva, così
+        i layout uniti rispettano il padding senza sprecare due margini per giunzione.
+        Il numero di strisce scende finché la striscia più corta accoglie il lato corto
+        di ogni tool.
+        """
+        margin = math.ceil(self.parameters.min_distance_mm)
+        padding = max(1, math.ceil(self.parameters.padding_mm))
+        start, end = margin, int(autoclave.width) - margin
+        usable_height = autoclave.height - 2 * margin
+        widest = max(
+            (min(t.width, t.height) if max(t.width, t.height) <= usable_height else t.width for t in tools),
+            default=0
+        )
+        count = max(1, math.ceil(len(tools) / max(1, self.parameters.strip_max_tools)))
+        while count > 1 and (end - start) // count - padding < widest:
+            count -= 1
+
+        seams = [start + (end - start) * i // count for i in range(count + 1)]
+        return [
+            (seams[i], seams[i + 1] - (padding if i < count - 1 else 0))
+            for i in range(count)
+        ]
+
+    def _assign_tools_to_strips(
+        self,
+        tools: List[ToolInfo],
+        strips: List[Tuple[int, int]],
+        autoclave: AutoclaveInfo
+    ) -> Tuple[List[List[ToolInfo]], List[ToolInfo]]:
+        """
+        Bin packing 1D sulle aree: first-fit decreasing con capacità = area della striscia
+        × quota di riempimento; i tool in eccesso vanno nella striscia con più area residua
+        (il sotto-solve sceglie il sottoinsieme), quelli che non entrano in nessuna striscia
+        restano alla riparazione delle giunzioni.
+        """
+        margin = math.ceil(self.parameters.min_distance_mm)
+        height = autoclave.height - 2 * margin
+        residual = [(x1 - x0) * height * AREA_FILL_LIMIT for x0, x1 in strips]
+        assigned: List[List[ToolInfo]] = [[] for _ in strips]
+        unassigned = []
+
+        for tool in sorted(tools, key=lambda t: t.width * t.height, reverse=True):
+            area = tool.width * tool.height
+            compatible = [
+                i for i, (x0, x1) in enumerate(strips)
+                if (tool.width <= x1 - x0 and tool.height <= height) or (tool.height <= x1 - x0 and tool.width <= height)
+            ]
+            if not compatible:
+                unassigned.append(tool)
+                continue
+            target = next((i for i in compatible if area <= residual[i]), None)
+            if target is None:
+                target = max(compatible, key=lambda i: residual[i])
+            assigned[target].append(tool)
+            residual[target] -= area
+        return assigned, unassigned
+
+    def _solve_strips(
+        self,
+        tools: List[ToolInfo],
+        autoclave: AutoclaveInfo,
+        timeout_seconds: float,
+        start_time: float,
+        reference: Optional[List[NestingLayout]] = None
+    ) -> NestingSolution:
+        """
+        🚀 STRISCE: decomposizione spaziale della lunghezza dell'autoclave
+
+        1. strisce di uguale lunghezza e assegnazione dei tool con bin packing 1D sulle aree
+        2. ogni striscia risolta come autoclave indipendente in un processo worker
+           (peso e linee vuoto ripartiti in proporzione alla domanda assegnata)
+        3. unione dei layout traslati e riparazione delle giunzioni: i tool esclusi
+           vengono inseriti negli spazi residui dell'intero piano (MaxRects)
+
+        La perdita di efficienza è misurata rispetto al BL-FFD monolitico sullo stesso piano.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        
+        strips = self._plan_strips(tools, autoclave)
+        assigned, unassigned = self._assign_tools_to_strips(tools, strips, autoclave)
+        self.logger.info(
+            f"🚀 STRISCE: {len(tools)} tool su {len(strips)} strisce "
+            f"{[len(group) for group in assigned]}, {len(unassigned)} senza striscia"
+        )
+        
+        margin = math.ceil(self.parameters.min_distance_mm)
+        capacity = self.parameters.vacuum_lines_capacity
+        total_weight = sum(t.weight for t in tools)
+        total_lines = sum(t.lines_needed for t in tools)
+        workers = self.parameters.strip_workers or os.cpu_count() or 1
+        workers = max(1, min(workers, len(strips)))
+        remaining = max(1.0, timeout_seconds - (time.time() - start_time))
+        strip_timeout = max(1, int(remaining / math.ceil(len(strips) / workers)))
+        
+        jobs = []
+        for i, ((x0, x1), group) in enumerate(zip(strips, assigned)):
+            weight = sum(t.weight for t in group)
+            lines = sum(t.lines_needed for t in group)
+            weight_share = weight if total_weight <= autoclave.max_weight else autoclave.max_weight * weight / total_weight
+            lines_share = lines if total_lines <= capacity else capacity * lines // max(1, total_lines)
+            sub_autoclave = AutoclaveInfo(
+                id=autoclave.id, width=x1 - x0 + 2 * margin, height=autoclave.height,
+                max_weight=weight_share, max_lines=lines_share
+            )
+            sub_parameters = replace(
+                self.parameters, strip_decomposition=False, portfolio_mode=False, min_distance_mm=margin,
+                timeout_override=strip_timeout, vacuum_lines_capacity=lines_share, use_solution_cache=False
+            )
+            jobs.append((sub_parameters, group, sub_autoclave))
+        
+        results = None
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=_get_portfolio_context()) as pool:
+                    results = list(pool.map(_solve_strip, *zip(*jobs)))
+            except Exception as e:
+                self.logger.warning(f"⚠️ STRISCE: pool non disponibile ({e}), risoluzione sequenziale")
+        if results is None:
+            results = [_solve_strip(*job) for job in jobs]
+        
+        layouts: List[NestingLayout] = []
+        stats = []
+        for i, ((x0, x1), group, (strip_layouts, time_ms, status)) in enumerate(zip(strips, assigned, results)):
+            offset = x0 - margin
+            layouts.extend(replace(l, x=l.x + offset) for l in strip_layouts)
+            stats.append({
+                'strip': i, 'x_start': x0, 'x_end': x1, 'tools': len(group),
+                'placed': len(strip_layouts), 'time_ms': time_ms, 'algorithm': status
+            })
+        
+        placed_ids = {l.odl_id for l in layouts}
+        layouts, repaired = self._fill_gaps(
+            layouts, [t for t in tools if t.odl_id not in placed_ids], autoclave
+        )
+        
+        solution = self._create_solution_from_layouts(layouts, tools, autoclave, start_time, "STRIP_DECOMPOSITION")
+        if reference is None:
+            reference = self._build_cpsat_warm_start(tools, autoclave)
+        solution.metrics.strip_stats = stats
+        solution.metrics.strip_repaired = repaired
+        solution.metrics.strip_efficiency_loss_pct = (
+            self._portfolio_score(reference, autoclave) - self._portfolio_score(layouts, autoclave)
+        )
+        solution.metrics.stop_reason = "completed"
+        self.logger.info(
+            f"✅ STRISCE: {len(layouts)} posizionati ({repaired} dalla riparazione giunzioni), "
+            f"perdita vs monolitico {solution.metrics.strip_efficiency_loss_pct:+.2f}, "
+            f"tempi {[round(s['time_ms']) for s in stats]}ms"
+        )
+        return solution
+
+    def _fill_gaps(
+        self,
+        layouts: List[NestingLayout],
+        excluded: List[ToolInfo],
+        autoclave: AutoclaveInfo
+    ) -> Tuple[List[NestingLayout], int]:
+        """Inserisce i tool esclusi negli spazi residui dell'intero piano (MaxRects), entro peso e linee vuoto"""
+        # Margine arrotondato per eccesso come in _plan_strips: mai più vicino al bordo del previsto
+        margin = max(1, math.ceil(self.parameters.min_distance_mm))
+        padding = max(1, round(self.parameters.padding_mm))
+        packer = MaxRectsPacker(
+            margin, margin, autoclave.width - margin, autoclave.height - margin,
+            spacing=padding, rule=MaxRectsRule(self.parameters.maxrects_rule)
+        )
+        for l in layouts:
+            packer.occupy(l.x, l.y, l.width, l.height)
+        
+        layouts = list(layouts)
+        weight = sum(l.weight for l in layouts)
+        lines = sum(l.lines_used for l in layouts)
+        repaired = 0
+        for tool in sorted(excluded, key=lambda t: t.width * t.height, reverse=True):
+            if weight + tool.weight > autoclave.max_weight or lines + tool.lines_needed > self.parameters.vacuum_lines_capacity:
+                continue
+            placement = packer.insert(round(tool.width), round(tool.height))
+            if placement is None:
+                continue
+            x, y, w, h, rotated = placement
+            layouts.append(NestingLayout(
+                odl_id=tool.odl_id, x=x, y=y, width=w, height=h,
+                weight=tool.weight, rotated=rotated, lines_used=tool.lines_needed
+            ))
+            weight += tool.weight
+            lines += tool.lines_needed
+            repaired += 1
+        return layouts, repaired
+
+    def _solve_sequence_pair(
+        self,
+        tools: List[ToolInfo],
+        autoclave: AutoclaveInfo,
+        timeout_seconds: float,
+        start_time: float,
+        incumbent: Optional[List[NestingLayout]] = None
+    ) -> NestingSolution:
+        """
+        🚀 SEQUENCE PAIR: simulated annealing con decodifica FAST-SP O(n log n)
+
+        Stessa geometria del modello CP-SAT (padding nella dimensione, margine dalle pareti),
+        budget = min(sa_time_budget_seconds, timeout residuo), stop anticipato sul target del bound.
+        """
+        from .sequence_pair import SequencePairAnnealer
+        
+        if incumbent is None:
+            incumbent = self._build_cpsat_warm_start(tools, autoclave)
+        remaining = max(0.0, timeout_seconds - (time.time() - start_time))
+        engine = SequencePairAnnealer(
+            self.parameters,
+            seed=self.parameters.sa_seed,
+            time_budget_seconds=min(self.parameters.sa_time_budget_seconds, remaining),
+            initial_temperature=self.parameters.sa_initial_temperature
+        )
+        result = engine.run(tools, autoclave, incumbent=incumbent, target_score=self._score_target)
+        
+        solution = self._create_solution_from_layouts(result.layouts, tools, autoclave, start_time, "SEQUENCE_PAIR_SA")
+        solution.metrics.heuristic_iters = result.evaluations
+        solution.metrics.sa_evaluations_per_second = result.evaluations_per_second
+        solution.metrics.stop_reason = "gap_reached" if result.target_reached else "completed"
+        return solution
+    
+    def _solve_lns(
+        self,
+        tools: List[ToolInfo],
+        autoclave: AutoclaveInfo,
+        timeout_seconds: float,
+        start_time: float
+    ) -> NestingSolution:
+        """
+        🚀 LNS CP-SAT: parte da un incumbent BL-FFD e risolve ripetutamente sotto-modelli piccoli
+
+        Ogni iterazione sceglie una regione (striscia verticale, finestra casuale o intorno del
+        gap più grande da _identify_gaps), libera i tool che vi ricadono più i tool non
+        posizionati e fissa tutti gli altri come intervalli immobili. Il sotto-modello dura
+        lns_subsolve_seconds: il tempo cresce con le iterazioni, non con la dimensione del batch.
+        Si accetta ogni miglioramento di score (o pari score con layout più compatto).
+        """
+        deadline = start_time + timeout_seconds
+        rng = random.Random(self.parameters.lns_seed)
+        incumbent = self._build_cpsat_warm_start(tools, autoclave)
+        incumbent_score = self._portfolio_score(incumbent, autoclave)
+        curve = [(round((time.time() - start_time) * 1000, 1), incumbent_score)]
+        improvements = {kind: 0 for kind in LNS_NEIGHBOURHOODS}
+        iterations = 0
+        
+        self.logger.info(f"🚀 LNS: {len(tools)} tools, incumbent {len(incumbent)} posizionati, score {incumbent_score:.2f}")
+        
+        target_reached = False
+        while time.time() + 0.05 < deadline:
+            if self._score_target is not None and incumbent_score >= self._score_target - 1e-9:
+                target_reached = True
+                break
+            kind = LNS_NEIGHBOURHOODS[iterations % len(LNS_NEIGHBOURHOODS)]
+            iterations += 1
+            free_ids, box = self._select_lns_region(kind, incumbent, autoclave, rng)
+            budget = min(self.parameters.lns_subsolve_seconds, deadline - time.time())
+            candidate = self._solve_lns_submodel(tools, autoclave, incumbent, free_ids, box, budget, rng)
+            if candidate is None:
+                continue
+            
+            candidate_score = self._portfolio_score(candidate, autoclave)
+            compaction = sum(l.x + l.y for l in candidate)
+            if (candidate_score > incumbent_score + 1e-9 or
+                    (candidate_score >= incumbent_score - 1e-9 and compaction < sum(l.x + l.y for l in incumbent))):
+                if candidate_score > incumbent_score + 1e-9:
+                    improvements[kind] += 1
+                    curve.append((round((time.time() - start_time) * 1000, 1), candidate_score))
+                incumbent, incumbent_score = candidate, candidate_score
+        
+        solution = self._create_solution_from_layouts(incumbent, tools, autoclave, start_time, "CP-SAT_LNS")
+        solution.metrics.lns_iterations = iterations
+        solution.metrics.lns_improvements = improvements
+        solution.metrics.improvement_curve = curve
+        solution.metrics.time_to_first_solution_ms = curve[0][0]
+        solution.metrics.cpsat_model_mode = "no_overlap_2d"
+        solution.metrics.timeout_used = timeout_seconds
+        solution.metrics.stop_reason = "gap_reached" if target_reached else "timeout"
+        
+        self.logger.info(
+            f"✅ LNS: {iterations} iterazioni, score {curve[0][1]:.2f} → {incumbent_score:.2f}, "
+            f"miglioramenti {improvements}"
+        )
+        return solution
+    
+    def _select_lns_region(
+        self,
+        kind: str,
+        layouts: List[NestingLayout],
+        autoclave: AutoclaveInfo,
+        rng: random.Random
+    ) -> Tuple[set, Tuple[float, float, float, float]]:
+        """
+        🚀 LNS: ODL dei tool da liberare per il tipo di regione (al massimo lns_max_free_tools)
+        e riquadro di lavoro: regione ∪ tool liberati, esteso di mezzo tool medio per
+        raggiungere lo spazio libero adiacente, limitato all'autoclave
+        """
+        grow = sum(max(l.width, l.height) for l in layouts) / len(layouts) / 2 if layouts else 0.0
+        if kind == "strip":
+            width = autoclave.width * rng.uniform(0.15, 0.3)
+            x0 = rng.uniform(0, autoclave.width - width)
+            region = (x0, 0.0, width, autoclave.height)
+        elif kind == "window":
+            width = autoclave.width * rng.uniform(0.2, 0.4)
+            height = autoclave.height * rng.uniform(0.4, 0.7)
+            region = (rng.uniform(0, autoclave.width - width), rng.uniform(0, autoclave.height - height), width, height)
+        else:
+            # Intorno del gap: estende di mezzo tool medio per includere i vicini da spostare
+            gx, gy, gw, gh = self._largest_gap_region(layouts, autoclave)
+            region = (gx - grow, gy - grow, gw + 2 * grow, gh + 2 * grow)
+        
+        rx, ry, rw, rh = region
+        center_x, center_y = rx + rw / 2, ry + rh / 2
+        inside = [
+            l for l in layouts
+            if l.x < rx + rw and rx < l.x + l.width and l.y < ry + rh and ry < l.y + l.height
+        ]
+        inside.sort(key=lambda l: math.hypot(l.x + l.width / 2 - center_x, l.y + l.height / 2 - center_y))
+        freed = inside[:self.parameters.lns_max_free_tools]
+        
+        x0 = max(0.0, min([rx] + [l.x for l in freed]) - grow)
+        y0 = max(0.0, min([ry] + [l.y for l in freed]) - grow)
+        x1 = min(autoclave.width, max([rx + rw] + [l.x + l.width for l in freed]) + grow)
+        y1 = min(autoclave.height, max([ry + rh] + [l.y + l.height for l in freed]) + grow)
+        return {l.odl_id for l in freed}, (x0, y0, x1 - x0, y1 - y0)
+    
+    def _largest_gap_region(
+        self,
+        layouts: List[NestingLayout],
+        autoclave: AutoclaveInfo
+    ) -> Tuple[float, float, float, float]:
+        """🚀 LNS: bounding box della componente connessa più grande di celle libere (_identify_gaps)"""
+        cells = self._identify_gaps(layouts, autoclave, round(self.parameters.min_distance_mm))
+        if not cells:
+            return (0.0, 0.0, autoclave.width, autoclave.height)
+        
+        by_origin = {(x, y): (x, y, w, h) for x, y, w, h in cells}
+        step = 50  # Passo griglia di _identify_gaps
+        seen = set()
+        best_component: List[Tuple[float, float, float, float]] = []
+        for origin in by_origin:
+            if origin in seen:
+                continue
+            component = []
+            stack = [origin]
+            seen.add(origin)
+            while stack:
+                cx, cy = stack.pop()
+                component.append(by_origin[(cx, cy)])
+                for neighbour in ((cx + step, cy), (cx - step, cy), (cx, cy + step), (cx, cy - step)):
+                    if neighbour in by_origin and neighbour not in seen:
+                        seen.add(neighbour)
+                        stack.append(neighbour)
+            if len(component) > len(best_component):
+                best_component = component
+        
+        x0 = min(c[0] for c in best_component)
+        y0 = min(c[1] for c in best_component)
+        x1 = max(c[0] + c[2] for c in best_component)
+        y1 = max(c[1] + c[3] for c in best_component)
+        return (x0, y0, x1 - x0, y1 - y0)
+    
+    def _solve_lns_submodel(
+        self,
+        tools: List[ToolInfo],
+        autoclave: AutoclaveInfo,
+        layouts: List[NestingLayout],
+        free_ids: set,
+        box: Tuple[float, float, float, float],
+        time_limit: float,
+        rng: random.Random
+    ) -> Optional[List[NestingLayout]]:
+        """
+        🚀 LNS: sotto-modello CP-SAT limitato al riquadro di lavoro
+
+        - tool liberati + non posizionati che entrano nel riquadro (al massimo
+          lns_max_free_tools, campionati) come intervalli opzionali, stessa geometria di
+          _create_cpsat_interval_variables, con dominio ristretto al riquadro
+        - tool fissi che toccano il riquadro come intervalli immobili; gli altri non entrano nel modello
+        Obiettivo: score (area 85% + linee 15%) scalato intero, poi compattazione bottom-left.
+        """
+        padding = max(1, round(self.parameters.padding_mm))
+        margin = max(1, round(self.parameters.min_distance_mm))
+        bx0, by0 = max(margin, math.floor(box[0])), max(margin, math.floor(box[1]))
+        bx1 = min(int(autoclave.width - margin), math.ceil(box[0] + box[2]))
+        by1 = min(int(autoclave.height - margin), math.ceil(box[1] + box[3]))
+        
+        placed_ids = {l.odl_id for l in layouts}
+        fits_box = lambda t: ((round(t.width) <= bx1 - bx0 and round(t.height) <= by1 - by0) or
+                              (round(t.height) <= bx1 - bx0 and round(t.width) <= by1 - by0))
+        unplaced = [t for t in tools if t.odl_id not in placed_ids and fits_box(t)]
+        if len(unplaced) > self.parameters.lns_max_free_tools:
+            # Candidati all'inserimento campionati: il sotto-modello resta di dimensione costante
+            unplaced = rng.sample(unplaced, self.parameters.lns_max_free_tools)
+        free_tools = [t for t in tools if t.odl_id in free_ids] + unplaced
+        fixed = [l for l in layouts if l.odl_id not in free_ids]
+        if not free_tools or time_limit <= 0:
+            return None
+        
+        model = cp_model.CpModel()
+        variables = self._create_cpsat_interval_variables(model, free_tools, autoclave)
+        for tool in free_tools:
+            model.Add(variables['x'][tool.odl_id] >= bx0)
+            model.Add(variables['y'][tool.odl_id] >= by0)
+            model.Add(variables['end_x'][tool.odl_id] <= bx1 + padding)
+            model.Add(variables['end_y'][tool.odl_id] <= by1 + padding)
+        
+        fixed_rects = [
+            (round(l.x), round(l.y), round(l.width), round(l.height)) for l in fixed
+            if l.x < bx1 + padding and bx0 < l.x + l.width + padding and
+            l.y < by1 + padding and by0 < l.y + l.height + padding
+        ]
+        fixed_x = [model.NewFixedSizeIntervalVar(x, w + padding, f'fixed_x_{i}') for i, (x, _, w, _) in enumerate(fixed_rects)]
+        fixed_y = [model.NewFixedSizeIntervalVar(y, h + padding, f'fixed_y_{i}') for i, (_, y, _, h) in enumerate(fixed_rects)]
+        free_x = [variables['x_interval'][t.odl_id] for t in free_tools]
+        free_y = [variables['y_interval'][t.odl_id] for t in free_tools]
+        
+        # Incumbent euristico con spaziature diverse: se i fissi si toccano, un vincolo per fisso
+        if fixed_rects_disjoint(fixed_rects, padding):
+            model.AddNoOverlap2D(free_x + fixed_x, free_y + fixed_y)
+        else:
+            model.AddNoOverlap2D(free_x, free_y)
+            for ix, iy in zip(fixed_x, fixed_y):
+                model.AddNoOverlap2D(free_x + [ix], free_y + [iy])
+        
+        included = variables['included']
+        fixed_weight = sum(round(l.weight * 1000) for l in fixed)
+        fixed_lines = sum(l.lines_used for l in fixed)
+        model.Add(sum(round(t.weight * 1000) * included[t.odl_id] for t in free_tools)
+                  <= round(autoclave.max_weight * 1000) - fixed_weight)
+        model.Add(sum(t.lines_needed * included[t.odl_id] for t in free_tools)
+                  <= self.parameters.vacuum_lines_capacity - fixed_lines)
+        
+        capacity = max(1, self.parameters.vacuum_lines_capacity)
+        score_terms = []
+        compaction_terms = []
+        for tool in free_tools:
+            coefficient = round(LNS_SCORE_SCALE * tool_score_contribution(tool, autoclave, capacity) / 100)
+            score_terms.append(coefficient * included[tool.odl_id])
+            compaction_terms.extend([variables['x'][tool.odl_id], variables['y'][tool.odl_id]])
+        model.Maximize(sum(score_terms) - sum(compaction_terms))
+        
+        current = {l.odl_id: l for l in layouts}
+        self._add_cpsat_hints(model, free_tools, variables, [current[t.odl_id] for t in free_tools if t.odl_id in current])
+        
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = time_limit
+        # Portfolio CP-SAT completo anche con pochi core: con un solo worker la ricerca resta sull'hint
+        solver.parameters.num_search_workers = LNS_SUBSOLVE_WORKERS
+        status = solver.Solve(model)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return None
+        
+        result = list(fixed)
+        for tool in free_tools:
+            if not solver.Value(included[tool.odl_id]):
+                continue
+            rotated = bool(solver.Value(variables['rotated'][tool.odl_id]))
+            result.append(NestingLayout(
+                odl_id=tool.odl_id,
+                x=float(solver.Value(variables['x'][tool.odl_id])),
+                y=float(solver.Value(variables['y'][tool.odl_id])),
+                width=float(tool.height if rotated else tool.width),
+                height=float(tool.width if rotated else tool.height),
+                weight=tool.weight,
+                rotated=rotated,
+                lines_used=tool.lines_needed
+            ))
+        return result
+    
+    def _add_cpsat_refinement_domains(
+        self,
+        model: cp_model.CpModel,
+        tools: List[ToolInfo],
+        variables: Dict[str, Any],
+        layouts: List[NestingLayout],
+        window: int
+    ) -> None:
+        """🚀 MULTI-RISOLUZIONE: tool del layout inclusi, orientamento fisso, x/y entro ±window"""
+        placed = {layout.odl_id: layout for layout in layouts}
+        
+        for tool in tools:
+            layout = placed.get(tool.odl_id)
+            if layout is None:
+                continue
+            tool_id = tool.odl_id
+            model.Add(variables['included'][tool_id] == 1)
+            model.Add(variables['rotated'][tool_id] == (1 if layout.rotated else 0))
+            model.Add(variables['x'][tool_id] >= round(layout.x) - window)
+            model.Add(variables['x'][tool_id] <= round(layout.x) + window)
+            model.Add(variables['y'][tool_id] >= round(layout.y) - window)
+            model.Add(variables['y'][tool_id] <= round(layout.y) + window)
+    
+    def _build_cpsat_warm_start(
+        self,
+        tools: List[ToolInfo],
+        autoclave: AutoclaveInfo
+    ) -> List[NestingLayout]:
+        """
+        🚀 WARM START: BL-FFD (MaxRects) con la stessa geometria intera del modello CP-SAT
+
+        - dimensioni arrotondate come nelle variabili CP-SAT
+        - margine min_distance dalle pareti, padding tra tool
+        - limiti peso e linee vuoto rispettati
+        Il layout risultante è quindi un assegnamento ammissibile da usare come hint.
+        """
+        margin = max(1, round(self.parameters.min_distance_mm))
+        padding = max(1, round(self.parameters.padding_mm))
+        packer = MaxRectsPacker(
+            margin, margin, autoclave.width - margin, autoclave.height - margin,
+            spacing=padding, rule=MaxRectsRule(self.parameters.maxrects_rule)
+        )
+        
+        weight_limit = round(autoclave.max_weight * 1000)
+        total_weight = 0
+        total_lines = 0
+        layouts = []
+        
+        for tool in sorted(tools, key=lambda t: t.width * t.height, reverse=True):
+            tool_weight = round(tool.weight * 1000)
+            if total_weight + tool_weight > weight_limit:
+                continue
+            if total_lines + tool.lines_needed > self.parameters.vacuum_lines_capacity:
+                continue
+            
+            placement = packer.insert(round(tool.width), round(tool.height))
+            if placement is None:
+                continue
+            
+            x, y, width, height, rotated = placement
+            layouts.append(NestingLayout(
+                odl_id=tool.odl_id,
+                x=float(x),
+                y=float(y),
+                width=float(tool.height if rotated else tool.width),
+                height=float(tool.width if rotated else tool.height),
+                weight=tool.weight,
+                rotated=rotated,
+                lines_used=tool.lines_needed
+            ))
+            total_weight += tool_weight
+            total_lines += tool.lines_needed
+        
+        self.logger.info(f"🚀 WARM START BL-FFD: {len(layouts)}/{len(tools)} tools come hint CP-SAT")
+        return layouts
+    
+    def _add_cpsat_hints(
+        self,
+        model: cp_model.CpModel,
+        tools: List[ToolInfo],
+        variables: Dict[str, Any],
+        hint_layouts: List[NestingLayout]
+    ) -> None:
+        """🚀 WARM START: AddHint su included, x, y e rotated (tool non nel layout → escluso)"""
+        placed = {layout.odl_id: layout for layout in hint_layouts}
+        
+        for tool in tools:
+            tool_id = tool.odl_id
+            layout = placed.get(tool_id)
+            if layout is None:
+                model.AddHint(variables['included'][tool_id], 0)
+                continue
+            
+            model.AddHint(variables['included'][tool_id], 1)
+            model.AddHint(variables['x'][tool_id], round(layout.x))
+            model.AddHint(variables['y'][tool_id], round(layout.y))
+            model.AddHint(variables['rotated'][tool_id], 1 if layout.rotated else 0)
+    
     def _create_cpsat_variables(
         self, 
         model: cp_model.CpModel, 
@@ -1136,7 +2664,8 @@ class NestingModel:
         
         # 🚀 OTTIMIZZAZIONE v3.0: Vincoli non-overlap semplificati senza OnlyEnforceIf problematici
         # Usa approccio diretto con BigM invece di enforcement literals
-        big_m = max(virtual_width, virtual_height) * 2
+        # 🔧 FIX: big-M intero (CP-SAT rifiuta coefficienti float con dimensioni autoclave float)
+        big_m = int(math.ceil(max(virtual_width, virtual_height) * 2))
         
         for i, tool1 in enumerate(tools):
             for j, tool2 in enumerate(tools):
@@ -1154,6 +2683,8 @@ class NestingModel:
                 # Almeno una separazione deve essere vera se entrambi inclusi
                 both_included = model.NewBoolVar(f'both_included_{id1}_{id2}')
                 model.AddBoolAnd([variables['included'][id1], variables['included'][id2]]).OnlyEnforceIf(both_included)
+                # 🔧 FIX: implicazione inversa, altrimenti both_included=0 disattiva la separazione
+                model.AddBoolOr([variables['included'][id1].Not(), variables['included'][id2].Not(), both_included])
                 model.AddBoolOr([sep_left, sep_right, sep_below, sep_above]).OnlyEnforceIf(both_included)
                 
                 # Vincoli di separazione con BigM (senza OnlyEnforceIf problematici)
@@ -1171,7 +2702,117 @@ class NestingModel:
         
         # 🔧 Vincoli peso e linee vuoto (invariati)
         self._add_weight_and_vacuum_constraints_optimized(model, tools, autoclave, variables)
-    
+
+    def _create_cpsat_interval_variables(
+        self,
+        model: cp_model.CpModel,
+        tools: List[ToolInfo],
+        autoclave: AutoclaveInfo
+    ) -> Dict[str, Any]:
+        """
+        🚀 NUOVO: Variabili CP-SAT a intervalli opzionali per AddNoOverlap2D
+
+        Ogni tool ha un intervallo X e uno Y opzionali:
+        - presenza = included
+        - dimensione = lato del tool commutato da rotated (espressione affine)
+        - padding incorporato nella dimensione (estensione a destra/in alto)
+
+        Due intervalli adiacenti distano quindi almeno `padding`, senza BoolVar di coppia.
+        Il limite superiore delle variabili end è spostato di `padding` per preservare
+        il margine dalle pareti dell'autoclave.
+        """
+
+        variables = {
+            'included': {},      # tool incluso nel layout (presenza intervalli)
+            'x': {},            # posizione x
+            'y': {},            # posizione y
+            'rotated': {},      # tool ruotato 90°
+            'end_x': {},        # fine intervallo X (padding incluso)
+            'end_y': {},        # fine intervallo Y (padding incluso)
+            'x_interval': {},   # intervallo opzionale asse X
+            'y_interval': {},   # intervallo opzionale asse Y
+        }
+
+        margin = max(1, round(self.parameters.min_distance_mm))
+        padding = max(1, round(self.parameters.padding_mm))
+
+        max_end_x = int(autoclave.width - margin) + padding
+        max_end_y = int(autoclave.height - margin) + padding
+
+        for tool in tools:
+            tool_id = tool.odl_id
+            tool_w = round(tool.width)
+            tool_h = round(tool.height)
+
+            included = model.NewBoolVar(f'included_{tool_id}')
+            rotated = model.NewBoolVar(f'rotated_{tool_id}')
+            variables['included'][tool_id] = included
+            variables['rotated'][tool_id] = rotated
+
+            # Orientamenti ammessi (stessa logica di _create_cpsat_variables)
+            fits_normal = (tool.width + margin <= autoclave.width and
+                          tool.height + margin <= autoclave.height)
+            fits_rotated = (tool.height + margin <= autoclave.width and
+                           tool.width + margin <= autoclave.height)
+
+            if fits_rotated and not fits_normal:
+                model.Add(rotated == 1)  # Forzato ruotato
+            elif not fits_rotated or tool_w == tool_h:
+                model.Add(rotated == 0)  # Forzato normale (o rotazione irrilevante)
+
+            max_x = max(
+                round(autoclave.width - tool.width - margin) if fits_normal else 0,
+                round(autoclave.width - tool.height - margin) if fits_rotated else 0
+            )
+            max_y = max(
+                round(autoclave.height - tool.height - margin) if fits_normal else 0,
+                round(autoclave.height - tool.width - margin) if fits_rotated else 0
+            )
+
+            x = model.NewIntVar(margin, max(margin, max_x), f'x_{tool_id}')
+            y = model.NewIntVar(margin, max(margin, max_y), f'y_{tool_id}')
+            end_x = model.NewIntVar(margin, max(margin, max_end_x), f'end_x_{tool_id}')
+            end_y = model.NewIntVar(margin, max(margin, max_end_y), f'end_y_{tool_id}')
+            variables['x'][tool_id] = x
+            variables['y'][tool_id] = y
+            variables['end_x'][tool_id] = end_x
+            variables['end_y'][tool_id] = end_y
+
+            # Dimensioni con padding: normale (w, h), ruotato (h, w)
+            size_x = tool_w + padding + (tool_h - tool_w) * rotated
+            size_y = tool_h + padding + (tool_w - tool_h) * rotated
+
+            variables['x_interval'][tool_id] = model.NewOptionalIntervalVar(
+                x, size_x, end_x, included, f'x_interval_{tool_id}'
+            )
+            variables['y_interval'][tool_id] = model.NewOptionalIntervalVar(
+                y, size_y, end_y, included, f'y_interval_{tool_id}'
+            )
+
+        return variables
+
+    def _add_no_overlap_2d_constraints(
+        self,
+        model: cp_model.CpModel,
+        tools: List[ToolInfo],
+        autoclave: AutoclaveInfo,
+        variables: Dict[str, Any]
+    ) -> None:
+        """
+        🚀 NUOVO: Vincolo unico AddNoOverlap2D sugli intervalli opzionali
+        Sostituisce le O(n²) disgiunzioni big-M di _add_one_big_bin_constraints
+        """
+
+        self.logger.info(f"🚀 NoOverlap2D: {len(tools)} intervalli opzionali, padding={max(1, round(self.parameters.padding_mm))}mm")
+
+        model.AddNoOverlap2D(
+            [variables['x_interval'][tool.odl_id] for tool in tools],
+            [variables['y_interval'][tool.odl_id] for tool in tools]
+        )
+
+        # 🔧 Vincoli peso e linee vuoto (invariati)
+        self._add_weight_and_vacuum_constraints_optimized(model, tools, autoclave, variables)
+
     def _add_weight_and_vacuum_constraints_optimized(self, model: cp_model.CpModel, tools: List[ToolInfo], autoclave: AutoclaveInfo, variables: Dict[str, Any]) -> None:
         """Aggiunge vincoli peso e linee vuoto ottimizzati per One Big Bin"""
         # Vincoli peso
@@ -1441,14 +3082,8 @@ class NestingModel:
             total_area = autoclave.width * autoclave.height
             efficiency = (area_used / total_area) * 100 if total_area > 0 else 0
             
-            # 🔧 FIX LOOP INFINITO: Disabilita GRASP per dataset grandi
-            if len(tools) > 15:
-                self.logger.warning(f"🔧 GRASP DISABILITATO: {len(tools)} tools troppi (>15), saltando GRASP per evitare loop infinito")
-                skip_grasp = True
-            else:
-                skip_grasp = False
-            
-            if efficiency < 70.0 and self.parameters.use_grasp_heuristic and not skip_grasp:
+            # GRASP a budget di tempo: nessun limite sul numero di tool
+            if efficiency < 70.0 and self.parameters.use_grasp_heuristic:
                 self.logger.info(f"🔧 EFFICIENZA REALE: {efficiency:.1f}% < 70%, attivazione GRASP...")
                 
                 # Crea soluzione temporanea per GRASP
@@ -1707,6 +3342,13 @@ class NestingModel:
         
         margin = int(self.parameters.min_distance_mm)
         
+        # 🚀 MaxRects: costo lineare nei rettangoli liberi invece della griglia a 2mm
+        if self.parameters.placement_engine == "maxrects":
+            packer = self._create_maxrects_packer(autoclave, [], margin)
+            for rect_x, rect_y, rect_w, rect_h in occupied_rects:
+                packer.occupy(rect_x, rect_y, rect_w, rect_h)
+            return packer.find_position(tool.width, tool.height)
+        
         # 🔄 ROTAZIONE INTELLIGENTE: Prova entrambi gli orientamenti con ottimizzazione spazio
         orientations = []
         
@@ -1748,6 +3390,26 @@ class NestingModel:
         
         return None
     
+    def _create_maxrects_packer(
+        self,
+        autoclave: AutoclaveInfo,
+        existing_layouts: List[NestingLayout],
+        padding: float
+    ) -> MaxRectsPacker:
+        """
+        🚀 NUOVO: Crea un packer MaxRects con i layout esistenti già occupati
+        Stessa semantica dei punti candidati legacy: origine e distanza tra tool = padding,
+        tool contenuti nei bordi dell'autoclave
+        """
+        packer = MaxRectsPacker(
+            padding, padding, autoclave.width, autoclave.height,
+            spacing=padding,
+            rule=MaxRectsRule(self.parameters.maxrects_rule)
+        )
+        for layout in existing_layouts:
+            packer.occupy(layout.x, layout.y, layout.width, layout.height)
+        return packer
+    
     def _create_empty_solution(
         self, 
         excluded_tools: List[Dict[str, Any]], 
@@ -1911,6 +3573,10 @@ class NestingModel:
         current_weight = sum(l.weight for l in existing_layouts)
         current_lines = sum(l.lines_used for l in existing_layouts)
         
+        packer = None
+        if self.parameters.placement_engine == "maxrects":
+            packer = self._create_maxrects_packer(autoclave, existing_layouts, padding)
+        
         for tool in sorted_tools:
             # Verifica vincoli globali
             if current_weight + tool.weight > autoclave.max_weight:
@@ -1919,8 +3585,11 @@ class NestingModel:
                 continue
             
             # Trova posizione considerando sia layout esistenti che nuovi
-            all_layouts = existing_layouts + new_layouts
-            best_position = self._find_bottom_left_position(tool, autoclave, all_layouts, padding)
+            if packer is not None:
+                best_position = packer.insert(tool.width, tool.height)
+            else:
+                all_layouts = existing_layouts + new_layouts
+                best_position = self._find_bottom_left_position(tool, autoclave, all_layouts, padding)
             
             if best_position:
                 x, y, width, height, rotated = best_position
@@ -2016,18 +3685,13 @@ class NestingModel:
         """
         overlaps = []
         
-        for i in range(len(layout)):
-            for j in range(i + 1, len(layout)):
-                piece_a = layout[i]
-                piece_b = layout[j]
-                
-                # Controlla se i bounding box si intersecano
-                if not (piece_a.x + piece_a.width <= piece_b.x or  # A è a sinistra di B
-                       piece_b.x + piece_b.width <= piece_a.x or   # B è a sinistra di A
-                       piece_a.y + piece_a.height <= piece_b.y or  # A è sopra B
-                       piece_b.y + piece_b.height <= piece_a.y):   # B è sopra A
-                    overlaps.append((piece_a, piece_b))
-                    self.logger.warning(f"🔴 OVERLAP rilevato tra ODL {piece_a.odl_id} e ODL {piece_b.odl_id}")
+        # 🚀 Indice spaziale: confronta solo i pezzi che condividono celle della griglia
+        index = RectIndex.from_layouts(layout)
+        for i, j in index.overlapping_pairs():
+            piece_a = layout[i]
+            piece_b = layout[j]
+            overlaps.append((piece_a, piece_b))
+            self.logger.warning(f"🔴 OVERLAP rilevato tra ODL {piece_a.odl_id} e ODL {piece_b.odl_id}")
         
         return overlaps
 
@@ -2063,6 +3727,11 @@ class NestingModel:
         
         layouts = []
         
+        # 🚀 MaxRects: rettangoli liberi aggiornati incrementalmente a ogni inserimento
+        packer = None
+        if self.parameters.placement_engine == "maxrects":
+            packer = self._create_maxrects_packer(autoclave, [], padding)
+        
         for tool in sorted_tools:
             # Controlla vincoli di peso e linee vuoto globali
             current_weight = sum(l.weight for l in layouts)
@@ -2077,7 +3746,10 @@ class NestingModel:
                 continue
             
             # 🔄 NUOVO v1.4.17-DEMO: Trova la posizione bottom-left migliore con rotazione
-            best_position = self._find_bottom_left_position(tool, autoclave, layouts, padding)
+            if packer is not None:
+                best_position = packer.insert(tool.width, tool.height)
+            else:
+                best_position = self._find_bottom_left_position(tool, autoclave, layouts, padding)
             
             if best_position:
                 x, y, width, height, rotated = best_position
@@ -2126,8 +3798,8 @@ class NestingModel:
             Tuple (x, y, width, height, rotated) se trovata posizione valida, None altrimenti
         """
         
-        # Prepara rettangoli occupati per controllo sovrapposizioni
-        occupied_rects = [(l.x, l.y, l.width, l.height) for l in existing_layouts]
+        # Prepara indice spaziale dei rettangoli occupati per controllo sovrapposizioni
+        occupied_index = RectIndex.from_layouts(existing_layouts)
         
         # Prova entrambi gli orientamenti
         orientations = []
@@ -2152,14 +3824,7 @@ class NestingModel:
                     continue
                 
                 # Controlla sovrapposizioni
-                valid_position = True
-                for rect_x, rect_y, rect_w, rect_h in occupied_rects:
-                    if not (x + width <= rect_x or x >= rect_x + rect_w or 
-                           y + height <= rect_y or y >= rect_y + rect_h):
-                        valid_position = False
-                        break
-                
-                if valid_position:
+                if not occupied_index.intersects(x, y, width, height):
                     # Calcola score bottom-left (priorità y, poi x)
                     score = y * 10000 + x
                     if score < best_score:
@@ -2223,8 +3888,13 @@ class NestingModel:
         2. Best-Fit con valutazione spreco
         3. Corner-Fitting per spazi stretti
         4. Gap-Filling per spazi residui
+        
+        🚀 Le quattro strategie condividono un unico CandidateEvaluator (layout come
+        array NumPy): ogni strategia valuta tutti i suoi candidati in blocco.
         """
         
+        evaluator = CandidateEvaluator.from_layouts(existing_layouts, autoclave)
+        
         strategies = [
             self._strategy_bottom_left_skyline,
             self._strategy_best_fit_waste,
@@ -2237,12 +3907,11 @@ class NestingModel:
         
         # Prova tutte le strategie e scegli la migliore
         for strategy in strategies:
-            position = strategy(tool, autoclave, existing_layouts, padding)
+            position = strategy(tool, autoclave, existing_layouts, padding, evaluator=evaluator)
             if position:
                 x, y, width, height, rotated = position
                 # Score = priorità bottom-left + spreco spazio
-                wasted_space = self._calculate_wasted_space(x, y, width, height, existing_layouts, autoclave)
-                score = y * 1000 + x + wasted_space * 0.1
+                score = float(evaluator.placement_scores([x], [y], width, height)[0])
                 
                 if score < best_score:
                     best_position = position
@@ -2255,10 +3924,14 @@ class NestingModel:
         tool: ToolInfo, 
         autoclave: AutoclaveInfo, 
         existing_layouts: List[NestingLayout], 
-        padding: int
+        padding: int,
+        evaluator: Optional[CandidateEvaluator] = None
     ) -> Optional[Tuple[float, float, float, float, bool]]:
         """🚀 Strategia 1: Bottom-Left con Skyline per massima compattezza"""
         
+        if evaluator is None:
+            evaluator = CandidateEvaluator.from_layouts(existing_layouts, autoclave)
+        
         # Costruisci skyline dai layout esistenti
         skyline = self._build_skyline(existing_layouts, autoclave)
         
@@ -2278,36 +3951,50 @@ class NestingModel:
                 orientations.append((tool.width, tool.height, False))
                 self.logger.warning(f"🔄 ODL {tool.odl_id}: Rotazione forzata fallita, uso orientamento normale")
         
-        best_position = None
-        best_y = float('inf')
-        
-        for width, height, rotated in orientations:
-            # 🔧 FIX: Prova posizioni lungo la skyline rispettando il padding minimo
-            step = max(2, int(padding // 2))  # Step ridotto ma che rispetta il padding
-            for x in range(int(padding), int(autoclave.width - width) + 1, step):
-                y = self._find_skyline_y(x, x + width, skyline, padding)
-                
-                if y + height <= autoclave.height:
-                    if not self._has_overlap(x, y, width, height, existing_layouts):
-                        if y < best_y or (y == best_y and x < best_position[0]):
-                            best_position = (x, y, width, height, rotated)
-                            best_y = y
-                            
-                            # Early exit per ODL 2 se trova posizione ottima
-                            if force_rotation and tool.odl_id == 2 and y < autoclave.height * 0.3:
-                                return best_position
-        
-        return best_position
+        # 🚀 Candidati di tutti gli orientamenti valutati in blocco (ordine: orientamento, x)
+        # 🔧 FIX: Prova posizioni lungo la skyline rispettando il padding minimo
+        step = max(2, int(padding // 2))  # Step ridotto ma che rispetta il padding
+        cand_x, cand_y, cand_o = [], [], []
+        for k, (width, height, rotated) in enumerate(orientations):
+            xs = np.arange(int(padding), int(autoclave.width - width) + 1, step, dtype=float)
+            ys = evaluator.skyline_heights(xs, width, skyline, padding)
+            mask = evaluator.feasibility_mask(xs, ys, width, height)
+            cand_x.append(xs[mask])
+            cand_y.append(ys[mask])
+            cand_o.append(np.full(int(mask.sum()), k))
+        
+        if not cand_x or sum(len(c) for c in cand_x) == 0:
+            return None
+        cand_x = np.concatenate(cand_x)
+        cand_y = np.concatenate(cand_y)
+        cand_o = np.concatenate(cand_o)
+        
+        # Early exit per ODL 2: primo candidato (in ordine di scansione) sotto il 30% dell'altezza
+        if force_rotation and tool.odl_id == 2:
+            low = np.flatnonzero(cand_y < autoclave.height * 0.3)
+            if low.size:
+                best = low[0]
+                width, height, rotated = orientations[cand_o[best]]
+                return (int(cand_x[best]), float(cand_y[best]), width, height, rotated)
+        
+        # Bottom-left: minimo y, poi minimo x, poi primo orientamento
+        best = np.lexsort((np.arange(len(cand_x)), cand_x, cand_y))[0]
+        width, height, rotated = orientations[cand_o[best]]
+        return (int(cand_x[best]), float(cand_y[best]), width, height, rotated)
     
     def _strategy_best_fit_waste(
         self, 
         tool: ToolInfo, 
         autoclave: AutoclaveInfo, 
         existing_layouts: List[NestingLayout], 
-        padding: int
+        padding: int,
+        evaluator: Optional[CandidateEvaluator] = None
     ) -> Optional[Tuple[float, float, float, float, bool]]:
         """🚀 Strategia 2: Best-Fit per minimizzare spreco spazio"""
         
+        if evaluator is None:
+            evaluator = CandidateEvaluator.from_layouts(existing_layouts, autoclave)
+        
         # 🔄 ENHANCED: Controlla se il tool deve essere forzatamente ruotato  
         force_rotation = self._should_force_rotation(tool)
         
@@ -2331,13 +4018,24 @@ class NestingModel:
             # 🔧 FIX: Griglia di ricerca che rispetta padding frontend invece di valori hardcoded
             step = max(2, int(padding // 2))  # Step proporzionale al padding, minimo 2mm
             
-            for y in range(int(padding), int(autoclave.height - height) + 1, step):
-                for x in range(int(padding), int(autoclave.width - width) + 1, step):
-                    if not self._has_overlap(x, y, width, height, existing_layouts):
-                        waste = self._calculate_wasted_space(x, y, width, height, existing_layouts, autoclave)
-                        if waste < best_waste:
-                            best_position = (x, y, width, height, rotated)
-                            best_waste = waste
+            # 🚀 Griglia completa (y esterno, x interno) valutata in blocco
+            grid_y, grid_x = np.meshgrid(
+                np.arange(int(padding), int(autoclave.height - height) + 1, step, dtype=float),
+                np.arange(int(padding), int(autoclave.width - width) + 1, step, dtype=float),
+                indexing='ij'
+            )
+            xs, ys = grid_x.ravel(), grid_y.ravel()
+            if xs.size == 0:
+                continue
+            
+            mask = ~evaluator.overlap_mask(xs, ys, width, height)
+            if not mask.any():
+                continue
+            waste = np.where(mask, evaluator.waste_scores(xs, ys, width, height), np.inf)
+            best = int(np.argmin(waste))  # Primo minimo = stesso tie-break della scansione
+            if waste[best] < best_waste:
+                best_position = (int(xs[best]), int(ys[best]), width, height, rotated)
+                best_waste = waste[best]
         
         return best_position
     
@@ -2346,10 +4044,14 @@ class NestingModel:
         tool: ToolInfo, 
         autoclave: AutoclaveInfo, 
         existing_layouts: List[NestingLayout], 
-        padding: int
+        padding: int,
+        evaluator: Optional[CandidateEvaluator] = None
     ) -> Optional[Tuple[float, float, float, float, bool]]:
         """🚀 Strategia 3: Corner-Fitting per spazi stretti"""
         
+        if evaluator is None:
+            evaluator = CandidateEvaluator.from_layouts(existing_layouts, autoclave)
+        
         # Prova orientamenti
         orientations = []
         if tool.width + padding <= autoclave.width and tool.height + padding <= autoclave.height:
@@ -2367,25 +4069,34 @@ class NestingModel:
                 (layout.x + layout.width + padding, layout.y + layout.height + padding)
             ])
         
-        for width, height, rotated in orientations:
-            for x, y in corners:
-                if (x + width <= autoclave.width and y + height <= autoclave.height and
-                    not self._has_overlap(x, y, width, height, existing_layouts)):
-                    return (x, y, width, height, rotated)
+        # 🚀 Matrice orientamenti × corner valutata in blocco, primo fattibile in ordine
+        xs = np.array([c[0] for c in corners], dtype=float)
+        ys = np.array([c[1] for c in corners], dtype=float)
+        mask, _ = evaluator.evaluate(xs, ys, orientations)
+        hit = first_true(mask)
+        if hit is None:
+            return None
         
-        return None
+        k, i = hit
+        width, height, rotated = orientations[k]
+        x, y = corners[i]
+        return (x, y, width, height, rotated)
     
     def _strategy_gap_filling(
         self, 
         tool: ToolInfo, 
         autoclave: AutoclaveInfo, 
         existing_layouts: List[NestingLayout], 
-        padding: int
+        padding: int,
+        evaluator: Optional[CandidateEvaluator] = None
     ) -> Optional[Tuple[float, float, float, float, bool]]:
         """🚀 Strategia 4: Gap-Filling per spazi residui"""
         
+        if evaluator is None:
+            evaluator = CandidateEvaluator.from_layouts(existing_layouts, autoclave)
+        
         # Identifica gaps tra gli oggetti esistenti
-        gaps = self._identify_gaps(existing_layouts, autoclave, padding)
+        gaps = self._identify_gaps(existing_layouts, autoclave, padding, evaluator=evaluator)
         
         # Prova orientamenti
         orientations = []
@@ -2394,14 +4105,26 @@ class NestingModel:
         if tool.height + padding <= autoclave.width and tool.width + padding <= autoclave.height:
             orientations.append((tool.height, tool.width, True))
         
-        for gap_x, gap_y, gap_width, gap_height in gaps:
-            for width, height, rotated in orientations:
-                if (width <= gap_width and height <= gap_height and
-                    gap_x + width <= autoclave.width and gap_y + height <= autoclave.height and
-                    not self._has_overlap(gap_x, gap_y, width, height, existing_layouts)):
-                    return (gap_x, gap_y, width, height, rotated)
+        if not gaps or not orientations:
+            return None
+        
+        # 🚀 Matrice gap × orientamenti valutata in blocco, primo fattibile in ordine
+        gap_array = np.array(gaps, dtype=float)
+        mask = np.zeros((len(gaps), len(orientations)), dtype=bool)
+        for k, (width, height, _) in enumerate(orientations):
+            fits = (width <= gap_array[:, 2]) & (height <= gap_array[:, 3])
+            if fits.any():
+                idx = np.nonzero(fits)[0]
+                mask[idx, k] = evaluator.feasibility_mask(gap_array[idx, 0], gap_array[idx, 1], width, height)
+        
+        hit = first_true(mask)
+        if hit is None:
+            return None
         
-        return None
+        i, k = hit
+        width, height, rotated = orientations[k]
+        gap_x, gap_y = gaps[i][0], gaps[i][1]
+        return (gap_x, gap_y, width, height, rotated)
     
     def _build_skyline(self, layouts: List[NestingLayout], autoclave: AutoclaveInfo) -> List[Tuple[float, float]]:
         """Costruisce la skyline (contorno superiore) degli oggetti posizionati"""
@@ -2441,6 +4164,10 @@ class NestingModel:
     
     def _has_overlap(self, x: float, y: float, width: float, height: float, layouts: List[NestingLayout]) -> bool:
         """Verifica se un rettangolo si sovrappone con i layout esistenti"""
+        # 🚀 Layout numerosi: indice spaziale aggiornato incrementalmente tra le chiamate
+        if len(layouts) >= LINEAR_SCAN_THRESHOLD:
+            return self._layout_index_cache.get(layouts).intersects(x, y, width, height)
+        
         for layout in layouts:
             if not (x + width <= layout.x or x >= layout.x + layout.width or 
                    y + height <= layout.y or y >= layout.y + layout.height):
@@ -2465,31 +4192,37 @@ class NestingModel:
         
         return wasted
     
-    def _identify_gaps(self, layouts: List[NestingLayout], autoclave: AutoclaveInfo, padding: int) -> List[Tuple[float, float, float, float]]:
+    def _identify_gaps(
+        self,
+        layouts: List[NestingLayout],
+        autoclave: AutoclaveInfo,
+        padding: int,
+        evaluator: Optional[CandidateEvaluator] = None
+    ) -> List[Tuple[float, float, float, float]]:
         """Identifica spazi vuoti (gap) tra gli oggetti posizionati"""
         if not layouts:
             return [(padding, padding, autoclave.width - 2*padding, autoclave.height - 2*padding)]
         
-        gaps = []
+        if evaluator is None:
+            evaluator = CandidateEvaluator.from_layouts(layouts, autoclave)
         
         # Griglia semplificata per identificare spazi vuoti
         grid_size = 50  # mm
         
-        for y in range(int(padding), int(autoclave.height), grid_size):
-            for x in range(int(padding), int(autoclave.width), grid_size):
-                # Verifica se questo punto è libero
-                point_free = True
-                for layout in layouts:
-                    if (layout.x <= x <= layout.x + layout.width and 
-                        layout.y <= y <= layout.y + layout.height):
-                        point_free = False
-                        break
-                
-                if point_free:
-                    # Calcola dimensioni del gap partendo da questo punto
-                    gap_width = min(grid_size, autoclave.width - x)
-                    gap_height = min(grid_size, autoclave.height - y)
-                    gaps.append((x, y, gap_width, gap_height))
+        # 🚀 Test "punto libero" su tutta la griglia (y esterno, x interno) in blocco
+        ys_range = range(int(padding), int(autoclave.height), grid_size)
+        xs_range = range(int(padding), int(autoclave.width), grid_size)
+        grid_y, grid_x = np.meshgrid(np.array(ys_range, dtype=float), np.array(xs_range, dtype=float), indexing='ij')
+        free = evaluator.free_points_mask(grid_x.ravel(), grid_y.ravel())
+        
+        gaps = []
+        for idx in np.flatnonzero(free):
+            x = xs_range[idx % len(xs_range)]
+            y = ys_range[idx // len(xs_range)]
+            # Calcola dimensioni del gap partendo da questo punto
+            gap_width = min(grid_size, autoclave.width - x)
+            gap_height = min(grid_size, autoclave.height - y)
+            gaps.append((x, y, gap_width, gap_height))
         
         return gaps
     
@@ -2704,7 +4437,7 @@ class NestingModel:
         vacuum_util_pct = (total_lines / self.parameters.vacuum_lines_capacity * 100) if self.parameters.vacuum_lines_capacity > 0 else 0
         
         # Calcola efficienza combinata (standard aerospace: 85% area + 15% vacuum)
-        efficiency_score = area_pct * 0.85 + vacuum_util_pct * 0.15
+        score = efficiency_score(used_area, total_lines, autoclave, self.parameters.vacuum_lines_capacity)
         
         # Determina se è stata usata rotazione
         rotation_used = any(layout.rotated for layout in layouts)
@@ -2728,7 +4461,7 @@ class NestingModel:
             total_weight=total_weight,
             positioned_count=len(layouts),
             excluded_count=len(excluded_odls),
-            efficiency_score=efficiency_score,
+            efficiency_score=score,
             time_solver_ms=(time.time() - start_time) * 1000,
             fallback_used=True if "FALLBACK" in algorithm_status else False,
             heuristic_iters=0,
@@ -2737,7 +4470,7 @@ class NestingModel:
         )
         
         success = len(layouts) > 0
-        message = f"{algorithm_status}: {len(layouts)} tool posizionati, efficienza {efficiency_score:.1f}%"
+        message = f"{algorithm_status}: {len(layouts)} tool posizionati, efficienza {score:.1f}%"
         
         return NestingSolution(
             layouts=layouts,
@@ -2756,39 +4489,48 @@ class NestingModel:
         start_time: float
     ) -> NestingSolution:
         """
-        🔧 FIX METODO MANCANTE: Applica ottimizzazione GRASP (wrapper per Ruin & Recreate)
+        🚀 GRASP multi-start: costruzioni RCL randomizzate + ricerca locale in parallelo
         
         Args:
-            initial_solution: Soluzione iniziale da ottimizzare
+            initial_solution: Soluzione iniziale da ottimizzare (incumbent da battere)
             tools: Lista di tutti i tool
             autoclave: Informazioni autoclave
             start_time: Timestamp inizio risoluzione
             
         Returns:
-            Soluzione ottimizzata tramite GRASP
+            Soluzione GRASP se migliore dell'incumbent, altrimenti quella iniziale
         """
+        from .grasp import GraspEngine
         
         self.logger.info(f"🚀 GRASP: Inizio ottimizzazione da efficienza {initial_solution.metrics.efficiency_score:.1f}%")
         
         try:
-            # Usa il metodo esistente Ruin & Recreate che è l'implementazione GRASP reale
-            optimized_solution = self._apply_ruin_recreate_heuristic(
-                initial_solution, tools, autoclave, start_time
+            engine = GraspEngine(
+                self.parameters,
+                alpha=self.parameters.grasp_alpha,
+                seed=self.parameters.grasp_seed,
+                time_budget_seconds=self.parameters.grasp_time_budget_seconds,
+                workers=self.parameters.grasp_workers
             )
+            result = engine.run(tools, autoclave, incumbent=initial_solution.layouts, target_score=self._score_target)
             
-            # Verifica se c'è stato miglioramento
-            if optimized_solution.metrics.efficiency_score > initial_solution.metrics.efficiency_score:
-                improvement = optimized_solution.metrics.efficiency_score - initial_solution.metrics.efficiency_score
-                self.logger.info(f"🚀 GRASP: Miglioramento +{improvement:.2f}% → {optimized_solution.metrics.efficiency_score:.1f}%")
-                
-                # Aggiorna status per indicare che GRASP è stato applicato
-                if "_RRGH" not in optimized_solution.algorithm_status:
-                    optimized_solution.algorithm_status += "_GRASP"
-                    
-                return optimized_solution
-            else:
+            if result.score <= initial_solution.metrics.efficiency_score:
                 self.logger.info(f"🚀 GRASP: Nessun miglioramento, mantiene soluzione originale {initial_solution.metrics.efficiency_score:.1f}%")
-                return initial_solution
+                solution = initial_solution
+            else:
+                solution = self._create_solution_from_layouts(
+                    result.layouts, tools, autoclave, start_time, f"{initial_solution.algorithm_status}_GRASP"
+                )
+                improvement = solution.metrics.efficiency_score - initial_solution.metrics.efficiency_score
+                self.logger.info(f"🚀 GRASP: Miglioramento +{improvement:.2f}% → {solution.metrics.efficiency_score:.1f}%")
+            
+            solution.metrics.heuristic_iters = result.iterations
+            solution.metrics.grasp_starts = result.starts
+            solution.metrics.grasp_iterations_per_second = result.iterations_per_second
+            solution.metrics.grasp_trajectory = list(result.trajectory)
+            if result.target_reached:
+                solution.metrics.stop_reason = "gap_reached"
+            return solution
                 
         except Exception as e:
             self.logger.warning(f"🚀 GRASP: Errore durante ottimizzazione: {str(e)}")
@@ -2838,7 +4580,28 @@ class NestingModel:
             # Ordina tool esclusi per area decrescente (priorità ai grandi)
             excluded_sorted = sorted(excluded_tools, key=lambda t: t.width * t.height, reverse=True)
             
+            packer = None
+            if self.parameters.placement_engine == "maxrects":
+                packer = self._create_maxrects_packer(autoclave, final_layouts, int(padding_compatto))
+            
             for tool in excluded_sorted:
+                if packer is not None:
+                    best_position = packer.insert(tool.width, tool.height)
+                    if best_position:
+                        x, y, width, height, rotated = best_position
+                        final_layouts.append(NestingLayout(
+                            odl_id=tool.odl_id,
+                            x=float(x),
+                            y=float(y),
+                            width=float(width),
+                            height=float(height),
+                            weight=tool.weight,
+                            rotated=rotated,
+                            lines_used=tool.lines_needed
+                        ))
+                        self.logger.info(f"🔧 REINSERITO (MaxRects): ODL {tool.odl_id} in ({x:.1f}, {y:.1f})")
+                    continue
+                
                 # Usa strategie di posizionamento per tentare inserimento
                 strategies = [
                     self._strategy_space_optimization,
@@ -13,7 +13,10 @@ Basato su solver.py esistente con estensioni per gestire piano base + cavalletto
 import logging
 import math
 import random
+import threading
 import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
 from typing import List, Dict, Any, Tuple, Optional
 from dataclasses import dataclass, field
 from ortools.sat.python import cp_model
@@ -29,6 +32,7 @@ from schemas.batch_nesting import (
 
 # 🆕 IMPORT SOLVER PRINCIPALE per integrazione sequenziale
 from .solver import NestingModel, NestingParameters, ToolInfo, AutoclaveInfo, NestingLayout, NestingSolution
+from .spatial_index import RectIndex, LayoutIndexCache, LINEAR_SCAN_THRESHOLD
 
 # Configurazione logger
 logger = logging.getLogger(__name__)
@@ -44,6 +48,10 @@ class NestingParameters2L:
     allow_heuristic: bool = True
     timeout_override: Optional[int] = None
     heavy_piece_threshold_kg: float = 50.0
+    mode: str = "thorough"  # Modalità di solve del livello 0: fast | balanced | thorough (vedi solver.SOLVE_MODES)
+    level_strategy: str = "sequential"  # sequential: piano poi cavalletti | joint: CP-SAT congiunto sui due livelli
+    joint_time_limit_seconds: float = 10.0  # Budget del modello congiunto (warm start dalla soluzione sequenziale)
+    cavalletti_strategy: str = "auto"  # auto: strategia per numero di tool | all: tutte in parallelo, vince la migliore
     
     # Parametri specifici per due livelli (configurabili dal frontend)
     use_cavalletti: bool = True  # Abilita secondo livello
@@ -158,6 +166,8 @@ class NestingMetrics2LLocal:
     algorithm_used: str = ""
     complexity_score: float = 0.0
     timeout_used: float = 0.0
+    mode_used: str = ""  # Modalità di solve applicata al livello 0
+    sequential_score: float = 0.0  # Score della soluzione sequenziale (confronto con la strategia joint)
 
 @dataclass
 class NestingSolution2L:
@@ -259,6 +269,129 @@ class CavallettiFixedConfiguration:
     # Orientamento (sempre trasversale al lato corto)
     orientation: str = "horizontal"  # I cavalletti sono sempre orizzontali
 
+class FixedSupportModel:
+    """
+    Modello precalcolato dei cavalletti fissi di un'autoclave.
+
+    Ogni cavalletto fisso occupa sul piano [x, x + spessore] × [y, y + lunghezza]
+    (in CavallettoFixedPosition lo spessore è `height`, la lunghezza trasversale `width`).
+    I segmenti fissi non si sovrappongono: ordinati per inizio lo sono anche per fine,
+    quindi i supporti sotto [x0, x1] sono un intervallo contiguo trovato con due bisect.
+    """
+
+    def __init__(self, positions: List[CavallettoFixedPosition]):
+        self.positions = sorted(positions, key=lambda cav: cav.x)
+        self._starts = [cav.x for cav in self.positions]
+        self._ends = [cav.x + cav.height for cav in self.positions]
+        self._centers = [cav.x + cav.height / 2 for cav in self.positions]
+        self._y_start = min((cav.y for cav in self.positions), default=0.0)
+        self._y_end = max((cav.y + cav.width for cav in self.positions), default=0.0)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def _span(self, x: float, width: float) -> Tuple[int, int]:
+        """Indici [i0, i1) dei supporti con overlap stretto lungo X"""
+        return bisect_right(self._ends, x), bisect_left(self._starts, x + width)
+
+    def count(self, x: float, y: float, width: float, height: float) -> int:
+        """Numero di cavalletti fissi sotto [x, x+width] × [y, y+height] in O(log k)"""
+        if y + height <= self._y_start or self._y_end <= y:
+            return 0
+        i0, i1 = self._span(x, width)
+        return max(0, i1 - i0)
+
+    def is_supported(self, x: float, y: float, width: float, height: float, minimum: int = 2) -> bool:
+        """Almeno `minimum` supporti sotto il tool, con almeno uno per lato rispetto al centro"""
+        if self.count(x, y, width, height) < minimum:
+            return False
+        i0, i1 = self._span(x, width)
+        center = x + width / 2
+        return self._centers[i0] < center <= self._centers[i1 - 1]
+
+    def supported_x_ranges(self, width: float, x_min: int, x_max: int) -> List[Tuple[int, int]]:
+        """
+        Intervalli interi chiusi di x in [x_min, x_max] per cui un tool largo `width` è supportato.
+
+        is_supported cambia valore solo ai breakpoint (ingresso/uscita di un supporto,
+        centro del tool su un centro supporto): basta valutare i breakpoint e un punto
+        interno per ciascun tratto, O(k log k) invece di una scansione su x.
+        """
+        if x_min > x_max or len(self.positions) < 2:
+            return []
+        points = {x_min, x_max}
+        for start, end, center in zip(self._starts, self._ends, self._centers):
+            for breakpoint in (start - width, end, center - width / 2):
+                for value in (math.floor(breakpoint), math.ceil(breakpoint)):
+                    if x_min <= value <= x_max:
+                        points.add(value)
+        ordered = sorted(points)
+        samples = []
+        for a, b in zip(ordered, ordered[1:]):
+            samples.append((a, a))
+            if b - a > 1:
+                samples.append((a + 1, b - 1))
+        samples.append((ordered[-1], ordered[-1]))
+
+        ranges: List[Tuple[int, int]] = []
+        for low, high in samples:
+            # Il predicato è costante su ogni tratto aperto tra breakpoint consecutivi
+            if not self.is_supported(low, self._y_start, width, 1):
+                continue
+            if ranges and ranges[-1][1] + 1 >= low:
+                ranges[-1] = (ranges[-1][0], high)
+            else:
+                ranges.append((low, high))
+        return ranges
+
+
+@dataclass
+class ReachableDomain:
+    """
+    Posizioni raggiungibili da un tool nel modello CP-SAT 2L (estremi inclusi).
+
+    L'area occupabile sul piano è [x_min, x_max + width_max] × [y_min, y_max + height_max];
+    per il livello 1 l'angolo resta in level_1_x × [y_min, y_max] (None se il livello 1 è escluso).
+    """
+    x_min: int
+    x_max: int
+    y_min: int
+    y_max: int
+    width_max: int
+    height_max: int
+    level_1_x: Optional[Tuple[int, int]] = None
+
+    def level_0_box(self) -> Tuple[int, int, int, int]:
+        """Bounding box (x, y, larghezza, altezza) dell'area occupabile sul piano"""
+        return (self.x_min, self.y_min,
+                self.x_max + self.width_max - self.x_min, self.y_max + self.height_max - self.y_min)
+
+
+@dataclass
+class CavallettiConflictGraph:
+    """
+    Grafo sparso delle interferenze cavalletto/piano: (tool livello 1, tool livello 0) →
+    indici dei cavalletti del primo che possono cadere sull'area raggiungibile dal secondo.
+    """
+    edges: Dict[Tuple[int, int], List[int]] = field(default_factory=dict)
+    relative_positions: Dict[int, List[Dict[str, float]]] = field(default_factory=dict)
+    naive_count: int = 0  # Vincoli emessi dal ciclo completo tool × cavalletto × tool
+
+    @property
+    def constraint_count(self) -> int:
+        return sum(len(positions) for positions in self.edges.values())
+
+    @property
+    def saved_count(self) -> int:
+        return self.naive_count - self.constraint_count
+
+
+# Modelli dei cavalletti fissi riusati tra solve (chiave: geometria autoclave + configurazione)
+_FIXED_SUPPORT_CACHE: "OrderedDict[Tuple, FixedSupportModel]" = OrderedDict()
+_FIXED_SUPPORT_CACHE_SIZE = 64
+_FIXED_SUPPORT_LOCK = threading.Lock()
+
+
 class NestingModel2L:
     """Modello di nesting a due livelli con supporto cavalletti - CONFIGURAZIONE DINAMICA"""
     
@@ -286,6 +419,9 @@ class NestingModel2L:
         
         self.base_solver = NestingModel(base_params)
         
+        # 🆕 Indice spaziale dei layout per query di overlap nei loop candidati
+        self._layout_index_cache = LayoutIndexCache()
+        
         # Statistiche e metriche
         self.stats = {
             'total_solve_time': 0.0,
@@ -419,9 +555,15 @@ class NestingModel2L:
             autoclave, 
             start_time
         )
+        final_solution.metrics.sequential_score = final_solution.metrics.efficiency_score
+        
+        # 5b. Strategia joint: CP-SAT congiunto sui due livelli con warm start sequenziale
+        if self.parameters.level_strategy == "joint":
+            final_solution = self._solve_joint_2l(valid_tools, excluded_tools, autoclave, final_solution, start_time)
         
         # 6. Aggiungi calcolo cavalletti alla soluzione finale
         final_solution = self._add_cavalletti_with_advanced_optimizer(final_solution, autoclave)
+        final_solution.metrics.mode_used = self.parameters.mode
         
         return final_solution
     
@@ -512,9 +654,9 @@ class NestingModel2L:
             # Aggiunta vincoli base
             self._add_cpsat_constraints_2l(model, tools, autoclave, variables)
             
-            # Aggiungi vincoli interferenza cavalletti (TEMPORANEAMENTE DISABILITATO)
-            # if autoclave.has_cavalletti:
-            #     self._add_cavalletti_interference_constraints_2l(model, tools, autoclave, variables)
+            # Aggiungi vincoli interferenza cavalletti (grafo sparso dei conflitti possibili)
+            if autoclave.has_cavalletti:
+                self._add_cavalletti_interference_constraints_2l(model, tools, autoclave, variables)
             
             # Aggiungi funzione obiettivo
             self._add_cpsat_objective_2l(model, tools, autoclave, variables)
@@ -904,6 +1046,15 @@ class NestingModel2L:
         
         self.logger.info(f"✅ [2L] Vincoli stabilità cavalletti: {stability_constraints_added} vincoli aggiunti (X+Y separazione)")
     
+    def _cpsat_fixed_support_config(self) -> CavallettiFixedConfiguration:
+        """Configurazione dei cavalletti fissi usata dai vincoli di supporto CP-SAT"""
+        return CavallettiFixedConfiguration(
+            distribute_evenly=True,
+            min_distance_from_edges=100.0,
+            min_spacing_between_cavalletti=200.0,
+            orientation="horizontal"
+        )
+
     def _add_fixed_support_constraints_2l(
         self,
         model: cp_model.CpModel,
@@ -920,14 +1071,7 @@ class NestingModel2L:
         self.logger.info("🔧 [2L] Aggiunta vincoli supporto cavalletti fissi (standard aeronautico)")
         
         # Genera cavalletti fissi per questa autoclave
-        fixed_config = CavallettiFixedConfiguration(
-            distribute_evenly=True,
-            min_distance_from_edges=100.0,
-            min_spacing_between_cavalletti=200.0,
-            orientation="horizontal"
-        )
-        
-        cavalletti_fissi = self.calcola_cavalletti_fissi_autoclave(autoclave, fixed_config)
+        cavalletti_fissi = self._fixed_support_model(autoclave, self._cpsat_fixed_support_config()).positions
         
         if not cavalletti_fissi:
             self.logger.warning("⚠️ Nessun cavalletto fisso disponibile - vincoli supporto non applicabili")
@@ -1107,102 +1251,184 @@ class NestingModel2L:
             cavalletto_width=autoclave.cavalletto_width,
             cavalletto_height=autoclave.cavalletto_height_mm
         )
-        constraint_count = 0
         
-        for i, tool_level_1 in enumerate(tools):
+        # Preprocessing: domini raggiungibili e grafo sparso dei conflitti possibili
+        graph = self._cavalletti_conflict_graph_2l(tools, autoclave, config)
+        
+        cav_width = int(config.cavalletto_width)
+        cav_height = int(config.cavalletto_height)
+        safety_margin = int(config.safety_margin_x + config.safety_margin_y)
+        
+        # Letterali condivisi: livello per tool, posizione assoluta per cavalletto, attivazione per coppia
+        on_level = {}
+        cavalletto_abs = {}
+        
+        def level_literal(idx: int, level: int):
+            if (idx, level) not in on_level:
+                literal = model.NewBoolVar(f'level_{idx}_is_{level}')
+                model.Add(variables['level'][f"tool_{idx}"] == level).OnlyEnforceIf(literal)
+                model.Add(variables['level'][f"tool_{idx}"] != level).OnlyEnforceIf(literal.Not())
+                on_level[(idx, level)] = literal
+            return on_level[(idx, level)]
+        
+        for (i, j), pos_indices in graph.edges.items():
             tool_id_i = f"tool_{i}"
+            tool_id_j = f"tool_{j}"
             
-            # Solo per tool che possono andare su cavalletto
-            if not tool_level_1.can_use_cavalletto:
-                continue
-                
-            # Calcola posizioni relative cavalletti per questo tool
-            cavalletti_positions = self._calculate_cavalletti_positions_relative(tool_level_1, config)
+            # Condizione attiva: tool_i a livello 1 AND tool_j a livello 0 AND entrambi inclusi
+            interference_active = model.NewBoolVar(f'interference_{i}_{j}')
+            conditions = [
+                variables['included'][tool_id_i],
+                variables['included'][tool_id_j],
+                level_literal(i, 1),
+                level_literal(j, 0)
+            ]
+            model.AddBoolAnd(conditions).OnlyEnforceIf(interference_active)
+            model.AddBoolOr([cond.Not() for cond in conditions]).OnlyEnforceIf(interference_active.Not())
             
-            for pos_idx, pos in enumerate(cavalletti_positions):
-                # Per ogni posizione cavalletto, assicura che nessun tool di livello 0 la occupi
-                for j, tool_level_0 in enumerate(tools):
-                    if i == j:
-                        continue
-                    
-                    tool_id_j = f"tool_{j}"
-                    
-                    # Condizione attiva: tool_i a livello 1 AND tool_j a livello 0 AND entrambi inclusi
-                    interference_active = model.NewBoolVar(f'interference_{i}_{j}_{pos_idx}')
-                    
-                    # Definizione condizione attiva
-                    level_i_is_1 = model.NewBoolVar(f'level_i_is_1_{i}_{j}_{pos_idx}')
-                    level_j_is_0 = model.NewBoolVar(f'level_j_is_0_{i}_{j}_{pos_idx}')
-                    
-                    model.Add(variables['level'][tool_id_i] == 1).OnlyEnforceIf(level_i_is_1)
-                    model.Add(variables['level'][tool_id_i] != 1).OnlyEnforceIf(level_i_is_1.Not())
-                    model.Add(variables['level'][tool_id_j] == 0).OnlyEnforceIf(level_j_is_0)
-                    model.Add(variables['level'][tool_id_j] != 0).OnlyEnforceIf(level_j_is_0.Not())
-                    
-                    conditions = [
-                        variables['included'][tool_id_i],
-                        variables['included'][tool_id_j],
-                        level_i_is_1,
-                        level_j_is_0
-                    ]
-                    
-                    model.AddBoolAnd(conditions).OnlyEnforceIf(interference_active)
-                    model.AddBoolOr([cond.Not() for cond in conditions]).OnlyEnforceIf(interference_active.Not())
-                    
+            for pos_idx in pos_indices:
+                if (i, pos_idx) not in cavalletto_abs:
                     # 🔧 FIX CP-SAT: Usa variabili intermedie per evitare BoundedLinearExpression
-                    cavalletto_abs_x = model.NewIntVar(0, int(autoclave.width), f'cav_abs_x_{i}_{j}_{pos_idx}')
-                    cavalletto_abs_y = model.NewIntVar(0, int(autoclave.height), f'cav_abs_y_{i}_{j}_{pos_idx}')
-                    
-                    # Definizione delle variabili intermedie - FIX: usa int() per evitare float
-                    rel_x_int = int(round(pos['rel_x']))
-                    rel_y_int = int(round(pos['rel_y']))
-                    model.Add(cavalletto_abs_x == variables['x'][tool_id_i] + rel_x_int)
-                    model.Add(cavalletto_abs_y == variables['y'][tool_id_i] + rel_y_int)
-                    
-                    # Dimensioni cavalletto
-                    cav_width = int(config.cavalletto_width)
-                    cav_height = int(config.cavalletto_height)
-                    safety_margin = int(config.safety_margin_x + config.safety_margin_y)
-                    
-                    # Variabili booleane per non-sovrapposizione
-                    no_overlap_left = model.NewBoolVar(f'no_overlap_left_{i}_{j}_{pos_idx}')
-                    no_overlap_right = model.NewBoolVar(f'no_overlap_right_{i}_{j}_{pos_idx}')
-                    no_overlap_bottom = model.NewBoolVar(f'no_overlap_bottom_{i}_{j}_{pos_idx}')
-                    no_overlap_top = model.NewBoolVar(f'no_overlap_top_{i}_{j}_{pos_idx}')
-                    
-                    # Vincoli di non-sovrapposizione cavalletto con tool livello 0
-                    # Cavalletto completamente a sinistra del tool
-                    model.Add(
-                        cavalletto_abs_x + cav_width + safety_margin <= variables['x'][tool_id_j]
-                    ).OnlyEnforceIf([interference_active, no_overlap_left])
-                    
-                    # Cavalletto completamente a destra del tool
-                    model.Add(
-                        variables['x'][tool_id_j] + variables['width'][tool_id_j] + safety_margin <= cavalletto_abs_x
-                    ).OnlyEnforceIf([interference_active, no_overlap_right])
-                    
-                    # Cavalletto completamente sotto il tool
-                    model.Add(
-                        cavalletto_abs_y + cav_height + safety_margin <= variables['y'][tool_id_j]
-                    ).OnlyEnforceIf([interference_active, no_overlap_bottom])
-                    
-                    # Cavalletto completamente sopra il tool
-                    model.Add(
-                        variables['y'][tool_id_j] + variables['height'][tool_id_j] + safety_margin <= cavalletto_abs_y
-                    ).OnlyEnforceIf([interference_active, no_overlap_top])
-                    
-                    # Almeno una condizione di non-sovrapposizione deve essere vera quando c'è interferenza
-                    model.AddBoolOr([
-                        no_overlap_left, 
-                        no_overlap_right, 
-                        no_overlap_bottom, 
-                        no_overlap_top, 
-                        interference_active.Not()
-                    ])
-                    
-                    constraint_count += 1
+                    pos = graph.relative_positions[i][pos_idx]
+                    cavalletto_abs_x = model.NewIntVar(0, int(autoclave.width), f'cav_abs_x_{i}_{pos_idx}')
+                    cavalletto_abs_y = model.NewIntVar(0, int(autoclave.height), f'cav_abs_y_{i}_{pos_idx}')
+                    model.Add(cavalletto_abs_x == variables['x'][tool_id_i] + int(round(pos['rel_x'])))
+                    model.Add(cavalletto_abs_y == variables['y'][tool_id_i] + int(round(pos['rel_y'])))
+                    cavalletto_abs[(i, pos_idx)] = (cavalletto_abs_x, cavalletto_abs_y)
+                cavalletto_abs_x, cavalletto_abs_y = cavalletto_abs[(i, pos_idx)]
+                
+                # Variabili booleane per non-sovrapposizione
+                no_overlap_left = model.NewBoolVar(f'no_overlap_left_{i}_{j}_{pos_idx}')
+                no_overlap_right = model.NewBoolVar(f'no_overlap_right_{i}_{j}_{pos_idx}')
+                no_overlap_bottom = model.NewBoolVar(f'no_overlap_bottom_{i}_{j}_{pos_idx}')
+                no_overlap_top = model.NewBoolVar(f'no_overlap_top_{i}_{j}_{pos_idx}')
+                
+                # Cavalletto completamente a sinistra del tool
+                model.Add(
+                    cavalletto_abs_x + cav_width + safety_margin <= variables['x'][tool_id_j]
+                ).OnlyEnforceIf([interference_active, no_overlap_left])
+                
+                # Cavalletto completamente a destra del tool
+                model.Add(
+                    variables['x'][tool_id_j] + variables['width'][tool_id_j] + safety_margin <= cavalletto_abs_x
+                ).OnlyEnforceIf([interference_active, no_overlap_right])
+                
+                # Cavalletto completamente sotto il tool
+                model.Add(
+                    cavalletto_abs_y + cav_height + safety_margin <= variables['y'][tool_id_j]
+                ).OnlyEnforceIf([interference_active, no_overlap_bottom])
+                
+                # Cavalletto completamente sopra il tool
+                model.Add(
+                    variables['y'][tool_id_j] + variables['height'][tool_id_j] + safety_margin <= cavalletto_abs_y
+                ).OnlyEnforceIf([interference_active, no_overlap_top])
+                
+                # Almeno una condizione di non-sovrapposizione deve essere vera quando c'è interferenza
+                model.AddBoolOr([
+                    no_overlap_left, 
+                    no_overlap_right, 
+                    no_overlap_bottom, 
+                    no_overlap_top, 
+                    interference_active.Not()
+                ])
         
-        self.logger.info(f"✅ Vincoli interferenza cavalletti: {constraint_count} vincoli aggiunti")
+        saved_pct = graph.saved_count / graph.naive_count * 100 if graph.naive_count else 0.0
+        self.logger.info(
+            f"✅ Vincoli interferenza cavalletti: {graph.constraint_count} vincoli su {len(graph.edges)} coppie "
+            f"(risparmiati {graph.saved_count}/{graph.naive_count}, {saved_pct:.0f}%)"
+        )
+
+    def _reachable_domains_2l(
+        self,
+        tools: List[ToolInfo2L],
+        autoclave: AutoclaveInfo2L
+    ) -> List[Optional[ReachableDomain]]:
+        """
+        Domini di posizione raggiungibili da ogni tool con i vincoli del modello CP-SAT 2L:
+        bordi autoclave per entrambe le rotazioni, peso ammesso sul livello 1 e copertura di
+        almeno 2 cavalletti fissi (condizione necessaria di _add_fixed_support_constraints_2l).
+        None se il tool non entra nell'autoclave in nessuna orientazione.
+        """
+        width, height = int(autoclave.width), int(autoclave.height)
+        estimated_cavalletti = autoclave.num_cavalletti_utilizzati or (getattr(autoclave, 'max_cavalletti', 4) if autoclave.has_cavalletti else 0)
+        _, peso_max_livello_1 = self._calculate_dynamic_weight_limits(autoclave, estimated_cavalletti)
+        
+        fixed = self._fixed_support_model(autoclave, self._cpsat_fixed_support_config()).positions
+        starts = sorted(int(cav.x) for cav in fixed)
+        ends = sorted((int(cav.end_x) for cav in fixed), reverse=True)
+        
+        domains: List[Optional[ReachableDomain]] = []
+        for tool in tools:
+            sizes = [(int(w), int(h)) for w, h in ((tool.width, tool.height), (tool.height, tool.width))
+                     if int(w) <= width and int(h) <= height]
+            if not sizes:
+                domains.append(None)
+                continue
+            
+            domain = ReachableDomain(
+                x_min=0, x_max=width - min(w for w, _ in sizes),
+                y_min=0, y_max=height - min(h for _, h in sizes),
+                width_max=max(w for w, _ in sizes), height_max=max(h for _, h in sizes)
+            )
+            
+            if autoclave.has_cavalletti and tool.can_use_cavalletto and int(tool.weight) <= int(peso_max_livello_1):
+                low, high = domain.x_min, domain.x_max
+                if len(fixed) >= 2:
+                    # Almeno 2 cavalletti fissi sotto [x, x + w]: x + w > secondo inizio, x < penultima fine
+                    low = max(low, starts[1] - domain.width_max + 1)
+                    high = min(high, ends[1] - 1)
+                if low <= high:
+                    domain.level_1_x = (low, high)
+            domains.append(domain)
+        return domains
+
+    def _cavalletti_conflict_graph_2l(
+        self,
+        tools: List[ToolInfo2L],
+        autoclave: AutoclaveInfo2L,
+        config: CavallettiConfiguration
+    ) -> CavallettiConflictGraph:
+        """
+        Grafo sparso delle interferenze: una coppia (i livello 1, j livello 0) entra solo se
+        i due tool possono coesistere (linee vuoto, peso totale) e il bounding box raggiungibile
+        da un cavalletto di i (più margine di sicurezza) tocca l'area raggiungibile da j.
+        """
+        domains = self._reachable_domains_2l(tools, autoclave)
+        safety_margin = int(config.safety_margin_x + config.safety_margin_y)
+        graph = CavallettiConflictGraph()
+        
+        floor = RectIndex(cell_size=max(1.0, max(autoclave.width, autoclave.height) / 8))
+        for j, domain in enumerate(domains):
+            if domain is not None:
+                floor.insert(j, *domain.level_0_box())
+        
+        for i, tool in enumerate(tools):
+            if not tool.can_use_cavalletto:
+                continue
+            positions = self._calculate_cavalletti_positions_relative(tool, config)
+            graph.relative_positions[i] = positions
+            graph.naive_count += len(positions) * (len(tools) - 1)
+            
+            domain = domains[i]
+            if domain is None or domain.level_1_x is None:
+                continue
+            x_low, x_high = domain.level_1_x
+            for pos_idx, pos in enumerate(positions):
+                rel_x, rel_y = int(round(pos['rel_x'])), int(round(pos['rel_y']))
+                # Area spazzata dal cavalletto al variare della posizione del tool
+                box_x, box_y = x_low + rel_x, domain.y_min + rel_y
+                box_w = x_high - x_low + int(config.cavalletto_width)
+                box_h = domain.y_max - domain.y_min + int(config.cavalletto_height)
+                for j in floor.query(box_x, box_y, box_w, box_h, padding=safety_margin):
+                    if j == i or not self._can_coexist_2l(tool, tools[j], autoclave):
+                        continue
+                    graph.edges.setdefault((i, j), []).append(pos_idx)
+        return graph
+
+    def _can_coexist_2l(self, tool_a: ToolInfo2L, tool_b: ToolInfo2L, autoclave: AutoclaveInfo2L) -> bool:
+        """I due tool possono essere inclusi insieme (linee vuoto e peso totale del modello CP-SAT)"""
+        return (tool_a.lines_needed + tool_b.lines_needed <= autoclave.max_lines and
+                int(tool_a.weight) + int(tool_b.weight) <= int(autoclave.max_weight))
 
     def _calculate_cavalletti_positions_relative(
         self, 
@@ -2154,46 +2380,18 @@ class NestingModel2L:
         Returns:
             True se il tool è supportato da ≥2 cavalletti fissi (standard aeronautico)
         """
-        # Genera cavalletti fissi per questa autoclave
-        fixed_config = CavallettiFixedConfiguration(
-            distribute_evenly=True,
-            min_distance_from_edges=100.0,
-            min_spacing_between_cavalletti=200.0,
-            orientation="horizontal"
-        )
+        support_model = self._fixed_support_model(autoclave)
         
-        cavalletti_fissi = self.calcola_cavalletti_fissi_autoclave(autoclave, fixed_config)
-        
-        if not cavalletti_fissi:
+        if not len(support_model):
             self.logger.warning(f"⚠️ Nessun cavalletto fisso disponibile per supporto")
             return False
         
-        # Conta quanti cavalletti fissi supportano questo tool
-        supported_by = []
-        
-        for i, cav_fisso in enumerate(cavalletti_fissi):
-            # Verifica se il tool si sovrappone con questo cavalletto fisso
-            tool_start_x = x
-            tool_end_x = x + width
-            
-            cav_start_x = cav_fisso.x
-            cav_end_x = cav_fisso.end_x
-            
-            # Verifica sovrapposizione lungo X (i cavalletti attraversano tutto Y)
-            overlap_x = not (tool_end_x <= cav_start_x or cav_end_x <= tool_start_x)
-            
-            if overlap_x:
-                supported_by.append(i)
-        
-        num_supports = len(supported_by)
-        
         # Standard aeronautico: almeno 2 supporti
+        num_supports = support_model.count(x, y, width, height)
         is_sufficient = num_supports >= 2
         
         if not is_sufficient:
             self.logger.debug(f"❌ Tool ({x:.1f},{y:.1f}) {width:.0f}×{height:.0f}mm: solo {num_supports} supporti fissi (richiesti ≥2)")
-        else:
-            self.logger.debug(f"✅ Tool ({x:.1f},{y:.1f}) {width:.0f}×{height:.0f}mm: {num_supports} supporti fissi {supported_by}")
         
         return is_sufficient
 
@@ -2574,14 +2772,28 @@ class NestingModel2L:
         optimized = []
         removed_count = 0
         
+        # 🚀 Indici spaziali: tool per la ricerca adiacenze, cavalletti per i candidati alla rimozione
+        layouts_by_odl: Dict[int, NestingLayout2L] = {}
+        for layout in layouts:
+            layouts_by_odl.setdefault(layout.odl_id, layout)
+        layout_index = RectIndex.from_layouts(layouts)
+        cavalletti_index = RectIndex.from_rects(
+            (k, (c.x, c.y, c.width, c.height)) for k, c in enumerate(cavalletti)
+        )
+        active_cavalletti = dict(enumerate(cavalletti))
+        search_distance = max(
+            getattr(config, 'min_distance_between_cavalletti', 150.0),
+            max(config.cavalletto_width, config.cavalletto_height)
+        )
+        
         for cavalletto in cavalletti:
             # Trova tool supportato da questo cavalletto
-            tool_layout = next((l for l in layouts if l.odl_id == cavalletto.tool_odl_id), None)
+            tool_layout = layouts_by_odl.get(cavalletto.tool_odl_id)
             if not tool_layout:
                 continue
             
             # Cerca tool adiacenti che potrebbero condividere questo supporto
-            adjacent_tools = self._find_adjacent_tools(tool_layout, layouts, config)
+            adjacent_tools = self._find_adjacent_tools(tool_layout, layouts, config, layout_index)
             
             if adjacent_tools:
                 # Verifica se cavalletto può supportare tool multipli
@@ -2590,19 +2802,26 @@ class NestingModel2L:
                 )
                 
                 if can_share:
-                    # Rimuovi cavalletti ridondanti degli altri tool
-                    cavalletti_to_remove = [
-                        c for c in cavalletti 
-                        if c.tool_odl_id in [t.odl_id for t in adjacent_tools] 
-                        and self._cavalletti_overlap_significantly(cavalletto, c, config)
-                    ]
+                    # Rimuovi cavalletti ridondanti degli altri tool (solo candidati vicini dall'indice)
+                    adjacent_ids = {t.odl_id for t in adjacent_tools}
+                    keys_to_remove = sorted(
+                        k for k in cavalletti_index.near(
+                            cavalletto.x, cavalletto.y, cavalletto.width, cavalletto.height, search_distance
+                        )
+                        if active_cavalletti[k].tool_odl_id in adjacent_ids
+                        and self._cavalletti_overlap_significantly(cavalletto, active_cavalletti[k], config)
+                    )
+                    cavalletti_to_remove = [active_cavalletti[k] for k in keys_to_remove]
                     
                     if cavalletti_to_remove:
                         self.logger.debug(f"   Condivisione supporto: cavalletto ODL {cavalletto.tool_odl_id} "
                                         f"supporta anche {[t.odl_id for t in adjacent_tools]}")
                         removed_count += len(cavalletti_to_remove)
-                        # Rimuovi i cavalletti ridondanti dalla lista principale
-                        cavalletti = [c for c in cavalletti if c not in cavalletti_to_remove]
+                        # Rimuovi i cavalletti ridondanti (anche eventuali duplicati uguali)
+                        for k in list(active_cavalletti):
+                            if active_cavalletti[k] in cavalletti_to_remove:
+                                del active_cavalletti[k]
+                                cavalletti_index.remove(k)
             
             optimized.append(cavalletto)
         
@@ -2615,15 +2834,23 @@ class NestingModel2L:
         self,
         tool: NestingLayout2L,
         all_layouts: List[NestingLayout2L],
-        config: CavallettiConfiguration
+        config: CavallettiConfiguration,
+        layout_index: Optional[RectIndex] = None
     ) -> List[NestingLayout2L]:
         """
         🔧 NUOVO: Trova tool adiacenti che potrebbero condividere supporti
+        
+        Con `layout_index` (costruito su all_layouts) vengono esaminati solo i tool vicini
         """
         adjacent = []
         adjacency_threshold = config.min_distance_between_cavalletti  # Soglia vicinanza
         
-        for other_tool in all_layouts:
+        candidates = all_layouts
+        if layout_index is not None:
+            near_keys = layout_index.near(tool.x, tool.y, tool.width, tool.height, adjacency_threshold)
+            candidates = [all_layouts[k] for k in sorted(near_keys)]
+        
+        for other_tool in candidates:
             if other_tool.odl_id == tool.odl_id or other_tool.level != tool.level:
                 continue
             
@@ -2986,6 +3213,10 @@ class NestingModel2L:
         """
         Verifica se una posizione proposta si sovrappone con layout esistenti
         """
+        # 🚀 Layout numerosi: indice spaziale aggiornato incrementalmente tra le chiamate
+        if len(existing_layouts) >= LINEAR_SCAN_THRESHOLD:
+            return self._layout_index_cache.get(existing_layouts).intersects(x, y, width, height, padding)
+        
         for layout in existing_layouts:
             # Verifica sovrapposizione con padding
             if not (x + width + padding <= layout.x or 
@@ -3169,6 +3400,7 @@ class NestingModel2L:
                 use_fallback=True,
                 allow_heuristic=True,
                 timeout_override=None,
+                mode=self.parameters.mode,
                 use_multithread=True,
                 num_search_workers=8,
                 # Target: massimo riempimento livello 0
@@ -3263,6 +3495,7 @@ class NestingModel2L:
                     self.logger.warning(f"⚠️ [FASE 2] Tool ODL {tool.odl_id} → Non posizionabile su livello 1")
             
             self.logger.info(f"✅ [FASE 2] Completato: {len(level_1_layouts)}/{len(remaining_tools)} tool su livello 1")
+            self._validate_minimum_supports_per_tool(level_1_layouts, autoclave)
             return level_1_layouts
             
         except Exception as e:
@@ -3330,10 +3563,10 @@ class NestingModel2L:
         """
         padding = self.parameters.padding_mm
         
-        # 🔧 FIX CRITICO: Calcola cavalletti fissi PRIMA della ricerca posizioni
-        cavalletti_fissi = self.calcola_cavalletti_fissi_autoclave(autoclave)
-        if len(cavalletti_fissi) < 2:
-            self.logger.warning(f"⚠️ Autoclave {autoclave.id} ha solo {len(cavalletti_fissi)} cavalletti fissi, richiesti ≥2")
+        # 🔧 FIX CRITICO: Modello cavalletti fissi (precalcolato per autoclave) PRIMA della ricerca posizioni
+        support_model = self._fixed_support_model(autoclave)
+        if len(support_model) < 2:
+            self.logger.warning(f"⚠️ Autoclave {autoclave.id} ha solo {len(support_model)} cavalletti fissi, richiesti ≥2")
             return None
         
         # Genera punti candidati per livello 1
@@ -3357,7 +3590,7 @@ class NestingModel2L:
                     continue
                 
                 # 🔧 FIX CRITICO: Verifica supporto cavalletti fissi PRIMA di tutto
-                if not self._is_supported_by_fixed_cavalletti(x, y, width, height, cavalletti_fissi):
+                if not support_model.is_supported(x, y, width, height):
                     continue
                 
                 # 🆕 CHECK CRITICO: Interferenza cavalletti livello 1 con cavalletti livello 0
@@ -3369,62 +3602,7 @@ class NestingModel2L:
                 # Posizione valida trovata
                 return (x, y, width, height, rotated)
         
-                return None
-
-    def _is_supported_by_fixed_cavalletti(
-        self, 
-        x: float, 
-        y: float, 
-        width: float, 
-        height: float,
-        cavalletti_fissi: List[CavallettoFixedPosition]
-    ) -> bool:
-        """
-        🔧 FIX CRITICO: Verifica che il tool sia fisicamente supportato da ≥2 cavalletti fissi
-        
-        Implementa verifica fisica rigorosa:
-        - Conta cavalletti fissi che attraversano il tool
-        - Verifica distribuzione bilanciata (non tutti da un lato)
-        - Standard aeronautico: minimo 2 supporti distribuiti
-        """
-        supporting_count = 0
-        tool_center_x = x + width / 2
-        left_support = False
-        right_support = False
-        supporting_positions = []
-        
-        for cav in cavalletti_fissi:
-            # I cavalletti fissi attraversano tutta la larghezza Y dell'autoclave
-            # Verifica sovrapposizione lungo X con il tool
-            tool_start_x = x
-            tool_end_x = x + width
-            cav_start_x = cav.x
-            cav_end_x = cav.x + cav.height  # height = spessore del cavalletto
-            
-            # Verifica sovrapposizione X
-            overlap_x = not (tool_end_x <= cav_start_x or cav_end_x <= tool_start_x)
-            
-            if overlap_x:
-                supporting_count += 1
-                supporting_positions.append(cav.center_x)
-                
-                # Verifica distribuzione bilanciata
-                if cav.center_x < tool_center_x:
-                    left_support = True
-                else:
-                    right_support = True
-        
-        # Standard fisico aeronautico: ≥2 supporti E distribuzione bilanciata
-        is_supported = supporting_count >= 2 and left_support and right_support
-        
-        if not is_supported:
-            self.logger.debug(f"❌ Tool ({x:.0f},{y:.0f}) {width:.0f}×{height:.0f}mm: "
-                             f"supporti={supporting_count}, sinistra={left_support}, destra={right_support}")
-        else:
-            self.logger.debug(f"✅ Tool ({x:.0f},{y:.0f}) {width:.0f}×{height:.0f}mm: "
-                             f"{supporting_count} supporti bilanciati {supporting_positions}")
-        
-        return is_supported
+        return None
 
     def _has_cavalletti_interference_with_level_0(
         self,
@@ -3488,7 +3666,8 @@ class NestingModel2L:
         excluded_tools: List[Dict[str, Any]],
         original_tools: List[ToolInfo2L],
         autoclave: AutoclaveInfo2L,
-        start_time: float
+        start_time: float,
+        strategy: str = "SEQUENTIAL"
     ) -> NestingSolution2L:
         """Crea la soluzione finale combinando risultati livello 0 e 1"""
         
@@ -3498,13 +3677,13 @@ class NestingModel2L:
         metrics = self._calculate_metrics_2l(all_layouts, original_tools, autoclave, solve_time_ms)
         
         # Aggiorna informazioni algoritmo
-        metrics.algorithm_used = "SEQUENTIAL_2L"
+        metrics.algorithm_used = f"{strategy}_2L"
         metrics.complexity_score = self._calculate_dataset_complexity(original_tools, autoclave)
         
         success = len(all_layouts) > 0
-        status = "SEQUENTIAL_SUCCESS" if success else "SEQUENTIAL_FAILED"
+        status = f"{strategy}_SUCCESS" if success else f"{strategy}_FAILED"
         
-        message = f"Sequential 2L: L0={metrics.level_0_count}, L1={metrics.level_1_count}, Total={metrics.positioned_count}"
+        message = f"{strategy.capitalize()} 2L: L0={metrics.level_0_count}, L1={metrics.level_1_count}, Total={metrics.positioned_count}"
         
         return NestingSolution2L(
             layouts=all_layouts,
@@ -3515,6 +3694,77 @@ class NestingModel2L:
             message=message
         ) 
 
+    def _solve_joint_2l(
+        self,
+        tools: List[ToolInfo2L],
+        excluded_tools: List[Dict[str, Any]],
+        autoclave: AutoclaveInfo2L,
+        sequential: NestingSolution2L,
+        start_time: float
+    ) -> NestingSolution2L:
+        """
+        🧩 JOINT 2L: un solo modello CP-SAT decide livello, orientamento e posizione di ogni tool.
+        Parte dalla soluzione sequenziale (hint, ripulito dei posizionamenti non ammissibili) e la
+        sostituisce solo se lo score joint è almeno quello sequenziale validato (senza i tool di
+        livello 1 fuori margine o non supportati, che il modello congiunto esclude per costruzione).
+        Lo score sequenziale resta nelle metriche per confronto.
+        """
+        if self.parameters.mode == "fast":
+            self.logger.info("⏭️ [JOINT 2L] Saltato in modalità fast")
+            return sequential
+        
+        from .joint_2l import JointTwoLevelSolver
+        
+        try:
+            result = JointTwoLevelSolver(self, self.parameters.joint_time_limit_seconds).solve(
+                tools, autoclave, warm_start=sequential.layouts
+            )
+        except Exception as e:
+            self.logger.error(f"❌ [JOINT 2L] Errore modello congiunto, mantengo la soluzione sequenziale: {e}")
+            return sequential
+        
+        if not result.layouts:
+            return sequential
+        
+        joint = self._create_combined_solution_2l(
+            result.layouts, excluded_tools, tools, autoclave, start_time, strategy="JOINT"
+        )
+        joint.metrics.sequential_score = sequential.metrics.efficiency_score
+        valid_score = self._valid_sequential_score_2l(sequential, tools, autoclave)
+        if joint.metrics.efficiency_score < valid_score:
+            self.logger.info(
+                f"↩️ [JOINT 2L] Score {joint.metrics.efficiency_score:.2f} < sequenziale validato "
+                f"{valid_score:.2f} ({result.status}): mantengo la soluzione sequenziale"
+            )
+            return sequential
+        
+        self.logger.info(
+            f"✅ [JOINT 2L] Score {sequential.metrics.efficiency_score:.2f} (validato {valid_score:.2f}) → "
+            f"{joint.metrics.efficiency_score:.2f} (L0={joint.metrics.level_0_count}, L1={joint.metrics.level_1_count})"
+        )
+        return joint
+    
+    def _invalid_level_1_2l(self, layouts: List[NestingLayout2L], autoclave: AutoclaveInfo2L) -> set:
+        """ODL dei tool di livello 1 fuori dai margini o senza supporto dai cavalletti fissi"""
+        margin = self.parameters.min_distance_mm
+        upper = [l for l in layouts if l.level == 1]
+        outside = {l.odl_id for l in upper if l.x < margin or l.y < margin or
+                   l.x + l.width > autoclave.width - margin or l.y + l.height > autoclave.height - margin}
+        return outside | set(self._validate_minimum_supports_per_tool(upper, autoclave))
+    
+    def _valid_sequential_score_2l(
+        self,
+        sequential: NestingSolution2L,
+        tools: List[ToolInfo2L],
+        autoclave: AutoclaveInfo2L
+    ) -> float:
+        """Score della soluzione sequenziale senza i tool di livello 1 non validi"""
+        invalid = self._invalid_level_1_2l(sequential.layouts, autoclave)
+        if not invalid:
+            return sequential.metrics.efficiency_score
+        valid = [l for l in sequential.layouts if not (l.level == 1 and l.odl_id in invalid)]
+        return self._calculate_metrics_2l(valid, tools, autoclave, 0.0).efficiency_score
+
     def calcola_cavalletti_fissi_autoclave(
         self, 
         autoclave: AutoclaveInfo2L, 
@@ -3657,6 +3907,35 @@ class NestingModel2L:
             self.logger.debug(f"   Cavalletto #{i}: X={cav.x:.1f}-{cav.end_x:.1f}mm, Y={cav.y:.1f}-{cav.end_y:.1f}mm")
         
         return cavalletti_positions
+
+    def _fixed_support_model(
+        self,
+        autoclave: AutoclaveInfo2L,
+        config: CavallettiFixedConfiguration = None
+    ) -> FixedSupportModel:
+        """
+        Modello dei cavalletti fissi dell'autoclave, calcolato una volta per geometria e configurazione
+        e condiviso tra tool, candidati e solve successivi
+        """
+        if config is None:
+            config = CavallettiFixedConfiguration()
+        key = (
+            autoclave.width, autoclave.height, autoclave.max_cavalletti, autoclave.cavalletto_thickness_mm,
+            config.distribute_evenly, config.min_distance_from_edges,
+            config.min_spacing_between_cavalletti, config.orientation
+        )
+        with _FIXED_SUPPORT_LOCK:
+            support_model = _FIXED_SUPPORT_CACHE.get(key)
+            if support_model is not None:
+                _FIXED_SUPPORT_CACHE.move_to_end(key)
+                return support_model
+
+        support_model = FixedSupportModel(self.calcola_cavalletti_fissi_autoclave(autoclave, config))
+        with _FIXED_SUPPORT_LOCK:
+            _FIXED_SUPPORT_CACHE[key] = support_model
+            while len(_FIXED_SUPPORT_CACHE) > _FIXED_SUPPORT_CACHE_SIZE:
+                _FIXED_SUPPORT_CACHE.popitem(last=False)
+        return support_model
     
     def _validate_cavalletti_non_interference(
         self, 
@@ -3680,58 +3959,48 @@ class NestingModel2L:
 
     def _validate_minimum_supports_per_tool(
         self, 
-        cavalletti: List[CavallettoFixedPosition], 
         level_1_tools: List[NestingLayout2L],
-        config: CavallettiConfiguration
-    ) -> None:
+        autoclave: AutoclaveInfo2L
+    ) -> List[int]:
         """
-        ✅ VALIDAZIONE AERONAUTICA: Verifica che ogni tool abbia almeno 2 supporti
+        ✅ VALIDAZIONE AERONAUTICA: Verifica che ogni tool abbia almeno 2 supporti fissi bilanciati
+        
+        Returns:
+            ODL dei tool di livello 1 senza supporto sufficiente
         """
+        support_model = self._fixed_support_model(autoclave)
+        violations = []
         for tool_layout in level_1_tools:
-            tool_cavalletti = [c for c in cavalletti if c.tool_odl_id == tool_layout.odl_id]
-            
-            if len(tool_cavalletti) < 2:
-                self.logger.error(f"❌ VIOLAZIONE STANDARD AERONAUTICO: ODL {tool_layout.odl_id} ha solo {len(tool_cavalletti)} supporti (richiesti ≥2)")
-                self.logger.error(f"   Tool: ({tool_layout.x:.1f},{tool_layout.y:.1f}) {tool_layout.width:.1f}x{tool_layout.height:.1f}")
-                
-                # 🚨 CORREZIONE AUTOMATICA: Forza 2 cavalletti minimi
-                if len(tool_cavalletti) == 0:
-                    # Nessun cavalletto - genera 2 cavalletti di emergenza
-                    emergency_cavalletti = self._genera_cavalletti_orizzontali(tool_layout, 2, config)
-                    for i, cav_pos in enumerate(emergency_cavalletti):
-                        emergency_fixed = CavallettoFixedPosition(
-                            x=cav_pos.x,
-                            y=cav_pos.y,
-                            width=cav_pos.width,
-                            height=cav_pos.height,
-                            sequence_number=len(cavalletti) + i,
-                            orientation="horizontal",
-                            tool_odl_id=tool_layout.odl_id
-                        )
-                        cavalletti.append(emergency_fixed)
-                    self.logger.warning(f"🔧 Correzione automatica: Aggiunti 2 cavalletti di emergenza per ODL {tool_layout.odl_id}")
-                    
-                elif len(tool_cavalletti) == 1:
-                    # 1 cavalletto - aggiungi un secondo
-                    existing_cav = tool_cavalletti[0]
-                    # Posiziona il secondo cavalletto all'estremità opposta
-                    if existing_cav.x < tool_layout.x + tool_layout.width / 2:
-                        # Cavalletto esistente a sinistra, aggiungi a destra
-                        new_x = tool_layout.x + tool_layout.width - config.cavalletto_width - config.min_distance_from_edge
-                    else:
-                        # Cavalletto esistente a destra, aggiungi a sinistra
-                        new_x = tool_layout.x + config.min_distance_from_edge
-                    
-                    new_cavalletto = CavallettoFixedPosition(
-                        x=new_x,
-                        y=existing_cav.y,
-                        width=config.cavalletto_width,
-                        height=config.cavalletto_height,
-                        sequence_number=len(cavalletti),
-                        orientation="horizontal",
-                        tool_odl_id=tool_layout.odl_id
-                    )
-                    cavalletti.append(new_cavalletto)
+            if support_model.is_supported(tool_layout.x, tool_layout.y, tool_layout.width, tool_layout.height):
+                continue
+            num_supports = support_model.count(tool_layout.x, tool_layout.y, tool_layout.width, tool_layout.height)
+            self.logger.error(f"❌ VIOLAZIONE STANDARD AERONAUTICO: ODL {tool_layout.odl_id} ha {num_supports} supporti fissi (richiesti ≥2 bilanciati)")
+            self.logger.error(f"   Tool: ({tool_layout.x:.1f},{tool_layout.y:.1f}) {tool_layout.width:.1f}x{tool_layout.height:.1f}")
+            violations.append(tool_layout.odl_id)
+        return violations
+
+    def _advanced_cavalletti_config(self, autoclave: AutoclaveInfo2L) -> CavallettiConfiguration:
+        """Configurazione cavalletti usata dall'ottimizzatore avanzato (dimensioni dal database autoclave)"""
+        return CavallettiConfiguration(
+            cavalletto_width=autoclave.cavalletto_width or 80.0,
+            cavalletto_height=autoclave.cavalletto_height_mm or 60.0,
+            min_distance_from_edge=30.0,
+            max_span_without_support=400.0,
+            min_distance_between_cavalletti=200.0,
+            safety_margin_x=5.0,
+            safety_margin_y=5.0,
+            prefer_symmetric=True,
+            force_minimum_two=True
+        )
+
+    def _get_cavalletti_optimizer(self):
+        """Ottimizzatore cavalletti avanzato (quello configurato dall'endpoint, altrimenti uno nuovo)"""
+        optimizer = getattr(self, '_cavalletti_optimizer', None)
+        if optimizer is None:
+            from .cavalletti_optimizer import CavallettiOptimizerAdvanced
+            optimizer = CavallettiOptimizerAdvanced()
+            self._cavalletti_optimizer = optimizer
+        return optimizer
 
     def _add_cavalletti_with_advanced_optimizer(
         self, 
@@ -3744,7 +4013,7 @@ class NestingModel2L:
         Sostituisce il sistema problematico con l'ottimizzatore industriale completamente implementato.
         """
         try:
-            from .cavalletti_optimizer import CavallettiOptimizerAdvanced, OptimizationStrategy
+            from .cavalletti_optimizer import OptimizationStrategy
             
             # Verifica se ci sono tool di livello 1 che necessitano cavalletti
             level_1_layouts = [l for l in solution.layouts if l.level == 1]
@@ -3755,38 +4024,36 @@ class NestingModel2L:
             self.logger.info(f"🔧 [OTTIMIZZATORE AVANZATO] Calcolo cavalletti per {len(level_1_layouts)} tool")
             
             # Crea configurazione cavalletti dal database autoclave
-            config = CavallettiConfiguration(
-                cavalletto_width=autoclave.cavalletto_width or 80.0,
-                cavalletto_height=autoclave.cavalletto_height_mm or 60.0,
-                min_distance_from_edge=30.0,
-                max_span_without_support=400.0,
-                min_distance_between_cavalletti=200.0,
-                safety_margin_x=5.0,
-                safety_margin_y=5.0,
-                prefer_symmetric=True,
-                force_minimum_two=True
-            )
+            config = self._advanced_cavalletti_config(autoclave)
             
             # Inizializza ottimizzatore avanzato
-            optimizer = CavallettiOptimizerAdvanced()
+            optimizer = self._get_cavalletti_optimizer()
             
-            # Determina strategia basata sulla complessità
-            if len(level_1_layouts) <= 8:
-                strategy = OptimizationStrategy.BALANCED
-            elif len(level_1_layouts) <= 25:
-                strategy = OptimizationStrategy.INDUSTRIAL
+            if self.parameters.cavalletti_strategy == "all":
+                # Tutte le strategie in parallelo: vince il punteggio migliore
+                optimization_result = optimizer.optimize_cavalletti_all_strategies(
+                    layouts=solution.layouts,
+                    autoclave=autoclave,
+                    config=config
+                )
             else:
-                strategy = OptimizationStrategy.AEROSPACE
-            
-            self.logger.info(f"   Strategia ottimizzazione: {strategy.value}")
-            
-            # Applica ottimizzazione avanzata
-            optimization_result = optimizer.optimize_cavalletti_complete(
-                layouts=solution.layouts,  # Passa tutti i layout, l'ottimizzatore filtra livello 1
-                autoclave=autoclave,
-                config=config,
-                strategy=strategy
-            )
+                # Determina strategia basata sulla complessità
+                if len(level_1_layouts) <= 8:
+                    strategy = OptimizationStrategy.BALANCED
+                elif len(level_1_layouts) <= 25:
+                    strategy = OptimizationStrategy.INDUSTRIAL
+                else:
+                    strategy = OptimizationStrategy.AEROSPACE
+                
+                self.logger.info(f"   Strategia ottimizzazione: {strategy.value}")
+                
+                # Applica ottimizzazione avanzata
+                optimization_result = optimizer.optimize_cavalletti_complete(
+                    layouts=solution.layouts,  # Passa tutti i layout, l'ottimizzatore filtra livello 1
+                    autoclave=autoclave,
+                    config=config,
+                    strategy=strategy
+                )
             
             # Aggiorna soluzione con risultati ottimizzazione
             solution.cavalletti_finali = optimization_result.cavalletti_finali
@@ -3796,7 +4063,10 @@ class NestingModel2L:
                 'riduzione_percentuale': optimization_result.riduzione_percentuale,
                 'limite_rispettato': optimization_result.limite_rispettato,
                 'strategia_applicata': optimization_result.strategia_applicata.value,
-                'physical_violations_fixed': optimization_result.physical_violations_fixed
+                'physical_violations_fixed': optimization_result.physical_violations_fixed,
+                'tempo_ms': optimization_result.tempo_ms,
+                'strategy_timings_ms': optimization_result.strategy_timings_ms,
+                'strategy_scores': optimization_result.strategy_scores
             }
             
             # 🔧 FIX CRITICO: Validazione fisica post-ottimizzazione
@@ -4048,74 +4318,100 @@ class NestingModel2L:
         """
         conflicts_resolved = 0
         
-        for i, layout1 in enumerate(layouts):
-            if layout1.level != 1:
-                continue
-                
-            for j, layout2 in enumerate(layouts[i+1:], i+1):
-                if layout2.level != 1:
-                    continue
+        for layout1, layout2 in self._find_x_adjacent_pairs(layouts, config.min_distance_between_cavalletti):
+            # VERIFICA ADIACENZA LUNGO X
+            # Calcola gap minimo tra i due tool
+            gap_x_left = abs(layout1.x + layout1.width - layout2.x)  # Layout1 a sinistra di layout2
+            gap_x_right = abs(layout2.x + layout2.width - layout1.x)  # Layout2 a sinistra di layout1
+            min_gap_x = min(gap_x_left, gap_x_right)
+            
+            # Tool consecutivi se gap < soglia
+            if min_gap_x < config.min_distance_between_cavalletti:
+                self.logger.debug(f"🔍 Tool consecutivi X: ODL {layout1.odl_id} ↔ ODL {layout2.odl_id} (gap: {min_gap_x:.1f}mm)")
                 
-                # VERIFICA ADIACENZA LUNGO X
-                # Calcola gap minimo tra i due tool
-                gap_x_left = abs(layout1.x + layout1.width - layout2.x)  # Layout1 a sinistra di layout2
-                gap_x_right = abs(layout2.x + layout2.width - layout1.x)  # Layout2 a sinistra di layout1
-                min_gap_x = min(gap_x_left, gap_x_right)
+                # TROVA CAVALLETTI ESTREMI
+                cav1_estremi = self._get_extreme_cavalletti(layout1, cavalletti_finali)
+                cav2_estremi = self._get_extreme_cavalletti(layout2, cavalletti_finali)
                 
-                # Tool consecutivi se gap < soglia
-                if min_gap_x < config.min_distance_between_cavalletti:
-                    self.logger.debug(f"🔍 Tool consecutivi X: ODL {layout1.odl_id} ↔ ODL {layout2.odl_id} (gap: {min_gap_x:.1f}mm)")
-                    
-                    # TROVA CAVALLETTI ESTREMI
-                    cav1_estremi = self._get_extreme_cavalletti(layout1, cavalletti_finali)
-                    cav2_estremi = self._get_extreme_cavalletti(layout2, cavalletti_finali)
-                    
-                    # VERIFICA CONFLITTI TRA ESTREMI
-                    for cav1 in cav1_estremi:
-                        for cav2 in cav2_estremi:
-                            if self._cavalletti_overlap_significantly(cav1, cav2, config):
-                                # CONFLITTO RILEVATO: Risolvi rimuovendo cavalletto meno critico
-                                conflict_msg = f"⚠️ Conflitto estremi: ODL {layout1.odl_id} ↔ ODL {layout2.odl_id}"
-                                self.logger.warning(conflict_msg)
+                # VERIFICA CONFLITTI TRA ESTREMI
+                for cav1 in cav1_estremi:
+                    for cav2 in cav2_estremi:
+                        if self._cavalletti_overlap_significantly(cav1, cav2, config):
+                            # CONFLITTO RILEVATO: Risolvi rimuovendo cavalletto meno critico
+                            conflict_msg = f"⚠️ Conflitto estremi: ODL {layout1.odl_id} ↔ ODL {layout2.odl_id}"
+                            self.logger.warning(conflict_msg)
+                            
+                            # Determina quale cavalletto rimuovere (tool più piccolo perde supporto)
+                            if layout1.area < layout2.area:
+                                cavalletto_to_remove = cav1
+                                layout_affected = layout1
+                            else:
+                                cavalletto_to_remove = cav2
+                                layout_affected = layout2
+                            
+                            # RIMUOVI CAVALLETTO CONFLITTUALE
+                            if cavalletto_to_remove in cavalletti_finali:
+                                cavalletti_finali.remove(cavalletto_to_remove)
+                                conflicts_resolved += 1
+                                self.logger.info(f"🔧 Rimosso cavalletto estremo ODL {layout_affected.odl_id} per conflitto")
                                 
-                                # Determina quale cavalletto rimuovere (tool più piccolo perde supporto)
-                                if layout1.area < layout2.area:
-                                    cavalletto_to_remove = cav1
-                                    layout_affected = layout1
-                                else:
-                                    cavalletto_to_remove = cav2
-                                    layout_affected = layout2
-                                
-                                # RIMUOVI CAVALLETTO CONFLITTUALE
-                                if cavalletto_to_remove in cavalletti_finali:
-                                    cavalletti_finali.remove(cavalletto_to_remove)
-                                    conflicts_resolved += 1
-                                    self.logger.info(f"🔧 Rimosso cavalletto estremo ODL {layout_affected.odl_id} per conflitto")
+                                # VERIFICA CHE IL TOOL ABBIA ANCORA SUPPORTO SUFFICIENTE
+                                remaining_cavalletti = [c for c in cavalletti_finali if c.tool_odl_id == layout_affected.odl_id]
+                                if len(remaining_cavalletti) < 2:
+                                    # CORREZIONE: Aggiungi cavalletto sostitutivo in posizione sicura
+                                    safe_x = self._find_safe_position_for_replacement(
+                                        layout_affected, cavalletti_finali, config
+                                    )
                                     
-                                    # VERIFICA CHE IL TOOL ABBIA ANCORA SUPPORTO SUFFICIENTE
-                                    remaining_cavalletti = [c for c in cavalletti_finali if c.tool_odl_id == layout_affected.odl_id]
-                                    if len(remaining_cavalletti) < 2:
-                                        # CORREZIONE: Aggiungi cavalletto sostitutivo in posizione sicura
-                                        safe_x = self._find_safe_position_for_replacement(
-                                            layout_affected, cavalletti_finali, config
-                                        )
-                                        
-                                        replacement_cavalletto = CavallettoFixedPosition(
-                                            x=safe_x - 40.0,
-                                            y=layout_affected.y + layout_affected.height / 2 - 30.0,
-                                            width=80.0,
-                                            height=60.0,
-                                            sequence_number=len(cavalletti_finali),
-                                            tool_odl_id=layout_affected.odl_id
-                                        )
-                                        cavalletti_finali.append(replacement_cavalletto)
-                                        self.logger.info(f"🔧 Aggiunto cavalletto sostitutivo per ODL {layout_affected.odl_id}")
+                                    replacement_cavalletto = CavallettoFixedPosition(
+                                        x=safe_x - 40.0,
+                                        y=layout_affected.y + layout_affected.height / 2 - 30.0,
+                                        width=80.0,
+                                        height=60.0,
+                                        sequence_number=len(cavalletti_finali),
+                                        tool_odl_id=layout_affected.odl_id
+                                    )
+                                    cavalletti_finali.append(replacement_cavalletto)
+                                    self.logger.info(f"🔧 Aggiunto cavalletto sostitutivo per ODL {layout_affected.odl_id}")
         
         if conflicts_resolved > 0:
             self.logger.info(f"✅ Risolti {conflicts_resolved} conflitti condivisione estremi")
         else:
             self.logger.info("✅ Nessun conflitto condivisione estremi rilevato")
 
+    def _find_x_adjacent_pairs(
+        self,
+        layouts: List[NestingLayout2L],
+        threshold: float
+    ) -> List[Tuple[NestingLayout2L, NestingLayout2L]]:
+        """
+        🚀 HELPER: Coppie (i < j) di tool livello 1 consecutivi lungo X in O(n log n + k)
+
+        Due tool sono consecutivi se |fine_i - inizio_j| < soglia oppure |fine_j - inizio_i| < soglia:
+        con bordi sinistri e destri ordinati ogni condizione è una ricerca binaria per intervallo,
+        invece del confronto di tutte le coppie.
+        """
+        level_1 = [i for i, layout in enumerate(layouts) if layout.level == 1]
+        starts = sorted((layouts[i].x, i) for i in level_1)
+        ends = sorted((layouts[i].x + layouts[i].width, i) for i in level_1)
+        start_keys = [s for s, _ in starts]
+        end_keys = [e for e, _ in ends]
+
+        pairs = set()
+        for i in level_1:
+            start_i = layouts[i].x
+            end_i = start_i + layouts[i].width
+            # Tool j che inizia vicino alla fine di i
+            for _, j in starts[bisect_right(start_keys, end_i - threshold):bisect_left(start_keys, end_i + threshold)]:
+                if j != i:
+                    pairs.add((min(i, j), max(i, j)))
+            # Tool j che finisce vicino all'inizio di i
+            for _, j in ends[bisect_right(end_keys, start_i - threshold):bisect_left(end_keys, start_i + threshold)]:
+                if j != i:
+                    pairs.add((min(i, j), max(i, j)))
+
+        return [(layouts[i], layouts[j]) for i, j in sorted(pairs)]
+
     def _get_extreme_cavalletti(
         self, 
         layout: NestingLayout2L, 
@@ -0,0 +1,278 @@
+"""
+CarbonPilot - Spatial Index per query di overlap
+Indice a griglia uniforme (bucket grid) di rettangoli condiviso da solver, solver_2l
+e cavalletti optimizer
+
+- Inserimento e rimozione incrementali
+- "Questo rettangolo collide?" e "quali rettangoli sono vicini?" visitando solo
+  le celle coperte dal rettangolo di query, invece di scansionare tutti i layout
+- Semantica identica ai controlli lineari esistenti: bordi a contatto NON sono overlap
+- sweep_pairs: sort-and-sweep su un asse per le coppie di intervalli vicini
+"""
+
+import heapq
+import math
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+Rect = Tuple[float, float, float, float]  # (x, y, width, height)
+
+# Sotto questa soglia la scansione lineare è più veloce della costruzione dell'indice
+LINEAR_SCAN_THRESHOLD = 12
+
+
+class RectIndex:
+    """
+    Griglia uniforme di bucket: ogni rettangolo è registrato in tutte le celle che copre.
+    Con celle dell'ordine della dimensione media dei pezzi una query visita O(1) celle
+    e confronta solo i rettangoli locali.
+    """
+
+    def __init__(self, cell_size: float = 200.0):
+        self.cell_size = max(1.0, float(cell_size))
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self._rects: Dict[Hashable, Rect] = {}
+
+    @classmethod
+    def from_rects(
+        cls,
+        items: Iterable[Tuple[Hashable, Rect]],
+        cell_size: Optional[float] = None
+    ) -> "RectIndex":
+        """Costruisce l'indice da coppie (chiave, rettangolo) con cella automatica"""
+        items = list(items)
+        if cell_size is None:
+            cell_size = _auto_cell_size(rect for _, rect in items)
+        index = cls(cell_size)
+        for key, (x, y, width, height) in items:
+            index.insert(key, x, y, width, height)
+        return index
+
+    @classmethod
+    def from_layouts(cls, layouts: Sequence[Any], cell_size: Optional[float] = None) -> "RectIndex":
+        """Costruisce l'indice da oggetti con x, y, width, height (chiave = posizione in lista)"""
+        return cls.from_rects(
+            ((i, (l.x, l.y, l.width, l.height)) for i, l in enumerate(layouts)),
+            cell_size
+        )
+
+    def __len__(self) -> int:
+        return len(self._rects)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rects
+
+    def get(self, key: Hashable) -> Optional[Rect]:
+        return self._rects.get(key)
+
+    # ------------------------------------------------------------------
+    # Aggiornamento incrementale
+    # ------------------------------------------------------------------
+
+    def insert(self, key: Hashable, x: float, y: float, width: float, height: float) -> None:
+        """Inserisce (o sostituisce) il rettangolo associato a `key`"""
+        if key in self._rects:
+            self.remove(key)
+        rect = (x, y, width, height)
+        self._rects[key] = rect
+        for cell in self._cells_for(x, y, x + width, y + height):
+            self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key: Hashable) -> bool:
+        """Rimuove il rettangolo associato a `key`; False se assente"""
+        rect = self._rects.pop(key, None)
+        if rect is None:
+            return False
+        x, y, width, height = rect
+        for cell in self._cells_for(x, y, x + width, y + height):
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._cells[cell]
+        return True
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    def query(
+        self,
+        x: float,
+        y: float,
+        width: float,
+        height: float,
+        padding: float = 0.0
+    ) -> List[Hashable]:
+        """
+        Chiavi dei rettangoli che si sovrappongono (interno, non solo contatto) al
+        rettangolo di query esteso di `padding` su ogni lato.
+        Equivale a: not (x+w+p <= rx or rx+rw+p <= x or y+h+p <= ry or ry+rh+p <= y)
+        """
+        x0, y0 = x - padding, y - padding
+        x1, y1 = x + width + padding, y + height + padding
+        result = []
+        for key in self._candidates(x0, y0, x1, y1):
+            rx, ry, rw, rh = self._rects[key]
+            if not (x1 <= rx or rx + rw <= x0 or y1 <= ry or ry + rh <= y0):
+                result.append(key)
+        return result
+
+    def intersects(
+        self,
+        x: float,
+        y: float,
+        width: float,
+        height: float,
+        padding: float = 0.0,
+        exclude: Optional[Hashable] = None
+    ) -> bool:
+        """True se il rettangolo (esteso di `padding`) collide con almeno un rettangolo indicizzato"""
+        x0, y0 = x - padding, y - padding
+        x1, y1 = x + width + padding, y + height + padding
+        for key in self._candidates(x0, y0, x1, y1):
+            if key == exclude:
+                continue
+            rx, ry, rw, rh = self._rects[key]
+            if not (x1 <= rx or rx + rw <= x0 or y1 <= ry or ry + rh <= y0):
+                return True
+        return False
+
+    def near(
+        self,
+        x: float,
+        y: float,
+        width: float,
+        height: float,
+        distance: float
+    ) -> List[Hashable]:
+        """
+        Chiavi dei rettangoli con distanza tra bordi <= `distance` su entrambi gli assi
+        (gap_x <= d and gap_y <= d, contatto e overlap inclusi)
+        """
+        x0, y0 = x - distance, y - distance
+        x1, y1 = x + width + distance, y + height + distance
+        result = []
+        for key in self._candidates(x0, y0, x1, y1):
+            rx, ry, rw, rh = self._rects[key]
+            if not (x1 < rx or rx + rw < x0 or y1 < ry or ry + rh < y0):
+                result.append(key)
+        return result
+
+    def near_point(self, cx: float, cy: float, radius: float) -> List[Hashable]:
+        """Chiavi dei rettangoli il cui centro dista strettamente meno di `radius` da (cx, cy)"""
+        result = []
+        radius_sq = radius * radius
+        for key in self._candidates(cx - radius, cy - radius, cx + radius, cy + radius):
+            rx, ry, rw, rh = self._rects[key]
+            dx = rx + rw / 2 - cx
+            dy = ry + rh / 2 - cy
+            if dx * dx + dy * dy < radius_sq:
+                result.append(key)
+        return result
+
+    def overlapping_pairs(self) -> List[Tuple[Hashable, Hashable]]:
+        """Tutte le coppie di rettangoli indicizzati che si sovrappongono (ciascuna una volta)"""
+        pairs = []
+        seen: Set[Tuple[Hashable, Hashable]] = set()
+        for bucket in self._cells.values():
+            keys = list(bucket)
+            for i, key_a in enumerate(keys):
+                ax, ay, aw, ah = self._rects[key_a]
+                for key_b in keys[i + 1:]:
+                    pair = (key_a, key_b) if _order_key(key_a) <= _order_key(key_b) else (key_b, key_a)
+                    if pair in seen:
+                        continue
+                    bx, by, bw, bh = self._rects[key_b]
+                    if not (ax + aw <= bx or bx + bw <= ax or ay + ah <= by or by + bh <= ay):
+                        seen.add(pair)
+                        pairs.append(pair)
+        pairs.sort(key=lambda p: (_order_key(p[0]), _order_key(p[1])))
+        return pairs
+
+    # ------------------------------------------------------------------
+    # Interni
+    # ------------------------------------------------------------------
+
+    def _cells_for(self, x0: float, y0: float, x1: float, y1: float):
+        size = self.cell_size
+        ix0, iy0 = math.floor(x0 / size), math.floor(y0 / size)
+        ix1, iy1 = math.floor(x1 / size), math.floor(y1 / size)
+        for ix in range(ix0, ix1 + 1):
+            for iy in range(iy0, iy1 + 1):
+                yield (ix, iy)
+
+    def _candidates(self, x0: float, y0: float, x1: float, y1: float) -> Set[Hashable]:
+        found: Set[Hashable] = set()
+        cells = self._cells
+        for cell in self._cells_for(x0, y0, x1, y1):
+            bucket = cells.get(cell)
+            if bucket:
+                found.update(bucket)
+        return found
+
+
+class LayoutIndexCache:
+    """
+    Cache a slot singolo dell'indice di una lista di layout.
+
+    I loop candidati interrogano ripetutamente la stessa lista, che nel frattempo
+    cresce solo per append: i nuovi elementi vengono inseriti incrementalmente,
+    qualsiasi altra modifica (lista diversa, elementi sostituiti o rimossi) ricostruisce.
+    """
+
+    def __init__(self):
+        self._layouts: Optional[List[Any]] = None
+        self._count = 0
+        self._last: Any = None
+        self._index: Optional[RectIndex] = None
+
+    def get(self, layouts: List[Any]) -> RectIndex:
+        count = len(layouts)
+        reusable = (
+            self._index is not None and
+            layouts is self._layouts and
+            count >= self._count and
+            (self._count == 0 or layouts[self._count - 1] is self._last)
+        )
+        if not reusable:
+            self._index = RectIndex.from_layouts(layouts)
+            self._layouts = layouts
+        else:
+            for i in range(self._count, count):
+                layout = layouts[i]
+                self._index.insert(i, layout.x, layout.y, layout.width, layout.height)
+        self._count = count
+        self._last = layouts[count - 1] if count else None
+        return self._index
+
+
+def sweep_pairs(
+    intervals: Iterable[Tuple[Hashable, float, float]],
+    gap: float = 0.0
+) -> List[Tuple[Hashable, Hashable]]:
+    """
+    Sort-and-sweep su un asse: coppie di intervalli (chiave, inizio, fine) separati da al più
+    `gap` (contatto e sovrapposizione inclusi), ciascuna una volta, in O(n log n + k).
+    Nella coppia viene prima l'intervallo che inizia prima (a parità, l'ordine di input).
+    """
+    ordered = sorted(intervals, key=lambda item: item[1])
+    active: List[Tuple[float, int, Hashable]] = []  # heap (fine, sequenza, chiave)
+    pairs = []
+    for seq, (key, start, end) in enumerate(ordered):
+        while active and active[0][0] + gap < start:
+            heapq.heappop(active)
+        pairs.extend((other, key) for _, _, other in active)
+        heapq.heappush(active, (end, seq, key))
+    return pairs
+
+
+def _auto_cell_size(rects: Iterable[Rect]) -> float:
+    """Cella pari alla dimensione media dei rettangoli (minimo 50mm)"""
+    sizes = [max(w, h) for _, _, w, h in rects]
+    if not sizes:
+        return 200.0
+    return max(50.0, sum(sizes) / len(sizes))
+
+
+def _order_key(key: Hashable):
+    return (0, key) if isinstance(key, (int, float)) else (1, str(key))
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark valutazione di tutte le strategie cavalletti
+
+Per ogni dimensione conta quante volte vince ogni strategia (punteggio di
+optimize_cavalletti_all_strategies) e il tempo medio per strategia: le strategie
+che non vincono mai sono candidate alla rimozione.
+
+Uso: python services/nesting/tests/bench_cavalletti_strategies.py
+"""
+
+import logging
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.cavalletti_optimizer import CavallettiOptimizerAdvanced, OptimizationStrategy
+from services.nesting.solver_2l import NestingLayout2L, AutoclaveInfo2L, CavallettiConfiguration
+
+
+def _dataset(count, seed):
+    rng = random.Random(seed)
+    columns = max(1, int(count ** 0.5))
+    layouts = []
+    for i in range(count):
+        row, column = divmod(i, columns)
+        layouts.append(NestingLayout2L(odl_id=i + 1, x=50.0 + column * 1000.0 + rng.uniform(0, 80),
+                                       y=50.0 + row * 700.0 + rng.uniform(0, 80),
+                                       width=rng.choice([300.0, 500.0, 700.0, 900.0]), height=rng.choice([300.0, 600.0]),
+                                       weight=rng.uniform(5, 150), level=1))
+    # Limite stretto in metà dei casi: a volte serve la riduzione forzata
+    max_cavalletti = rng.choice([None, count * 2])
+    autoclave = AutoclaveInfo2L(id=1, width=columns * 1000.0 + 100, height=(count // columns + 1) * 700.0 + 100,
+                                max_weight=1e6, max_lines=1000, has_cavalletti=True, max_cavalletti=max_cavalletti)
+    return layouts, autoclave
+
+
+def bench(count, seeds, workers):
+    wins = Counter()
+    timings = defaultdict(list)
+    elapsed = []
+    optimizer = CavallettiOptimizerAdvanced()
+    for seed in range(seeds):
+        layouts, autoclave = _dataset(count, seed)
+        start = time.perf_counter()
+        best = optimizer.optimize_cavalletti_all_strategies(layouts, autoclave, CavallettiConfiguration(),
+                                                            workers=workers)
+        elapsed.append((time.perf_counter() - start) * 1000)
+        wins[best.strategia_applicata.value] += 1
+        for strategy, ms in best.strategy_timings_ms.items():
+            timings[strategy].append(ms)
+    print(f"  {count:4d} tool, {seeds} dataset, {workers} worker: totale medio {sum(elapsed) / len(elapsed):7.1f}ms")
+    for strategy in OptimizationStrategy:
+        ms = timings[strategy.value]
+        print(f"    {strategy.value:10s} vittorie {wins[strategy.value]:2d} | tempo medio {sum(ms) / len(ms):7.1f}ms")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    print("🏁 Tutte le strategie cavalletti")
+    for count in (8, 25, 100, 400):
+        bench(count, seeds=10, workers=os.cpu_count() or 1)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark strategia 2L sequenziale vs modello CP-SAT congiunto
+
+Per ogni dataset confronta score, tool per livello e tempo. Per la soluzione
+sequenziale riporta anche i tool di livello 1 fuori dai margini o senza supporto
+dai cavalletti fissi (il modello congiunto li esclude per costruzione). La strategia
+joint restituisce la soluzione sequenziale se non raggiunge lo score validato.
+
+Uso: python services/nesting/tests/bench_joint_2l.py
+"""
+
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.solver_2l import NestingModel2L, NestingParameters2L, ToolInfo2L, AutoclaveInfo2L
+
+
+def _dataset(count, seed):
+    rng = random.Random(seed)
+    autoclave = AutoclaveInfo2L(id=1, width=3000, height=1500, max_weight=5000, max_lines=40, has_cavalletti=True,
+                                max_cavalletti=6, cavalletto_thickness_mm=60.0, peso_max_per_cavalletto_kg=300.0)
+    tools = [
+        ToolInfo2L(odl_id=i + 1, width=rng.choice([400, 600, 900, 1200]), height=rng.choice([300, 500, 700]),
+                   weight=rng.uniform(5, 40), lines_needed=1)
+        for i in range(count)
+    ]
+    return tools, autoclave
+
+
+def bench(count, seed, time_limit):
+    tools, autoclave = _dataset(count, seed)
+    rows = []
+    for strategy in ("sequential", "joint"):
+        model = NestingModel2L(NestingParameters2L(mode="balanced", level_strategy=strategy,
+                                                   joint_time_limit_seconds=time_limit))
+        start = time.perf_counter()
+        solution = model.solve_2l(tools, autoclave)
+        elapsed = time.perf_counter() - start
+        m = solution.metrics
+        invalid = model._invalid_level_1_2l(solution.layouts, autoclave)
+        rows.append(f"{strategy:10s} score {m.efficiency_score:5.1f} (solo validi {model._valid_sequential_score_2l(solution, tools, autoclave):5.1f}) | "
+                    f"L0 {m.level_0_count:2d} L1 {m.level_1_count:2d} | L1 non validi {len(invalid):2d} | {elapsed:5.1f}s")
+    print(f"  {count} tool (seed {seed}, joint {time_limit:.0f}s)")
+    for row in rows:
+        print(f"    {row}")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    print("🧩 Sequenziale vs joint 2L")
+    for count, seed in ((8, 1), (14, 2), (20, 3)):
+        bench(count, seed, time_limit=10)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark indice spaziale vs scansione lineare
+
+Misura il costo di una query di overlap al crescere del numero di layout e
+il costo di check_overlap (tutte le coppie) su layout densi.
+
+Uso: python services/nesting/tests/bench_spatial_index.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.spatial_index import RectIndex
+from services.nesting.solver import NestingModel, NestingParameters, NestingLayout
+
+
+def _layouts(count, seed=0):
+    rng = random.Random(seed)
+    side = (count ** 0.5) * 400
+    return [
+        NestingLayout(i, rng.uniform(0, side), rng.uniform(0, side), rng.uniform(100, 400), rng.uniform(100, 400), 1.0)
+        for i in range(count)
+    ]
+
+
+def _linear_has_overlap(x, y, w, h, layouts):
+    for l in layouts:
+        if not (x + w <= l.x or x >= l.x + l.width or y + h <= l.y or y >= l.y + l.height):
+            return True
+    return False
+
+
+def bench_queries(count, queries=2000):
+    layouts = _layouts(count)
+    rng = random.Random(1)
+    side = (count ** 0.5) * 400
+    probes = [(rng.uniform(0, side), rng.uniform(0, side), 200, 200) for _ in range(queries)]
+
+    start = time.perf_counter()
+    linear = [_linear_has_overlap(*p, layouts) for p in probes]
+    linear_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = RectIndex.from_layouts(layouts)
+    indexed = [index.intersects(*p) for p in probes]
+    index_time = time.perf_counter() - start
+
+    assert linear == indexed
+    print(f"  {count:5d} layout | lineare {linear_time / queries * 1e6:8.1f} µs/query | "
+          f"indice {index_time / queries * 1e6:8.1f} µs/query (build incluso) | x{linear_time / index_time:5.1f}")
+
+
+def bench_check_overlap(count):
+    layouts = _layouts(count, seed=2)
+    model = NestingModel(NestingParameters())
+
+    start = time.perf_counter()
+    linear_pairs = sum(
+        1 for i in range(count) for j in range(i + 1, count)
+        if _linear_has_overlap(layouts[i].x, layouts[i].y, layouts[i].width, layouts[i].height, [layouts[j]])
+    )
+    linear_time = time.perf_counter() - start
+
+    model.logger.disabled = True
+    start = time.perf_counter()
+    indexed_pairs = len(model.check_overlap(layouts))
+    index_time = time.perf_counter() - start
+
+    assert linear_pairs == indexed_pairs
+    print(f"  {count:5d} layout | coppie O(n²) {linear_time * 1000:8.1f} ms | "
+          f"indice {index_time * 1000:8.1f} ms | x{linear_time / index_time:5.1f}")
+
+
+if __name__ == "__main__":
+    print("🔍 Query di overlap singola")
+    for n in (10, 50, 200, 1000):
+        bench_queries(n)
+    print("🔍 check_overlap su tutte le coppie")
+    for n in (50, 200, 1000):
+        bench_check_overlap(n)
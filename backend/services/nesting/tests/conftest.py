@@ -0,0 +1,33 @@
+"""
+Helper condivisi dai test del nesting: tool casuali riproducibili e parametri del solver
+"""
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.solver import NestingParameters, ToolInfo
+
+
+def random_tools(count, seed, width=(200, 900), height=(150, 600), weight=20.0, lines=1, priorities=None):
+    """
+    Tool con dimensioni casuali (estremi inclusi) riproducibili dal seed.
+    Peso e linee: valore fisso o intervallo (min, max); priorities: valori tra cui scegliere
+    """
+    rng = random.Random(seed)
+
+    def draw(value):
+        return rng.randint(*value) if isinstance(value, tuple) else value
+
+    return [
+        ToolInfo(odl_id=i + 1, width=rng.randint(*width), height=rng.randint(*height), weight=draw(weight),
+                 lines_needed=draw(lines), priority=rng.choice(priorities) if priorities else 1)
+        for i in range(count)
+    ]
+
+
+def nesting_parameters(**overrides):
+    """Parametri comuni ai test (padding 10 mm, distanza minima 15 mm) con override"""
+    return NestingParameters(**{'padding_mm': 10, 'min_distance_mm': 15, **overrides})
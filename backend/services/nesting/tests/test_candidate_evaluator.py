@@ -0,0 +1,78 @@
+"""
+Test valutatore vettorizzato dei candidati: equivalenza con i controlli scalari del solver
+"""
+
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.candidate_evaluator import CandidateEvaluator, first_true
+from services.nesting.solver import NestingModel, NestingParameters, NestingLayout, ToolInfo, AutoclaveInfo
+
+
+AUTOCLAVE = AutoclaveInfo(id=1, width=2000, height=1200, max_weight=1000, max_lines=20)
+
+
+def _layouts(count, seed):
+    rng = random.Random(seed)
+    layouts = []
+    for i in range(count):
+        w, h = rng.uniform(80, 400), rng.uniform(80, 400)
+        layouts.append(NestingLayout(i, rng.uniform(0, AUTOCLAVE.width - w), rng.uniform(0, AUTOCLAVE.height - h), w, h, 1.0))
+    return layouts
+
+
+def test_masks_match_scalar_checks():
+    model = NestingModel(NestingParameters())
+    layouts = _layouts(10, seed=1)
+    evaluator = CandidateEvaluator.from_layouts(layouts, AUTOCLAVE)
+    rng = np.random.default_rng(2)
+    xs = rng.uniform(0, AUTOCLAVE.width, 500)
+    ys = rng.uniform(0, AUTOCLAVE.height, 500)
+
+    overlap = evaluator.overlap_mask(xs, ys, 150, 90)
+    waste = evaluator.waste_scores(xs, ys, 150, 90)
+    for i in range(len(xs)):
+        assert overlap[i] == model._has_overlap(xs[i], ys[i], 150, 90, layouts)
+        assert waste[i] == model._calculate_wasted_space(xs[i], ys[i], 150, 90, layouts, AUTOCLAVE)
+
+    skyline = model._build_skyline(layouts, AUTOCLAVE)
+    heights = evaluator.skyline_heights(xs, 150, skyline, 10)
+    for i in range(len(xs)):
+        assert heights[i] == model._find_skyline_y(xs[i], xs[i] + 150, skyline, 10)
+
+
+def test_evaluate_returns_mask_and_scores():
+    layouts = [NestingLayout(1, 0, 0, 500, 500, 1.0)]
+    evaluator = CandidateEvaluator.from_layouts(layouts, AUTOCLAVE)
+    orientations = [(300, 100, False), (100, 300, True)]
+    mask, scores = evaluator.evaluate([100, 500, 1900], [100, 0, 0], orientations)
+
+    assert mask.shape == scores.shape == (2, 3)
+    assert mask.tolist() == [[False, True, False], [False, True, True]]
+    assert np.isinf(scores[~mask]).all()
+    assert scores[0, 1] == 0 * 1000 + 500
+    assert first_true(mask) == (0, 1)
+    assert first_true(np.zeros((2, 2), dtype=bool)) is None
+
+
+def test_ffd_strategies_return_valid_positions():
+    model = NestingModel(NestingParameters())
+    layouts = _layouts(8, seed=3)
+    # Rimuovi overlap tra i layout di partenza
+    layouts = [l for i, l in enumerate(layouts) if not model._has_overlap(l.x, l.y, l.width, l.height, layouts[:i])]
+    tool = ToolInfo(odl_id=50, width=120, height=80, weight=1.0)
+
+    for strategy in (model._strategy_bottom_left_skyline, model._strategy_best_fit_waste,
+                     model._strategy_corner_fitting, model._strategy_gap_filling,
+                     model._find_optimal_position_ffd):
+        position = strategy(tool, AUTOCLAVE, layouts, 10)
+        if position is None:
+            continue
+        x, y, width, height, _ = position
+        assert x + width <= AUTOCLAVE.width and y + height <= AUTOCLAVE.height
+        assert not model._has_overlap(x, y, width, height, layouts)
@@ -0,0 +1,121 @@
+"""
+Test valutazione parallela delle strategie cavalletti: punteggio, scelta della migliore, tempi per strategia
+"""
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.cavalletti_optimizer import (
+    CavallettiOptimizerAdvanced, CavallettiOptimizationResult, OptimizationStrategy
+)
+from services.nesting.solver_2l import (
+    NestingModel2L, NestingParameters2L, NestingLayout2L, ToolInfo2L, AutoclaveInfo2L,
+    CavallettiConfiguration, CavallettoFixedPosition
+)
+
+
+def _autoclave(max_cavalletti=None):
+    return AutoclaveInfo2L(id=1, width=4000, height=2000, max_weight=5000, max_lines=40, has_cavalletti=True,
+                           max_cavalletti=max_cavalletti, cavalletto_thickness_mm=60.0, peso_max_per_cavalletto_kg=300.0)
+
+
+def _level_1_layouts(count, seed):
+    rng = random.Random(seed)
+    layouts = []
+    for i in range(count):
+        row, column = divmod(i, 4)
+        layouts.append(NestingLayout2L(odl_id=i + 1, x=50.0 + column * 950.0, y=50.0 + row * 650.0,
+                                       width=rng.choice([500.0, 700.0, 900.0]), height=rng.choice([300.0, 600.0]),
+                                       weight=rng.uniform(10, 60), level=1))
+    return layouts
+
+
+def test_all_strategies_returns_best_with_timings():
+    optimizer = CavallettiOptimizerAdvanced()
+    layouts = _level_1_layouts(12, seed=1)
+
+    best = optimizer.optimize_cavalletti_all_strategies(layouts, _autoclave(), CavallettiConfiguration(), workers=4)
+
+    values = [s.value for s in OptimizationStrategy]
+    assert list(best.strategy_timings_ms) == values and all(t > 0 for t in best.strategy_timings_ms.values())
+    assert list(best.strategy_scores) == values
+    keys = {v: optimizer._score_key(score) for v, score in best.strategy_scores.items()}
+    assert keys[best.strategia_applicata.value] == min(keys.values())
+    assert best.strategy_scores[best.strategia_applicata.value]['cavalletti'] == best.cavalletti_ottimizzati
+
+
+def test_thread_process_and_sequential_pick_same_strategy():
+    layouts, config = _level_1_layouts(8, seed=2), CavallettiConfiguration()
+    optimizer = CavallettiOptimizerAdvanced()
+
+    runs = [
+        optimizer.optimize_cavalletti_all_strategies(layouts, _autoclave(6), config, workers=1),
+        optimizer.optimize_cavalletti_all_strategies(layouts, _autoclave(6), config, workers=4),
+        optimizer.optimize_cavalletti_all_strategies(layouts, _autoclave(6), config, workers=2, use_processes=True),
+    ]
+
+    assert len({run.strategia_applicata for run in runs}) == 1
+    assert len({len(run.cavalletti_finali) for run in runs}) == 1
+    assert runs[0].strategy_scores == runs[1].strategy_scores == runs[2].strategy_scores
+
+
+def test_truncated_supports_are_scored_unstable():
+    optimizer = CavallettiOptimizerAdvanced()
+    tool = NestingLayout2L(odl_id=1, x=100.0, y=100.0, width=900.0, height=400.0, weight=40.0, level=1)
+
+    def result(xs, forced=False):
+        supports = [CavallettoFixedPosition(x=x, y=200.0, width=80.0, height=60.0, sequence_number=k,
+                                            tool_odl_id=1) for k, x in enumerate(xs)]
+        return CavallettiOptimizationResult(
+            cavalletti_finali=supports, cavalletti_originali=2, cavalletti_ottimizzati=len(supports),
+            riduzione_percentuale=0.0, max_cavalletti_limite=None, limite_rispettato=True,
+            strategia_applicata=OptimizationStrategy.MINIMAL, riduzione_forzata=forced
+        )
+
+    balanced = optimizer._evaluate_result(result([150.0, 850.0]), [tool], CavallettiConfiguration())
+    one_side = optimizer._evaluate_result(result([150.0, 300.0]), [tool], CavallettiConfiguration())
+    truncated = optimizer._evaluate_result(result([150.0], forced=True), [tool], CavallettiConfiguration())
+
+    assert balanced['tool_instabili'] == 0 and balanced['carico_max_kg'] == 20.0
+    assert one_side['tool_instabili'] == 1 and truncated['tool_instabili'] == 1
+    # Meno supporti non basta se il tool resta instabile
+    assert optimizer._score_key(balanced) < optimizer._score_key(truncated)
+
+
+def test_solve_2l_all_strategies_reports_timings():
+    autoclave = AutoclaveInfo2L(id=1, width=2000, height=1000, max_weight=2000, max_lines=20, has_cavalletti=True,
+                                max_cavalletti=6, cavalletto_thickness_mm=60.0, peso_max_per_cavalletto_kg=300.0)
+    tools = [ToolInfo2L(odl_id=i + 1, width=1200, height=600, weight=20.0) for i in range(3)]
+    model = NestingModel2L(NestingParameters2L(mode="fast", cavalletti_strategy="all"))
+
+    solution = model.solve_2l(tools, autoclave)
+
+    assert solution.metrics.level_1_count == 1
+    stats = solution.cavalletti_optimization_stats
+    assert set(stats['strategy_timings_ms']) == {s.value for s in OptimizationStrategy}
+    assert stats['strategia_applicata'] in stats['strategy_scores']
+
+
+def test_ranking_uses_remaining_violations_not_fixes():
+    optimizer = CavallettiOptimizerAdvanced()
+    tool = NestingLayout2L(odl_id=1, x=100.0, y=100.0, width=900.0, height=400.0, weight=40.0, level=1)
+
+    def score(xs, fixed):
+        supports = [CavallettoFixedPosition(x=x, y=200.0, width=80.0, height=60.0, sequence_number=k,
+                                            tool_odl_id=1) for k, x in enumerate(xs)]
+        result = CavallettiOptimizationResult(
+            cavalletti_finali=supports, cavalletti_originali=2, cavalletti_ottimizzati=len(supports),
+            riduzione_percentuale=0.0, max_cavalletti_limite=None, limite_rispettato=True,
+            strategia_applicata=OptimizationStrategy.MINIMAL, physical_violations_fixed=fixed
+        )
+        return optimizer._evaluate_result(result, [tool], CavallettiConfiguration())
+
+    repaired = score([150.0, 850.0], fixed=3)
+    left_as_is = score([150.0, 300.0], fixed=0)
+
+    assert repaired['violazioni_residue'] == 0 and left_as_is['violazioni_residue'] == 1
+    # Più correzioni non penalizzano: conta ciò che resta nel risultato
+    assert optimizer._score_key(repaired) < optimizer._score_key(left_as_is)
@@ -0,0 +1,75 @@
+"""
+Test pre-clustering tool piccoli: super-item a mensole, espansione con rotazione, integrazione nel solver
+"""
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.clustering import SmallToolClusterer
+from services.nesting.solver import NestingModel, NestingParameters, NestingLayout, ToolInfo, AutoclaveInfo
+
+
+AUTOCLAVE = AutoclaveInfo(id=1, width=5000, height=2000, max_weight=20000, max_lines=80)
+PARAMS = NestingParameters(padding_mm=10, min_distance_mm=15, vacuum_lines_capacity=80)
+
+
+def _mixed_tools(seed):
+    rng = random.Random(seed)
+    large = [ToolInfo(odl_id=i + 1, width=rng.randint(800, 1500), height=rng.randint(500, 900), weight=20.0)
+             for i in range(6)]
+    small = [ToolInfo(odl_id=100 + i, width=rng.randint(100, 400), height=rng.randint(80, 300), weight=5.0)
+             for i in range(20)]
+    return large, small
+
+
+def _assert_spaced(layouts, padding=10):
+    for i, a in enumerate(layouts):
+        for b in layouts[i + 1:]:
+            assert (a.x + a.width + padding <= b.x or b.x + b.width + padding <= a.x or
+                    a.y + a.height + padding <= b.y or b.y + b.height + padding <= a.y)
+
+
+def test_cluster_reduces_n_and_aggregates_members():
+    large, small = _mixed_tools(seed=1)
+    solver_tools, super_items = SmallToolClusterer(PARAMS).cluster(large + small, AUTOCLAVE)
+
+    assert len(solver_tools) < len(large) + len(small)
+    assert all(t.odl_id > 0 for t in solver_tools if t.odl_id not in super_items)
+    members = [m[0].odl_id for item in super_items.values() for m in item.members]
+    singles = [t.odl_id for t in solver_tools if 100 <= t.odl_id]
+    assert sorted(members + singles) == [t.odl_id for t in small]
+    for item in super_items.values():
+        assert item.tool.weight == sum(m[0].weight for m in item.members)
+        assert item.tool.lines_needed == len(item.members)
+
+
+def test_expand_keeps_padding_with_and_without_rotation():
+    _, small = _mixed_tools(seed=2)
+    _, super_items = SmallToolClusterer(PARAMS).cluster(small, AUTOCLAVE)
+    item = next(iter(super_items.values()))
+    w, h = item.tool.width, item.tool.height
+
+    for layout in (NestingLayout(item.tool.odl_id, 100, 50, w, h, item.tool.weight),
+                   NestingLayout(item.tool.odl_id, 100, 50, h, w, item.tool.weight, rotated=True)):
+        members = item.expand(layout)
+        _assert_spaced(members)
+        for m in members:
+            assert layout.x <= m.x and m.x + m.width <= layout.x + layout.width
+            assert layout.y <= m.y and m.y + m.height <= layout.y + layout.height
+
+
+def test_solver_expands_clustered_layout():
+    large, small = _mixed_tools(seed=1)
+    params = NestingParameters(padding_mm=10, min_distance_mm=15, vacuum_lines_capacity=80, timeout_override=3,
+                               num_search_workers=2, cluster_small_tools=True)
+    model = NestingModel(params)
+    solution = model.solve(large + small, AUTOCLAVE)
+
+    assert solution.metrics.super_items >= 1 and solution.metrics.clustered_tools >= 2
+    assert all(l.odl_id > 0 for l in solution.layouts)
+    assert solution.metrics.positioned_count == len(solution.layouts)
+    assert model._is_portfolio_layout_valid(solution.layouts, AUTOCLAVE)
+    _assert_spaced(solution.layouts)
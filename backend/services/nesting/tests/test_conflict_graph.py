@@ -0,0 +1,112 @@
+"""
+Test grafo sparso delle interferenze cavalletti: domini raggiungibili, filtro coppie, vincoli ancora attivi
+"""
+
+import logging
+import os
+import sys
+
+from ortools.sat.python import cp_model
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.solver_2l import (
+    NestingModel2L, NestingParameters2L, ToolInfo2L, AutoclaveInfo2L, CavallettiConfiguration
+)
+
+
+def _autoclave(**kwargs):
+    values = dict(id=1, width=2000, height=1000, max_weight=500, max_lines=10, has_cavalletti=True,
+                  max_cavalletti=4, cavalletto_thickness_mm=60.0, peso_max_per_cavalletto_kg=30.0,
+                  cavalletto_width=80.0, cavalletto_height_mm=60.0)
+    values.update(kwargs)
+    return AutoclaveInfo2L(**values)
+
+
+def _model():
+    model = NestingModel2L(NestingParameters2L())
+    model._cavalletti_config = CavallettiConfiguration()
+    return model
+
+
+def test_reachable_domains_exclude_level_1_when_impossible():
+    model, autoclave = _model(), _autoclave()
+    _, level_1_limit = model._calculate_dynamic_weight_limits(autoclave, autoclave.max_cavalletti)
+    tools = [
+        ToolInfo2L(odl_id=1, width=1200, height=600, weight=10.0),
+        ToolInfo2L(odl_id=2, width=1200, height=600, weight=level_1_limit + 10),
+        ToolInfo2L(odl_id=3, width=1200, height=600, weight=10.0, can_use_cavalletto=False),
+        ToolInfo2L(odl_id=4, width=2500, height=1200, weight=10.0),
+    ]
+
+    light, heavy, floor_only, too_big = model._reachable_domains_2l(tools, autoclave)
+
+    assert too_big is None
+    assert heavy.level_1_x is None and floor_only.level_1_x is None
+    low, high = light.level_1_x
+    assert 0 <= low <= high <= autoclave.width - 600
+    # Ruotato (600 × 1200) non entra in altezza: area raggiungibile = tutto il piano
+    assert light.level_0_box() == (0, 0, 2000, 1000)
+
+
+def test_conflict_graph_drops_pairs_that_cannot_coexist():
+    model, autoclave = _model(), _autoclave()
+    tools = [
+        ToolInfo2L(odl_id=1, width=1200, height=600, weight=10.0, lines_needed=2),
+        ToolInfo2L(odl_id=2, width=300, height=300, weight=10.0, lines_needed=2),
+        ToolInfo2L(odl_id=3, width=300, height=300, weight=10.0, lines_needed=9),
+    ]
+    config = CavallettiConfiguration(cavalletto_width=80.0, cavalletto_height=60.0)
+
+    graph = model._cavalletti_conflict_graph_2l(tools, autoclave, config)
+
+    positions = len(graph.relative_positions[0])
+    assert graph.naive_count == sum(len(p) for p in graph.relative_positions.values()) * (len(tools) - 1)
+    assert (0, 1) in graph.edges and len(graph.edges[(0, 1)]) == positions
+    # Linee vuoto 2 + 9 > 10: mai inclusi insieme
+    assert (0, 2) not in graph.edges and (2, 0) not in graph.edges
+    assert graph.saved_count == graph.naive_count - graph.constraint_count > 0
+
+
+def test_interference_constraints_are_logged_with_savings(caplog):
+    model, autoclave = _model(), _autoclave()
+    tools = [ToolInfo2L(odl_id=i + 1, width=600, height=400, weight=10.0 + i * 20) for i in range(8)]
+    cp = cp_model.CpModel()
+    variables = model._create_cpsat_variables_2l(cp, tools, autoclave)
+
+    with caplog.at_level(logging.INFO, logger="services.nesting.solver_2l"):
+        model._add_cavalletti_interference_constraints_2l(cp, tools, autoclave, variables)
+
+    message = next(r.getMessage() for r in caplog.records if "Vincoli interferenza cavalletti:" in r.getMessage())
+    assert "risparmiati" in message
+    # Un letterale di livello per tool, non uno per tripla tool × cavalletto × tool
+    level_literals = [v.name for v in cp.Proto().variables if v.name.startswith("level_") and "_is_" in v.name]
+    assert len(level_literals) <= 2 * len(tools)
+
+
+def _solve_with_floor_tool_at(x, y):
+    model, autoclave = _model(), _autoclave()
+    tools = [
+        ToolInfo2L(odl_id=1, width=1200, height=600, weight=10.0),
+        ToolInfo2L(odl_id=2, width=200, height=200, weight=10.0, can_use_cavalletto=False),
+    ]
+    cp = cp_model.CpModel()
+    variables = model._create_cpsat_variables_2l(cp, tools, autoclave)
+    model._add_cavalletti_interference_constraints_2l(cp, tools, autoclave, variables)
+    for tool_id, (level, tool_x, tool_y) in (("tool_0", (1, 400, 200)), ("tool_1", (0, x, y))):
+        cp.Add(variables['level'][tool_id] == level)
+        cp.Add(variables['x'][tool_id] == tool_x)
+        cp.Add(variables['y'][tool_id] == tool_y)
+        cp.Add(variables['rotated'][tool_id] == 0)
+        cp.Add(variables['included'][tool_id] == 1)
+    return cp_model.CpSolver().Solve(cp)
+
+
+def test_interference_still_enforced_on_filtered_graph():
+    config = CavallettiConfiguration(cavalletto_width=80.0, cavalletto_height=60.0)
+    tool = ToolInfo2L(odl_id=1, width=1200, height=600, weight=10.0)
+    first = _model()._calculate_cavalletti_positions_relative(tool, config)[0]
+
+    # Tool di livello 0 sotto il primo cavalletto del tool di livello 1
+    assert _solve_with_floor_tool_at(400 + round(first['rel_x']), 200 + round(first['rel_y'])) == cp_model.INFEASIBLE
+    assert _solve_with_floor_tool_at(1750, 780) == cp_model.OPTIMAL
@@ -0,0 +1,77 @@
+"""
+Test modello precalcolato dei cavalletti fissi: conteggio in O(log k), bilanciamento, cache per autoclave
+"""
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.solver_2l import (
+    NestingModel2L, NestingParameters2L, NestingLayout2L, ToolInfo2L, AutoclaveInfo2L, FixedSupportModel
+)
+
+
+def _autoclave(max_cavalletti=6, width=6000):
+    return AutoclaveInfo2L(id=1, width=width, height=2000, max_weight=5000, max_lines=40, has_cavalletti=True,
+                           max_cavalletti=max_cavalletti, cavalletto_thickness_mm=60.0)
+
+
+def _brute_force(positions, x, width):
+    covering = [cav for cav in positions if not (x + width <= cav.x or cav.x + cav.height <= x)]
+    center = x + width / 2
+    balanced = any(cav.x + cav.height / 2 < center for cav in covering) and \
+        any(cav.x + cav.height / 2 >= center for cav in covering)
+    return len(covering), len(covering) >= 2 and balanced
+
+
+def test_count_and_balance_match_linear_scan():
+    model = NestingModel2L(NestingParameters2L())
+    support_model = model._fixed_support_model(_autoclave())
+    assert len(support_model) == 6
+
+    rng = random.Random(7)
+    for _ in range(500):
+        x, width = rng.uniform(-100, 6000), rng.uniform(10, 4000)
+        count, supported = _brute_force(support_model.positions, x, width)
+        assert support_model.count(x, 100, width, 500) == count
+        assert support_model.is_supported(x, 100, width, 500) == supported
+
+    assert support_model.count(0, 2500, 6000, 300) == 0
+    assert FixedSupportModel([]).count(0, 0, 100, 100) == 0
+
+
+def test_model_is_computed_once_per_autoclave_geometry(monkeypatch):
+    model = NestingModel2L(NestingParameters2L())
+    calls = []
+    original = NestingModel2L.calcola_cavalletti_fissi_autoclave
+
+    def _counting(self, autoclave, config=None):
+        calls.append(autoclave.max_cavalletti)
+        return original(self, autoclave, config)
+    monkeypatch.setattr(NestingModel2L, "calcola_cavalletti_fissi_autoclave", _counting)
+
+    autoclave = _autoclave(max_cavalletti=5, width=7100)
+    tools = [ToolInfo2L(odl_id=i + 1, width=1800, height=400, weight=10.0) for i in range(4)]
+    placed = []
+    for tool in tools:
+        position = model._find_level_1_position_safe(tool, autoclave, [], placed, [])
+        if position:
+            x, y, width, height, rotated = position
+            placed.append(NestingLayout2L(odl_id=tool.odl_id, x=x, y=y, width=width, height=height,
+                                          weight=tool.weight, level=1, rotated=rotated))
+    NestingModel2L(NestingParameters2L())._has_sufficient_fixed_support(0, 0, 3000, 500, autoclave)
+
+    assert calls == [5]
+    assert placed and model._validate_minimum_supports_per_tool(placed, autoclave) == []
+
+
+def test_validate_minimum_supports_flags_unsupported_tools():
+    model = NestingModel2L(NestingParameters2L())
+    autoclave = _autoclave()
+    first = model._fixed_support_model(autoclave).positions[0]
+    narrow = NestingLayout2L(odl_id=1, x=first.x + 10, y=100, width=30, height=300, weight=5.0, level=1)
+    wide = NestingLayout2L(odl_id=2, x=50, y=100, width=5000, height=300, weight=5.0, level=1)
+
+    assert model._validate_minimum_supports_per_tool([narrow, wide], autoclave) == [1]
@@ -0,0 +1,84 @@
+"""
+Test assegnazione congiunta ODL → autoclavi: capacità, dimensioni e ciclo di cura
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.fleet_assignment import FleetAssigner, FleetAssignment
+from services.nesting.solver import NestingParameters, ToolInfo, AutoclaveInfo
+
+
+PARAMS = NestingParameters(padding_mm=10, min_distance_mm=15, num_search_workers=2)
+LARGE = AutoclaveInfo(id=1, width=3000, height=1500, max_weight=1000, max_lines=10)
+SMALL = AutoclaveInfo(id=2, width=1200, height=800, max_weight=300, max_lines=4)
+
+
+def _assigned_to(assignment):
+    return {odl: autoclave_id for autoclave_id, ids in assignment.assignments.items() for odl in ids}
+
+
+def test_oversized_tools_only_go_where_they_fit():
+    tools = [ToolInfo(odl_id=1, width=2000, height=900, weight=50.0),
+             ToolInfo(odl_id=2, width=500, height=400, weight=20.0),
+             ToolInfo(odl_id=3, width=4000, height=500, weight=20.0)]
+    assignment = FleetAssigner(PARAMS).assign(tools, [SMALL, LARGE])
+
+    assert _assigned_to(assignment)[1] == 1
+    assert assignment.unassigned == [3]
+    assert assignment.alternatives[3] == []
+
+
+def test_one_cure_cycle_per_autoclave():
+    tools = [ToolInfo(odl_id=i, width=600, height=500, weight=10.0, ciclo_cura_id=1 + i % 2) for i in range(6)]
+    tools.append(ToolInfo(odl_id=99, width=300, height=300, weight=5.0))
+    assignment = FleetAssigner(PARAMS).assign(tools, [LARGE, SMALL])
+
+    assigned = _assigned_to(assignment)
+    by_id = {t.odl_id: t for t in tools}
+    for autoclave_id, ids in assignment.assignments.items():
+        cycles = {by_id[o].ciclo_cura_id for o in ids} - {None}
+        assert len(cycles) <= 1
+        assert cycles <= {assignment.cure_cycles[autoclave_id]}
+    assert 99 in assigned
+
+
+def test_capacities_are_respected_and_throughput_beats_round_robin():
+    # Round-robin metterebbe metà dei tool nella piccola, che ne accoglie uno solo (area utile)
+    tools = [ToolInfo(odl_id=i, width=700, height=600, weight=120.0, lines_needed=2) for i in range(8)]
+    assignment = FleetAssigner(PARAMS).assign(tools, [LARGE, SMALL])
+
+    by_id = {t.odl_id: t for t in tools}
+    for autoclave in (LARGE, SMALL):
+        ids = assignment.assignments[autoclave.id]
+        assert sum(by_id[o].weight for o in ids) <= autoclave.max_weight
+        assert sum(by_id[o].lines_needed for o in ids) <= autoclave.max_lines
+    assert len(assignment.assignments[SMALL.id]) == 1
+    assert len(assignment.assignments[LARGE.id]) == 5  # Limite linee: 10 / 2
+    assert assignment.method.startswith("CP-SAT")
+    assert len(assignment.unassigned) == 2
+
+
+def test_pending_odls_keep_one_cure_cycle_per_autoclave():
+    # X (ciclo 1) e Y (ciclo 2) rimandati dalle prime due autoclavi, la terza non ha ciclo
+    tools = [ToolInfo(odl_id=1, width=600, height=500, weight=10.0, ciclo_cura_id=1),
+             ToolInfo(odl_id=2, width=600, height=500, weight=10.0, ciclo_cura_id=2),
+             ToolInfo(odl_id=3, width=300, height=300, weight=5.0)]
+    autoclaves = [AutoclaveInfo(id=k, width=3000, height=1500, max_weight=1000, max_lines=10) for k in (1, 2, 3)]
+    assigner = FleetAssigner(PARAMS)
+    assignment = FleetAssignment(assignments={1: [1], 2: [2], 3: []}, unassigned=[3],
+                                 cure_cycles={1: 1, 2: 2, 3: None},
+                                 odl_cycles={tool.odl_id: tool.ciclo_cura_id for tool in tools})
+    assignment.alternatives = assigner._alternatives(tools, autoclaves, assignment)
+
+    pending = [3]
+    assert assignment.take_pending(pending, 1) == [3]
+    pending.append(1)  # X escluso dal nesting dell'autoclave 1
+    assert assignment.take_pending(pending, 2) == []
+    pending.append(2)  # Y escluso dal nesting dell'autoclave 2
+
+    assert assignment.take_pending(pending, 3) == [1]
+    assert pending == [2]
+    assert assignment.cure_cycles[3] == 1
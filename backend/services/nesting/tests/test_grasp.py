@@ -0,0 +1,72 @@
+"""
+Test GRASP multi-start: RCL randomizzata con seed, budget di tempo, traiettoria, pool di processi
+"""
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.grasp import GraspEngine, GraspSearch, PARALLEL_MIN_TOOLS
+from services.nesting.solver import NestingModel, AutoclaveInfo
+from services.nesting.tests.conftest import nesting_parameters, random_tools
+
+
+AUTOCLAVE = AutoclaveInfo(id=1, width=3000, height=1500, max_weight=5000, max_lines=40)
+PARAMS = nesting_parameters(vacuum_lines_capacity=40)
+
+
+def test_construction_is_seeded_and_alpha_zero_is_greedy():
+    tools = random_tools(15, seed=1)
+    first = GraspSearch(tools, AUTOCLAVE, PARAMS, random.Random(7)).construct(alpha=0.5)
+    second = GraspSearch(tools, AUTOCLAVE, PARAMS, random.Random(7)).construct(alpha=0.5)
+    assert [(l.odl_id, l.x, l.y) for l in first] == [(l.odl_id, l.x, l.y) for l in second]
+
+    greedy_a = GraspSearch(tools, AUTOCLAVE, PARAMS, random.Random(1)).construct(alpha=0.0)
+    greedy_b = GraspSearch(tools, AUTOCLAVE, PARAMS, random.Random(2)).construct(alpha=0.0)
+    assert [l.odl_id for l in greedy_a] == [l.odl_id for l in greedy_b]
+
+
+def test_engine_beats_incumbent_within_budget():
+    tools = random_tools(25, seed=2)
+    model = NestingModel(PARAMS)
+    incumbent = model._apply_bl_ffd_algorithm_aerospace(tools, AUTOCLAVE)
+
+    result = GraspEngine(PARAMS, seed=1, time_budget_seconds=1.0, workers=1).run(tools, AUTOCLAVE, incumbent=incumbent)
+
+    assert result.elapsed_seconds < 1.5
+    assert result.score >= model._portfolio_score(incumbent, AUTOCLAVE)
+    assert model._is_portfolio_layout_valid(result.layouts, AUTOCLAVE)
+    assert result.starts > 1 and result.iterations_per_second > 0
+    scores = [s for _, s in result.trajectory]
+    assert scores == sorted(scores) and len(set(scores)) == len(scores)
+
+
+def test_parallel_workers_return_valid_layout():
+    tools = random_tools(PARALLEL_MIN_TOOLS + 5, seed=3)
+    result = GraspEngine(PARAMS, seed=5, time_budget_seconds=0.5, workers=2).run(tools, AUTOCLAVE)
+
+    assert result.workers == 2 and result.starts >= 2
+    # Istanza piccola: nessun pool di processi
+    small = GraspEngine(PARAMS, seed=5, time_budget_seconds=0.2, workers=2).run(tools[:PARALLEL_MIN_TOOLS], AUTOCLAVE)
+    assert small.workers == 1 and small.starts >= 1
+    assert result.layouts
+    assert NestingModel(PARAMS)._is_portfolio_layout_valid(result.layouts, AUTOCLAVE)
+
+
+def test_grasp_optimization_reports_metrics():
+    tools = random_tools(25, seed=4)
+    params = nesting_parameters(vacuum_lines_capacity=40,
+                                grasp_seed=3, grasp_time_budget_seconds=0.5, grasp_workers=1)
+    model = NestingModel(params)
+    initial = model._create_solution_from_layouts(
+        model._apply_bl_ffd_algorithm_aerospace(tools, AUTOCLAVE), tools, AUTOCLAVE, 0.0, "BL_FFD_INITIAL"
+    )
+
+    solution = model._apply_grasp_optimization(initial, tools, AUTOCLAVE, 0.0)
+
+    assert solution.metrics.efficiency_score >= initial.metrics.efficiency_score
+    assert solution.metrics.grasp_starts > 0
+    assert solution.metrics.grasp_iterations_per_second > 0
+    assert solution.metrics.heuristic_iters >= solution.metrics.grasp_starts
@@ -0,0 +1,73 @@
+"""
+Test riparazione incrementale: tool non coinvolti fissi, CP-SAT locale solo quando serve
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.incremental import IncrementalRepairer
+from services.nesting.solver import NestingModel, NestingParameters, NestingLayout, ToolInfo, AutoclaveInfo
+
+
+PARAMS = NestingParameters(padding_mm=10, min_distance_mm=15, vacuum_lines_capacity=20, num_search_workers=2)
+STRIP = AutoclaveInfo(id=1, width=1000, height=300, max_weight=500, max_lines=20)
+
+
+def _strip_layout():
+    # Quattro tool in fila con gap da 50mm: nessun gap accoglie un tool da 100mm + padding
+    return [NestingLayout(i + 1, 15 + 250 * i, 15, 200, 270, 10.0) for i in range(4)]
+
+
+def _assert_valid(layouts, autoclave, padding=10):
+    assert NestingModel(PARAMS)._is_portfolio_layout_valid(layouts, autoclave)
+    for i, a in enumerate(layouts):
+        for b in layouts[i + 1:]:
+            assert (a.x + a.width + padding <= b.x or b.x + b.width + padding <= a.x or
+                    a.y + a.height + padding <= b.y or b.y + b.height + padding <= a.y)
+
+
+def test_remove_keeps_every_other_tool_in_place():
+    layouts = _strip_layout()
+    result = IncrementalRepairer(PARAMS).repair(layouts, STRIP, remove_odl_ids=[2])
+
+    assert result.strategy == "REMOVE_ONLY"
+    assert result.removed_odl_ids == [2]
+    assert [(l.odl_id, l.x, l.y) for l in result.solution.layouts] == [(1, 15, 15), (3, 515, 15), (4, 765, 15)]
+
+
+def test_add_uses_free_space_without_moving_tools():
+    autoclave = AutoclaveInfo(id=1, width=1500, height=300, max_weight=500, max_lines=20)
+    result = IncrementalRepairer(PARAMS).repair(
+        _strip_layout(), autoclave, add_tools=[ToolInfo(odl_id=9, width=270, height=150, weight=5.0)]
+    )
+
+    assert result.strategy == "GREEDY_INSERT"
+    assert result.added_odl_ids == [9] and result.moved_odl_ids == []
+    _assert_valid(result.solution.layouts, autoclave)
+
+
+def test_add_compacts_local_neighbourhood_under_a_second():
+    start = time.time()
+    result = IncrementalRepairer(PARAMS, neighbourhood_size=2).repair(
+        _strip_layout(), STRIP, add_tools=[ToolInfo(odl_id=9, width=100, height=270, weight=5.0)]
+    )
+
+    assert time.time() - start < 1.0
+    assert result.strategy == "LOCAL_CPSAT"
+    assert result.added_odl_ids == [9]
+    assert 0 < len(result.moved_odl_ids) < 4
+    _assert_valid(result.solution.layouts, STRIP)
+
+
+def test_add_respects_obstacles_and_capacity():
+    layouts = _strip_layout()[:2]
+    obstacles = [(515, 15, 200, 270)]
+    tools = [ToolInfo(odl_id=9, width=200, height=270, weight=5.0), ToolInfo(odl_id=10, width=50, height=50, weight=600.0)]
+    result = IncrementalRepairer(PARAMS).repair(layouts, STRIP, add_tools=tools, obstacles=obstacles)
+
+    new = next(l for l in result.solution.layouts if l.odl_id == 9)
+    assert new.x >= 515 + 200 + 10
+    assert [e['odl_id'] for e in result.solution.excluded_odls] == [10]
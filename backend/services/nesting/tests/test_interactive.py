@@ -0,0 +1,97 @@
+"""
+Test validazione interattiva dello spostamento: vincoli, cavalletti 2L, ri-ottimizzazione locale, latenza
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.interactive import LayoutIndexRegistry, LayoutMoveValidator
+from services.nesting.solver_2l import NestingLayout2L, CavallettoPosition
+
+
+def _grid(rows, cols, size=300, gap=50, origin=50):
+    return [
+        NestingLayout2L(odl_id=r * cols + c + 1, x=origin + c * (size + gap), y=origin + r * (size + gap),
+                        width=size, height=size, weight=10.0)
+        for r in range(rows) for c in range(cols)
+    ]
+
+
+def _kinds(validation):
+    return sorted((v.kind, v.odl_id) for v in validation.violations)
+
+
+def test_validate_reports_bounds_overlap_and_padding():
+    validator = LayoutMoveValidator(_grid(2, 3), width=1200, height=800, padding_mm=10, min_distance_mm=15)
+
+    assert validator.validate(1, 50, 50).valid
+    assert _kinds(validator.validate(1, 5, 50)) == [('BOUNDS', None)]
+    assert _kinds(validator.validate(1, 250, 50)) == [('OVERLAP', 2)]
+    assert _kinds(validator.validate(1, 95, 50)) == [('PADDING', 2)]
+
+    rotated = validator.validate(1, 50, 50, rotated=True)
+    assert rotated.rotated and rotated.valid
+
+
+def test_2l_cavalletti_interference_and_support():
+    floor = [NestingLayout2L(odl_id=1, x=100, y=100, width=400, height=300, weight=10.0)]
+    upper = NestingLayout2L(odl_id=2, x=700, y=100, width=600, height=300, weight=20.0, level=1)
+    cavalletti = [
+        CavallettoPosition(x=750, y=100, width=80, height=300, tool_odl_id=2, sequence_number=0),
+        CavallettoPosition(x=1170, y=100, width=80, height=300, tool_odl_id=2, sequence_number=1),
+    ]
+    validator = LayoutMoveValidator(floor + [upper], width=2000, height=1000, cavalletti=cavalletti)
+
+    # Tool di livello 1 sopra il piano: valido finché i cavalletti non finiscono sul tool di livello 0
+    assert validator.validate(2, 700, 500).valid
+    assert ('CAVALLETTO', 1) in _kinds(validator.validate(2, 30, 100))
+    # Tool di livello 0 sotto un cavalletto
+    assert _kinds(validator.validate(1, 1100, 100)) == [('CAVALLETTO', 2)]
+
+    single = LayoutMoveValidator(floor + [upper], width=2000, height=1000, cavalletti=cavalletti[:1])
+    assert ('SUPPORT', 2) in _kinds(single.validate(2, 700, 500))
+
+
+def test_relocate_shifts_only_neighbours():
+    layouts = _grid(2, 3)
+    validator = LayoutMoveValidator(layouts, width=1200, height=800, padding_mm=10, min_distance_mm=15)
+
+    result = validator.relocate(1, 120, 50, max_shift_mm=200)
+
+    assert result.success and result.status in ("OPTIMAL", "FEASIBLE")
+    assert {s.odl_id for s in result.shifts} <= {2, 3, 4, 5, 6} and result.shifts
+    placed = {l.odl_id: (l.x, l.y, l.width, l.height) for l in layouts}
+    placed[1] = (120, 50, 300, 300)
+    for shift in result.shifts:
+        placed[shift.odl_id] = (shift.x, shift.y, 300, 300)
+        assert abs(shift.dx) <= 200 and abs(shift.dy) <= 200
+    moved = [NestingLayout2L(odl_id=k, x=x, y=y, width=w, height=h, weight=10.0) for k, (x, y, w, h) in placed.items()]
+    check = LayoutMoveValidator(moved, width=1200, height=800, padding_mm=10, min_distance_mm=15)
+    assert all(check.validate(l.odl_id, l.x, l.y).valid for l in moved)
+
+    assert validator.relocate(1, 50, 50).status == "NOT_NEEDED"
+    assert validator.relocate(1, 0, 50).status == "INFEASIBLE_MOVE"
+
+
+def test_validation_latency_and_registry_reuse():
+    layouts = _grid(15, 20, size=200, gap=20)
+    registry = LayoutIndexRegistry(max_entries=2)
+    builds = []
+
+    def _build():
+        builds.append(1)
+        return LayoutMoveValidator(layouts, width=4500, height=3400, padding_mm=10, min_distance_mm=15)
+
+    validator, cached = registry.get("batch", "v1", _build)
+    assert not cached and registry.get("batch", "v1", _build) == (validator, True)
+    assert registry.get("batch", "v2", _build)[1] is False and len(builds) == 2
+
+    latencies = []
+    for odl_id in range(1, 301, 7):
+        started = time.perf_counter()
+        validator.validate(odl_id, 1000, 1000, rotated=True)
+        latencies.append((time.perf_counter() - started) * 1000)
+    assert max(latencies) < 20
@@ -0,0 +1,106 @@
+"""
+Test modello CP-SAT congiunto a due livelli: scelta del livello, impronte dei supporti, warm start, strategia
+"""
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.joint_2l import JointTwoLevelSolver, JointSolveResult
+from services.nesting.solver_2l import NestingModel2L, NestingParameters2L, NestingLayout2L, ToolInfo2L, AutoclaveInfo2L
+from services.nesting.spatial_index import RectIndex
+
+
+def _autoclave(width=2000, height=1000):
+    return AutoclaveInfo2L(id=1, width=width, height=height, max_weight=2000, max_lines=20, has_cavalletti=True,
+                           max_cavalletti=4, cavalletto_thickness_mm=60.0, peso_max_per_cavalletto_kg=300.0)
+
+
+def _model(**kwargs):
+    return NestingModel2L(NestingParameters2L(padding_mm=10, min_distance_mm=15, **kwargs))
+
+
+def _large_tools(count=3):
+    # Sul piano ne entra uno solo: il secondo può stare solo sui cavalletti
+    return [ToolInfo2L(odl_id=i + 1, width=1200, height=600, weight=20.0, lines_needed=1) for i in range(count)]
+
+
+def test_joint_places_tool_on_level_1_when_floor_is_full():
+    model, autoclave = _model(), _autoclave()
+
+    result = JointTwoLevelSolver(model, time_limit_seconds=2).solve(_large_tools(), autoclave)
+
+    assert result.status == "OPTIMAL"
+    assert sorted(l.level for l in result.layouts) == [0, 1]
+    upper = next(l for l in result.layouts if l.level == 1)
+    assert model._fixed_support_model(autoclave).is_supported(upper.x, upper.y, upper.width, upper.height)
+
+
+def test_support_footprints_and_levels_do_not_collide():
+    model, autoclave = _model(), _autoclave(width=3000, height=1500)
+    rng = random.Random(5)
+    tools = [ToolInfo2L(odl_id=i + 1, width=rng.choice([500, 800, 1100]), height=rng.choice([300, 500]),
+                        weight=15.0, lines_needed=1) for i in range(12)]
+    solver = JointTwoLevelSolver(model, time_limit_seconds=2)
+
+    result = solver.solve(tools, autoclave)
+    assert result.layouts
+
+    config = model._advanced_cavalletti_config(autoclave)
+    by_id = {t.odl_id: t for t in tools}
+    floor, upper = RectIndex(), RectIndex()
+    for layout in result.layouts:
+        index = floor if layout.level == 0 else upper
+        assert not index.intersects(layout.x, layout.y, layout.width, layout.height, padding=10)
+        index.insert(layout.odl_id, layout.x, layout.y, layout.width, layout.height)
+    for layout in (l for l in result.layouts if l.level == 1):
+        footprints = solver._support_footprints(by_id[layout.odl_id], int(layout.width), int(layout.height), config)
+        for k, (dx, dy, fw, fh) in enumerate(footprints):
+            assert not floor.intersects(layout.x + dx, layout.y + dy, fw, fh, padding=10)
+            floor.insert((layout.odl_id, k), layout.x + dx, layout.y + dy, fw, fh)
+
+
+def test_warm_start_hints_only_admissible_positions():
+    model, autoclave = _model(), _autoclave()
+    floor = NestingLayout2L(odl_id=1, x=15.0, y=15.0, width=1200.0, height=600.0, weight=20.0)
+    # Posizione sequenziale fuori dal margine: non deve invalidare il resto del warm start
+    off_margin = NestingLayout2L(odl_id=2, x=0.0, y=100.0, width=1200.0, height=600.0, weight=20.0, level=1)
+    on_floor_tool = NestingLayout2L(odl_id=2, x=15.0, y=300.0, width=1200.0, height=600.0, weight=20.0, level=1)
+
+    solver = JointTwoLevelSolver(model, time_limit_seconds=2)
+    assert solver.solve(_large_tools(), autoclave, warm_start=[floor, off_margin]).hinted == 1
+    # Supporti del tool di livello 1 sopra il tool di livello 0: hint scartato
+    assert solver.solve(_large_tools(), autoclave, warm_start=[floor, on_floor_tool]).hinted == 1
+    shifted = NestingLayout2L(odl_id=1, x=15.0, y=355.0, width=1200.0, height=600.0, weight=20.0)
+    upper = NestingLayout2L(odl_id=2, x=15.0, y=15.0, width=1200.0, height=600.0, weight=20.0, level=1)
+    result = solver.solve(_large_tools(), autoclave, warm_start=[shifted, upper])
+    assert result.hinted == 2 and len(result.layouts) == 2
+
+
+def test_solve_2l_joint_strategy_keeps_sequential_score():
+    autoclave = _autoclave()
+
+    joint = _model(level_strategy="joint", mode="balanced", joint_time_limit_seconds=2).solve_2l(_large_tools(), autoclave)
+    assert joint.metrics.algorithm_used == "JOINT_2L"
+    assert joint.metrics.level_1_count == 1 and joint.metrics.sequential_score > 0
+
+    fast = _model(level_strategy="joint", mode="fast").solve_2l(_large_tools(), autoclave)
+    assert fast.metrics.algorithm_used == "SEQUENTIAL_2L"
+    assert fast.metrics.sequential_score == fast.metrics.efficiency_score
+
+
+def test_solve_2l_keeps_sequential_when_joint_is_worse(monkeypatch):
+    autoclave = _autoclave()
+    tools = [ToolInfo2L(odl_id=i + 1, width=500, height=400, weight=20.0, lines_needed=1) for i in range(3)]
+    # Soluzione joint a tempo scaduto: un solo tool sul piano
+    worse = JointSolveResult(layouts=[NestingLayout2L(odl_id=1, x=15.0, y=15.0, width=500.0, height=400.0,
+                                                      weight=20.0)], status="FEASIBLE")
+    monkeypatch.setattr(JointTwoLevelSolver, "solve", lambda self, *args, **kwargs: worse)
+
+    solution = _model(level_strategy="joint", mode="balanced").solve_2l(tools, autoclave)
+
+    assert solution.metrics.algorithm_used == "SEQUENTIAL_2L"
+    assert solution.metrics.efficiency_score == solution.metrics.sequential_score
+    assert len(solution.layouts) == 3
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test per il motore MaxRects (rettangoli liberi massimali)
+"""
+
+import sys
+import os
+import random
+
+# Aggiunge il path del backend per gli import
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.maxrects import MaxRectsPacker, MaxRectsRule
+from services.nesting.solver import NestingModel, NestingParameters, ToolInfo, AutoclaveInfo
+
+
+def _assert_valid(placements, spacing, x_min, y_min, x_max, y_max):
+    for x, y, w, h, _ in placements:
+        assert x >= x_min - 1e-6 and y >= y_min - 1e-6
+        assert x + w <= x_max + 1e-6 and y + h <= y_max + 1e-6
+    for i, a in enumerate(placements):
+        for b in placements[i + 1:]:
+            assert (
+                a[0] + a[2] + spacing <= b[0] + 1e-6 or b[0] + b[2] + spacing <= a[0] + 1e-6 or
+                a[1] + a[3] + spacing <= b[1] + 1e-6 or b[1] + b[3] + spacing <= a[1] + 1e-6
+            ), f"Sovrapposizione/padding violato tra {a} e {b}"
+
+
+def test_all_rules_produce_valid_packings():
+    """Ogni regola di scoring produce layout senza sovrapposizioni e con spacing rispettato"""
+    rng = random.Random(7)
+    sizes = [(rng.randint(80, 500), rng.randint(60, 400)) for _ in range(40)]
+
+    for rule in MaxRectsRule:
+        packer = MaxRectsPacker(10, 10, 2000, 1200, spacing=10, rule=rule)
+        placements = [p for p in (packer.insert(w, h) for w, h in sizes) if p is not None]
+        assert len(placements) >= 10, f"{rule.value}: solo {len(placements)} tool posizionati"
+        _assert_valid(placements, 10, 10, 10, 2000, 1200)
+
+
+def test_exact_fit_and_rotation():
+    """Un tool che entra solo ruotato viene ruotato; l'area esatta viene riempita"""
+    packer = MaxRectsPacker(0, 0, 100, 50, spacing=0)
+    assert packer.insert(50, 100) == (0, 0, 100, 50, True)
+    assert packer.insert(1, 1) is None
+    assert packer.free_rects == []
+
+
+def test_occupy_existing_layouts():
+    """I rettangoli pre-occupati non vengono riutilizzati"""
+    packer = MaxRectsPacker(0, 0, 300, 100, spacing=5)
+    packer.occupy(0, 0, 100, 100)
+    placement = packer.insert(100, 100, allow_rotation=False)
+    assert placement is not None
+    assert placement[0] >= 105
+
+
+def test_solver_bl_ffd_with_maxrects():
+    """BL-FFD del solver usa MaxRects come strategia drop-in"""
+    tools = [ToolInfo(odl_id=i + 1, width=300 + 20 * i, height=200, weight=10.0) for i in range(8)]
+    autoclave = AutoclaveInfo(id=1, width=2000.0, height=1000.0, max_weight=1000.0, max_lines=25)
+
+    for engine in ("maxrects", "grid"):
+        model = NestingModel(NestingParameters(placement_engine=engine))
+        layouts = model._apply_bl_ffd_algorithm(tools, autoclave, padding=15)
+        assert len(layouts) == len(tools)
+        assert model.check_overlap(layouts) == []
@@ -0,0 +1,76 @@
+"""
+Test preselezione knapsack: capacità aggregate, riserva, integrazione nel solver con fallback sulla riserva
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.preselection import KnapsackPreselector
+from services.nesting.solver import NestingModel, ToolInfo, AutoclaveInfo
+from services.nesting.tests.conftest import nesting_parameters, random_tools
+
+
+AUTOCLAVE = AutoclaveInfo(id=1, width=5000, height=2000, max_weight=2000, max_lines=30)
+
+
+def _tools(count, seed):
+    return random_tools(count, seed, width=(200, 1200), height=(150, 800), weight=(5, 60), priorities=[1, 1, 2])
+
+
+def _params(**overrides):
+    return nesting_parameters(**{'vacuum_lines_capacity': 30, 'knapsack_preselection': True, **overrides})
+
+
+def test_selection_respects_capacities_and_orders_reserve():
+    tools = _tools(200, seed=1)
+    preselector = KnapsackPreselector(_params(), reserve_size=5)
+    selection = preselector.select(tools, AUTOCLAVE)
+
+    assert selection.method in ("CP-SAT_OPTIMAL", "CP-SAT_FEASIBLE", "GREEDY")
+    assert sum(preselector._footprint(t) for t in selection.selected) <= preselector._area_capacity(AUTOCLAVE)
+    assert sum(t.weight for t in selection.selected) <= AUTOCLAVE.max_weight
+    assert sum(t.lines_needed for t in selection.selected) <= 30
+    assert len(selection.reserve) == 5
+    assert len(selection.selected) + len(selection.reserve) + len(selection.rejected) == len(tools)
+    values = [preselector._value(t, AUTOCLAVE) for t in selection.reserve + selection.rejected]
+    assert values[:5] == sorted(values[:5], reverse=True) and min(values[:5]) >= max(values[5:])
+
+
+def test_all_fit_skips_selection():
+    tools = _tools(4, seed=2)
+    selection = KnapsackPreselector(_params()).select(tools, AUTOCLAVE)
+
+    assert selection.method == "ALL_FIT" and selection.selected == tools and not selection.reserve
+
+
+def test_solver_uses_selected_subset_and_reserve():
+    tools = _tools(150, seed=3)
+    params = _params(timeout_override=3, num_search_workers=2, preselection_reserve_size=8)
+    model = NestingModel(params)
+    solution = model.solve(tools, AUTOCLAVE)
+    metrics = solution.metrics
+
+    assert metrics.preselection_method and metrics.reserve_count == 8
+    assert 0 < metrics.preselected_count < len(tools)
+    assert metrics.positioned_count == len(solution.layouts)
+    assert metrics.excluded_count == len(tools) - len(solution.layouts)
+    assert model._is_portfolio_layout_valid(solution.layouts, AUTOCLAVE)
+    assert any(e.get('motivo') == 'Preselezione knapsack' for e in solution.excluded_odls)
+
+
+def test_tools_that_never_fit_are_rejected_before_selection():
+    tools = _tools(4, seed=2)
+    # 6000 × 100 non entra in nessun orientamento (piano 5000 × 2000)
+    oversized = ToolInfo(odl_id=99, width=6000, height=100, weight=5, priority=2)
+    preselector = KnapsackPreselector(_params())
+
+    selection = preselector.select(tools + [oversized], AUTOCLAVE)
+    assert selection.method == "ALL_FIT" and selection.selected == tools
+    assert selection.rejected == [oversized]
+
+    many = _tools(200, seed=1) + [oversized]
+    selection = preselector.select(many, AUTOCLAVE)
+    assert oversized not in selection.selected + selection.reserve and oversized in selection.rejected
+    assert len(selection.selected) + len(selection.reserve) + len(selection.rejected) == len(many)
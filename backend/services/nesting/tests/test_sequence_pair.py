@@ -0,0 +1,84 @@
+"""
+Test motore sequence pair: decodifica FAST-SP, geometria CP-SAT (padding/margine), annealing e integrazione nel solver
+"""
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.sequence_pair import SequencePairAnnealer, SequencePairDecoder
+from services.nesting.solver import NestingModel, AutoclaveInfo
+from services.nesting.tests.conftest import nesting_parameters, random_tools
+
+
+AUTOCLAVE = AutoclaveInfo(id=1, width=3000, height=1500, max_weight=5000, max_lines=40)
+PARAMS = nesting_parameters(vacuum_lines_capacity=40)
+
+
+def _assert_cpsat_geometry(layouts, margin=15, padding=10):
+    for layout in layouts:
+        assert layout.x >= margin and layout.y >= margin
+        assert layout.x + layout.width <= AUTOCLAVE.width - margin
+        assert layout.y + layout.height <= AUTOCLAVE.height - margin
+    for i, a in enumerate(layouts):
+        for b in layouts[i + 1:]:
+            assert (a.x + a.width + padding <= b.x or b.x + b.width + padding <= a.x or
+                    a.y + a.height + padding <= b.y or b.y + b.height + padding <= a.y)
+
+
+def test_longest_paths_follow_sequence_pair_relations():
+    # Γ+ = (0, 1, 2), Γ- = (1, 0, 2): 0 sopra 1, entrambi a sinistra di 2
+    position = [2, 1, 3]
+    xs = SequencePairDecoder.longest_paths([0, 1, 2], position, [100, 300, 50])
+    ys = SequencePairDecoder.longest_paths([2, 1, 0], position, [40, 60, 80])
+
+    assert xs == [0, 0, 300]
+    assert ys == [60, 0, 0]
+
+
+def test_decoded_layouts_respect_padding_and_margin():
+    tools = random_tools(20, seed=1)
+    decoder = SequencePairDecoder(tools, AUTOCLAVE, PARAMS)
+    rng = random.Random(4)
+    for _ in range(20):
+        plus = rng.sample(range(len(tools)), len(tools))
+        minus = rng.sample(range(len(tools)), len(tools))
+        rotated = [rng.random() < 0.5 for _ in tools]
+        position = [0] * len(tools)
+        for p, i in enumerate(minus):
+            position[i] = p + 1
+        widths, heights = decoder.padded_sizes(rotated)
+        _, score, placed, xs, ys = decoder.evaluate(plus, position, widths, heights)
+        layouts = decoder.layouts(placed, xs, ys, rotated)
+
+        _assert_cpsat_geometry(layouts)
+        assert abs(score - NestingModel(PARAMS)._portfolio_score(layouts, AUTOCLAVE)) < 1e-6
+
+
+def test_annealing_never_worse_than_incumbent_and_is_fast():
+    tools = random_tools(25, seed=2)
+    model = NestingModel(PARAMS)
+    incumbent = model._apply_bl_ffd_algorithm_aerospace(tools, AUTOCLAVE)
+
+    result = SequencePairAnnealer(PARAMS, seed=1, time_budget_seconds=1.0).run(tools, AUTOCLAVE, incumbent=incumbent)
+
+    assert result.elapsed_seconds < 1.5
+    assert result.score >= model._portfolio_score(incumbent, AUTOCLAVE) - 1e-9
+    assert model._is_portfolio_layout_valid(result.layouts, AUTOCLAVE)
+    assert result.evaluations_per_second > 1000
+    scores = [s for _, s in result.trajectory]
+    assert scores == sorted(scores)
+
+
+def test_solver_dispatches_sequence_pair_engine():
+    params = nesting_parameters(vacuum_lines_capacity=40, timeout_override=5,
+                                algorithm="sequence_pair", sa_seed=3, sa_time_budget_seconds=0.5,
+                                early_stop_enabled=False)
+    solution = NestingModel(params).solve(random_tools(18, seed=5), AUTOCLAVE)
+
+    assert solution.success and solution.algorithm_status == "SEQUENCE_PAIR_SA"
+    assert solution.metrics.algorithm_used == "SEQUENCE_PAIR_SA"
+    assert solution.metrics.heuristic_iters > 0 and solution.metrics.sa_evaluations_per_second > 0
+    _assert_cpsat_geometry(solution.layouts)
@@ -0,0 +1,106 @@
+"""
+Test cache soluzioni su istanza canonica: rimappatura ODL, LRU, livello SQLite, invalidazione
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting import solution_cache
+from services.nesting.solution_cache import NestingSolutionCache
+from services.nesting.solver import (
+    NestingModel, NestingParameters, NestingLayout, NestingMetrics, NestingSolution, ToolInfo, AutoclaveInfo
+)
+
+
+AUTOCLAVE = AutoclaveInfo(id=1, width=2000, height=1000, max_weight=500, max_lines=10)
+PARAMS = NestingParameters(padding_mm=10, min_distance_mm=15)
+
+
+def _tools(ids):
+    dims = [(400, 300, 10.0, 1), (400, 300, 10.0, 1), (600, 200, 25.0, 2)]
+    return [ToolInfo(odl_id=i, width=w, height=h, weight=kg, lines_needed=lines)
+            for i, (w, h, kg, lines) in zip(ids, dims)]
+
+
+def _solution(tools):
+    layouts = [
+        NestingLayout(tools[0].odl_id, 15, 15, 400, 300, 10.0),
+        NestingLayout(tools[2].odl_id, 425, 15, 600, 200, 25.0, lines_used=2),
+    ]
+    metrics = NestingMetrics(20.0, 30.0, 3, 35.0, 2, 1, 22.0, 1500.0, False, 0)
+    excluded = [{'odl_id': tools[1].odl_id, 'motivo': 'Non posizionato'}]
+    return NestingSolution(layouts, excluded, metrics, True, "CP-SAT_OPTIMAL", "ok")
+
+
+def test_hit_remaps_layout_to_new_odl_ids(tmp_path):
+    cache = NestingSolutionCache(db_path=str(tmp_path / "cache.db"))
+    old_tools = _tools([1, 2, 3])
+    cache.store(old_tools, AUTOCLAVE, PARAMS, _solution(old_tools))
+
+    # Stessi tool, ODL diversi e ordine diverso
+    new_tools = list(reversed(_tools([71, 72, 73])))
+    hit = cache.lookup(new_tools, AUTOCLAVE, PARAMS)
+
+    assert hit is not None and hit.metrics.cache_hit
+    positions = {(l.x, l.y, l.width, l.height) for l in hit.layouts}
+    assert positions == {(15, 15, 400, 300), (425, 15, 600, 200)}
+    placed = {l.odl_id for l in hit.layouts}
+    assert 73 in placed and len(placed & {71, 72}) == 1
+    assert {e['odl_id'] for e in hit.excluded_odls} == {71, 72} - placed
+    assert cache.get_stats()['memory_hits'] == 1
+
+
+def test_miss_on_different_geometry_or_parameters(tmp_path):
+    cache = NestingSolutionCache(db_path=str(tmp_path / "cache.db"))
+    tools = _tools([1, 2, 3])
+    cache.store(tools, AUTOCLAVE, PARAMS, _solution(tools))
+
+    other_tools = _tools([1, 2, 3])
+    other_tools[2].width = 650
+    assert cache.lookup(other_tools, AUTOCLAVE, PARAMS) is None
+    assert cache.lookup(tools, AUTOCLAVE, NestingParameters(padding_mm=5)) is None
+    # La priorità cambia cosa il solver sceglie di posizionare
+    urgent = _tools([1, 2, 3])
+    urgent[1].priority = 3
+    assert cache.lookup(urgent, AUTOCLAVE, PARAMS) is None
+    assert cache.get_stats()['misses'] == 3
+
+
+def test_disk_tier_survives_restart_and_invalidation(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    tools = _tools([1, 2, 3])
+    NestingSolutionCache(db_path=db_path).store(tools, AUTOCLAVE, PARAMS, _solution(tools))
+
+    restarted = NestingSolutionCache(db_path=db_path, memory_size=1)
+    assert restarted.lookup(_tools([4, 5, 6]), AUTOCLAVE, PARAMS) is not None
+    assert restarted.get_stats()['disk_hits'] == 1
+
+    assert restarted.invalidate_dimensions(200, 600) == 1  # orientamento indifferente
+    assert restarted.lookup(_tools([4, 5, 6]), AUTOCLAVE, PARAMS) is None
+    assert NestingSolutionCache(db_path=db_path).lookup(tools, AUTOCLAVE, PARAMS) is None
+
+
+def test_memory_lru_evicts_oldest():
+    cache = NestingSolutionCache(db_path=None, memory_size=1)
+    tools = _tools([1, 2, 3])
+    cache.store(tools, AUTOCLAVE, PARAMS, _solution(tools))
+    cache.store(tools, AUTOCLAVE, NestingParameters(padding_mm=5), _solution(tools))
+
+    assert cache.lookup(tools, AUTOCLAVE, PARAMS) is None
+    assert cache.lookup(tools, AUTOCLAVE, NestingParameters(padding_mm=5)) is not None
+
+
+def test_solver_uses_cache_when_enabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(solution_cache, "_default_cache", NestingSolutionCache(db_path=str(tmp_path / "cache.db")))
+    params = NestingParameters(padding_mm=10, min_distance_mm=15, timeout_override=2,
+                               num_search_workers=2, use_solution_cache=True)
+
+    first = NestingModel(params).solve(_tools([1, 2, 3]), AUTOCLAVE)
+    second = NestingModel(params).solve(_tools([11, 12, 13]), AUTOCLAVE)
+
+    assert first.success and not first.metrics.cache_hit
+    assert second.metrics.cache_hit
+    assert len(second.layouts) == len(first.layouts)
+    assert {l.odl_id for l in second.layouts} <= {11, 12, 13}
@@ -0,0 +1,74 @@
+"""
+Test limiti superiori dello score e stop anticipato sul gap
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.solver import NestingModel, NestingParameters, ToolInfo, AutoclaveInfo
+
+
+AUTOCLAVE = AutoclaveInfo(id=1, width=2000, height=1000, max_weight=1000, max_lines=20)
+
+
+def _params(**overrides):
+    values = dict(padding_mm=10, min_distance_mm=15, vacuum_lines_capacity=10,
+                  timeout_override=5, num_search_workers=2)
+    values.update(overrides)
+    return NestingParameters(**values)
+
+
+def test_bounds_pick_the_binding_constraint():
+    model = NestingModel(_params())
+    few = [ToolInfo(odl_id=i, width=300, height=200, weight=10.0) for i in range(3)]
+    heavy = [ToolInfo(odl_id=i, width=300, height=200, weight=400.0) for i in range(6)]
+    many_lines = [ToolInfo(odl_id=i, width=300, height=200, weight=1.0, lines_needed=4) for i in range(6)]
+
+    bound = model._compute_score_upper_bound(few, AUTOCLAVE)
+    assert bound.source == "area"
+    assert abs(bound.value - model._portfolio_score(
+        [type("L", (), {"width": 300, "height": 200, "lines_used": 1})()] * 3, AUTOCLAVE)) < 1e-9
+
+    assert model._compute_score_upper_bound(heavy, AUTOCLAVE).source == "weight"
+    lines_bound = model._compute_score_upper_bound(many_lines, AUTOCLAVE)
+    assert lines_bound.source == "lines"
+    # Al massimo 2 tool da 4 linee su 10: DP esatta, non frazionaria
+    assert abs(lines_bound.lines - 2 * (85.0 * 60000 / 2000000 + 15.0 * 4 / 10)) < 1e-9
+
+
+def test_all_tools_placed_stops_without_cpsat():
+    tools = [ToolInfo(odl_id=i + 1, width=400, height=300, weight=10.0) for i in range(4)]
+    start = time.time()
+    solution = NestingModel(_params()).solve(tools, AUTOCLAVE)
+
+    assert time.time() - start < 1.0
+    assert solution.algorithm_status == "BL_FFD_BOUND"
+    assert solution.metrics.stop_reason == "gap_reached"
+    assert solution.metrics.optimality_gap_pct == 0
+    assert solution.metrics.positioned_count == 4
+
+
+def test_cpsat_callback_stops_search_at_target():
+    tools = [ToolInfo(odl_id=i + 1, width=300 + 10 * i, height=200 + 5 * i, weight=10.0) for i in range(8)]
+    model = NestingModel(_params())
+    model._score_target = 1.0
+    start = time.time()
+    solution = model._solve_cpsat_aerospace(tools, AUTOCLAVE, 20, start)
+
+    assert time.time() - start < 5
+    assert solution.metrics.stop_reason == "gap_reached"
+    assert solution.success
+
+
+def test_gap_is_recorded_when_bound_is_not_reached():
+    # Le linee vuoto limitano a 5 tool: bound sulle linee, euristica e CP-SAT lo raggiungono
+    tools = [ToolInfo(odl_id=i + 1, width=300 + 10 * i, height=200, weight=10.0, lines_needed=2) for i in range(8)]
+    solution = NestingModel(_params(early_stop_enabled=False, timeout_override=1)).solve(tools, AUTOCLAVE)
+
+    assert solution.metrics.bound_source == "lines"
+    assert solution.metrics.stop_reason in ("optimal", "timeout")
+    assert solution.metrics.score_upper_bound > 0
+    assert 0 <= solution.metrics.optimality_gap_pct < 100
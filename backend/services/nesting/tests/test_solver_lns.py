@@ -0,0 +1,80 @@
+"""
+Test LNS CP-SAT: regioni liberate, resto del layout fisso, mai peggiorativo rispetto all'incumbent
+"""
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.solver import NestingModel, NestingLayout, ToolInfo, AutoclaveInfo
+from services.nesting.tests.conftest import nesting_parameters, random_tools
+
+
+AUTOCLAVE = AutoclaveInfo(id=1, width=6000, height=2000, max_weight=10000, max_lines=80)
+
+
+def _params(**overrides):
+    return nesting_parameters(**{'vacuum_lines_capacity': 80, 'num_search_workers': 1, 'lns_enabled': True,
+                                 'lns_seed': 1, **overrides})
+
+
+def test_gap_region_is_largest_free_component():
+    model = NestingModel(_params())
+    layouts = [NestingLayout(1, 15, 15, 2000, 1970, 1.0)]
+
+    x, y, width, height = model._largest_gap_region(layouts, AUTOCLAVE)
+
+    assert x >= 2000 and y <= 65
+    assert width > 3500 and height > 1800
+
+
+def test_region_frees_at_most_max_tools_closest_to_center():
+    model = NestingModel(_params(lns_max_free_tools=3))
+    layouts = [NestingLayout(i + 1, 15 + 300 * i, 15, 250, 250, 1.0) for i in range(10)]
+
+    free, (x, y, width, height) = model._select_lns_region("strip", layouts, AUTOCLAVE, random.Random(4))
+    assert 0 < len(free) <= 3
+    xs = sorted(next(l.x for l in layouts if l.odl_id == odl) for odl in free)
+    assert xs == [xs[0] + 300 * k for k in range(len(xs))]
+    assert x <= xs[0] and x + width >= xs[-1] + 250
+
+
+def test_submodel_repacks_freed_tools_to_insert_unplaced_one():
+    model = NestingModel(_params())
+    autoclave = AutoclaveInfo(id=1, width=1030, height=330, max_weight=1000, max_lines=80)
+    tools = [ToolInfo(odl_id=1, width=400, height=300, weight=1.0), ToolInfo(odl_id=2, width=400, height=300, weight=1.0),
+             ToolInfo(odl_id=3, width=150, height=300, weight=1.0)]
+    layouts = [NestingLayout(1, 15, 15, 400, 300, 1.0), NestingLayout(2, 500, 15, 400, 300, 1.0)]
+
+    result = model._solve_lns_submodel(tools, autoclave, layouts, {1, 2}, (0, 0, 1030, 330), 1.0, random.Random(1))
+
+    assert sorted(l.odl_id for l in result) == [1, 2, 3]
+    assert model._is_portfolio_layout_valid(result, autoclave)
+
+
+def test_lns_improves_incumbent_on_large_batch():
+    tools = random_tools(100, seed=5, width=(150, 700), height=(100, 500), weight=(5, 40))
+    model = NestingModel(_params(timeout_override=3, lns_subsolve_seconds=0.3))
+    incumbent = model._build_cpsat_warm_start(tools, AUTOCLAVE)
+
+    solution = model.solve(tools, AUTOCLAVE)
+    metrics = solution.metrics
+
+    assert solution.algorithm_status == "CP-SAT_LNS"
+    assert metrics.lns_iterations >= 3
+    assert set(metrics.lns_improvements) == {"strip", "window", "gap"}
+    assert model._portfolio_score(solution.layouts, AUTOCLAVE) >= model._portfolio_score(incumbent, AUTOCLAVE)
+    scores = [score for _, score in metrics.improvement_curve]
+    assert scores == sorted(scores)
+
+    layouts = solution.layouts
+    for layout in layouts:
+        assert layout.x >= 15 and layout.y >= 15
+        assert layout.x + layout.width <= AUTOCLAVE.width - 15
+        assert layout.y + layout.height <= AUTOCLAVE.height - 15
+    for i, a in enumerate(layouts):
+        for b in layouts[i + 1:]:
+            assert (a.x + a.width + 10 <= b.x or b.x + b.width + 10 <= a.x or
+                    a.y + a.height + 10 <= b.y or b.y + b.height + 10 <= a.y)
@@ -0,0 +1,80 @@
+"""
+Test modalità di solve: fast senza CP-SAT a latenza garantita, balanced con budget CP-SAT limitato
+"""
+
+import os
+import random
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.solver import NestingModel, AutoclaveInfo, MODE_TIMEOUT_CAP_SECONDS
+from services.nesting.solver_2l import NestingModel2L, NestingParameters2L, ToolInfo2L, AutoclaveInfo2L
+from services.nesting.tests.conftest import nesting_parameters, random_tools
+
+
+AUTOCLAVE = AutoclaveInfo(id=1, width=8000, height=2500, max_weight=20000, max_lines=80)
+
+
+def _tools(count, seed):
+    return random_tools(count, seed, width=(100, 1500), height=(100, 900))
+
+
+def _params(mode, **overrides):
+    return nesting_parameters(**{'vacuum_lines_capacity': 80, 'mode': mode, **overrides})
+
+
+def test_fast_mode_skips_cpsat_and_meets_latency(monkeypatch):
+    def _no_cpsat(*args, **kwargs):
+        raise AssertionError("CP-SAT non deve essere usato in modalità fast")
+    monkeypatch.setattr(NestingModel, "_solve_cpsat_aerospace", _no_cpsat)
+
+    latencies = []
+    for seed in range(20):
+        tools = _tools(100, seed)
+        model = NestingModel(_params("fast"))
+        started = time.perf_counter()
+        solution = model.solve(tools, AUTOCLAVE)
+        latencies.append(time.perf_counter() - started)
+
+        assert solution.algorithm_status == "FAST_BL_FFD" and solution.metrics.mode_used == "fast"
+        assert model._is_portfolio_layout_valid(solution.layouts, AUTOCLAVE)
+        assert solution.metrics.positioned_count + solution.metrics.excluded_count == len(tools)
+
+    assert max(latencies) < 0.5
+
+
+def test_balanced_mode_caps_cpsat_budget(monkeypatch):
+    budgets = []
+
+    def _capture(self, tools, autoclave, timeout_seconds, start_time, **kwargs):
+        budgets.append(timeout_seconds)
+        return None
+    monkeypatch.setattr(NestingModel, "_solve_cpsat_aerospace", _capture)
+
+    solution = NestingModel(_params("balanced", timeout_override=120, early_stop_enabled=False,
+                                    use_grasp_heuristic=False)).solve(_tools(12, seed=1), AUTOCLAVE)
+
+    assert budgets == [MODE_TIMEOUT_CAP_SECONDS["balanced"]]
+    assert solution.metrics.mode_used == "balanced"
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        NestingModel(_params("instant")).solve(_tools(3, seed=2), AUTOCLAVE)
+
+
+def test_2l_fast_mode_reports_mode():
+    rng = random.Random(3)
+    tools = [ToolInfo2L(odl_id=i + 1, width=rng.randint(300, 900), height=rng.randint(200, 600), weight=15.0)
+             for i in range(10)]
+    autoclave = AutoclaveInfo2L(id=1, width=3000, height=1500, max_weight=5000, max_lines=40)
+    params = NestingParameters2L(padding_mm=10, min_distance_mm=15, vacuum_lines_capacity=40, mode="fast")
+
+    solution = NestingModel2L(params).solve_2l(tools, autoclave)
+
+    assert solution.metrics.mode_used == "fast"
+    assert solution.metrics.positioned_count > 0
@@ -0,0 +1,39 @@
+"""
+Test CP-SAT multi-risoluzione: fase grossolana già ammissibile a 1mm, rifinitura mai peggiorativa
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.solver import NestingModel, AutoclaveInfo
+from services.nesting.tests.conftest import nesting_parameters, random_tools
+
+
+AUTOCLAVE = AutoclaveInfo(id=1, width=6000, height=1800, max_weight=5000, max_lines=40)
+
+
+def test_multires_reports_stages_and_valid_layout():
+    params = nesting_parameters(vacuum_lines_capacity=40,
+                                timeout_override=4, num_search_workers=2,
+                                cpsat_multires=True, cpsat_coarse_grid_mm=25, early_stop_enabled=False)
+    tools = random_tools(14, seed=3, width=(300, 1500), height=(200, 900), weight=(5, 40))
+    solution = NestingModel(params).solve(tools, AUTOCLAVE)
+    metrics = solution.metrics
+
+    assert solution.success and "MULTIRES" in solution.algorithm_status
+    assert [stage['stage'] for stage in metrics.multires_stages] == ['coarse', 'refine']
+    assert metrics.multires_stages[0]['grid_mm'] == 25
+    assert all(stage['time_ms'] > 0 for stage in metrics.multires_stages)
+    assert metrics.multires_quality_delta_pct >= 0
+
+    layouts = solution.layouts
+    for layout in layouts:
+        assert layout.x >= 15 and layout.y >= 15
+        assert layout.x + layout.width <= AUTOCLAVE.width - 15
+        assert layout.y + layout.height <= AUTOCLAVE.height - 15
+    for i, a in enumerate(layouts):
+        for b in layouts[i + 1:]:
+            assert (a.x + a.width + 10 <= b.x or b.x + b.width + 10 <= a.x or
+                    a.y + a.height + 10 <= b.y or b.y + b.height + 10 <= a.y)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test per la formulazione CP-SAT a intervalli opzionali (AddNoOverlap2D)
+Confronta la dimensione del modello e la validità del layout con la formulazione pairwise
+"""
+
+import sys
+import os
+import time
+
+# Aggiunge il path del backend per gli import
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.solver import NestingModel, NestingParameters, ToolInfo, AutoclaveInfo
+
+
+def _make_instance():
+    tools = [
+        ToolInfo(odl_id=i + 1, width=180 + (i * 37) % 220, height=120 + (i * 53) % 160,
+                 weight=10.0 + i, lines_needed=1)
+        for i in range(16)
+    ]
+    autoclave = AutoclaveInfo(id=1, width=2000.0, height=1200.0, max_weight=1000.0, max_lines=30)
+    return tools, autoclave
+
+
+def _solve_with_mode(mode: str):
+    tools, autoclave = _make_instance()
+    parameters = NestingParameters(
+        padding_mm=10.0,
+        min_distance_mm=15.0,
+        vacuum_lines_capacity=30,
+        num_search_workers=4,
+        cpsat_model_mode=mode
+    )
+    model = NestingModel(parameters)
+    solution = model._solve_cpsat_aerospace(tools, autoclave, 3.0, time.time())
+    return solution, parameters, autoclave
+
+
+def _assert_padding_respected(layouts, padding, autoclave, margin):
+    for layout in layouts:
+        assert layout.x >= margin and layout.y >= margin
+        assert layout.x + layout.width <= autoclave.width - margin
+        assert layout.y + layout.height <= autoclave.height - margin
+    for i, a in enumerate(layouts):
+        for b in layouts[i + 1:]:
+            separated = (
+                a.x + a.width + padding <= b.x or
+                b.x + b.width + padding <= a.x or
+                a.y + a.height + padding <= b.y or
+                b.y + b.height + padding <= a.y
+            )
+            assert separated, f"ODL {a.odl_id} e ODL {b.odl_id} violano il padding"
+
+
+def test_no_overlap_2d_layout_valid():
+    """Il modello a intervalli produce layout validi con padding e margini"""
+    solution, parameters, autoclave = _solve_with_mode("no_overlap_2d")
+
+    assert solution.success
+    assert solution.metrics.cpsat_model_mode == "no_overlap_2d"
+    assert solution.metrics.model_variables > 0
+    assert solution.metrics.model_constraints > 0
+    _assert_padding_respected(solution.layouts, parameters.padding_mm, autoclave, parameters.min_distance_mm)
+
+
+def test_no_overlap_2d_smaller_than_pairwise():
+    """Il modello a intervalli è più piccolo della formulazione pairwise sulla stessa istanza"""
+    intervals, _, _ = _solve_with_mode("no_overlap_2d")
+    pairwise, parameters, autoclave = _solve_with_mode("pairwise")
+
+    assert pairwise.success
+    assert pairwise.metrics.cpsat_model_mode == "pairwise"
+    _assert_padding_respected(pairwise.layouts, parameters.padding_mm, autoclave, parameters.min_distance_mm)
+
+    assert intervals.metrics.model_variables < pairwise.metrics.model_variables
+    assert intervals.metrics.model_constraints < pairwise.metrics.model_constraints
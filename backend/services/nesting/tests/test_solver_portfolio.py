@@ -0,0 +1,54 @@
+"""
+Test portfolio parallelo: deadline rigida, layout valido, score per motore in algorithm_used
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.solver import (
+    NestingModel, NestingParameters, NestingLayout, ToolInfo, AutoclaveInfo, PORTFOLIO_ENGINES
+)
+
+
+AUTOCLAVE = AutoclaveInfo(id=1, width=3000, height=1500, max_weight=2000, max_lines=40)
+
+
+def test_portfolio_returns_best_valid_layout_within_deadline():
+    rng = random.Random(1)
+    tools = [
+        ToolInfo(odl_id=i + 1, width=rng.randint(150, 700), height=rng.randint(100, 500),
+                 weight=rng.randint(5, 40), lines_needed=1)
+        for i in range(8)
+    ]
+    deadline = 8.0
+    params = NestingParameters(padding_mm=10, min_distance_mm=15, vacuum_lines_capacity=40,
+                               num_search_workers=2, portfolio_mode=True,
+                               portfolio_deadline_seconds=deadline)
+    model = NestingModel(params)
+
+    start = time.time()
+    solution = model.solve(tools, AUTOCLAVE)
+    elapsed = time.time() - start
+
+    assert elapsed < deadline + 1.5
+    assert solution.success
+    assert solution.algorithm_status.startswith("PORTFOLIO_")
+    assert model._is_portfolio_layout_valid(solution.layouts, AUTOCLAVE)
+    for engine in PORTFOLIO_ENGINES:
+        assert f"{engine}=" in solution.metrics.algorithm_used
+
+
+def test_portfolio_validity_rejects_overlap_and_overweight():
+    model = NestingModel(NestingParameters(vacuum_lines_capacity=10))
+    a = NestingLayout(1, 0, 0, 100, 100, 10.0)
+    b = NestingLayout(2, 50, 50, 100, 100, 10.0)
+    c = NestingLayout(3, 200, 0, 100, 100, 5000.0)
+
+    assert model._is_portfolio_layout_valid([a], AUTOCLAVE)
+    assert not model._is_portfolio_layout_valid([a, b], AUTOCLAVE)
+    assert not model._is_portfolio_layout_valid([a, c], AUTOCLAVE)
+    assert model._portfolio_score([a, c], AUTOCLAVE) > model._portfolio_score([a], AUTOCLAVE)
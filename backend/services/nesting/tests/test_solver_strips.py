@@ -0,0 +1,94 @@
+"""
+Test decomposizione in strisce: piano delle strisce, bin packing 1D, unione con riparazione delle giunzioni
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.solver import NestingModel, AutoclaveInfo
+from services.nesting.tests.conftest import nesting_parameters, random_tools
+
+
+AUTOCLAVE = AutoclaveInfo(id=1, width=9000, height=1800, max_weight=20000, max_lines=80)
+
+
+def _tools(count, seed):
+    return random_tools(count, seed, width=(300, 1100), height=(200, 700))
+
+
+def _params(**overrides):
+    return nesting_parameters(**{
+        'vacuum_lines_capacity': 80, 'strip_decomposition': True, 'strip_min_tools': 30, 'strip_workers': 1,
+        **overrides
+    })
+
+
+def test_strips_cover_floor_with_padding_at_seams():
+    model = NestingModel(_params())
+    tools = _tools(40, seed=1)
+    strips = model._plan_strips(tools, AUTOCLAVE)
+
+    assert len(strips) == 4
+    assert strips[0][0] == 15 and strips[-1][1] == AUTOCLAVE.width - 15
+    for (_, left_end), (right_start, _) in zip(strips, strips[1:]):
+        assert right_start - left_end == 10
+
+    assigned, unassigned = model._assign_tools_to_strips(tools, strips, AUTOCLAVE)
+    assert not unassigned
+    assert sorted(t.odl_id for group in assigned for t in group) == [t.odl_id for t in tools]
+
+
+def test_strip_decomposition_merges_valid_layout_with_metrics():
+    tools = _tools(40, seed=2)
+    model = NestingModel(_params(timeout_override=4, num_search_workers=2))
+    solution = model.solve(tools, AUTOCLAVE)
+    metrics = solution.metrics
+
+    assert solution.algorithm_status == "STRIP_DECOMPOSITION"
+    assert len(metrics.strip_stats) == 4
+    assert all(stat['time_ms'] > 0 for stat in metrics.strip_stats)
+    assert sum(stat['placed'] for stat in metrics.strip_stats) + metrics.strip_repaired == len(solution.layouts)
+    reference = model._portfolio_score(model._build_cpsat_warm_start(tools, AUTOCLAVE), AUTOCLAVE)
+    assert abs(metrics.strip_efficiency_loss_pct - (reference - metrics.efficiency_score)) < 1e-6
+
+    assert model._is_portfolio_layout_valid(solution.layouts, AUTOCLAVE)
+    layouts = solution.layouts
+    for i, a in enumerate(layouts):
+        for b in layouts[i + 1:]:
+            assert (a.x + a.width + 10 <= b.x or b.x + b.width + 10 <= a.x or
+                    a.y + a.height + 10 <= b.y or b.y + b.height + 10 <= a.y)
+
+
+def test_seam_repair_fills_leftover_gaps():
+    model = NestingModel(_params())
+    tools = _tools(3, seed=3)
+    placed, repaired = model._fill_gaps([], tools, AUTOCLAVE)
+
+    assert repaired == 3 and len(placed) == 3
+    assert model._is_portfolio_layout_valid(placed, AUTOCLAVE)
+
+
+def test_strip_sub_solves_skip_cache_and_gap_fill_keeps_planned_margin(tmp_path, monkeypatch):
+    import services.nesting.solver as solver_module
+    from services.nesting import solution_cache
+
+    monkeypatch.setattr(solution_cache, "_default_cache",
+                        solution_cache.NestingSolutionCache(db_path=str(tmp_path / "cache.db")))
+    seen = []
+    original = solver_module._solve_strip
+
+    def record(parameters, tools, autoclave):
+        seen.append(parameters)
+        return original(parameters, tools, autoclave)
+
+    monkeypatch.setattr(solver_module, "_solve_strip", record)
+    model = NestingModel(_params(timeout_override=4, num_search_workers=2, use_solution_cache=True))
+    model.solve(_tools(40, seed=2), AUTOCLAVE)
+    assert seen and not any(p.use_solution_cache for p in seen)
+
+    # Margine frazionario: il riempimento rispetta lo stesso margine per eccesso delle strisce
+    model = NestingModel(_params(min_distance_mm=15.4))
+    placed, _ = model._fill_gaps([], _tools(3, seed=3), AUTOCLAVE)
+    assert min(min(l.x, l.y) for l in placed) >= 16
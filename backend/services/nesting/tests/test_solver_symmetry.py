@@ -0,0 +1,52 @@
+"""
+Test classi di equivalenza tra tool identici e rottura simmetrie CP-SAT
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.solver import NestingModel, NestingParameters, NestingLayout, ToolInfo, AutoclaveInfo
+
+
+AUTOCLAVE = AutoclaveInfo(id=1, width=1300, height=500, max_weight=1000, max_lines=20)
+
+
+def test_classes_group_identical_tools_by_priority():
+    model = NestingModel(NestingParameters())
+    tools = [
+        ToolInfo(odl_id=5, width=400, height=300, weight=10.0),
+        ToolInfo(odl_id=2, width=400.2, height=300, weight=10.0),
+        ToolInfo(odl_id=9, width=400, height=300, weight=10.0, priority=3),
+        ToolInfo(odl_id=7, width=400, height=300, weight=12.0),
+    ]
+    classes = model._build_tool_classes(tools)
+
+    assert sorted([t.odl_id for t in c] for c in classes) == [[7], [9, 2, 5]]
+
+
+def test_canonicalize_assigns_lexicographic_positions_in_class_order():
+    model = NestingModel(NestingParameters())
+    tools = [ToolInfo(odl_id=i, width=100, height=100, weight=1.0) for i in (1, 2, 3)]
+    layouts = [NestingLayout(3, 10, 10, 100, 100, 1.0), NestingLayout(1, 500, 10, 100, 100, 1.0)]
+
+    canonical = model._canonicalize_layouts(model._build_tool_classes(tools), layouts)
+
+    assert sorted((l.odl_id, l.x) for l in canonical) == [(1, 10), (2, 500)]
+
+
+def test_repeated_tools_keep_priority_and_report_classes():
+    # Entrano al massimo 3 tool su 5 identici: devono essere i più prioritari
+    tools = [ToolInfo(odl_id=i + 1, width=400, height=450, weight=10.0, priority=2 if i >= 2 else 1) for i in range(5)]
+    params = NestingParameters(padding_mm=10, min_distance_mm=15, vacuum_lines_capacity=20,
+                               timeout_override=3, num_search_workers=2)
+    solution = NestingModel(params).solve(tools, AUTOCLAVE)
+    metrics = solution.metrics
+
+    assert solution.algorithm_status.startswith("CP-SAT")
+    assert metrics.tool_classes == 1 and metrics.symmetric_tools == 5
+    assert metrics.symmetry_constraints == 8
+    assert sorted(l.odl_id for l in solution.layouts) == [3, 4, 5]
+    positions = [(l.x, l.y) for l in sorted(solution.layouts, key=lambda l: l.odl_id)]
+    assert positions == sorted(positions)
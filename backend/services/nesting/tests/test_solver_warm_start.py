@@ -0,0 +1,56 @@
+"""
+Test warm start CP-SAT: hint BL-FFD e curva delle soluzioni migliorative
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.solver import NestingModel, AutoclaveInfo
+from services.nesting.tests.conftest import nesting_parameters, random_tools
+
+
+AUTOCLAVE = AutoclaveInfo(id=1, width=3000, height=1500, max_weight=2000, max_lines=40)
+
+
+def _tools(count, seed):
+    return random_tools(count, seed, width=(150, 700), height=(100, 500), weight=(5, 40), lines=(1, 2))
+
+
+def _params(**overrides):
+    return nesting_parameters(**{'vacuum_lines_capacity': 40, 'timeout_override': 3, 'num_search_workers': 4,
+                                 **overrides})
+
+
+def test_warm_start_layout_respects_cpsat_geometry():
+    params = _params()
+    model = NestingModel(params)
+    layouts = model._build_cpsat_warm_start(_tools(12, seed=2), AUTOCLAVE)
+
+    assert layouts
+    margin, padding = 15, 10
+    for layout in layouts:
+        assert layout.x >= margin and layout.y >= margin
+        assert layout.x + layout.width <= AUTOCLAVE.width - margin
+        assert layout.y + layout.height <= AUTOCLAVE.height - margin
+    for i, a in enumerate(layouts):
+        for b in layouts[i + 1:]:
+            assert (a.x + a.width + padding <= b.x or b.x + b.width + padding <= a.x or
+                    a.y + a.height + padding <= b.y or b.y + b.height + padding <= a.y)
+    assert sum(l.lines_used for l in layouts) <= params.vacuum_lines_capacity
+
+
+def test_solve_reports_first_solution_and_improvement_curve():
+    # Tutti i tool entrano già con BL-FFD: stop anticipato disattivato per osservare CP-SAT
+    solution = NestingModel(_params(early_stop_enabled=False)).solve(_tools(10, seed=1), AUTOCLAVE)
+    metrics = solution.metrics
+
+    assert solution.algorithm_status.startswith("CP-SAT")
+    assert metrics.warm_start_placed > 0
+    assert metrics.improvement_curve
+    assert metrics.time_to_first_solution_ms == metrics.improvement_curve[0][0]
+    times = [t for t, _ in metrics.improvement_curve]
+    objectives = [o for _, o in metrics.improvement_curve]
+    assert times == sorted(times)
+    assert all(a < b for a, b in zip(objectives, objectives[1:]))
@@ -0,0 +1,107 @@
+"""
+Test indice spaziale: equivalenza con le scansioni lineari usate da solver e solver_2l
+"""
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.spatial_index import RectIndex, LayoutIndexCache
+from services.nesting.solver import NestingModel, NestingParameters, NestingLayout
+from services.nesting.solver_2l import NestingModel2L, NestingParameters2L, NestingLayout2L
+
+
+def _random_rects(count, seed, size=3000.0):
+    rng = random.Random(seed)
+    return [
+        (rng.uniform(0, size), rng.uniform(0, size), rng.uniform(20, 600), rng.uniform(20, 600))
+        for _ in range(count)
+    ]
+
+
+def _linear_overlap(rect, others, padding):
+    x, y, w, h = rect
+    return [
+        k for k, (ox, oy, ow, oh) in enumerate(others)
+        if not (x + w + padding <= ox or ox + ow + padding <= x or
+                y + h + padding <= oy or oy + oh + padding <= y)
+    ]
+
+
+def test_query_matches_linear_scan():
+    rects = _random_rects(300, seed=1)
+    index = RectIndex.from_rects(enumerate(rects))
+    for query in _random_rects(200, seed=2):
+        for padding in (0.0, 15.0):
+            assert sorted(index.query(*query, padding=padding)) == _linear_overlap(query, rects, padding)
+            assert index.intersects(*query, padding=padding) == bool(_linear_overlap(query, rects, padding))
+
+
+def test_touching_edges_are_not_overlap():
+    index = RectIndex.from_rects([(0, (0, 0, 100, 100))], cell_size=50)
+    assert not index.intersects(100, 0, 50, 50)
+    assert not index.intersects(0, 100, 50, 50)
+    assert index.intersects(99, 0, 50, 50)
+    assert index.near(110, 0, 50, 50, distance=10) == [0]
+
+
+def test_remove_and_overlapping_pairs():
+    rects = _random_rects(150, seed=3)
+    index = RectIndex.from_rects(enumerate(rects))
+    expected = [
+        (i, j) for i in range(len(rects)) for j in range(i + 1, len(rects))
+        if _linear_overlap(rects[i], [rects[j]], 0.0)
+    ]
+    assert index.overlapping_pairs() == expected
+
+    for key in range(0, 150, 2):
+        assert index.remove(key)
+    assert not index.remove(0)
+    assert all(i % 2 and j % 2 for i, j in index.overlapping_pairs())
+
+
+def test_layout_cache_tracks_appends_and_rebuilds():
+    cache = LayoutIndexCache()
+    layouts = [NestingLayout(i, x, y, w, h, 1.0) for i, (x, y, w, h) in enumerate(_random_rects(20, seed=4))]
+    first = cache.get(layouts)
+    layouts.append(NestingLayout(99, 5000, 5000, 10, 10, 1.0))
+    assert cache.get(layouts) is first
+    assert first.intersects(5001, 5001, 2, 2)
+
+    replaced = list(layouts)
+    assert cache.get(replaced) is not first
+
+
+def test_solver_overlap_helpers_match_linear_scan():
+    model = NestingModel(NestingParameters())
+    layouts = [NestingLayout(i, x, y, w, h, 1.0) for i, (x, y, w, h) in enumerate(_random_rects(40, seed=5))]
+    for query in _random_rects(100, seed=6):
+        assert model._has_overlap(*query, layouts) == bool(_linear_overlap(query, [
+            (l.x, l.y, l.width, l.height) for l in layouts
+        ], 0.0))
+
+    expected = [
+        (layouts[i].odl_id, layouts[j].odl_id) for i in range(len(layouts)) for j in range(i + 1, len(layouts))
+        if _linear_overlap((layouts[i].x, layouts[i].y, layouts[i].width, layouts[i].height),
+                           [(layouts[j].x, layouts[j].y, layouts[j].width, layouts[j].height)], 0.0)
+    ]
+    assert [(a.odl_id, b.odl_id) for a, b in model.check_overlap(layouts)] == expected
+
+
+def test_solver_2l_x_adjacent_pairs_match_pairwise_scan():
+    model = NestingModel2L(NestingParameters2L())
+    layouts = [
+        NestingLayout2L(odl_id=i, x=x, y=y, width=w, height=h, weight=1.0, level=i % 2)
+        for i, (x, y, w, h) in enumerate(_random_rects(80, seed=7))
+    ]
+    threshold = 150.0
+    expected = [
+        (a.odl_id, b.odl_id)
+        for i, a in enumerate(layouts) if a.level == 1
+        for b in layouts[i + 1:] if b.level == 1
+        and min(abs(a.x + a.width - b.x), abs(b.x + b.width - a.x)) < threshold
+    ]
+    pairs = model._find_x_adjacent_pairs(layouts, threshold)
+    assert [(a.odl_id, b.odl_id) for a, b in pairs] == expected
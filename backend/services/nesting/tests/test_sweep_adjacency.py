@@ -0,0 +1,101 @@
+"""
+Test sort-and-sweep nell'ottimizzatore cavalletti: equivalenza con i confronti a coppie
+"""
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from services.nesting.spatial_index import sweep_pairs
+from services.nesting.cavalletti_optimizer import CavallettiOptimizerAdvanced
+from services.nesting.solver_2l import (
+    NestingLayout2L, CavallettiConfiguration, CavallettoPosition
+)
+
+
+def _random_supports(count, seed, size=3000.0):
+    rng = random.Random(seed)
+    return [
+        CavallettoPosition(x=rng.uniform(0, size), y=rng.uniform(0, size / 2), width=80.0, height=60.0,
+                           tool_odl_id=rng.randint(1, 20), sequence_number=k)
+        for k in range(count)
+    ]
+
+
+def _random_layouts(count, seed):
+    rng = random.Random(seed)
+    return [
+        NestingLayout2L(odl_id=i + 1, x=rng.uniform(0, 4000), y=rng.uniform(0, 2000),
+                        width=rng.choice([40.0, 300.0, 600.0, 900.0]), height=rng.choice([50.0, 400.0, 700.0]),
+                        weight=20.0, level=rng.choice([0, 1]))
+        for i in range(count)
+    ]
+
+
+def test_sweep_pairs_matches_brute_force():
+    rng = random.Random(3)
+    intervals = []
+    for k in range(400):
+        start = rng.uniform(0, 5000)
+        intervals.append((k, start, start + rng.choice([0.0, rng.uniform(1, 300)])))
+    for gap in (0.0, 25.0):
+        expected = {
+            frozenset((a, b))
+            for a, sa, ea in intervals for b, sb, eb in intervals
+            if a < b and max(sa, sb) - min(ea, eb) <= gap
+        }
+        pairs = sweep_pairs(intervals, gap)
+        assert len(pairs) == len(expected)
+        assert {frozenset(p) for p in pairs} == expected
+
+
+def test_support_neighbours_and_columns_match_linear_scan():
+    optimizer = CavallettiOptimizerAdvanced()
+    supports = _random_supports(500, seed=7)
+    radius = optimizer.LOAD_CONSOLIDATION_THRESHOLD
+
+    neighbours = optimizer._support_neighbours(supports, radius)
+    for k, cav in enumerate(supports):
+        assert neighbours[k] == [
+            j for j, other in enumerate(supports)
+            if j != k and ((cav.center_x - other.center_x) ** 2 + (cav.center_y - other.center_y) ** 2) ** 0.5 <= radius
+        ]
+
+    # Riferimento: prima colonna (in ordine di creazione) con media entro tolleranza
+    expected = []
+    for cav in supports:
+        column = next((c for c in expected if abs(cav.center_x - sum(s.center_x for s in c) / len(c))
+                       <= optimizer.COLUMN_ALIGNMENT_TOLERANCE), None)
+        if column is None:
+            expected.append([cav])
+        else:
+            column.append(cav)
+    assert optimizer._identify_potential_columns(supports, CavallettiConfiguration()) == expected
+
+
+def test_adjacent_pairs_are_those_with_common_support_area():
+    optimizer = CavallettiOptimizerAdvanced()
+    config = CavallettiConfiguration()
+    layouts = _random_layouts(250, seed=11)
+    margin = config.min_distance_from_edge
+
+    def area(l):
+        return (l.x + margin, l.x + l.width - margin - config.cavalletto_width,
+                l.y + margin, l.y + l.height - margin - config.cavalletto_height)
+
+    expected = set()
+    for a, tool in enumerate(layouts):
+        for b, other in enumerate(layouts):
+            ax0, ax1, ay0, ay1 = area(tool)
+            bx0, bx1, by0, by1 = area(other)
+            if (a < b and tool.level == other.level and ax0 <= ax1 and ay0 <= ay1 and bx0 <= bx1 and by0 <= by1
+                    and max(ax0, bx0) <= min(ax1, bx1) and max(ay0, by0) <= min(ay1, by1)
+                    and optimizer._are_adjacent(tool, other, config)):
+                expected.add((a, b))
+
+    pairs = optimizer._find_adjacent_tools_advanced(layouts, config)
+    assert len(pairs) == len(expected)
+    assert {tuple(sorted(p)) for p in pairs} == expected
+
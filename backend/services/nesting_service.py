@@ -47,6 +47,7 @@ class NestingParameters:
     use_fallback: bool = True  # Usa fallback greedy se CP-SAT fallisce
     allow_heuristic: bool = True  # Usa euristiche avanzate
     timeout_override: Optional[int] = None  # Override del timeout predefinito
+    mode: str = "thorough"  # Modalità di solve: fast | balanced | thorough
     
 @dataclass
 class ToolPosition:
@@ -860,6 +861,7 @@ class NestingService:
                 use_fallback=True,
                 allow_heuristic=True,
                 timeout_override=None,
+                mode=parameters.mode,
                 heavy_piece_threshold_kg=50.0,
                 # 🔧 PARAMETRI OTTIMIZZATI PER EFFICIENZA REALE:
                 use_multithread=True,  # Multi-threading per convergenza migliore
@@ -868,7 +870,8 @@ class NestingService:
                 compactness_weight=0.05,  # 🔧 RIDOTTO: 5% vs 10% per priorità area
                 balance_weight=0.02,  # 🔧 RIDOTTO: 2% vs 5% per priorità area  
                 area_weight=0.93,  # 🔧 AUMENTATO: 93% vs 85% per efficienza spazio
-                max_iterations_grasp=8  # 🔧 AUMENTATO: 8 vs 5 iterazioni per convergenza
+                max_iterations_grasp=8,  # 🔧 AUMENTATO: 8 vs 5 iterazioni per convergenza
+                use_solution_cache=True  # 🚀 Riuso layout per set di tool già nestati (ODL diversi)
             )
             
             # 🚀 AEROSPACE: Conversione tool data